@@ -23,9 +23,98 @@ class Config:
 
     # Gemini API Configuration
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+    GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+    # Model backend: "gemini" (the Gemini API, needs GEMINI_API_KEY), "stand-in" (the local server in
+    # api/services/gemini_standin.py at GEMINI_STANDIN_URL, for load and failure tests) or "offline"
+    # (no model; the offline analyzers answer). Stand-in calls give up after GEMINI_STANDIN_TIMEOUT_SECONDS
+    GEMINI_BACKEND = os.getenv("GEMINI_BACKEND", "gemini").lower()
+    GEMINI_STANDIN_URL = os.getenv("GEMINI_STANDIN_URL", "http://127.0.0.1:8765")
+    GEMINI_STANDIN_TIMEOUT_SECONDS = float(os.getenv("GEMINI_STANDIN_TIMEOUT_SECONDS", "120"))
 
     # File upload limits
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+    # Whole request body limit for /pdf uploads: the file plus multipart framing and form fields
+    MAX_REQUEST_SIZE = MAX_FILE_SIZE + 256 * 1024
+    # Uploads are validated and hashed in chunks of this size
+    UPLOAD_CHUNK_SIZE = 64 * 1024
+
+    # Extraction cache (keyed by SHA-256 of the uploaded PDF bytes); the disk tier also keeps
+    # PDFs fetched from GCS by object_name, within the same EXTRACTION_CACHE_MAX_DISK_MB
+    EXTRACTION_CACHE_MEMORY_ITEMS = int(os.getenv("EXTRACTION_CACHE_MEMORY_ITEMS", "32"))
+    EXTRACTION_CACHE_DIR = os.getenv("EXTRACTION_CACHE_DIR", ".cache/extraction")
+    EXTRACTION_CACHE_MAX_DISK_MB = int(os.getenv("EXTRACTION_CACHE_MAX_DISK_MB", "256"))  # 0 disables the disk tier
+
+    # Parallel extraction: PDFs with at least this many pages are split across a process pool
+    PARALLEL_EXTRACTION_MIN_PAGES = int(os.getenv("PARALLEL_EXTRACTION_MIN_PAGES", "60"))
+    EXTRACTION_PROCESSES = int(os.getenv("EXTRACTION_PROCESSES", str(os.cpu_count() or 1)))
+
+    # Gemini response cache (SQLite); set LLM_CACHE_PATH to an empty string to disable it
+    LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".cache/llm_responses.sqlite3")
+    LLM_CACHE_TTL_HOURS = float(os.getenv("LLM_CACHE_TTL_HOURS", "168"))
+    LLM_CACHE_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB", "128"))
+
+    # Worker pools that keep blocking work off the event loop
+    # (size = threads, concurrency = requests allowed in the pool at once; the rest wait)
+    EXTRACTION_POOL_SIZE = int(os.getenv("EXTRACTION_POOL_SIZE", "2"))
+    EXTRACTION_POOL_CONCURRENCY = int(os.getenv("EXTRACTION_POOL_CONCURRENCY", "4"))
+    GEMINI_POOL_SIZE = int(os.getenv("GEMINI_POOL_SIZE", "8"))
+    GEMINI_POOL_CONCURRENCY = int(os.getenv("GEMINI_POOL_CONCURRENCY", "16"))
+    GCS_POOL_SIZE = int(os.getenv("GCS_POOL_SIZE", "8"))
+    GCS_POOL_CONCURRENCY = int(os.getenv("GCS_POOL_CONCURRENCY", "16"))
+
+    # Google Cloud Storage (/file): HTTP connections to GCS kept open and shared by every request
+    GCS_HTTP_POOL_SIZE = int(os.getenv("GCS_HTTP_POOL_SIZE", "10"))
+    # Uploads go over resumable sessions in chunks of GCS_UPLOAD_CHUNK_MB (rounded to 256 KiB);
+    # failed requests are retried, resuming from what GCS stored, for up to GCS_UPLOAD_RETRY_SECONDS
+    GCS_UPLOAD_CHUNK_MB = float(os.getenv("GCS_UPLOAD_CHUNK_MB", "8"))
+    GCS_UPLOAD_RETRY_SECONDS = float(os.getenv("GCS_UPLOAD_RETRY_SECONDS", "120"))
+    # /file/upload stores content under GCS_CONTENT_PREFIX + SHA-256 (uploaded once) and
+    # records each filename under GCS_ALIAS_PREFIX + filename
+    GCS_CONTENT_PREFIX = os.getenv("GCS_CONTENT_PREFIX", "sha256/")
+    GCS_ALIAS_PREFIX = os.getenv("GCS_ALIAS_PREFIX", "aliases/")
+    # Content and aliases seen in the bucket are trusted for GCS_KNOWN_OBJECT_TTL_SECONDS (at most
+    # GCS_KNOWN_OBJECT_ITEMS of each) before a repeat upload checks GCS again; 0 always checks
+    GCS_KNOWN_OBJECT_TTL_SECONDS = float(os.getenv("GCS_KNOWN_OBJECT_TTL_SECONDS", "300"))
+    GCS_KNOWN_OBJECT_ITEMS = int(os.getenv("GCS_KNOWN_OBJECT_ITEMS", "10000"))
+    # Signed URLs are valid for SIGNED_URL_TTL_SECONDS and reused from a cache of up to
+    # SIGNED_URL_CACHE_ITEMS while at least SIGNED_URL_MIN_REMAINING_SECONDS of that is left
+    SIGNED_URL_TTL_SECONDS = int(os.getenv("SIGNED_URL_TTL_SECONDS", "3600"))
+    SIGNED_URL_MIN_REMAINING_SECONDS = int(os.getenv("SIGNED_URL_MIN_REMAINING_SECONDS", "900"))
+    SIGNED_URL_CACHE_ITEMS = int(os.getenv("SIGNED_URL_CACHE_ITEMS", "10000"))
+    # /file/list pages are reused for this many seconds (0 disables the cache); uploads clear it
+    FILE_LIST_CACHE_TTL_SECONDS = float(os.getenv("FILE_LIST_CACHE_TTL_SECONDS", "15"))
+
+    # Map-reduce analysis of long transcripts: page-aligned chunks of at most CHUNK_MAX_TOKENS
+    # (estimated at 4 characters per token), analyzed with at most CHUNK_CONCURRENCY calls in flight;
+    # a chunk's call is tried CHUNK_ATTEMPTS times before the chunk is reported as not analyzed
+    CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "20000"))
+    CHUNK_CONCURRENCY = int(os.getenv("CHUNK_CONCURRENCY", "4"))
+    CHUNK_ATTEMPTS = int(os.getenv("CHUNK_ATTEMPTS", "2"))
+
+    # Relevance pre-filter for innocence analysis (context_filter=true): share of lines kept as
+    # top-scoring seeds and lines of context kept around each seed
+    RELEVANCE_KEEP_RATIO = float(os.getenv("RELEVANCE_KEEP_RATIO", "0.1"))
+    RELEVANCE_CONTEXT_LINES = int(os.getenv("RELEVANCE_CONTEXT_LINES", "2"))
+
+    # Citation verification (verify_citations=true): share of a quote's character n-grams a
+    # transcript passage must contain for the quote to count as found there
+    CITATION_MIN_SIMILARITY = float(os.getenv("CITATION_MIN_SIMILARITY", "0.8"))
+
+    # Finished parole summaries and innocence analyses (SQLite, zlib-compressed JSON) served by
+    # /pdf/results; set RESULTS_DB_PATH to an empty string to disable it
+    RESULTS_DB_PATH = os.getenv("RESULTS_DB_PATH", ".cache/results.sqlite3")
+
+    # Background analysis jobs (/pdf/jobs): SQLite job records, saved uploads, worker count and
+    # how many queued jobs are accepted before new submissions are turned away with 503
+    JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", ".cache/jobs.sqlite3")
+    JOBS_DIR = os.getenv("JOBS_DIR", ".cache/jobs")
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+    JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", "100"))
+
+    # Multi-file /pdf/batch uploads: files per request, total body size and files analyzed at once
+    BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "50"))
+    BATCH_MAX_REQUEST_SIZE = int(os.getenv("BATCH_MAX_REQUEST_MB", "200")) * 1024 * 1024
+    BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
 
     # Debug mode (disable in production)
     DEBUG = os.getenv("DEBUG", "True").lower() in ("true", "1", "yes")
@@ -38,12 +127,21 @@ class Config:
 
     @classmethod
     def get_gemini_model(cls) -> Any:
-        """Get configured Gemini model."""
+        """Get the model of the configured GEMINI_BACKEND, or None to use the offline analyzers."""
+        if cls.GEMINI_BACKEND == "offline":
+            return None
+        if cls.GEMINI_BACKEND == "stand-in":
+            from api.services.gemini_standin import StandInGenerativeModel
+
+            return StandInGenerativeModel(cls.GEMINI_STANDIN_URL, cls.GEMINI_MODEL, timeout=cls.GEMINI_STANDIN_TIMEOUT_SECONDS)
+        if cls.GEMINI_BACKEND != "gemini":
+            print(f"Warning: unknown GEMINI_BACKEND {cls.GEMINI_BACKEND!r}, using the offline analyzers")
+            return None
         if GENAI_AVAILABLE and genai and cls.GEMINI_API_KEY:
             try:
                 genai.configure(api_key=cls.GEMINI_API_KEY)  # type: ignore
-                # Use the updated gemini-2.5-flash model
-                return genai.GenerativeModel("gemini-2.5-flash")  # type: ignore
+                # Defaults to the gemini-2.5-flash model
+                return genai.GenerativeModel(cls.GEMINI_MODEL)  # type: ignore
             except Exception as e:
                 print(f"Error configuring Gemini: {e}")
                 return None
@@ -56,8 +154,10 @@ class Config:
 
     @classmethod
     def is_gemini_configured(cls) -> bool:
-        """Check if Gemini is properly configured."""
-        return cls.GEMINI_API_KEY is not None and GENAI_AVAILABLE
+        """Check if a model backend is properly configured."""
+        if cls.GEMINI_BACKEND == "stand-in":
+            return True
+        return cls.GEMINI_BACKEND == "gemini" and cls.GEMINI_API_KEY is not None and GENAI_AVAILABLE
 
 
 config = Config()
@@ -0,0 +1,85 @@
+import json
+from typing import Any, Callable, Optional
+
+Message = dict[str, Any]
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Reject oversized request bodies before they are parsed.
+
+    Requests whose Content-Length is over the limit are answered with 413 without reading
+    the body. Chunked bodies are counted as they stream in; once the limit is crossed the
+    rest of the body is not buffered and the app's response is replaced with a 413.
+
+    path_limits overrides max_body_size for specific path prefixes (the longest match wins),
+    e.g. a larger budget for multi-file batch uploads.
+    """
+
+    def __init__(self, app: Any, max_body_size: int, path_prefixes: tuple[str, ...] = ("/pdf",), path_limits: Optional[dict[str, int]] = None):
+        self.app = app
+        self.max_body_size = max_body_size
+        self.path_prefixes = path_prefixes
+        self.path_limits = sorted((path_limits or {}).items(), key=lambda item: len(item[0]), reverse=True)
+
+    def _limit_for(self, path: str) -> int:
+        for prefix, limit in self.path_limits:
+            if path.startswith(prefix):
+                return limit
+        return self.max_body_size
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        max_body_size = self._limit_for(scope["path"])
+        for name, value in scope.get("headers", []):
+            if name == b"content-length":
+                try:
+                    if int(value) > max_body_size:
+                        await self._send_rejection(send, max_body_size)
+                        return
+                except ValueError:
+                    pass
+
+        received = 0
+        too_large = False
+        response_started = False
+        rejection_sent = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, too_large
+            if too_large:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_body_size:
+                    # Stop reading; the app sees a disconnect and its error response is swapped out
+                    too_large = True
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message: Message) -> None:
+            nonlocal response_started, rejection_sent
+            if not too_large or response_started:
+                response_started = True
+                await send(message)
+            elif not rejection_sent:
+                rejection_sent = True
+                await self._send_rejection(send, max_body_size)
+
+        await self.app(scope, limited_receive, guarded_send)
+
+    async def _send_rejection(self, send: Callable, max_body_size: int) -> None:
+        limit_mb = max_body_size // (1024 * 1024)
+        body = json.dumps({"detail": f"Request body exceeds {limit_mb}MB limit"}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 413,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -1,11 +1,20 @@
-from fastapi import APIRouter, UploadFile, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, UploadFile, HTTPException, Query
 
 # Try to import GCS client, make it optional
 try:
-    from ..services.gcs_client import upload_file as gcs_upload_file, GCS_AVAILABLE
+    from ..services.gcs_client import (
+        file_url_async as gcs_file_url,
+        list_files_async as gcs_list_files,
+        store_upload_async as gcs_store_upload,
+        GCS_AVAILABLE,
+    )
 except ImportError:
     GCS_AVAILABLE = False
-    gcs_upload_file = None
+    gcs_store_upload = gcs_list_files = gcs_file_url = None
+
+from ..services.ingestion import ingest_upload
 
 router = APIRouter(prefix="/file", tags=["File"])
 
@@ -14,29 +23,60 @@ router = APIRouter(prefix="/file", tags=["File"])
 async def upload_file_route(file: UploadFile):
     """
     Upload a file to Google Cloud Storage
+
+    The file is stored once per content (under its SHA-256); uploading the same bytes again,
+    under any filename, only records the filename alias and returns "deduplicated": true.
     """
-    if not GCS_AVAILABLE or not gcs_upload_file:
+    if not GCS_AVAILABLE or not gcs_store_upload:
         raise HTTPException(status_code=503, detail="File upload service is not available. Google Cloud Storage is not configured.")
 
     try:
-        # Generate a safe filename
-        destination_name = file.filename or "uploaded_file"
+        # Hash the upload in one streaming pass over the spooled file
+        upload = await ingest_upload(file)
 
-        # Upload the file to GCS
-        url = gcs_upload_file(file.file, destination_name)
+        # Stream new content to GCS in chunks over a resumable session, in the GCS worker pool
+        stored = await gcs_store_upload(upload.file, upload.sha256, upload.size, file.filename, file.content_type)
 
-        return {"success": True, "filename": file.filename, "file_size": file.size, "content_type": file.content_type, "url": url}
+        return {"success": True, "filename": file.filename, "file_size": upload.size, "content_type": file.content_type, **stored}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/list")
-async def list_files_route():
+async def list_files_route(
+    prefix: str = "",
+    page_size: int = Query(100, ge=1, le=1000),
+    page_token: Optional[str] = None,
+    sign: bool = False,
+):
     """
-    List all files stored in Google Cloud Storage
+    List files stored in Google Cloud Storage, one page at a time
+
+    Args:
+        prefix: Only list files whose names start with this
+        page_size: Files per page (1-1000)
+        page_token: next_page_token from the previous page
+        sign: Include a signed URL for every file; otherwise use /file/url/{name} for the ones needed
     """
+    if not GCS_AVAILABLE or not gcs_list_files:
+        raise HTTPException(status_code=503, detail="File listing is not available. Google Cloud Storage is not configured.")
+
+    try:
+        page = await gcs_list_files(prefix, page_size, page_token, sign)
+        return {"success": True, "prefix": prefix, **page}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/url/{name:path}")
+async def file_url_route(name: str):
+    """
+    Signed URL for one stored file, valid for at least SIGNED_URL_MIN_REMAINING_SECONDS
+    """
+    if not GCS_AVAILABLE or not gcs_file_url:
+        raise HTTPException(status_code=503, detail="File storage is not available. Google Cloud Storage is not configured.")
+
     try:
-        files = gcs_list_files()
-        return {"success": True, "files": files}
+        return {"success": True, "name": name, "url": await gcs_file_url(name)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,6 +1,8 @@
 from fastapi import APIRouter
 
 from api.core.config import config
+from api.services.jobs import job_queue
+from api.services.worker_pools import pool_stats
 
 router = APIRouter(tags=["Health"])
 
@@ -15,3 +17,15 @@ async def root():
 async def health_check():
     """Health check endpoint."""
     return {"status": "healthy", "gemini_configured": config.is_gemini_configured()}
+
+
+@router.get("/health/pools")
+async def worker_pool_status():
+    """Worker pool sizes, limits and current load."""
+    return {"pools": pool_stats()}
+
+
+@router.get("/health/jobs")
+async def job_queue_status():
+    """Background job workers, queue depth and job counts by status."""
+    return {"jobs": job_queue.stats()}
@@ -1,85 +1,106 @@
+import asyncio
 import json
 from typing import Optional
-from fastapi import APIRouter, File, UploadFile, HTTPException, Form
-
-from api.services.pdf_service import pdf_service, gemini_service
+from fastapi import APIRouter, File, UploadFile, HTTPException, Form, Query, Request
+from fastapi.responses import Response, StreamingResponse
+
+from api.core.config import config
+from api.services.analysis import DEFAULT_SUMMARY_PROMPT, DEMOGRAPHICS_EXTRACTION_PROMPT, PAROLE_SUMMARY_PROMPT, parse_demographics
+from api.services.chunked_analysis import ANALYSIS_MODES
+from api.services.document import ExtractedDocument
+from api.services.ingestion import IngestedPDF, ingest_pdf
+from api.services.pdf_service import pdf_service, gemini_service, extraction_cache, llm_response_cache
+from api.services.jobs import job_queue
+from api.services.job_store import JobStore
+from api.services.results_store import StoredResult, combined_etag, results_store
+from api.services.pipeline import ANALYSIS_TYPES, analyze_batch, analyze_document, extract_document, save_result
+from api.services.worker_pools import extraction_pool
 
 router = APIRouter(prefix="/pdf", tags=["PDF Processing"])
 
 
+# Keep proxies from buffering the event stream
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def validate_analysis_mode(analysis_mode: str) -> None:
+    if analysis_mode not in ANALYSIS_MODES:
+        raise HTTPException(status_code=400, detail=f"analysis_mode must be one of: {', '.join(ANALYSIS_MODES)}")
+
+
+def validate_analysis_type(analysis_type: str) -> None:
+    if analysis_type not in ANALYSIS_TYPES:
+        raise HTTPException(status_code=400, detail=f"analysis_type must be one of: {', '.join(ANALYSIS_TYPES)}")
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def extract_for_stream(file: Optional[UploadFile], object_name: Optional[str]) -> tuple[IngestedPDF, ExtractedDocument]:
+    """Ingest and extract before the event stream starts, so upload and extraction errors are plain HTTP errors."""
+    try:
+        async with ingest_pdf(file, object_name) as upload:
+            document = await extract_document(upload.file, upload.sha256)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+    return upload, document
+
+
+def extraction_event(upload: IngestedPDF, document: ExtractedDocument) -> str:
+    return sse_event(
+        "extraction",
+        {"filename": upload.filename, "file_size": upload.size, "extracted_text_length": len(document), "page_count": document.page_count},
+    )
+
+
 @router.post("/process")
-async def process_pdf_with_gemini(file: UploadFile = File(...), prompt: Optional[str] = Form(None), max_tokens: Optional[int] = Form(2000)):
+async def process_pdf_with_gemini(
+    file: Optional[UploadFile] = File(None),
+    object_name: Optional[str] = Form(None),
+    prompt: Optional[str] = Form(None),
+    max_tokens: Optional[int] = Form(2000),
+    analysis_mode: str = Form("single"),
+    verify_citations: bool = Form(False),
+):
     """
     Upload a PDF file and process it with Google's Gemini AI to generate a parole hearing summary.
 
     Args:
         file: PDF file to process
+        object_name: A PDF already stored with /file/upload, analyzed instead of an upload: the returned
+            object_name (sha256/...), a filename alias (aliases/<filename>) or any other stored object
         prompt: Custom prompt for Gemini (optional, defaults to parole summary prompt)
         max_tokens: Maximum tokens for response (optional, default 2000)
+        analysis_mode: "single" sends the whole transcript in one call, "chunked" splits it into page-aligned
+            chunks analyzed concurrently and merges the results, "auto" chunks only when it exceeds CHUNK_MAX_TOKENS
+        verify_citations: Check every quoted "(Page X, Line Y)" citation against the transcript and correct
+            wrong locations; the response then includes citation_verification with per-citation results
 
     Returns:
         JSON response with markdown summary optimized for frontend display
     """
 
-    # Default parole hearing summary prompt
-    default_prompt = """
-    Send back a markdown of the summary keep it under a page send back in the details:
-    offense context, programming, parole factors cited, claim-of-innocence evidence, contradictions
-    
-    Please analyze this parole hearing document and provide a concise 1-page markdown summary covering:
-    
-    1. **Offense Context**: Brief description of the original crime and circumstances
-       - Include citations and quotes from the document
-    2. **Programming**: Educational programs, therapy, or self-help completed or recommended
-       - Cite specific recommendations from commissioners
-    3. **Parole Factors Cited**: Key factors mentioned by the board regarding suitability/unsuitability
-       - Include direct quotes from board members explaining their reasoning
-    4. **Claim-of-Innocence Evidence**: Any evidence or statements regarding innocence claims
-       - Quote specific statements from participants
-    5. **Contradictions**: Any discrepancies noted between different versions of events
-       - Reference where in the document these contradictions are mentioned
-    
-    **For each point, include precise citations with BOTH page numbers and line numbers:**
-    - Direct quotes: "Quote text" - (Speaker Name, Page X, Line Y)
-    - References: Information found at Page X, Lines Y-Z
-    - Always include the specific page and line numbers where information is located
-    
-    **Example citation format:**
-    - "You solemnly swear, affirm the testimony..." - (Commissioner Ruff, Page 1, Line 16)
-    - Sentence details at Page 1, Lines 9-11
-    - Programming discussion at Page 3, Lines 45-52
-    
-    **Note**: The document includes page markers like [PAGE X] and line markers like [Line Y]. Use these to provide precise citations.
-    
-    Format as clean markdown with proper headings, bullet points, and precise page and line number citations. Keep it professional and factual.
-    """
-
-    # Read file content
-    file_content = await file.read()
-
-    # Validate file
-    pdf_service.validate_pdf_file(file.content_type or "", len(file_content))
+    validate_analysis_mode(analysis_mode)
 
     try:
-        # Extract text from PDF
-        extracted_text = pdf_service.extract_text_from_pdf(file_content)
-
-        if not extracted_text:
-            raise HTTPException(status_code=400, detail="No text could be extracted from the PDF")
+        # Stream and validate the upload (size, PDF magic bytes) while hashing it, or fetch the stored PDF
+        async with ingest_pdf(file, object_name) as upload:
+            # Extract text from PDF
+            document = await extract_document(upload.file, upload.sha256)
 
-        # Use custom prompt if provided, otherwise use default parole summary prompt
-        analysis_prompt = prompt if prompt else default_prompt
-
-        # Process with Gemini AI
-        gemini_response = gemini_service.process_text_with_ai(extracted_text, analysis_prompt)
+        result = await analyze_document("process", document, analysis_mode, prompt, verify_citations=verify_citations)
 
         return {
             "success": True,
-            "filename": file.filename,
-            "file_size": len(file_content),
-            "extracted_text_length": len(extracted_text),
-            "markdown_summary": gemini_response,
-            "summary_type": "parole_hearing_analysis",
+            "filename": upload.filename,
+            "file_size": upload.size,
+            "doc_hash": upload.sha256,
+            "extracted_text_length": len(document),
+            **result,
         }
 
     except HTTPException:
@@ -88,8 +109,44 @@ async def process_pdf_with_gemini(file: UploadFile = File(...), prompt: Optional
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.post("/process/stream")
+async def process_pdf_with_gemini_stream(
+    file: Optional[UploadFile] = File(None), object_name: Optional[str] = Form(None), prompt: Optional[str] = Form(None)
+):
+    """
+    Streaming variant of /pdf/process using Server-Sent Events; takes a file or object_name like /pdf/process.
+
+    Events:
+        extraction: sent as soon as the text is extracted (filename, sizes, page count)
+        chunk: {"text": ...} for each piece of the summary as Gemini produces it
+        done: summary type and total markdown length
+        error: {"detail": ...} if generation fails part-way through
+    """
+    upload, document = await extract_for_stream(file, object_name)
+    analysis_prompt = prompt if prompt else DEFAULT_SUMMARY_PROMPT
+
+    async def events():
+        yield extraction_event(upload, document)
+        markdown_length = 0
+        try:
+            async for piece in gemini_service.stream_text_with_ai(document, analysis_prompt):
+                markdown_length += len(piece)
+                yield sse_event("chunk", {"text": piece})
+        except Exception as e:
+            yield sse_event("error", {"detail": f"Internal server error: {str(e)}"})
+            return
+        yield sse_event("done", {"summary_type": "parole_hearing_analysis", "markdown_length": markdown_length})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
 @router.post("/parole-summary")
-async def generate_parole_summary(file: UploadFile = File(...)):
+async def generate_parole_summary(
+    file: Optional[UploadFile] = File(None),
+    object_name: Optional[str] = Form(None),
+    analysis_mode: str = Form("single"),
+    verify_citations: bool = Form(False),
+):
     """
     Generate a structured parole hearing summary from a PDF document.
 
@@ -98,250 +155,129 @@ async def generate_parole_summary(file: UploadFile = File(...)):
 
     Args:
         file: PDF file containing parole hearing transcript
+        object_name: Stored PDF to analyze instead of an upload (see /pdf/process)
+        analysis_mode: "single", "chunked" or "auto" (see /pdf/process)
+        verify_citations: Check and correct the summary's quoted citations (see /pdf/process)
 
     Returns:
-        JSON response with structured markdown summary and demographics object for frontend display
+        JSON response with structured markdown summary and demographics object for frontend display; the response
+        is also stored under its doc_hash (the PDF's SHA-256) for GET /pdf/results/{doc_hash}
     """
 
-    parole_summary_prompt = """
-    Send back a markdown of the summary keep it under a page send back in the details:
-    offense context, programming, parole factors cited, claim-of-innocence evidence, contradictions
-    
-    Please analyze this parole hearing document and provide a concise 1-page markdown summary covering:
-    
-    ## Parole Hearing Summary
-    
-    ### Offense Context
-    - Brief description of the original crime and circumstances
-    - Sentence details and timeline
-    - Include citations showing where this information appears in the document
-    
-    ### Programming
-    - Educational programs completed or in progress
-    - Therapy and self-help programs
-    - Recommendations made by the board
-    - Cite specific quotes from commissioners or documentation where programs are mentioned
-    
-    ### Parole Factors Cited
-    - Key factors mentioned regarding suitability/unsuitability
-    - Board's concerns and recommendations
-    - Classification score and behavioral factors
-    - Include direct quotes from commissioners explaining their reasoning
-    
-    ### Claim-of-Innocence Evidence
-    - Any evidence or statements regarding innocence claims
-    - Discrepancies in versions of events
-    - Quote specific statements from the inmate or attorney regarding innocence or procedural issues
-    
-    ### Contradictions
-    - Any noted contradictions between different accounts
-    - Areas where further clarification may be needed
-    - Reference specific parts of the transcript where contradictions are highlighted
-    
-    **IMPORTANT: For each major point, include citations with BOTH page numbers and line numbers:**
-    - Direct quotes: "Quote text" - (Speaker Name, Page X, Line Y)
-    - Factual references: Information found at Page X, Lines Y-Z
-    - When referencing testimony: As stated by [Speaker] at Page X, Line Y
-    - Use the exact page and line numbers where the information appears in the document
-    
-    **Citations Format Examples:**
-    - "You can't get any more 115s" - (Commissioner Ruff, Page 5, Line 245)
-    - Crime details found at Page 2, Lines 8-12
-    - Programming recommendations mentioned at Page 8, Lines 180-195
-    - Classification score: "68 points" - (Emmanuel Young, Page 1, Line 4)
-    
-    **Note**: The document includes page markers like [PAGE X] and line markers like [Line Y]. Use these to provide precise citations.
-    
-    Format as clean markdown with proper headings, bullet points, and precise page and line number citations. Keep it professional, factual, and under one page.
+    validate_analysis_mode(analysis_mode)
+
+    try:
+        # Stream and validate the upload (size, PDF magic bytes) while hashing it, or fetch the stored PDF
+        async with ingest_pdf(file, object_name) as upload:
+            # Extract text from PDF
+            document = await extract_document(upload.file, upload.sha256)
+
+        result = await analyze_document("parole-summary", document, analysis_mode, verify_citations=verify_citations)
+
+        response = {
+            "success": True,
+            "filename": upload.filename,
+            "file_size": upload.size,
+            "doc_hash": upload.sha256,
+            "extracted_text_length": len(document),
+            **result,
+        }
+        # Kept for GET /pdf/results/{doc_hash}
+        await save_result("parole-summary", upload.sha256, document, response)
+        return response
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.post("/parole-summary/stream")
+async def generate_parole_summary_stream(file: Optional[UploadFile] = File(None), object_name: Optional[str] = Form(None)):
     """
+    Streaming variant of /pdf/parole-summary using Server-Sent Events.
 
-    demographics_extraction_prompt = """
-    Please extract structured information from this parole hearing document and return it as a JSON object with the following structure.
-
-    Pay special attention to attorney information which may appear with phrases like:
-    - "Attorney for Incarcerated Person"
-    - "Counsel for the Inmate" 
-    - "Representing [Name]"
-    - "Attorney [Name] present"
-    - "Legal counsel"
-    - "Defense attorney"
-
-    {
-      "clientInfo": {
-        "name": "",
-        "cdcrNumber": "",
-        "dateOfBirth": "",
-        "contactInfo": ""
-      },
-      
-      "introduction": {
-        "shortSummary": ""
-      },
-      
-      "evidenceUsedToConvict": [],
-      
-      "potentialTheory": "",
-      
-      "convictionInfo": {
-        "dateOfCrime": "",
-        "locationOfCrime": "",
-        "dateOfArrest": "",
-        "charges": "",
-        "dateOfConviction": "",
-        "sentenceLength": "",
-        "county": "",
-        "trialOrPlea": ""
-      },
-      
-      "appealInfo": {
-        "directAppealFiled": "",
-        "appellateCourtCaseNumber": "",
-        "dateDecided": "",
-        "result": "",
-        "habenasFilings": []
-      },
-      
-      "attorneyInfo": {
-        "currentAttorneyForIncarceratedPerson": {
-          "name": "",
-          "title": "",
-          "firm": "",
-          "address": "",
-          "phone": "",
-          "email": "",
-          "presentAtHearing": false,
-          "representationContext": ""
-        },
-        "trialAttorney": {
-          "name": "",
-          "address": "",
-          "phone": "",
-          "caseNumber": "",
-          "appointedOrRetained": ""
-        },
-        "appellateAttorney": {
-          "name": "",
-          "address": "",
-          "phone": "",
-          "caseNumbers": "",
-          "courtLevel": ""
-        },
-        "otherLegalRepresentation": []
-      },
-      
-      "newEvidence": [],
-      
-      "codefendants": "",
-      
-      "physicalDescription": {
-        "height": "",
-        "weight": "",
-        "race": "",
-        "build": "",
-        "distinguishingMarks": ""
-      },
-      
-      "victimInfo": {
-        "name": "",
-        "relationship": ""
-      },
-      
-      "prisonRecord": {
-        "conduct": "",
-        "programming": "",
-        "support": ""
-      }
-    }
+    The markdown summary streams as `chunk` events while demographics are extracted concurrently
+    and sent as a single `demographics` event once the summary is complete. Other events match
+    /pdf/process/stream.
+    """
+    upload, document = await extract_for_stream(file, object_name)
 
-    **ATTORNEY EXTRACTION GUIDELINES:**
-    - Look for phrases like "Attorney for Incarcerated Person", "Counsel for [Name]", "Representing", etc.
-    - Extract attorney names that appear in the document header, participant list, or during proceedings
-    - If an attorney is speaking or mentioned as present, set "presentAtHearing" to true
-    - Include context about their role (e.g., "Attorney for Incarcerated Person", "Legal Counsel", etc.)
-    - For "otherLegalRepresentation", include any additional attorneys mentioned but not fitting other categories
+    async def events():
+        yield extraction_event(upload, document)
+        demographics_task = asyncio.create_task(gemini_service.extract_demographics_async(document, DEMOGRAPHICS_EXTRACTION_PROMPT))
+        markdown_length = 0
+        try:
+            async for piece in gemini_service.stream_parole_summary(document, PAROLE_SUMMARY_PROMPT):
+                markdown_length += len(piece)
+                yield sse_event("chunk", {"text": piece})
+            demographics = parse_demographics(await demographics_task)
+        except Exception as e:
+            yield sse_event("error", {"detail": f"Internal server error: {str(e)}"})
+            return
+        finally:
+            # Also reached when the client disconnects mid-stream
+            demographics_task.cancel()
+        yield sse_event("demographics", demographics)
+        yield sse_event("done", {"summary_type": "parole_hearing_summary", "markdown_length": markdown_length})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
 
-    Extract as much information as possible from the document. If specific information is not available, leave the field as an empty string, empty array, or false for boolean fields. Use exact quotes and references from the document where possible. Return ONLY valid JSON - no additional text or formatting.
+
+@router.post("/innocence-analysis")
+async def analyze_innocence_claims(
+    file: Optional[UploadFile] = File(None),
+    object_name: Optional[str] = Form(None),
+    analysis_mode: str = Form("single"),
+    context_filter: bool = Form(False),
+    verify_citations: bool = Form(False),
+):
     """
+    Specialized analysis for detecting and evaluating innocence claims in legal documents.
 
-    # Read file content
-    file_content = await file.read()
+    This endpoint focuses specifically on identifying potential innocence indicators,
+    procedural issues, and evidence inconsistencies that might support wrongful conviction claims.
 
-    # Validate file
-    pdf_service.validate_pdf_file(file.content_type or "", len(file_content))
+    Args:
+        file: PDF file containing legal documents (transcripts, court records, etc.)
+        object_name: Stored PDF to analyze instead of an upload (see /pdf/process)
+        analysis_mode: "single", "chunked" or "auto" (see /pdf/process)
+        context_filter: Send only the highest-scoring lines (plus context) instead of the whole transcript, in one call
+            (analysis_mode "single" only); the response then includes context_selection with the token reduction,
+            timings and an estimate of the latency saved
+        verify_citations: Check each finding's quote at its page/line, moving it to where the quote was found
+            when the location is wrong; findings get a verification entry and the response a citation_verification summary
 
-    try:
-        # Extract text from PDF
-        extracted_text = pdf_service.extract_text_from_pdf(file_content)
+    Returns:
+        JSON response with innocence-focused analysis and evidence assessment, also stored for /pdf/results
+    """
 
-        if not extracted_text:
-            raise HTTPException(status_code=400, detail="No text could be extracted from the PDF")
+    validate_analysis_mode(analysis_mode)
+    if context_filter and analysis_mode != "single":
+        # The excerpt is analyzed in one call, so it cannot also be chunked
+        raise HTTPException(status_code=400, detail='context_filter only supports analysis_mode "single"')
 
-        # Generate both markdown summary and demographics data
-        markdown_summary, demographics_raw = gemini_service.generate_parole_summary_with_demographics(
-            extracted_text, parole_summary_prompt, demographics_extraction_prompt
-        )
+    try:
+        # Stream and validate the upload (size, PDF magic bytes) while hashing it, or fetch the stored PDF
+        async with ingest_pdf(file, object_name) as upload:
+            # Extract text from PDF
+            document = await extract_document(upload.file, upload.sha256)
 
-        # Try to parse demographics as JSON
-        try:
-            # Remove markdown code block markers if present
-            clean_json = demographics_raw.strip()
-            if clean_json.startswith("```json"):
-                clean_json = clean_json[7:]  # Remove ```json
-            if clean_json.endswith("```"):
-                clean_json = clean_json[:-3]  # Remove ```
-            clean_json = clean_json.strip()
-
-            demographics = json.loads(clean_json)
-        except (json.JSONDecodeError, ValueError):
-            # Fallback to empty structure if AI didn't return valid JSON
-            demographics = {
-                "clientInfo": {"name": "", "cdcrNumber": "", "dateOfBirth": "", "contactInfo": ""},
-                "introduction": {"shortSummary": ""},
-                "evidenceUsedToConvict": [],
-                "potentialTheory": "",
-                "convictionInfo": {
-                    "dateOfCrime": "",
-                    "locationOfCrime": "",
-                    "dateOfArrest": "",
-                    "charges": "",
-                    "dateOfConviction": "",
-                    "sentenceLength": "",
-                    "county": "",
-                    "trialOrPlea": "",
-                },
-                "appealInfo": {"directAppealFiled": "", "appellateCourtCaseNumber": "", "dateDecided": "", "result": "", "habenasFilings": []},
-                "attorneyInfo": {
-                    "currentAttorneyForIncarceratedPerson": {
-                        "name": "",
-                        "title": "",
-                        "firm": "",
-                        "address": "",
-                        "phone": "",
-                        "email": "",
-                        "presentAtHearing": False,
-                        "representationContext": "",
-                    },
-                    "trialAttorney": {"name": "", "address": "", "phone": "", "caseNumber": "", "appointedOrRetained": ""},
-                    "appellateAttorney": {"name": "", "address": "", "phone": "", "caseNumbers": "", "courtLevel": ""},
-                    "otherLegalRepresentation": [],
-                },
-                "newEvidence": [],
-                "codefendants": "",
-                "physicalDescription": {"height": "", "weight": "", "race": "", "build": "", "distinguishingMarks": ""},
-                "victimInfo": {"name": "", "relationship": ""},
-                "prisonRecord": {"conduct": "", "programming": "", "support": ""},
-                "extraction_note": "Could not parse AI response as JSON",
-            }
+        result = await analyze_document(
+            "innocence-analysis", document, analysis_mode, context_filter=context_filter, verify_citations=verify_citations
+        )
 
-        return {
+        response = {
             "success": True,
-            "filename": file.filename,
-            "file_size": len(file_content),
-            "extracted_text_length": len(extracted_text),
-            "markdown_summary": markdown_summary,
-            "demographics": demographics,
-            "summary_type": "parole_hearing_summary",
+            "filename": upload.filename,
+            "file_size": upload.size,
+            "doc_hash": upload.sha256,
+            "extracted_text_length": len(document),
+            **result,
         }
+        # Kept for GET /pdf/results/{doc_hash}
+        await save_result("innocence-analysis", upload.sha256, document, response)
+        return response
 
     except HTTPException:
         raise
@@ -349,160 +285,230 @@ async def generate_parole_summary(file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
-@router.post("/innocence-analysis")
-async def analyze_innocence_claims(file: UploadFile = File(...)):
+@router.post("/jobs", status_code=202)
+async def submit_analysis_job(
+    file: Optional[UploadFile] = File(None),
+    object_name: Optional[str] = Form(None),
+    analysis_type: str = Form("innocence-analysis"),
+    analysis_mode: str = Form("single"),
+    prompt: Optional[str] = Form(None),
+):
     """
-    Specialized analysis for detecting and evaluating innocence claims in legal documents.
+    Queue a PDF analysis to run in the background and return its job id immediately.
 
-    This endpoint focuses specifically on identifying potential innocence indicators,
-    procedural issues, and evidence inconsistencies that might support wrongful conviction claims.
+    Use this for long transcripts that would outlive the request timeout; poll
+    /pdf/jobs/{job_id} for the result.
 
     Args:
-        file: PDF file containing legal documents (transcripts, court records, etc.)
+        file: PDF file to analyze
+        object_name: Stored PDF to analyze instead of an upload (see /pdf/process)
+        analysis_type: "process", "parole-summary" or "innocence-analysis" (default)
+        analysis_mode: "single", "chunked" or "auto" (see /pdf/process)
+        prompt: Custom prompt, only used by the "process" analysis
 
     Returns:
-        JSON response with innocence-focused analysis and evidence assessment
+        JSON response with the job id and the URL to poll
     """
+    validate_analysis_type(analysis_type)
+    validate_analysis_mode(analysis_mode)
 
-    innocence_analysis_prompt = """
-    You are analyzing a **parole hearing transcript** to evaluate whether the speaker may be **maintaining actual innocence** rather than admitting guilt or minimizing responsibility.
+    # Stream and validate the upload (size, PDF magic bytes) while hashing it, or fetch the stored PDF
+    async with ingest_pdf(file, object_name) as upload:
+        job_id = await job_queue.submit(upload, analysis_type, analysis_mode, prompt)
+    return {"success": True, "job_id": job_id, "status": "queued", "status_url": f"/pdf/jobs/{job_id}"}
 
-    Analyze the transcript and return your findings as a JSON object with the following structure:
 
-    {
-      "findings": [
-        {
-          "quote": "Exact quote from the document",
-          "speaker": "Name of the person who said it",
-          "page": 1,
-          "line": 15,
-          "category": "category_name",
-          "significance": "Brief explanation of why this is significant for innocence analysis"
-        }
-      ],
-      "summary": {
-        "total_findings": 0,
-        "innocence_indicators": 0,
-        "responsibility_pressure": 0,
-        "consistency_issues": 0,
-        "external_evidence": 0,
-        "overall_assessment": "innocence_claim | guilt_minimization | inconclusive"
-      }
-    }
+@router.get("/jobs/{job_id}")
+async def get_analysis_job(job_id: str):
+    """
+    Status of a background analysis job.
 
-    **Categories to use:**
-    - "direct_innocence_claim" - Direct denials of committing the crime or statements of non-participation
-    - "consistency_statement" - Statements that show consistency or inconsistency in the person's account
-    - "minimization_vs_innocence" - Statements that help distinguish between guilt minimization and innocence claims
-    - "responsibility_pressure" - Evidence of board pressure to admit guilt or accept responsibility
-    - "responsibility_response" - How the person responds to pressure to accept responsibility
-    - "external_evidence" - References to alibi, recanted testimony, weak evidence, coerced confessions
-    - "behavioral_clarity" - Direct, factual answers vs evasive or contradictory responses
-    - "procedural_issue" - Issues with legal process, representation, or conviction validity
-
-    **Instructions:**
-    1. Look for direct quotes that fit into these categories
-    2. Extract the exact text of significant statements
-    3. Identify the speaker (Commissioner name, defendant name, attorney, etc.)
-    4. Find the precise page and line numbers using the [PAGE X] and [Line Y] markers
-    5. Classify each quote into the appropriate category
-    6. Provide a brief explanation of why each quote is significant
-
-    **CRITICAL:** Only include actual quotes that exist in the document. Do not paraphrase or summarize - use exact text. Ensure page and line numbers are accurate based on the document markers.
-
-    Return ONLY valid JSON - no additional text or formatting.
+    Returns:
+        JSON response with the job status (queued, running, succeeded or failed), timestamps,
+        and either the same result the synchronous endpoint returns or the error
+    """
+    job = job_queue.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"success": True, "job": JobStore.to_response(job)}
+
+
+@router.post("/batch")
+async def analyze_pdf_batch(
+    files: list[UploadFile] = File([]),
+    object_names: list[str] = Form([]),
+    analysis_type: str = Form("parole-summary"),
+    analysis_mode: str = Form("single"),
+    prompt: Optional[str] = Form(None),
+    stream: bool = Form(False),
+):
     """
+    Analyze several PDFs in one request, at most BATCH_CONCURRENCY at a time.
 
-    # Read file content
-    file_content = await file.read()
+    A file that fails (not a PDF, no text, analysis error) gets an error entry; the other
+    files are still analyzed.
 
-    # Validate file
-    pdf_service.validate_pdf_file(file.content_type or "", len(file_content))
+    Args:
+        files: PDF files to analyze (up to BATCH_MAX_FILES together with object_names)
+        object_names: Stored PDFs to analyze (see object_name on /pdf/process); their results
+            follow the uploaded files' results
+        analysis_type: "process", "parole-summary" (default) or "innocence-analysis"
+        analysis_mode: "single", "chunked" or "auto" (see /pdf/process)
+        prompt: Custom prompt, only used by the "process" analysis
+        stream: Return NDJSON, one line per file as it finishes, then a summary line
 
-    try:
-        # Extract text from PDF
-        extracted_text = pdf_service.extract_text_from_pdf(file_content)
+    Returns:
+        JSON response with per-file results in upload order (then object_names order), each shaped like the single-file
+        endpoint's response or {"success": false, "filename", "status_code", "error"}
+    """
+    validate_analysis_type(analysis_type)
+    validate_analysis_mode(analysis_mode)
+    total = len(files) + len(object_names)
+    if total == 0:
+        raise HTTPException(status_code=400, detail="Send at least one PDF file or object_name")
+    if total > config.BATCH_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"A batch can contain at most {config.BATCH_MAX_FILES} files")
 
-        if not extracted_text:
-            raise HTTPException(status_code=400, detail="No text could be extracted from the PDF")
+    if stream:
 
-        # Process with Gemini AI using innocence-focused prompt
-        innocence_analysis_raw = gemini_service.process_text_with_ai(extracted_text, innocence_analysis_prompt)
+        async def lines():
+            succeeded = 0
+            async for index, result in analyze_batch(files, analysis_type, analysis_mode, prompt, object_names):
+                succeeded += result["success"]
+                yield json.dumps({"index": index, **result}) + "\n"
+            yield json.dumps({"done": True, "total": total, "succeeded": succeeded, "failed": total - succeeded}) + "\n"
 
-        # Try to parse as JSON, handling markdown code blocks
-        try:
-            # Remove markdown code block markers if present
-            clean_json = innocence_analysis_raw.strip()
-            if clean_json.startswith("```json"):
-                clean_json = clean_json[7:]  # Remove ```json
-            if clean_json.endswith("```"):
-                clean_json = clean_json[:-3]  # Remove ```
-            clean_json = clean_json.strip()
-
-            innocence_analysis = json.loads(clean_json)
-        except (json.JSONDecodeError, ValueError):
-            # Fallback to structured format if AI didn't return valid JSON
-            innocence_analysis = {
-                "findings": [],
-                "summary": {
-                    "total_findings": 0,
-                    "innocence_indicators": 0,
-                    "responsibility_pressure": 0,
-                    "consistency_issues": 0,
-                    "external_evidence": 0,
-                    "overall_assessment": "inconclusive",
-                },
-                "raw_analysis": innocence_analysis_raw,
-                "note": "AI returned text format instead of JSON",
-            }
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
 
-        return {
-            "success": True,
-            "filename": file.filename,
-            "file_size": len(file_content),
-            "extracted_text_length": len(extracted_text),
-            "innocence_analysis": innocence_analysis,
-            "analysis_type": "structured_innocence_detection",
-            "categories": [
-                "direct_innocence_claim",
-                "consistency_statement",
-                "minimization_vs_innocence",
-                "responsibility_pressure",
-                "responsibility_response",
-                "external_evidence",
-                "behavioral_clarity",
-                "procedural_issue",
-            ],
-        }
-
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+    results: list[Optional[dict]] = [None] * total
+    async for index, result in analyze_batch(files, analysis_type, analysis_mode, prompt, object_names):
+        results[index] = result
+    succeeded = sum(result["success"] for result in results)
+    return {"success": True, "total": total, "succeeded": succeeded, "failed": total - succeeded, "results": results}
 
 
 @router.post("/extract-text")
-async def extract_text_only(file: UploadFile = File(...)):
+async def extract_text_only(file: Optional[UploadFile] = File(None), object_name: Optional[str] = Form(None)):
     """
     Extract text from PDF without AI processing.
 
     Args:
         file: PDF file to process
+        object_name: Stored PDF to extract instead of an upload (see /pdf/process)
 
     Returns:
         JSON response with extracted text only
     """
 
-    # Read file content
-    file_content = await file.read()
+    # Stream and validate the upload (size, PDF magic bytes) while hashing it, or fetch the stored PDF
+    async with ingest_pdf(file, object_name) as upload:
+        try:
+            document = await extraction_pool.run(pdf_service.extract_text_from_pdf, upload.file, upload.sha256)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error extracting text: {str(e)}")
 
-    # Validate file
-    pdf_service.validate_pdf_file(file.content_type or "", len(file_content))
+    return {"success": True, "filename": upload.filename, "file_size": upload.size, "extracted_text": document.text}
 
-    try:
-        extracted_text = pdf_service.extract_text_from_pdf(file_content)
 
-        return {"success": True, "filename": file.filename, "file_size": len(file_content), "extracted_text": extracted_text}
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header names this ETag (weak comparison, as for GET)."""
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error extracting text: {str(e)}")
+
+def stored_results_response(request: Request, results: list[StoredResult], head: dict, single: bool) -> Response:
+    """
+    JSON response made of stored results, or 304 Not Modified when If-None-Match has its ETag.
+
+    The stored JSON is spliced into the response as is, so no result is parsed or re-serialized.
+    """
+    etag = combined_etag(results)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    entries = [
+        json.dumps({**head, **result.summary()} if single else result.summary())[:-1] + ', "result": ' + result.result_json() + "}"
+        for result in results
+    ]
+    body = entries[0] if single else json.dumps(head)[:-1] + ', "results": [' + ", ".join(entries) + "]}"
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def require_results_store() -> None:
+    if not results_store.enabled:
+        raise HTTPException(status_code=503, detail="The results store is disabled (RESULTS_DB_PATH is empty)")
+
+
+@router.get("/results")
+async def find_stored_results(cdcr_number: Optional[str] = None, filename: Optional[str] = None, limit: int = Query(100, ge=1, le=1000)):
+    """
+    Find stored analyses by CDCR number and/or filename, newest first.
+
+    Args:
+        cdcr_number: CDCR number of the incarcerated person (e.g. AK2960)
+        filename: Filename the PDF was analyzed under
+        limit: Maximum number of results listed (1-1000)
+
+    Returns:
+        JSON response listing doc_hash, analysis_type, prompt_version, filename, cdcr_number, sizes and
+        created_at of each match, without the results themselves
+    """
+    require_results_store()
+    matches = results_store.find(cdcr_number.upper() if cdcr_number else None, filename, limit)
+    return {"success": True, "results": [result.summary() for result in matches]}
+
+
+@router.get("/results/{doc_hash}")
+async def get_stored_results(request: Request, doc_hash: str, analysis_type: Optional[str] = None):
+    """
+    Every stored analysis of a document: the latest result per analysis type and prompt version.
+
+    Args:
+        doc_hash: SHA-256 of the PDF (doc_hash in the analysis response, sha256 from /file/upload)
+        analysis_type: Only "parole-summary" or "innocence-analysis" results
+
+    Returns:
+        JSON response with results newest first, each with its metadata and the analysis response under
+        result; sends an ETag and answers 304 when If-None-Match matches it
+    """
+    require_results_store()
+    results = results_store.get(doc_hash, analysis_type)
+    if not results:
+        raise HTTPException(status_code=404, detail="No stored results for this document")
+    return stored_results_response(request, results, {"success": True, "doc_hash": doc_hash}, single=False)
+
+
+@router.get("/results/{doc_hash}/{analysis_type}")
+async def get_stored_result(request: Request, doc_hash: str, analysis_type: str, prompt_version: Optional[str] = None):
+    """
+    The latest stored analysis of one type for a document, or the one made with prompt_version.
+
+    Returns:
+        JSON response with the result's metadata and the analysis response under result; supports
+        ETag/If-None-Match like /pdf/results/{doc_hash}
+    """
+    require_results_store()
+    results = results_store.get(doc_hash, analysis_type, prompt_version)
+    if not results:
+        raise HTTPException(status_code=404, detail=f"No stored {analysis_type} result for this document")
+    return stored_results_response(request, results[:1], {"success": True}, single=True)
+
+
+@router.get("/cache-stats")
+async def get_cache_stats():
+    """
+    Report hit/miss counters for the PDF text extraction cache and the Gemini response cache.
+
+    Returns:
+        JSON response with memory/disk hits, misses and the estimated PyPDF2 time saved,
+        Gemini response cache hits, misses and size, and the model backend's call, failure
+        and token counters
+    """
+    return {
+        "success": True,
+        "extraction_cache": extraction_cache.stats(),
+        "llm_cache": llm_response_cache.stats() if llm_response_cache else None,
+        "gemini": gemini_service.usage_stats(),
+    }
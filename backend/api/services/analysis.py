@@ -0,0 +1,354 @@
+import hashlib
+import json
+from typing import Any
+
+# Prompts for the /pdf analysis endpoints. Their exact text is part of the Gemini response
+# cache key, so any edit invalidates cached responses for that prompt.
+
+DEFAULT_SUMMARY_PROMPT = """
+    Send back a markdown of the summary keep it under a page send back in the details:
+    offense context, programming, parole factors cited, claim-of-innocence evidence, contradictions
+    
+    Please analyze this parole hearing document and provide a concise 1-page markdown summary covering:
+    
+    1. **Offense Context**: Brief description of the original crime and circumstances
+       - Include citations and quotes from the document
+    2. **Programming**: Educational programs, therapy, or self-help completed or recommended
+       - Cite specific recommendations from commissioners
+    3. **Parole Factors Cited**: Key factors mentioned by the board regarding suitability/unsuitability
+       - Include direct quotes from board members explaining their reasoning
+    4. **Claim-of-Innocence Evidence**: Any evidence or statements regarding innocence claims
+       - Quote specific statements from participants
+    5. **Contradictions**: Any discrepancies noted between different versions of events
+       - Reference where in the document these contradictions are mentioned
+    
+    **For each point, include precise citations with BOTH page numbers and line numbers:**
+    - Direct quotes: "Quote text" - (Speaker Name, Page X, Line Y)
+    - References: Information found at Page X, Lines Y-Z
+    - Always include the specific page and line numbers where information is located
+    
+    **Example citation format:**
+    - "You solemnly swear, affirm the testimony..." - (Commissioner Ruff, Page 1, Line 16)
+    - Sentence details at Page 1, Lines 9-11
+    - Programming discussion at Page 3, Lines 45-52
+    
+    **Note**: The document includes page markers like [PAGE X] and line markers like [Line Y]. Use these to provide precise citations.
+    
+    Format as clean markdown with proper headings, bullet points, and precise page and line number citations. Keep it professional and factual.
+    """
+
+
+PAROLE_SUMMARY_PROMPT = """
+    Send back a markdown of the summary keep it under a page send back in the details:
+    offense context, programming, parole factors cited, claim-of-innocence evidence, contradictions
+    
+    Please analyze this parole hearing document and provide a concise 1-page markdown summary covering:
+    
+    ## Parole Hearing Summary
+    
+    ### Offense Context
+    - Brief description of the original crime and circumstances
+    - Sentence details and timeline
+    - Include citations showing where this information appears in the document
+    
+    ### Programming
+    - Educational programs completed or in progress
+    - Therapy and self-help programs
+    - Recommendations made by the board
+    - Cite specific quotes from commissioners or documentation where programs are mentioned
+    
+    ### Parole Factors Cited
+    - Key factors mentioned regarding suitability/unsuitability
+    - Board's concerns and recommendations
+    - Classification score and behavioral factors
+    - Include direct quotes from commissioners explaining their reasoning
+    
+    ### Claim-of-Innocence Evidence
+    - Any evidence or statements regarding innocence claims
+    - Discrepancies in versions of events
+    - Quote specific statements from the inmate or attorney regarding innocence or procedural issues
+    
+    ### Contradictions
+    - Any noted contradictions between different accounts
+    - Areas where further clarification may be needed
+    - Reference specific parts of the transcript where contradictions are highlighted
+    
+    **IMPORTANT: For each major point, include citations with BOTH page numbers and line numbers:**
+    - Direct quotes: "Quote text" - (Speaker Name, Page X, Line Y)
+    - Factual references: Information found at Page X, Lines Y-Z
+    - When referencing testimony: As stated by [Speaker] at Page X, Line Y
+    - Use the exact page and line numbers where the information appears in the document
+    
+    **Citations Format Examples:**
+    - "You can't get any more 115s" - (Commissioner Ruff, Page 5, Line 245)
+    - Crime details found at Page 2, Lines 8-12
+    - Programming recommendations mentioned at Page 8, Lines 180-195
+    - Classification score: "68 points" - (Emmanuel Young, Page 1, Line 4)
+    
+    **Note**: The document includes page markers like [PAGE X] and line markers like [Line Y]. Use these to provide precise citations.
+    
+    Format as clean markdown with proper headings, bullet points, and precise page and line number citations. Keep it professional, factual, and under one page.
+    """
+
+
+DEMOGRAPHICS_EXTRACTION_PROMPT = """
+    Please extract structured information from this parole hearing document and return it as a JSON object with the following structure.
+
+    Pay special attention to attorney information which may appear with phrases like:
+    - "Attorney for Incarcerated Person"
+    - "Counsel for the Inmate" 
+    - "Representing [Name]"
+    - "Attorney [Name] present"
+    - "Legal counsel"
+    - "Defense attorney"
+
+    {
+      "clientInfo": {
+        "name": "",
+        "cdcrNumber": "",
+        "dateOfBirth": "",
+        "contactInfo": ""
+      },
+      
+      "introduction": {
+        "shortSummary": ""
+      },
+      
+      "evidenceUsedToConvict": [],
+      
+      "potentialTheory": "",
+      
+      "convictionInfo": {
+        "dateOfCrime": "",
+        "locationOfCrime": "",
+        "dateOfArrest": "",
+        "charges": "",
+        "dateOfConviction": "",
+        "sentenceLength": "",
+        "county": "",
+        "trialOrPlea": ""
+      },
+      
+      "appealInfo": {
+        "directAppealFiled": "",
+        "appellateCourtCaseNumber": "",
+        "dateDecided": "",
+        "result": "",
+        "habenasFilings": []
+      },
+      
+      "attorneyInfo": {
+        "currentAttorneyForIncarceratedPerson": {
+          "name": "",
+          "title": "",
+          "firm": "",
+          "address": "",
+          "phone": "",
+          "email": "",
+          "presentAtHearing": false,
+          "representationContext": ""
+        },
+        "trialAttorney": {
+          "name": "",
+          "address": "",
+          "phone": "",
+          "caseNumber": "",
+          "appointedOrRetained": ""
+        },
+        "appellateAttorney": {
+          "name": "",
+          "address": "",
+          "phone": "",
+          "caseNumbers": "",
+          "courtLevel": ""
+        },
+        "otherLegalRepresentation": []
+      },
+      
+      "newEvidence": [],
+      
+      "codefendants": "",
+      
+      "physicalDescription": {
+        "height": "",
+        "weight": "",
+        "race": "",
+        "build": "",
+        "distinguishingMarks": ""
+      },
+      
+      "victimInfo": {
+        "name": "",
+        "relationship": ""
+      },
+      
+      "prisonRecord": {
+        "conduct": "",
+        "programming": "",
+        "support": ""
+      }
+    }
+
+    **ATTORNEY EXTRACTION GUIDELINES:**
+    - Look for phrases like "Attorney for Incarcerated Person", "Counsel for [Name]", "Representing", etc.
+    - Extract attorney names that appear in the document header, participant list, or during proceedings
+    - If an attorney is speaking or mentioned as present, set "presentAtHearing" to true
+    - Include context about their role (e.g., "Attorney for Incarcerated Person", "Legal Counsel", etc.)
+    - For "otherLegalRepresentation", include any additional attorneys mentioned but not fitting other categories
+
+    Extract as much information as possible from the document. If specific information is not available, leave the field as an empty string, empty array, or false for boolean fields. Use exact quotes and references from the document where possible. Return ONLY valid JSON - no additional text or formatting.
+    """
+
+
+INNOCENCE_ANALYSIS_PROMPT = """
+    You are analyzing a **parole hearing transcript** to evaluate whether the speaker may be **maintaining actual innocence** rather than admitting guilt or minimizing responsibility.
+
+    Analyze the transcript and return your findings as a JSON object with the following structure:
+
+    {
+      "findings": [
+        {
+          "quote": "Exact quote from the document",
+          "speaker": "Name of the person who said it",
+          "page": 1,
+          "line": 15,
+          "category": "category_name",
+          "significance": "Brief explanation of why this is significant for innocence analysis"
+        }
+      ],
+      "summary": {
+        "total_findings": 0,
+        "innocence_indicators": 0,
+        "responsibility_pressure": 0,
+        "consistency_issues": 0,
+        "external_evidence": 0,
+        "overall_assessment": "innocence_claim | guilt_minimization | inconclusive"
+      }
+    }
+
+    **Categories to use:**
+    - "direct_innocence_claim" - Direct denials of committing the crime or statements of non-participation
+    - "consistency_statement" - Statements that show consistency or inconsistency in the person's account
+    - "minimization_vs_innocence" - Statements that help distinguish between guilt minimization and innocence claims
+    - "responsibility_pressure" - Evidence of board pressure to admit guilt or accept responsibility
+    - "responsibility_response" - How the person responds to pressure to accept responsibility
+    - "external_evidence" - References to alibi, recanted testimony, weak evidence, coerced confessions
+    - "behavioral_clarity" - Direct, factual answers vs evasive or contradictory responses
+    - "procedural_issue" - Issues with legal process, representation, or conviction validity
+
+    **Instructions:**
+    1. Look for direct quotes that fit into these categories
+    2. Extract the exact text of significant statements
+    3. Identify the speaker (Commissioner name, defendant name, attorney, etc.)
+    4. Find the precise page and line numbers using the [PAGE X] and [Line Y] markers
+    5. Classify each quote into the appropriate category
+    6. Provide a brief explanation of why each quote is significant
+
+    **CRITICAL:** Only include actual quotes that exist in the document. Do not paraphrase or summarize - use exact text. Ensure page and line numbers are accurate based on the document markers.
+
+    Return ONLY valid JSON - no additional text or formatting.
+    """
+
+
+INNOCENCE_CATEGORIES = [
+    "direct_innocence_claim",
+    "consistency_statement",
+    "minimization_vs_innocence",
+    "responsibility_pressure",
+    "responsibility_response",
+    "external_evidence",
+    "behavioral_clarity",
+    "procedural_issue",
+]
+
+
+# Prompts each stored analysis depends on; editing one changes that analysis's prompt_version
+ANALYSIS_PROMPTS = {
+    "parole-summary": (PAROLE_SUMMARY_PROMPT, DEMOGRAPHICS_EXTRACTION_PROMPT),
+    "innocence-analysis": (INNOCENCE_ANALYSIS_PROMPT,),
+}
+
+
+def prompt_version(analysis_type: str, model_name: str) -> str:
+    """Short hash of the model and prompts behind an analysis, so results of older prompts are kept apart."""
+    text = "\0".join((model_name, *ANALYSIS_PROMPTS[analysis_type]))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+
+
+def parse_model_json(raw: str) -> Any:
+    """Parse JSON returned by the model, removing markdown code block markers if present."""
+    clean_json = raw.strip()
+    if clean_json.startswith("```json"):
+        clean_json = clean_json[7:]  # Remove ```json
+    if clean_json.endswith("```"):
+        clean_json = clean_json[:-3]  # Remove ```
+    return json.loads(clean_json.strip())
+
+
+def empty_demographics() -> dict:
+    """Demographics structure with every field empty, as described in DEMOGRAPHICS_EXTRACTION_PROMPT."""
+    return {
+        "clientInfo": {"name": "", "cdcrNumber": "", "dateOfBirth": "", "contactInfo": ""},
+        "introduction": {"shortSummary": ""},
+        "evidenceUsedToConvict": [],
+        "potentialTheory": "",
+        "convictionInfo": {
+            "dateOfCrime": "",
+            "locationOfCrime": "",
+            "dateOfArrest": "",
+            "charges": "",
+            "dateOfConviction": "",
+            "sentenceLength": "",
+            "county": "",
+            "trialOrPlea": "",
+        },
+        "appealInfo": {"directAppealFiled": "", "appellateCourtCaseNumber": "", "dateDecided": "", "result": "", "habenasFilings": []},
+        "attorneyInfo": {
+            "currentAttorneyForIncarceratedPerson": {
+                "name": "",
+                "title": "",
+                "firm": "",
+                "address": "",
+                "phone": "",
+                "email": "",
+                "presentAtHearing": False,
+                "representationContext": "",
+            },
+            "trialAttorney": {"name": "", "address": "", "phone": "", "caseNumber": "", "appointedOrRetained": ""},
+            "appellateAttorney": {"name": "", "address": "", "phone": "", "caseNumbers": "", "courtLevel": ""},
+            "otherLegalRepresentation": [],
+        },
+        "newEvidence": [],
+        "codefendants": "",
+        "physicalDescription": {"height": "", "weight": "", "race": "", "build": "", "distinguishingMarks": ""},
+        "victimInfo": {"name": "", "relationship": ""},
+        "prisonRecord": {"conduct": "", "programming": "", "support": ""},
+    }
+
+
+def parse_demographics(demographics_raw: str) -> dict:
+    """Parse the demographics JSON, falling back to an empty structure if the AI didn't return valid JSON."""
+    try:
+        return parse_model_json(demographics_raw)
+    except (json.JSONDecodeError, ValueError):
+        return {**empty_demographics(), "extraction_note": "Could not parse AI response as JSON"}
+
+
+def parse_innocence_analysis(innocence_analysis_raw: str) -> dict:
+    """Parse the innocence analysis JSON, falling back to an empty structure that keeps the raw text."""
+    try:
+        return parse_model_json(innocence_analysis_raw)
+    except (json.JSONDecodeError, ValueError):
+        return {
+            "findings": [],
+            "summary": {
+                "total_findings": 0,
+                "innocence_indicators": 0,
+                "responsibility_pressure": 0,
+                "consistency_issues": 0,
+                "external_evidence": 0,
+                "overall_assessment": "inconclusive",
+            },
+            "raw_analysis": innocence_analysis_raw,
+            "note": "AI returned text format instead of JSON",
+        }
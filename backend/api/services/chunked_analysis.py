@@ -0,0 +1,287 @@
+import asyncio
+import json
+import re
+from typing import Any, Awaitable, Callable, Optional, Sequence, TypeVar, Union
+
+from api.core.config import config
+from api.services.analysis import parse_model_json
+from api.services.document import ExtractedDocument
+
+T = TypeVar("T")
+
+# Rough token estimate used for chunk budgets
+CHARS_PER_TOKEN = 4
+
+ANALYSIS_MODES = ("single", "chunked", "auto")
+
+MARKDOWN_HEADING = re.compile(r"^#{1,6}\s+\S")
+# "- **Label**: value" bullets; a chunk that does not cover the label answers with a placeholder
+LABELED_BULLET = re.compile(r"^\s*[-*]\s+\*\*(?P<label>[^*]+)\*\*:?\s*(?P<value>.*)$")
+PLACEHOLDER_VALUES = ("not specified", "not mentioned", "unknown", "n/a")
+
+INNOCENCE_INDICATOR_CATEGORIES = ("direct_innocence_claim", "external_evidence")
+
+
+class ChunkAnalysisError(RuntimeError):
+    """No chunk of a chunked analysis could be analyzed by the model."""
+
+
+def estimate_tokens(document: ExtractedDocument) -> int:
+    """Approximate token count of the document as sent to the model."""
+    return len(document) // CHARS_PER_TOKEN
+
+
+def split_document(document: ExtractedDocument, max_tokens: int) -> list[ExtractedDocument]:
+    """
+    Split a document on page boundaries into chunks of roughly max_tokens each.
+
+    Chunks keep their original page numbers. A page larger than the budget becomes a chunk of its own.
+    """
+    budget = max_tokens * CHARS_PER_TOKEN
+    chunks = []
+    start = 0
+    size = 0
+    for index, page_size in enumerate(document.page_sizes()):
+        if index > start and size + page_size > budget:
+            chunks.append(document.page_range(start, index))
+            start, size = index, 0
+        size += page_size
+    if document.page_count:
+        chunks.append(document.page_range(start, document.page_count))
+    return chunks
+
+
+def plan_chunks(document: ExtractedDocument, mode: str) -> Optional[list[ExtractedDocument]]:
+    """Chunks to analyze for the requested mode, or None for a single-shot request."""
+    if mode == "single":
+        return None
+    if mode == "auto" and estimate_tokens(document) <= config.CHUNK_MAX_TOKENS:
+        return None
+    chunks = split_document(document, config.CHUNK_MAX_TOKENS)
+    return chunks if len(chunks) > 1 else None
+
+
+def chunk_prompt(prompt: str, chunk: ExtractedDocument, index: int, total: int) -> str:
+    """Tell the model which part of the transcript it is looking at."""
+    last_page = chunk.first_page + chunk.page_count - 1
+    return (
+        f"{prompt}\n\nThis is part {index} of {total} of the transcript, covering pages {chunk.first_page}-{last_page}. "
+        "Analyze only this part and cite page and line numbers exactly as marked."
+    )
+
+
+def chunk_semaphore() -> asyncio.Semaphore:
+    """Limit of CHUNK_CONCURRENCY model calls in flight, shared by every map over one request's chunks."""
+    return asyncio.Semaphore(max(config.CHUNK_CONCURRENCY, 1))
+
+
+async def map_chunks(
+    chunks: list[ExtractedDocument], analyze: Callable[[ExtractedDocument, int], Awaitable[T]], semaphore: Optional[asyncio.Semaphore] = None
+) -> list[T]:
+    """Run analyze(chunk, index) for every chunk with at most CHUNK_CONCURRENCY in flight, keeping chunk order."""
+    if semaphore is None:
+        semaphore = chunk_semaphore()
+
+    async def run(chunk: ExtractedDocument, index: int) -> T:
+        async with semaphore:
+            return await analyze(chunk, index)
+
+    return await asyncio.gather(*(run(chunk, index) for index, chunk in enumerate(chunks, start=1)))
+
+
+def _is_placeholder(line: str) -> bool:
+    match = LABELED_BULLET.match(line)
+    return bool(match) and match.group("value").strip().strip("-").strip().lower().startswith(PLACEHOLDER_VALUES)
+
+
+def _add_line(lines: list[str], line: str) -> None:
+    """Append line to a section unless it repeats one already there or only fills a label with a placeholder."""
+    if line in lines:
+        return
+    match = LABELED_BULLET.match(line)
+    if match:
+        label = match.group("label").strip().lower()
+        for index, existing in enumerate(lines):
+            existing_match = LABELED_BULLET.match(existing)
+            if not existing_match or existing_match.group("label").strip().lower() != label:
+                continue
+            if _is_placeholder(line):
+                return
+            if _is_placeholder(existing):
+                lines[index] = line
+                return
+    lines.append(line)
+
+
+def merge_markdown(parts: list[str]) -> str:
+    """Merge markdown summaries section by section, keeping first-seen heading order and dropping repeated lines."""
+    sections: dict[str, tuple[str, list[str]]] = {"": ("", [])}
+    for part in parts:
+        current = ""
+        for line in part.splitlines():
+            if MARKDOWN_HEADING.match(line):
+                current = " ".join(line.lower().split())
+                sections.setdefault(current, (line.strip(), []))
+                continue
+            if line.strip():
+                _add_line(sections[current][1], line.rstrip())
+
+    blocks = []
+    for heading, lines in sections.values():
+        block = "\n".join(([heading] if heading else []) + lines)
+        if block:
+            blocks.append(block)
+    return "\n\n".join(blocks)
+
+
+def summarize_findings(findings: list[dict]) -> dict:
+    """Summary counts and overall assessment for a list of innocence findings."""
+    innocence_indicators = sum(1 for f in findings if f.get("category") in INNOCENCE_INDICATOR_CATEGORIES)
+    responsibility_pressure = sum(1 for f in findings if f.get("category") == "responsibility_pressure")
+    consistency_issues = sum(1 for f in findings if f.get("category") == "consistency_statement")
+    external_evidence = sum(1 for f in findings if f.get("category") == "external_evidence")
+
+    if innocence_indicators > responsibility_pressure:
+        overall_assessment = "innocence_claim"
+    elif responsibility_pressure > innocence_indicators and consistency_issues > 0:
+        overall_assessment = "guilt_minimization"
+    else:
+        overall_assessment = "inconclusive"
+
+    return {
+        "total_findings": len(findings),
+        "innocence_indicators": innocence_indicators,
+        "responsibility_pressure": responsibility_pressure,
+        "consistency_issues": consistency_issues,
+        "external_evidence": external_evidence,
+        "overall_assessment": overall_assessment,
+    }
+
+
+def _citation_number(value: Any) -> int:
+    """A page or line number as an int for sorting; models sometimes answer "4" for 4, and 0 stands for anything else."""
+    try:
+        return int(value)
+    except (TypeError, ValueError, OverflowError):
+        return 0
+
+
+def merge_findings(parts: list[str], failed: Sequence[dict] = ()) -> str:
+    """Merge per-chunk innocence analyses into one JSON document with recomputed summary counts, listing failed chunks."""
+    findings = []
+    seen = set()
+    unparsed = []
+    for raw in parts:
+        try:
+            chunk_findings = parse_model_json(raw).get("findings", [])
+        except (json.JSONDecodeError, ValueError, AttributeError):
+            unparsed.append(raw)
+            continue
+        if not isinstance(chunk_findings, list):
+            unparsed.append(raw)
+            continue
+        for finding in chunk_findings:
+            # One malformed finding is dropped rather than failing the whole analysis
+            if not isinstance(finding, dict):
+                continue
+            key = json.dumps([finding.get("page"), finding.get("line"), finding.get("quote")], default=str)
+            if key not in seen:
+                seen.add(key)
+                findings.append(finding)
+
+    findings.sort(key=lambda f: (_citation_number(f.get("page")), _citation_number(f.get("line"))))
+    merged: dict[str, Any] = {"findings": findings, "summary": summarize_findings(findings)}
+    if unparsed:
+        merged["unparsed_chunks"] = unparsed
+    if failed:
+        merged["failed_chunks"] = list(failed)
+    return json.dumps(merged, indent=2)
+
+
+def _merge_values(base: Any, extra: Any) -> Any:
+    if isinstance(base, dict) and isinstance(extra, dict):
+        for key, value in extra.items():
+            base[key] = _merge_values(base[key], value) if key in base else value
+        return base
+    if isinstance(base, list) and isinstance(extra, list):
+        return base + [value for value in extra if value not in base]
+    if base in ("", None, False):
+        return extra
+    return base
+
+
+def merge_demographics(parts: list[str]) -> str:
+    """Merge per-chunk demographics JSON, filling empty fields from later chunks and combining lists."""
+    merged: Any = None
+    for raw in parts:
+        try:
+            data = parse_model_json(raw)
+        except (json.JSONDecodeError, ValueError):
+            continue
+        merged = data if merged is None else _merge_values(merged, data)
+    # If no chunk returned valid JSON, pass the first answer through so the caller's fallback applies
+    return json.dumps(merged, indent=2) if merged is not None else parts[0]
+
+
+async def generate_chunk(service: Any, prompt: str, chunk: ExtractedDocument, index: int, total: int) -> str:
+    """Run one chunk's prompt on the model, trying up to CHUNK_ATTEMPTS times; the last error is raised."""
+    part_prompt = chunk_prompt(prompt, chunk, index, total)
+    for attempt in range(1, max(config.CHUNK_ATTEMPTS, 1)):
+        try:
+            return await service.generate_async(chunk, part_prompt)
+        except Exception as e:
+            print(f"Gemini error on part {index} of {total} (attempt {attempt}), retrying: {e}")
+    return await service.generate_async(chunk, part_prompt)
+
+
+async def map_prompt(
+    service: Any, chunks: list[ExtractedDocument], prompt: str, semaphore: Optional[asyncio.Semaphore] = None
+) -> tuple[list[str], list[dict]]:
+    """
+    Run a prompt on every chunk; returns the answers of the chunks that were analyzed and an
+    entry (part, pages, error) for each that was not. Raises ChunkAnalysisError if none was.
+    Maps run together for one request pass the same semaphore, so they share CHUNK_CONCURRENCY.
+    """
+
+    async def analyze(chunk: ExtractedDocument, index: int) -> Union[str, dict]:
+        try:
+            return await generate_chunk(service, prompt, chunk, index, len(chunks))
+        except Exception as e:
+            return {"part": index, "pages": f"{chunk.first_page}-{chunk.first_page + chunk.page_count - 1}", "error": str(e)}
+
+    results = await map_chunks(chunks, analyze, semaphore)
+    parts = [result for result in results if isinstance(result, str)]
+    failed = [result for result in results if isinstance(result, dict)]
+    if not parts:
+        raise ChunkAnalysisError(f"None of the {len(chunks)} parts of the transcript could be analyzed: {failed[-1]['error']}")
+    return parts, failed
+
+
+def add_failed_chunks(markdown: str, failed: list[dict], total: int) -> str:
+    """List the pages of chunks that were not analyzed at the end of a merged markdown summary."""
+    if not failed:
+        return markdown
+    lines = [f"- Pages {entry['pages']} (part {entry['part']} of {total}): {entry['error']}" for entry in failed]
+    return "\n\n".join([markdown, "## Pages Not Analyzed\n" + "\n".join(lines)])
+
+
+async def process_text_chunked(service: Any, chunks: list[ExtractedDocument], prompt: str) -> str:
+    """Map a free-form prompt over the chunks and merge the markdown results."""
+    parts, failed = await map_prompt(service, chunks, prompt)
+    return add_failed_chunks(merge_markdown(parts), failed, len(chunks))
+
+
+async def innocence_analysis_chunked(service: Any, chunks: list[ExtractedDocument], prompt: str) -> str:
+    """Map the innocence prompt over the chunks and merge their findings."""
+    parts, failed = await map_prompt(service, chunks, prompt)
+    return merge_findings(parts, failed)
+
+
+async def parole_summary_chunked(service: Any, chunks: list[ExtractedDocument], markdown_prompt: str, demographics_prompt: str) -> tuple[str, str]:
+    """Map the parole summary and demographics prompts over the chunks and merge each result."""
+    semaphore = chunk_semaphore()
+    (markdown_parts, markdown_failed), (demographics_parts, _) = await asyncio.gather(
+        map_prompt(service, chunks, markdown_prompt, semaphore), map_prompt(service, chunks, demographics_prompt, semaphore)
+    )
+    # Demographics missing from a failed chunk are filled from the others, so only the summary lists its gaps
+    return add_failed_chunks(merge_markdown(markdown_parts), markdown_failed, len(chunks)), merge_demographics(demographics_parts)
@@ -0,0 +1,275 @@
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import NamedTuple, Optional
+
+from api.core.config import config
+from api.services.document import DocumentLine, ExtractedDocument
+
+# Character n-gram size of the fuzzy index
+NGRAM_SIZE = 3
+# Quotes may run over this many consecutive lines
+MAX_SPAN_LINES = 3
+# Rarest n-grams of a quote used to find candidate lines, and candidates scored in full
+SEED_NGRAMS = 12
+CANDIDATE_LINES = 8
+# Seed n-grams always used, and the most line postings the seeds may add up to beyond those
+MIN_SEED_NGRAMS = 3
+MAX_SEED_POSTINGS = 2000
+# Indexes kept for recently verified documents
+INDEX_CACHE_ITEMS = 8
+
+# Bytes kept by normalization; other ASCII bytes become spaces and UTF-8 sequences pass through
+WORD_BYTES = set(b"0123456789abcdefghijklmnopqrstuvwxyz\n")
+NORMALIZE_TABLE = bytes(byte if byte in WORD_BYTES or byte >= 0x80 else 0x20 for byte in range(256))
+UNICODE_PUNCTUATION = "\u2018\u2019\u201c\u201d\u2013\u2014\u2026"
+ELLIPSIS = re.compile(r"\[?(?:\.\.\.|\u2026)\]?")
+# A quoted phrase followed by its (Speaker, Page X, Line Y) or (Page X, Lines Y-Z) citation
+MARKDOWN_CITATION = re.compile(
+    r'"(?P<quote>[^"\n]{8,})"(?P<between>[^"(\n]*)\((?P<who>[^()\n]*?)Page (?P<page>\d+), Lines? (?P<line>\d+)(?:-(?P<end>\d+))?\)'
+)
+
+
+def normalize_lines(texts: list[str]) -> list[str]:
+    """Lowercase words and numbers of every line separated by single spaces, with punctuation dropped."""
+    text = "\n".join(texts).lower()
+    for char in UNICODE_PUNCTUATION:
+        text = text.replace(char, " ")
+    return [" ".join(line.split()) for line in text.encode("utf-8").translate(NORMALIZE_TABLE).decode("utf-8").split("\n")]
+
+
+def normalize(text: str) -> str:
+    return normalize_lines([text.replace("\n", " ")])[0]
+
+
+def ngrams(text: str) -> set[str]:
+    return {text[i : i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+class CitationMatch(NamedTuple):
+    """Where a quote was found: status is "verified", "corrected" or "unverified"."""
+
+    status: str
+    page: Optional[int]
+    line: Optional[int]
+    line_count: int
+    similarity: float
+
+
+class CitationIndex:
+    """
+    Lookup structures for checking quotes against an extracted document.
+
+    A hash index maps every normalized line to its positions, so quotes that are whole lines are
+    found with one dict lookup. Fuzzy matches go through an inverted index, built on first use,
+    from character n-grams of the document's words to the lines holding those words: the quote's
+    rarest n-grams pick a few candidate lines and only windows around those are scored, so a
+    lookup costs about the same on ten lines as on tens of thousands.
+    """
+
+    def __init__(self, lines: list[DocumentLine]):
+        self.lines = lines
+        self.normalized = normalize_lines([line.text for line in lines])
+        self.positions = {(line.page, line.line): index for index, line in enumerate(lines)}
+        # Transcript lines often end with the printed line number, which quotes leave out
+        self.unnumbered = []
+        for text in self.normalized:
+            head, _, tail = text.rpartition(" ")
+            self.unnumbered.append(head if head and tail.isdigit() else text)
+        self.exact: dict[str, list[int]] = {}
+        for index, (text, head) in enumerate(zip(self.normalized, self.unnumbered)):
+            self.exact.setdefault(text, []).append(index)
+            if head != text:
+                self.exact.setdefault(head, []).append(index)
+        self._word_lines: Optional[dict[str, list[int]]] = None
+        self._gram_words: dict[str, list[str]] = {}
+        self._gram_frequency: dict[str, int] = {}
+        self._line_grams: dict[int, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def _build_fuzzy_index(self) -> None:
+        with self._lock:
+            if self._word_lines is not None:
+                return
+            word_lines: dict[str, list[int]] = {}
+            for index, text in enumerate(self.normalized):
+                for word in set(text.split()):
+                    word_lines.setdefault(word, []).append(index)
+            for word, indexes in word_lines.items():
+                for gram in ngrams(f" {word} "):
+                    self._gram_words.setdefault(gram, []).append(word)
+                    self._gram_frequency[gram] = self._gram_frequency.get(gram, 0) + len(indexes)
+            self._word_lines = word_lines
+
+    def _contains(self, start: int, count: int, target: str) -> bool:
+        return target in " ".join(self.normalized[start : start + count]) or target in " ".join(self.unnumbered[start : start + count])
+
+    def _grams_of_line(self, index: int) -> set[str]:
+        grams = self._line_grams.get(index)
+        if grams is None:
+            grams = self._line_grams[index] = ngrams(self.normalized[index])
+        return grams
+
+    def _grams_across(self, index: int) -> set[str]:
+        """N-grams spanning the join between a line and the next one."""
+        edge = NGRAM_SIZE - 1
+        return ngrams(f"{self.normalized[index][-edge:]} {self.normalized[index + 1][:edge]}")
+
+    def _match(self, status: str, index: int, line_count: int, similarity: float) -> CitationMatch:
+        line = self.lines[index]
+        return CitationMatch(status, line.page, line.line, line_count, round(similarity, 3))
+
+    def locate(self, quote: str, page: Optional[int] = None, line: Optional[int] = None, min_similarity: Optional[float] = None) -> CitationMatch:
+        """
+        Check a quote against its cited page/line, looking for it elsewhere if it isn't there.
+
+        Quotes with an ellipsis inside are checked part by part and placed where the first part is.
+        """
+        min_similarity = config.CITATION_MIN_SIMILARITY if min_similarity is None else min_similarity
+        parts = [part for part in ELLIPSIS.split(quote) if normalize(part)]
+        if len(parts) <= 1:
+            return self._locate(normalize(quote), page, line, min_similarity)
+
+        matches = [self._locate(normalize(part), page, line, min_similarity) for part in parts]
+        similarity = min(match.similarity for match in matches)
+        if any(match.status == "unverified" for match in matches):
+            return CitationMatch("unverified", page, line, 1, similarity)
+        return matches[0]._replace(similarity=similarity)
+
+    def _locate(self, target: str, page: Optional[int], line: Optional[int], min_similarity: float) -> CitationMatch:
+        cited = self.positions.get((page, line))
+        if not target:
+            return CitationMatch("unverified", page, line, 1, 0.0)
+
+        # The quote is where it says it is
+        if cited is not None:
+            for count in range(1, MAX_SPAN_LINES + 1):
+                if self._contains(cited, count, target):
+                    return self._match("verified", cited, count, 1.0)
+
+        # The quote is a whole line somewhere else
+        exact = self.exact.get(target)
+        if exact:
+            best = min(exact, key=lambda index: abs(index - cited) if cited is not None else index)
+            return self._match("verified" if best == cited else "corrected", best, 1, 1.0)
+
+        # Fuzzy: score windows around the lines sharing the quote's rarest n-grams
+        grams = ngrams(target)
+        if not grams:
+            return CitationMatch("unverified", page, line, 1, 0.0)
+        self._build_fuzzy_index()
+        word_grams = {gram for word in target.split() for gram in ngrams(f" {word} ") if gram in self._gram_frequency}
+        votes: Counter = Counter()
+        postings = 0
+        for seed, gram in enumerate(sorted(word_grams, key=self._gram_frequency.__getitem__)[:SEED_NGRAMS]):
+            # Common n-grams add little but cost a lot; stop once the budget is spent
+            if seed >= MIN_SEED_NGRAMS and postings + self._gram_frequency[gram] > MAX_SEED_POSTINGS:
+                break
+            postings += self._gram_frequency[gram]
+            votes.update({index for word in self._gram_words[gram] for index in self._word_lines[word]})
+
+        # Quote n-grams found in each nearby line and across each line join, shared by the windows scored
+        found_in: dict[int, set[str]] = {}
+        found_across: dict[int, set[str]] = {}
+        best_key, best = None, None
+        for candidate, _ in votes.most_common(CANDIDATE_LINES):
+            for count in range(1, MAX_SPAN_LINES + 1):
+                for start in range(max(0, candidate - count + 1), min(candidate, len(self.lines) - count) + 1):
+                    found: set[str] = set()
+                    for index in range(start, start + count):
+                        if index not in found_in:
+                            found_in[index] = grams & self._grams_of_line(index)
+                        found |= found_in[index]
+                        if index > start:
+                            if index - 1 not in found_across:
+                                found_across[index - 1] = grams & self._grams_across(index - 1)
+                            found |= found_across[index - 1]
+                    similarity = len(found) / len(grams)
+                    distance = abs(start - cited) if cited is not None else 0
+                    # Highest similarity, then fewest lines, then closest to the cited line
+                    key = (similarity, -count, -distance)
+                    if best_key is None or key > best_key:
+                        best_key, best = key, (start, count, similarity)
+
+        if best is None or best[2] < min_similarity:
+            return CitationMatch("unverified", page, line, 1, round(best[2], 3) if best else 0.0)
+        start, count, similarity = best
+        return self._match("verified" if start == cited else "corrected", start, count, similarity)
+
+
+_index_cache: "OrderedDict[str, CitationIndex]" = OrderedDict()
+_index_cache_lock = threading.Lock()
+
+
+def citation_index(document: ExtractedDocument) -> CitationIndex:
+    """Index for a document, reused while it stays among the INDEX_CACHE_ITEMS most recently used."""
+    with _index_cache_lock:
+        index = _index_cache.get(document.digest)
+        if index is not None:
+            _index_cache.move_to_end(document.digest)
+            return index
+    index = CitationIndex(list(document.lines()))
+    with _index_cache_lock:
+        _index_cache[document.digest] = index
+        while len(_index_cache) > INDEX_CACHE_ITEMS:
+            _index_cache.popitem(last=False)
+    return index
+
+
+def _summary(statuses: list[str], started: float) -> dict:
+    counts = Counter(statuses)
+    return {
+        "checked": len(statuses),
+        "verified": counts["verified"],
+        "corrected": counts["corrected"],
+        "unverified": counts["unverified"],
+        "verification_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def verify_findings(document: ExtractedDocument, findings: list[dict]) -> dict:
+    """
+    Check every finding's quote against the document.
+
+    Corrected findings get the page/line where the quote was found (the cited location is kept
+    under verification); each finding gets a verification entry and a summary is returned.
+    """
+    started = time.perf_counter()
+    index = citation_index(document)
+    statuses = []
+    for finding in findings:
+        match = index.locate(str(finding.get("quote", "")), finding.get("page"), finding.get("line"))
+        verification = {"status": match.status, "similarity": match.similarity}
+        if match.status == "corrected":
+            verification.update(cited_page=finding.get("page"), cited_line=finding.get("line"))
+            finding["page"], finding["line"] = match.page, match.line
+        finding["verification"] = verification
+        statuses.append(match.status)
+    return _summary(statuses, started)
+
+
+def verify_markdown(document: ExtractedDocument, markdown: str) -> tuple[str, dict]:
+    """
+    Check quoted citations in a markdown summary ("quote" - (Speaker, Page X, Line Y)).
+
+    Returns the markdown with corrected page/line numbers and a summary listing every citation.
+    """
+    started = time.perf_counter()
+    index = citation_index(document)
+    citations = []
+
+    def check(citation: re.Match) -> str:
+        match = index.locate(citation["quote"], int(citation["page"]), int(citation["line"]))
+        cited = citation.group(0)[citation.start("page") - citation.start() - len("Page ") : citation.end() - citation.start() - 1]
+        entry = {"quote": citation["quote"], "cited": cited, "status": match.status, "similarity": match.similarity}
+        if match.status != "corrected":
+            citations.append(entry)
+            return citation.group(0)
+        last_line = match.line + match.line_count - 1
+        location = f"Page {match.page}, Line {match.line}" if match.line_count == 1 else f"Page {match.page}, Lines {match.line}-{last_line}"
+        citations.append({**entry, "corrected": location})
+        return f'"{citation["quote"]}"{citation["between"]}({citation["who"]}{location})'
+
+    corrected = MARKDOWN_CITATION.sub(check, markdown)
+    return corrected, {**_summary([entry["status"] for entry in citations], started), "citations": citations}
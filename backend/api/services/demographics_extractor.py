@@ -0,0 +1,132 @@
+import re
+from typing import Any, Iterable, Optional
+
+from api.services.analysis import empty_demographics
+from api.services.demographics_rules import DEMOGRAPHICS_RULES, FieldRule
+from api.services.document import DocumentLine
+
+# Static parts of the offline demographics, which no rule extracts
+MOCK_SUMMARY = (
+    "Parole hearing for individual serving life sentence for second-degree murder. "
+    "Board noted disciplinary concerns and recommended additional programming."
+)
+MOCK_EVIDENCE = ["Victim testimony", "Witness statements", "Physical evidence from crime scene"]
+MOCK_THEORY = "Domestic violence incident involving substance abuse and relationship conflict"
+MOCK_VICTIM_RELATIONSHIP = "Acquaintance known for approximately 5 months"
+
+
+def _set(demographics: dict, path: str, value: Any) -> None:
+    *parents, key = path.split(".")
+    for parent in parents:
+        demographics = demographics[parent]
+    demographics[key] = value
+
+
+def _get(demographics: dict, path: str) -> Any:
+    for key in path.split("."):
+        demographics = demographics[key]
+    return demographics
+
+
+class DemographicsExtractor:
+    """
+    Table-driven extractor behind the offline demographics.
+
+    Trigger literals are located with substring searches over the whole lowercased document, which
+    gives every candidate line the set of rules it could match; other lines are never looked at. Each line is then scanned once by a
+    single regex made of those rules as named alternatives (compiled once per rule set and reused);
+    a match's outer group names its rule and the rule's (?P<value>...) group holds the capture.
+    """
+
+    def __init__(self, rules: Iterable[FieldRule] = DEMOGRAPHICS_RULES):
+        self.rules = tuple(rules)
+        # Bitmask of the rules each trigger can start, bit i standing for self.rules[i]
+        self._trigger_masks: dict[str, int] = {}
+        for bit, rule in enumerate(self.rules):
+            for trigger in rule.triggers:
+                self._trigger_masks[trigger] = self._trigger_masks.get(trigger, 0) | (1 << bit)
+        # A line containing a trigger also contains every trigger inside it, so only the shortest need searching
+        for trigger in sorted(self._trigger_masks, key=len, reverse=True):
+            inner = [other for other in self._trigger_masks if other != trigger and other in trigger]
+            if inner:
+                mask = self._trigger_masks.pop(trigger)
+                for other in inner:
+                    self._trigger_masks[other] |= mask
+        self._patterns: dict[int, re.Pattern] = {}
+
+    def _pattern(self, mask: int) -> re.Pattern:
+        """Combined regex of the rules in mask, in table order."""
+        pattern = self._patterns.get(mask)
+        if pattern is None:
+            alternatives = []
+            for bit, rule in enumerate(self.rules):
+                if mask >> bit & 1:
+                    alternatives.append(f"(?P<r{bit}>{rule.pattern.replace('(?P<value>', f'(?P<r{bit}_value>')})")
+            pattern = self._patterns[mask] = re.compile("|".join(alternatives))
+        return pattern
+
+    def candidate_lines(self, document: str) -> dict[int, tuple[int, int]]:
+        """(end offset, rule mask) of every line containing at least one trigger, by start offset."""
+        lowered = document.lower()
+        if len(lowered) != len(document):
+            # A few characters (such as "İ") lowercase to two; keep those as they are so offsets line up
+            lowered = "".join(char.lower() if len(char.lower()) == 1 else char for char in document)
+
+        candidates: dict[int, tuple[int, int]] = {}
+        for trigger, mask in self._trigger_masks.items():
+            offset = lowered.find(trigger)
+            while offset != -1:
+                start = lowered.rfind("\n", 0, offset) + 1
+                end = lowered.find("\n", offset)
+                if end == -1:
+                    end = len(lowered)
+                candidates[start] = (end, candidates.get(start, (end, 0))[1] | mask)
+                # One hit per line is enough, so continue from the next line
+                offset = lowered.find(trigger, end)
+        return candidates
+
+    def extract(self, lines: Iterable[DocumentLine]) -> dict:
+        demographics = empty_demographics()
+        appended: dict[str, list[str]] = {}
+        document = "\n".join(line.text for line in lines)
+        candidates = self.candidate_lines(document)
+        for start in sorted(candidates):
+            end, mask = candidates[start]
+            for match in self._pattern(mask).finditer(document[start:end].strip()):
+                bit = int(match.lastgroup[1:])
+                captured = match.group(f"r{bit}_value") if f"r{bit}_value" in match.re.groupindex else None
+                self._apply(self.rules[bit], captured, demographics, appended)
+
+        for path, values in appended.items():
+            _set(demographics, path, ", ".join(values))
+        return demographics
+
+    @staticmethod
+    def _apply(rule: FieldRule, captured: Optional[str], demographics: dict, appended: dict[str, list[str]]) -> None:
+        if rule.field:
+            if rule.mode == "first" and (_get(demographics, rule.field) or rule.field in appended):
+                return
+            value = rule.value
+            if value is None:
+                value = rule.template.format(rule.transform(captured)) if captured else None
+            if value:
+                if rule.mode == "append":
+                    values = appended.setdefault(rule.field, [])
+                    if value.lower() not in (existing.lower() for existing in values):
+                        values.append(value)
+                else:
+                    _set(demographics, rule.field, value)
+        for path, constant in rule.sets:
+            _set(demographics, path, constant)
+
+    def mock_demographics(self, lines: Iterable[DocumentLine]) -> dict:
+        """Extracted fields plus the fixed narrative fields of the offline demographics."""
+        demographics = self.extract(lines)
+        demographics["introduction"]["shortSummary"] = MOCK_SUMMARY
+        demographics["evidenceUsedToConvict"] = list(MOCK_EVIDENCE)
+        demographics["potentialTheory"] = MOCK_THEORY
+        demographics["victimInfo"]["relationship"] = MOCK_VICTIM_RELATIONSHIP
+        return demographics
+
+
+demographics_extractor = DemographicsExtractor()
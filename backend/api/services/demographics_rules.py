@@ -0,0 +1,221 @@
+# Field rules of the offline demographics extractor.
+# Patterns run on stripped transcript lines; a (?P<value>...) group is the captured field value.
+# Case-insensitive parts use scoped (?i:...) groups so name captures can still require capitals.
+from typing import Any, Callable, NamedTuple, Optional
+
+# A name of two to four capitalized words, as transcripts print them
+NAME = r"[A-Z][A-Za-z.'\-]*(?: [A-Z][A-Za-z.'\-]*){1,3}"
+# Text after a colon that is short enough to be a name
+TRAILING_NAME = r"[ \t]*:[ \t]*(?P<value>[^:\n]{3,49})"
+NUMBER_WORDS = (
+    "one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|thirteen|fourteen|fifteen|sixteen|seventeen|eighteen|nineteen|twenty"
+    "|twenty-five|thirty|forty|fifty"
+)
+CHARGES = (
+    r"(?:first|second|third)[- ]degree murder|attempted murder|(?:voluntary |involuntary |vehicular )?manslaughter"
+    r"|(?:armed |attempted )?robbery|kidnapping|carjacking|burglary|arson|assault with a deadly weapon"
+)
+
+CURRENT_ATTORNEY = "attorneyInfo.currentAttorneyForIncarceratedPerson"
+
+
+def person_name(value: str) -> str:
+    """Title-case names printed in capitals (EMMANUEL YOUNG -> Emmanuel Young) and drop trailing periods."""
+    value = " ".join(value.split()).rstrip(".")
+    return value.title() if value.isupper() else value
+
+
+def sentence_case(value: str) -> str:
+    value = " ".join(value.split())
+    return value[:1].upper() + value[1:].lower()
+
+
+def clean(value: str) -> str:
+    return " ".join(value.split()).rstrip(".")
+
+
+class FieldRule(NamedTuple):
+    """One pattern of the offline demographics extractor and the fields it fills."""
+
+    # Unique rule id, used as the regex group name
+    name: str
+    # Lowercase literals, one of which every line the pattern matches contains
+    triggers: tuple[str, ...]
+    pattern: str
+    # Dotted path of the field the capture (or the constant value) is stored in
+    field: str = ""
+    # "first" keeps the first value, "last" the latest one, "append" collects distinct values
+    mode: str = "first"
+    # Stored instead of the capture
+    value: Optional[str] = None
+    transform: Callable[[str], str] = clean
+    template: str = "{}"
+    # Constant fields set whenever the rule stores its value (or matches, for rules without one)
+    sets: tuple[tuple[str, Any], ...] = ()
+
+
+# Checked in order at every position, so more specific patterns come first
+DEMOGRAPHICS_RULES = (
+    # Client
+    FieldRule(
+        "client_name",
+        ("incarcerated person", "inmate"),
+        rf"^(?P<value>{NAME}),[ \t]*(?i:incarcerated person|inmate)\b",
+        field="clientInfo.name",
+        transform=person_name,
+    ),
+    FieldRule(
+        "cdcr_number",
+        ("cdc",),
+        r"\b(?i:cdcr?[ \t]+(?:number|no\.?|#))[ \t]*(?::|(?i:is))?[ \t]*(?P<value>[A-Za-z]{1,2}\d{4,5})\b",
+        field="clientInfo.cdcrNumber",
+        transform=str.upper,
+    ),
+    # Current attorney: explicit representation statements overwrite each other
+    FieldRule(
+        "attorney_for_named",
+        ("attorney for",),
+        rf"(?P<value>{NAME}),[ \t]*(?i:attorney for (?:the )?incarcerated person)",
+        field=f"{CURRENT_ATTORNEY}.name",
+        mode="last",
+        transform=person_name,
+        sets=(
+            (f"{CURRENT_ATTORNEY}.representationContext", "Attorney for Incarcerated Person"),
+            (f"{CURRENT_ATTORNEY}.presentAtHearing", True),
+            (f"{CURRENT_ATTORNEY}.title", "Attorney"),
+        ),
+    ),
+    FieldRule(
+        "attorney_for",
+        ("attorney for",),
+        rf"(?i:attorney for (?:the )?incarcerated person)(?:{TRAILING_NAME})?",
+        field=f"{CURRENT_ATTORNEY}.name",
+        mode="last",
+        transform=person_name,
+        sets=(
+            (f"{CURRENT_ATTORNEY}.representationContext", "Attorney for Incarcerated Person"),
+            (f"{CURRENT_ATTORNEY}.presentAtHearing", True),
+            (f"{CURRENT_ATTORNEY}.title", "Attorney"),
+        ),
+    ),
+    FieldRule(
+        "counsel_for",
+        ("counsel for",),
+        rf"(?i:counsel for)\b[^:\n]*(?:{TRAILING_NAME})?",
+        field=f"{CURRENT_ATTORNEY}.name",
+        mode="last",
+        transform=person_name,
+        sets=((f"{CURRENT_ATTORNEY}.representationContext", "Legal Counsel"), (f"{CURRENT_ATTORNEY}.presentAtHearing", True)),
+    ),
+    FieldRule(
+        "representing_attorney",
+        ("representing",),
+        rf"(?i:representing\b.*?\battorney)[ \t]+(?P<value>{NAME})",
+        field=f"{CURRENT_ATTORNEY}.name",
+        mode="last",
+        transform=person_name,
+        sets=(
+            (f"{CURRENT_ATTORNEY}.representationContext", "Legal Representation"),
+            (f"{CURRENT_ATTORNEY}.presentAtHearing", True),
+            (f"{CURRENT_ATTORNEY}.title", "Attorney"),
+        ),
+    ),
+    FieldRule(
+        "representing",
+        ("representing",),
+        r"(?i:representing\b.*?\b(?:attorney|counsel)|\b(?:attorney|counsel)\b.*?\brepresenting)",
+        sets=((f"{CURRENT_ATTORNEY}.representationContext", "Legal Representation"), (f"{CURRENT_ATTORNEY}.presentAtHearing", True)),
+    ),
+    FieldRule(
+        "attorney_present",
+        ("attorney present",),
+        rf"(?i:attorney present)(?:{TRAILING_NAME})?",
+        field=f"{CURRENT_ATTORNEY}.name",
+        mode="last",
+        transform=person_name,
+        sets=((f"{CURRENT_ATTORNEY}.representationContext", "Attorney Present"), (f"{CURRENT_ATTORNEY}.presentAtHearing", True)),
+    ),
+    FieldRule(
+        "legal_counsel",
+        ("legal counsel",),
+        rf"(?i:legal counsel)(?:{TRAILING_NAME})?",
+        field=f"{CURRENT_ATTORNEY}.name",
+        mode="last",
+        transform=person_name,
+        sets=((f"{CURRENT_ATTORNEY}.representationContext", "Legal Counsel"), (f"{CURRENT_ATTORNEY}.presentAtHearing", True)),
+    ),
+    # Speaker labels ("ATTORNEY MBELU :") only fill the name when no statement named the attorney
+    FieldRule(
+        "attorney_speaker",
+        ("attorney",),
+        r"^(?P<value>(?i:attorney)\b[^:\n]{0,41}?)[ \t]*:",
+        field=f"{CURRENT_ATTORNEY}.name",
+        transform=person_name,
+        sets=(
+            (f"{CURRENT_ATTORNEY}.presentAtHearing", True),
+            (f"{CURRENT_ATTORNEY}.title", "Attorney"),
+            (f"{CURRENT_ATTORNEY}.representationContext", "Speaking at Hearing"),
+        ),
+    ),
+    FieldRule(
+        "counsel_speaker",
+        ("counsel",),
+        r"^(?P<value>(?i:counsel)\b[^:\n]{0,42}?)[ \t]*:",
+        field=f"{CURRENT_ATTORNEY}.name",
+        transform=person_name,
+        sets=(
+            (f"{CURRENT_ATTORNEY}.presentAtHearing", True),
+            (f"{CURRENT_ATTORNEY}.title", "Counsel"),
+            (f"{CURRENT_ATTORNEY}.representationContext", "Speaking at Hearing"),
+        ),
+    ),
+    # Conviction
+    FieldRule(
+        "charges",
+        ("murder", "manslaughter", "robbery", "kidnapping", "carjacking", "burglary", "arson", "assault"),
+        rf"\b(?P<value>(?i:{CHARGES}))\b",
+        field="convictionInfo.charges",
+        mode="append",
+        transform=sentence_case,
+    ),
+    FieldRule(
+        "sentence_to_life",
+        ("life",),
+        rf"\b(?P<value>\d{{1,2}}|(?i:{NUMBER_WORDS}))[- ](?i:years?[- ])?(?i:to|of)[- ](?i:life)\b",
+        field="convictionInfo.sentenceLength",
+        template="{} years to life",
+    ),
+    FieldRule(
+        "life_without_parole",
+        ("life without", "lwop"),
+        r"(?i:\blife without (?:the possibility of )?parole\b|\blwop\b)",
+        field="convictionInfo.sentenceLength",
+        value="Life without the possibility of parole",
+    ),
+    # Prison record
+    FieldRule("program_gogi", ("gogi",), r"\b(?i:gogi)\b", field="prisonRecord.programming", mode="append", value="GOGI"),
+    FieldRule(
+        "program_avp",
+        ("avp", "alternatives to violence"),
+        r"(?i:\bavp\b|\balternatives to violence\b)",
+        field="prisonRecord.programming",
+        mode="append",
+        value="AVP",
+    ),
+    FieldRule("program_prep", ("prep",), r"\bPREP\b", field="prisonRecord.programming", mode="append", value="PREP"),
+    FieldRule(
+        "program_anger",
+        ("anger management",),
+        r"(?i:\banger management\b)",
+        field="prisonRecord.programming",
+        mode="append",
+        value="Anger management",
+    ),
+    FieldRule(
+        "disciplinary",
+        ("115", "rvr", "disciplinary"),
+        r"(?i:\b115s?\b|\brvrs?\b|\bdisciplinary\b)",
+        field="prisonRecord.conduct",
+        value="Recent disciplinary issues noted by board",
+    ),
+)
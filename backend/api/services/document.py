@@ -0,0 +1,145 @@
+import hashlib
+import json
+from array import array
+from typing import Iterator, NamedTuple, Optional
+
+
+class DocumentLine(NamedTuple):
+    """A numbered (non-blank) line of an extracted document."""
+
+    page: int
+    line: int
+    text: str
+
+
+class ExtractedDocument:
+    """
+    Page/line model of text extracted from a PDF.
+
+    All raw lines live in one text buffer; pages and lines are array-backed offsets into it.
+    The marker format sent to Gemini ([PAGE X], [Line Y], [END PAGE X]) is rendered lazily,
+    once, with a single join.
+    """
+
+    __slots__ = ("_buffer", "_line_starts", "_line_numbers", "_page_starts", "_first_page", "_length", "_text", "_digest")
+
+    def __init__(self, page_texts: list[str], first_page: int = 1):
+        self._buffer = "\n".join(page_texts)
+        # Page number of the first page; slices of a larger document keep their original numbering
+        self._first_page = first_page
+        # Start offset of every raw line, plus a sentinel one past the end of the buffer
+        self._line_starts = array("L")
+        # Line number within its page, 0 for blank lines
+        self._line_numbers = array("L")
+        # Index of the first raw line of every page, plus a sentinel
+        self._page_starts = array("L")
+        self._text: Optional[str] = None
+        self._digest: Optional[str] = None
+
+        offset = 0
+        length = 0
+        for page_num, page_text in enumerate(page_texts, start=first_page):
+            self._page_starts.append(len(self._line_starts))
+            marker_digits = len(str(page_num))
+            length += len("\n[PAGE ]\n") + len("\n[END PAGE ]\n") + 2 * marker_digits
+
+            line_counter = 0
+            for line in page_text.split("\n"):
+                self._line_starts.append(offset)
+                offset += len(line) + 1
+                if line.strip():
+                    line_counter += 1
+                    self._line_numbers.append(line_counter)
+                    length += len("[Line ] \n") + len(str(line_counter)) + len(line)
+                else:
+                    self._line_numbers.append(0)
+                    length += 1
+
+        self._page_starts.append(len(self._line_starts))
+        self._line_starts.append(offset)
+        # The rendered text is stripped, which removes the leading and trailing newline
+        self._length = length - 2 if page_texts else 0
+
+    @property
+    def page_count(self) -> int:
+        """Number of pages in the document."""
+        return len(self._page_starts) - 1
+
+    @property
+    def first_page(self) -> int:
+        """Page number of the first page."""
+        return self._first_page
+
+    @property
+    def text(self) -> str:
+        """Document text with [PAGE X] / [Line Y] markers, rendered on first access."""
+        if self._text is None:
+            self._text = self._render()
+        return self._text
+
+    @property
+    def digest(self) -> str:
+        """SHA-256 of the extracted content and its page boundaries, computed on first access."""
+        if self._digest is None:
+            sha = hashlib.sha256(self._buffer.encode("utf-8"))
+            sha.update(self._page_starts.tobytes())
+            sha.update(str(self._first_page).encode("ascii"))
+            self._digest = sha.hexdigest()
+        return self._digest
+
+    def __len__(self) -> int:
+        """Length of the rendered marker text, computed without rendering it."""
+        return self._length
+
+    def __bool__(self) -> bool:
+        return self._length > 0
+
+    def _raw_line(self, index: int) -> str:
+        return self._buffer[self._line_starts[index] : self._line_starts[index + 1] - 1]
+
+    def lines(self) -> Iterator[DocumentLine]:
+        """Iterate over numbered lines in document order."""
+        for page_index in range(self.page_count):
+            for index in range(self._page_starts[page_index], self._page_starts[page_index + 1]):
+                line_num = self._line_numbers[index]
+                if line_num:
+                    yield DocumentLine(self._first_page + page_index, line_num, self._raw_line(index))
+
+    def _page_text(self, index: int) -> str:
+        return self._buffer[self._line_starts[self._page_starts[index]] : self._line_starts[self._page_starts[index + 1]] - 1]
+
+    def page_texts(self) -> list[str]:
+        """Raw text of every page, as returned by the PDF extractor."""
+        return [self._page_text(i) for i in range(self.page_count)]
+
+    def page_sizes(self) -> list[int]:
+        """Raw character count of every page."""
+        return [self._line_starts[self._page_starts[i + 1]] - self._line_starts[self._page_starts[i]] for i in range(self.page_count)]
+
+    def page_range(self, start: int, stop: int) -> "ExtractedDocument":
+        """Document holding pages [start, stop) by index, keeping their original page numbers."""
+        return ExtractedDocument([self._page_text(i) for i in range(start, stop)], first_page=self._first_page + start)
+
+    def _render(self) -> str:
+        parts: list[str] = []
+        for page_index in range(self.page_count):
+            page_num = self._first_page + page_index
+            parts.append(f"\n[PAGE {page_num}]\n")
+            for index in range(self._page_starts[page_index], self._page_starts[page_index + 1]):
+                line_num = self._line_numbers[index]
+                if line_num:
+                    parts.append(f"[Line {line_num}] {self._raw_line(index)}\n")
+                else:
+                    parts.append("\n")
+            parts.append(f"\n[END PAGE {page_num}]\n")
+        return "".join(parts).strip()
+
+    def to_json(self) -> str:
+        """Serialize the document for on-disk caching."""
+        return json.dumps({"pages": self.page_texts(), "first_page": self._first_page})
+
+    @classmethod
+    def from_json(cls, data: str) -> "ExtractedDocument":
+        """Rebuild a document serialized with to_json."""
+        payload = json.loads(data)
+        return cls(payload["pages"], first_page=payload.get("first_page", 1))
@@ -0,0 +1,187 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from api.services.document import ExtractedDocument
+
+
+class ExtractionCache:
+    """
+    Two-tier (memory LRU + disk) cache for extracted PDF documents, keyed by content hash.
+
+    The disk tier also keeps PDFs fetched from storage (put_pdf/pdf_path), under the same
+    hash and the same byte budget, so extracted text and source bytes are evicted together.
+    """
+
+    def __init__(self, memory_items: int, disk_dir: Optional[str], max_disk_bytes: int):
+        self.memory_items = memory_items
+        self.disk_dir = disk_dir if disk_dir and max_disk_bytes > 0 else None
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory: "OrderedDict[str, tuple[ExtractedDocument, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.seconds_saved = 0.0
+        self.pdf_hits = 0
+        self.pdf_misses = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self._disk_bytes = sum(entry.stat().st_size for entry in os.scandir(self.disk_dir) if entry.is_file())
+
+    @staticmethod
+    def make_key(sha256: str, extractor_version: str) -> str:
+        """Build a cache key from the SHA-256 of the PDF bytes and the extractor version."""
+        return f"{extractor_version}-{sha256}"
+
+    def get(self, key: str) -> Optional[ExtractedDocument]:
+        """Return the cached document for key, or None on a miss."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                self.seconds_saved += entry[1]
+                return entry[0]
+
+        entry = self._read_disk(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self.seconds_saved += entry[1]
+            self._remember(key, entry)
+        return entry[0]
+
+    def put(self, key: str, document: ExtractedDocument, seconds: float) -> None:
+        """Store an extracted document along with the time it took to produce it."""
+        with self._lock:
+            self._remember(key, (document, seconds))
+        self._write_disk(key, document, seconds)
+
+    def pdf_path(self, sha256: str) -> Optional[str]:
+        """Path of the cached PDF with this hash, or None when it isn't on disk."""
+        if self.disk_dir:
+            path = self._pdf_path(sha256)
+            try:
+                # Touch the file so eviction treats it as recently used
+                os.utime(path)
+                with self._lock:
+                    self.pdf_hits += 1
+                return path
+            except OSError:
+                pass
+        with self._lock:
+            self.pdf_misses += 1
+        return None
+
+    def pdf_temp_path(self) -> Optional[str]:
+        """Where to download a PDF before put_pdf moves it into place; None when there is no disk tier."""
+        if not self.disk_dir:
+            return None
+        return os.path.join(self.disk_dir, f"download.{threading.get_ident()}.{time.monotonic_ns()}.tmp")
+
+    def put_pdf(self, sha256: str, tmp_path: str) -> str:
+        """Move a downloaded PDF (at a pdf_temp_path) into the cache and return its cached path."""
+        path = self._pdf_path(sha256)
+        size = os.path.getsize(tmp_path)
+        previous = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._disk_bytes += size - previous
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk(keep=path)
+        return path
+
+    def stats(self) -> dict:
+        """Hit/miss counters and tier sizes."""
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "seconds_saved": round(self.seconds_saved, 3),
+                "pdf_hits": self.pdf_hits,
+                "pdf_misses": self.pdf_misses,
+                "memory_items": len(self._memory),
+                "memory_capacity": self.memory_items,
+                "disk_bytes": self._disk_bytes,
+                "disk_capacity_bytes": self.max_disk_bytes if self.disk_dir else 0,
+            }
+
+    def _remember(self, key: str, entry: tuple[ExtractedDocument, float]) -> None:
+        if self.memory_items <= 0:
+            return
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir or "", f"{key}.json")
+
+    def _pdf_path(self, sha256: str) -> str:
+        return os.path.join(self.disk_dir or "", f"{sha256}.pdf")
+
+    def _read_disk(self, key: str) -> Optional[tuple[ExtractedDocument, float]]:
+        if not self.disk_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                seconds = float(f.readline())
+                document = ExtractedDocument.from_json(f.read())
+            # Touch the file so eviction treats it as recently used
+            os.utime(path)
+            return document, seconds
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_disk(self, key: str, document: ExtractedDocument, seconds: float) -> None:
+        if not self.disk_dir:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(f"{seconds}\n")
+                f.write(document.to_json())
+            size = os.path.getsize(tmp_path)
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Extraction cache write failed: {e}")
+            return
+
+        with self._lock:
+            self._disk_bytes += size - previous
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+
+    def _evict_disk(self, keep: Optional[str] = None) -> None:
+        """Remove least recently used files (other than keep) until the disk tier fits its budget."""
+        entries = [entry for entry in os.scandir(self.disk_dir or "") if entry.is_file() and not entry.name.endswith(".tmp")]
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        total = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if total <= self.max_disk_bytes:
+                break
+            if entry.path == keep:
+                continue
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                total -= size
+            except OSError:
+                pass
+        self._disk_bytes = total
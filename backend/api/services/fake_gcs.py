@@ -0,0 +1,277 @@
+import base64
+import hashlib
+import json
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import google_crc32c
+
+BUCKET_PATH = re.compile(r"^/storage/v1/b/(?P<bucket>[^/]+)$")
+OBJECT_PATH = re.compile(r"^(?:/download|/upload)?/storage/v1/b/(?P<bucket>[^/]+)/o(?:/(?P<name>.+))?$")
+
+
+class FakeGCSObject:
+    """Bytes and metadata of one stored object."""
+
+    def __init__(self, bucket: str, name: str, data: bytes, content_type: str, generation: int):
+        self.bucket = bucket
+        self.name = name
+        self.data = data
+        self.content_type = content_type
+        self.generation = generation
+        self.updated = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        self.md5 = base64.b64encode(hashlib.md5(data).digest()).decode()
+        self.crc32c = base64.b64encode(google_crc32c.Checksum(data).digest()).decode()
+
+    def resource(self) -> dict:
+        return {
+            "kind": "storage#object",
+            "id": f"{self.bucket}/{self.name}/{self.generation}",
+            "name": self.name,
+            "bucket": self.bucket,
+            "generation": str(self.generation),
+            "metageneration": "1",
+            "contentType": self.content_type,
+            "size": str(len(self.data)),
+            "md5Hash": self.md5,
+            "crc32c": self.crc32c,
+            "timeCreated": self.updated,
+            "updated": self.updated,
+        }
+
+
+class FakeGCSServer:
+    """
+    Local stand-in for the Cloud Storage JSON API, used by tests and benchmarks.
+
+    Serves the object calls the storage client makes (media, multipart and resumable uploads,
+    metadata, downloads and listings) from memory on a local port; point the client at it with
+    STORAGE_EMULATOR_HOST=server.url. Every request waits `latency` seconds first and every new
+    connection `connect_latency` seconds (standing in for the TLS handshake); `connections` counts
+    the connections clients have opened and `downloads` the object media requests. The next `fail_chunks` resumable upload chunks keep only
+    their first half and fail with 503.
+    """
+
+    def __init__(self, latency: float = 0.0, connect_latency: float = 0.0, port: int = 0):
+        self.latency = latency
+        self.connect_latency = connect_latency
+        self.fail_chunks = 0
+        self.objects: dict[tuple[str, str], FakeGCSObject] = {}
+        self.requests = 0
+        self.connections = 0
+        self.downloads = 0
+        self._uploads: dict[str, dict] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeGCSServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-gcs", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeGCSServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def put(self, bucket: str, name: str, data: bytes, content_type: str = "application/octet-stream") -> FakeGCSObject:
+        with self._lock:
+            self._generation += 1
+            stored = self.objects[(bucket, name)] = FakeGCSObject(bucket, name, data, content_type, self._generation)
+            return stored
+
+    def _list(self, bucket: str, query: dict) -> dict:
+        prefix = query.get("prefix", "")
+        page_size = min(int(query.get("maxResults", 1000)), 1000)
+        start = query.get("pageToken", "")
+        with self._lock:
+            names = sorted(name for stored_bucket, name in self.objects if stored_bucket == bucket and name.startswith(prefix) and name >= start)
+            page = [self.objects[(bucket, name)].resource() for name in names[:page_size]]
+        response = {"kind": "storage#objects", "items": page}
+        if len(names) > page_size:
+            response["nextPageToken"] = names[page_size]
+        return response
+
+    def _handler(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+                time.sleep(server.connect_latency)
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: bytes = b"", content_type: str = "application/json", headers: Optional[dict] = None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for header, value in (headers or {}).items():
+                    self.send_header(header, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _json(self, payload: dict, status: int = 200, headers: Optional[dict] = None):
+                self._send(status, json.dumps(payload).encode(), headers=headers)
+
+            def _error(self, status: int, message: str):
+                self._json({"error": {"code": status, "message": message}}, status)
+
+            def _body(self) -> bytes:
+                return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+            def _route(self) -> tuple[Optional[re.Match], dict]:
+                server.requests += 1
+                time.sleep(server.latency)
+                url = urlsplit(self.path)
+                query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                return OBJECT_PATH.match(url.path), query
+
+            def do_GET(self):
+                match, query = self._route()
+                bucket = BUCKET_PATH.match(urlsplit(self.path).path)
+                if bucket:
+                    return self._json({"kind": "storage#bucket", "id": bucket["bucket"], "name": bucket["bucket"], "location": "US"})
+                if not match:
+                    return self._error(404, "Not Found")
+                if match["name"] is None:
+                    return self._json(server._list(match["bucket"], query))
+                stored = server.objects.get((match["bucket"], unquote(match["name"])))
+                if stored is None:
+                    return self._error(404, "No such object")
+                if query.get("alt") == "media":
+                    server.downloads += 1
+                    headers = {"x-goog-hash": f"crc32c={stored.crc32c},md5={stored.md5}", "x-goog-generation": str(stored.generation)}
+                    return self._send(200, stored.data, stored.content_type, headers)
+                self._json(stored.resource())
+
+            def do_POST(self):
+                match, query = self._route()
+                if not match or match["name"] is not None:
+                    return self._error(404, "Not Found")
+                bucket, upload_type, body = match["bucket"], query.get("uploadType"), self._body()
+                if upload_type == "media":
+                    content_type = self.headers.get("Content-Type", "application/octet-stream")
+                    return self._store(bucket, query["name"], body, content_type, query.get("ifGenerationMatch"))
+                if upload_type == "multipart":
+                    metadata, data, content_type = self._multipart(body)
+                    return self._store(bucket, metadata.get("name") or query["name"], data, content_type, query.get("ifGenerationMatch"))
+                if upload_type == "resumable":
+                    metadata = json.loads(body or b"{}")
+                    upload_id = uuid.uuid4().hex
+                    server._uploads[upload_id] = {
+                        "bucket": bucket,
+                        "name": metadata.get("name") or query.get("name"),
+                        "content_type": self.headers.get("X-Upload-Content-Type", metadata.get("contentType", "application/octet-stream")),
+                        "data": bytearray(),
+                        "if_generation_match": query.get("ifGenerationMatch"),
+                    }
+                    location = f"{server.url}/upload/storage/v1/b/{bucket}/o?uploadType=resumable&upload_id={upload_id}"
+                    return self._send(200, headers={"Location": location})
+                self._error(400, f"Unsupported uploadType {upload_type}")
+
+            def do_PUT(self):
+                match, query = self._route()
+                upload = server._uploads.get(query.get("upload_id", ""))
+                if not match or upload is None:
+                    return self._error(404, "No such upload")
+                body = self._body()
+                # Content-Range: "bytes first-last/total", with "*" for an unknown total or no bytes
+                byte_range, _, total = self.headers.get("Content-Range", "bytes */*").partition(" ")[2].partition("/")
+                if byte_range != "*":
+                    first = int(byte_range.split("-")[0])
+                    if first > len(upload["data"]):
+                        return self._error(400, "Chunk does not continue the upload")
+                    # Bytes before the committed offset were already received
+                    body = body[len(upload["data"]) - first :]
+                    if server.fail_chunks > 0 and body:
+                        # Keep part of the chunk and fail, as a dropped connection would
+                        server.fail_chunks -= 1
+                        upload["data"] += body[: len(body) // 2]
+                        return self._error(503, "Backend Error")
+                    upload["data"] += body
+                if total == "*" or int(total) > len(upload["data"]):
+                    headers = {"Range": f"bytes=0-{len(upload['data']) - 1}"} if upload["data"] else {}
+                    return self._send(308, headers=headers)
+                del server._uploads[query["upload_id"]]
+                self._store(upload["bucket"], upload["name"], bytes(upload["data"]), upload["content_type"], upload["if_generation_match"])
+
+            def _store(self, bucket: str, name: str, data: bytes, content_type: str, if_generation_match: Optional[str]):
+                """Store an upload unless its ifGenerationMatch precondition ("0": must not exist yet) fails."""
+                if if_generation_match is not None:
+                    existing = server.objects.get((bucket, name))
+                    if int(if_generation_match) != (existing.generation if existing else 0):
+                        return self._error(412, "Precondition Failed")
+                self._json(server.put(bucket, name, data, content_type).resource())
+
+            def _multipart(self, body: bytes) -> tuple[dict, bytes, str]:
+                """Metadata, media and media content type of a multipart/related upload body."""
+                boundary = self.headers.get_param("boundary").encode()
+                metadata_part, media_part = [part for part in body.split(b"--" + boundary) if part.strip(b"-\r\n")][:2]
+                metadata = json.loads(metadata_part.split(b"\r\n\r\n", 1)[1])
+                media_headers, data = media_part.split(b"\r\n\r\n", 1)
+                content_type = re.search(rb"content-type:\s*([^\r\n]+)", media_headers, re.IGNORECASE)
+                return metadata, data[: -len(b"\r\n")], content_type.group(1).decode() if content_type else "application/octet-stream"
+
+        return Handler
+
+
+def write_fake_service_account(path: str) -> str:
+    """Write a service account key file with a fresh RSA key, good for signing URLs offline."""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()).decode()
+    account = {
+        "type": "service_account",
+        "project_id": "fake-project",
+        "private_key_id": "fake-key",
+        "private_key": pem,
+        "client_email": "fake-uploader@fake-project.iam.gserviceaccount.com",
+        "client_id": "0",
+        "token_uri": "https://oauth2.googleapis.com/token",
+    }
+    with open(path, "w") as f:
+        json.dump(account, f)
+    return path
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the fake GCS server until interrupted")
+    parser.add_argument("--port", type=int, default=4443)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait per request")
+    args = parser.parse_args()
+    fake = FakeGCSServer(latency=args.latency, port=args.port)
+    print(f"Fake GCS server on {fake.url} (STORAGE_EMULATOR_HOST={fake.url})", flush=True)
+    try:
+        fake._server.serve_forever()
+    except KeyboardInterrupt:
+        fake._server.server_close()
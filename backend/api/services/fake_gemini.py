@@ -0,0 +1,71 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
+
+
+class FakeResponse:
+    """Minimal stand-in for a Gemini GenerateContentResponse."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeStreamingResponse:
+    """Stand-in for a streamed response: iterate (or async-iterate) it for chunks of the text."""
+
+    def __init__(self, text: str, chunk_size: int, chunk_delay: float):
+        self.text = text
+        self.chunk_size = max(chunk_size, 1)
+        self.chunk_delay = chunk_delay
+
+    def _pieces(self) -> list[str]:
+        return [self.text[i : i + self.chunk_size] for i in range(0, len(self.text), self.chunk_size)]
+
+    def __iter__(self) -> Iterator[FakeResponse]:
+        for piece in self._pieces():
+            time.sleep(self.chunk_delay)
+            yield FakeResponse(piece)
+
+    async def __aiter__(self) -> AsyncIterator[FakeResponse]:
+        for piece in self._pieces():
+            await asyncio.sleep(self.chunk_delay)
+            yield FakeResponse(piece)
+
+
+class FakeGenerativeModel:
+    """
+    Local stand-in for genai.GenerativeModel, used by tests and benchmarks.
+
+    Every call waits `latency` seconds (time.sleep for the blocking API, asyncio.sleep
+    for the async one) and answers with `responder(prompt)`. With stream=True the answer
+    arrives in `stream_chunk_size` character chunks, `stream_chunk_delay` seconds apart.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        responder: Optional[Callable[[str], str]] = None,
+        model_name: str = "models/fake-gemini",
+        stream_chunk_size: int = 64,
+        stream_chunk_delay: float = 0.0,
+    ):
+        self.latency = latency
+        self.responder = responder or (lambda prompt: f"Fake response to a {len(prompt)} character prompt")
+        self.model_name = model_name
+        self.stream_chunk_size = stream_chunk_size
+        self.stream_chunk_delay = stream_chunk_delay
+        self.calls = 0
+
+    def _respond(self, contents: Any, stream: bool) -> Any:
+        text = self.responder(str(contents))
+        return FakeStreamingResponse(text, self.stream_chunk_size, self.stream_chunk_delay) if stream else FakeResponse(text)
+
+    def generate_content(self, contents: Any, stream: bool = False, **kwargs: Any) -> Any:
+        self.calls += 1
+        time.sleep(self.latency)
+        return self._respond(contents, stream)
+
+    async def generate_content_async(self, contents: Any, stream: bool = False, **kwargs: Any) -> Any:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return self._respond(contents, stream)
@@ -1,12 +1,27 @@
-from typing import BinaryIO
+from collections import OrderedDict
+from datetime import timedelta
+from typing import BinaryIO, Callable, Optional
+import hashlib
+import json
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
+from api.core.config import config
+from api.services.worker_pools import gcs_pool
+
 load_dotenv()
 
 # Try to import Google Cloud Storage, make it optional
 try:
+    from google.api_core.exceptions import NotFound, PreconditionFailed, RetryError
+    from google.auth.credentials import AnonymousCredentials
+    from google.auth.transport.requests import AuthorizedSession
     from google.cloud import storage
+    from google.cloud.storage.retry import DEFAULT_RETRY
+    from google.oauth2 import service_account
+    from requests.adapters import HTTPAdapter
 
     GCS_AVAILABLE = True
 except ImportError:
@@ -17,27 +32,250 @@ except ImportError:
 SERVICE_ACCOUNT_JSON = os.getenv("GCS_SERVICE_ACCOUNT_JSON")
 BUCKET_NAME = os.getenv("GCS_BUCKET_NAME")
 
+# One client, bucket handle and connection pool (session) for the whole process, created on first use
+_client = None
+_session = None
+_bucket = None
+_signing_credentials = None
+_client_lock = threading.Lock()
+
+# Content hashes seen stored and the hash each filename alias points to, so repeat uploads skip the
+# existence check and the alias write; SHA-256 of objects stored under other names, by (name, generation),
+# learned when downloading them. Each maps key -> (expiry, value), oldest first, and holds at most
+# GCS_KNOWN_OBJECT_ITEMS entries for GCS_KNOWN_OBJECT_TTL_SECONDS, so an object deleted since is stored
+# again at the latest once its entry expires, or at once when a read finds it missing
+_known_content: "OrderedDict[str, tuple[float, bool]]" = OrderedDict()
+_known_aliases: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+_object_hashes: "OrderedDict[tuple[str, int], tuple[float, str]]" = OrderedDict()
+_known_lock = threading.Lock()
+
+# Signed URLs by (object name, generation): (expiry timestamp, url), ordered by expiry
+_signed_urls: "OrderedDict[tuple, tuple[float, str]]" = OrderedDict()
+_signed_url_lock = threading.Lock()
+
+# Listing pages by (bucket, prefix, page size, page token), kept FILE_LIST_CACHE_TTL_SECONDS
+_listing_cache: dict[tuple, tuple[float, dict]] = {}
+_listing_lock = threading.Lock()
+LISTING_CACHE_ITEMS = 256
+# Resumable uploads: chunk granularity and the backoff between retries
+UPLOAD_CHUNK_MULTIPLE = 256 * 1024
+UPLOAD_RETRY_BACKOFF = 0.5
+UPLOAD_RETRY_BACKOFF_MAX = 8.0
+UPLOAD_TIMEOUT = 120
+# Only the object fields a listing returns
+LISTING_FIELDS = "items(name,size,updated,contentType,generation),nextPageToken"
+
+
+def emulator_host() -> str:
+    """STORAGE_EMULATOR_HOST, set when talking to a local GCS emulator instead of Google."""
+    return os.getenv("STORAGE_EMULATOR_HOST", "")
+
 
 def is_gcs_available() -> bool:
     """Check if Google Cloud Storage is available and configured."""
-    return bool(GCS_AVAILABLE and SERVICE_ACCOUNT_JSON and BUCKET_NAME)
+    return bool(GCS_AVAILABLE and (SERVICE_ACCOUNT_JSON or emulator_host()) and BUCKET_NAME)
 
 
-def get_bucket():
+def _http_session(credentials) -> "AuthorizedSession":
+    """Authorized session whose connection pool holds GCS_HTTP_POOL_SIZE connections per host."""
+    session = AuthorizedSession(credentials)
+    adapter = HTTPAdapter(pool_connections=config.GCS_HTTP_POOL_SIZE, pool_maxsize=config.GCS_HTTP_POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_client():
+    """The process-wide storage client; the credential file is read and auth set up only once."""
+    global _client, _session, _signing_credentials
+    if _client is not None:
+        return _client
     if not GCS_AVAILABLE or not storage:
         raise ImportError("Google Cloud Storage is not available")
-    client = storage.Client.from_service_account_json(SERVICE_ACCOUNT_JSON)
-    bucket = client.bucket(BUCKET_NAME)
-    return bucket
+    with _client_lock:
+        if _client is None:
+            service_credentials = None
+            if SERVICE_ACCOUNT_JSON:
+                service_credentials = service_account.Credentials.from_service_account_file(SERVICE_ACCOUNT_JSON, scopes=storage.Client.SCOPE)
+            # Emulators take unauthenticated requests; the service account is then only used to sign URLs
+            credentials = AnonymousCredentials() if emulator_host() or service_credentials is None else service_credentials
+            project = service_credentials.project_id if service_credentials else "emulator"
+            _signing_credentials = service_credentials
+            _session = _http_session(credentials)
+            _client = storage.Client(project=project, credentials=credentials, _http=_session)
+    return _client
+
+
+def get_bucket():
+    global _bucket
+    if _bucket is None:
+        _bucket = get_client().bucket(BUCKET_NAME)
+    return _bucket
+
+
+def close_client() -> None:
+    """Close the shared connections; the next call creates a new client."""
+    global _client, _session, _bucket, _signing_credentials
+    with _client_lock:
+        if _session is not None:
+            _session.close()
+        _client = _session = _bucket = _signing_credentials = None
+    with _known_lock:
+        _known_content.clear()
+        _known_aliases.clear()
+        _object_hashes.clear()
+    with _signed_url_lock:
+        _signed_urls.clear()
+    clear_listing_cache()
+
+
+def _remember(known: OrderedDict, key, value) -> None:
+    if config.GCS_KNOWN_OBJECT_TTL_SECONDS <= 0:
+        return
+    now = time.monotonic()
+    with _known_lock:
+        # Re-added entries move to the end, so the dict stays ordered by expiry
+        known.pop(key, None)
+        known[key] = (now + config.GCS_KNOWN_OBJECT_TTL_SECONDS, value)
+        while known and (len(known) > config.GCS_KNOWN_OBJECT_ITEMS or next(iter(known.values()))[0] <= now):
+            known.popitem(last=False)
+
+
+def _recall(known: OrderedDict, key):
+    with _known_lock:
+        entry = known.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del known[key]
+            return None
+        return entry[1]
+
+
+def _forget(name: str, generation: Optional[int] = None) -> None:
+    """Drop what is known about an object a read found missing, so the next upload stores it again."""
+    sha256 = content_hash(name)
+    with _known_lock:
+        if sha256:
+            _known_content.pop(sha256, None)
+        if name.startswith(config.GCS_ALIAS_PREFIX):
+            _known_aliases.pop(name[len(config.GCS_ALIAS_PREFIX) :], None)
+        _object_hashes.pop((name, generation), None)
+
+
+def signed_url(name: str, generation: Optional[int] = None) -> str:
+    """
+    V4 signed GET URL for an object, valid for SIGNED_URL_TTL_SECONDS.
+
+    URLs are cached by (name, generation) and reused while they have at least
+    SIGNED_URL_MIN_REMAINING_SECONDS left, so warm objects cost a dict lookup instead of an RSA signature.
+    """
+    key = (name, generation)
+    now = time.time()
+    with _signed_url_lock:
+        cached = _signed_urls.get(key)
+        if cached is not None and cached[0] - now >= config.SIGNED_URL_MIN_REMAINING_SECONDS:
+            return cached[1]
+
+    expiration = timedelta(seconds=config.SIGNED_URL_TTL_SECONDS)
+    url = get_bucket().blob(name).generate_signed_url(version="v4", expiration=expiration, method="GET", credentials=_signing_credentials)
+    with _signed_url_lock:
+        # Re-signed entries move to the end, so the dict stays ordered by expiry
+        _signed_urls.pop(key, None)
+        _signed_urls[key] = (now + config.SIGNED_URL_TTL_SECONDS, url)
+        while _signed_urls:
+            expires_at, _ = next(iter(_signed_urls.values()))
+            if expires_at - now >= config.SIGNED_URL_MIN_REMAINING_SECONDS and len(_signed_urls) <= config.SIGNED_URL_CACHE_ITEMS:
+                break
+            _signed_urls.popitem(last=False)
+    return url
 
 
-def upload_file(file: BinaryIO, destination_name: str) -> str:
+def _upload_chunk_size() -> int:
+    # Chunks of a resumable upload must be multiples of 256 KiB
+    return max(1, round(config.GCS_UPLOAD_CHUNK_MB * 1024 / 256)) * UPLOAD_CHUNK_MULTIPLE
+
+
+class _ProgressReader:
+    """
+    File wrapper reporting how much of an upload GCS has stored.
+
+    The storage library reads a resumable upload's next chunk only once the previous one is
+    stored, so the position at each read is the stored size; a chunk read again after a
+    failure does not move progress back.
+    """
+
+    def __init__(self, file: BinaryIO, progress: Callable[[int], None]):
+        self.file = file
+        self.progress = progress
+        self.start = file.tell()
+        self.reported = 0
+
+    def read(self, size: int = -1) -> bytes:
+        self.report(self.file.tell() - self.start)
+        return self.file.read(size)
+
+    def report(self, stored: int) -> None:
+        if stored > self.reported:
+            self.reported = stored
+            self.progress(stored)
+
+    def __getattr__(self, name: str):
+        return getattr(self.file, name)
+
+
+def upload_stream(
+    file: BinaryIO,
+    destination_name: str,
+    size: Optional[int] = None,
+    content_type: Optional[str] = None,
+    progress: Optional[Callable[[int], None]] = None,
+    if_generation_match: Optional[int] = None,
+):
+    """
+    Upload a file with the storage library's resumable upload, GCS_UPLOAD_CHUNK_MB at a time.
+
+    Only one chunk is held in memory; files of up to 8 MB with a known size go in a single
+    multipart request instead. A dropped connection or retryable status is retried, resuming
+    from what the session stored, for up to GCS_UPLOAD_RETRY_SECONDS. progress is called with
+    the bytes stored after each chunk. With if_generation_match=0 the object is only created
+    if it doesn't exist yet; otherwise FileExistsError is raised.
+
+    Returns:
+        The uploaded blob
+    """
+    blob = get_bucket().blob(destination_name, chunk_size=_upload_chunk_size())
+    reader = _ProgressReader(file, progress) if progress else file
+    retry = DEFAULT_RETRY.with_delay(initial=UPLOAD_RETRY_BACKOFF, maximum=UPLOAD_RETRY_BACKOFF_MAX).with_timeout(config.GCS_UPLOAD_RETRY_SECONDS)
+    try:
+        blob.upload_from_file(
+            reader, size=size, content_type=content_type, if_generation_match=if_generation_match, timeout=UPLOAD_TIMEOUT, retry=retry
+        )
+    except PreconditionFailed:
+        raise FileExistsError(f"{destination_name} already exists")
+    except RetryError as e:
+        raise RuntimeError(f"Upload of {destination_name} failed after retrying for {config.GCS_UPLOAD_RETRY_SECONDS:g}s: {e.cause}")
+    if progress:
+        reader.report(blob.size)
+    return blob
+
+
+def upload_file(
+    file: BinaryIO,
+    destination_name: str,
+    size: Optional[int] = None,
+    content_type: Optional[str] = None,
+    progress: Optional[Callable[[int], None]] = None,
+) -> str:
     """
     Upload a file to Google Cloud Storage
 
     Args:
-        file: A file-like object to upload
+        file: A file-like object to upload, read from its current position
         destination_name: The name to give the file in GCS
+        size: Bytes to upload, when known (otherwise read until the end of the file)
+        content_type: Content type stored with the file
+        progress: Called with the number of bytes stored after every chunk
 
     Returns:
         str: A signed URL to access the uploaded file
@@ -45,42 +283,239 @@ def upload_file(file: BinaryIO, destination_name: str) -> str:
     if not GCS_AVAILABLE:
         raise ImportError("Google Cloud Storage is not available. Please install google-cloud-storage package.")
 
-    bucket = get_bucket()
-    blob = bucket.blob(destination_name)
-    blob.upload_from_file(file)
+    blob = upload_stream(file, destination_name, size, content_type, progress)
+    # Listings cached before this upload would miss it
+    clear_listing_cache()
+    return signed_url(blob.name, blob.generation)
+
+
+def content_object_name(sha256: str) -> str:
+    return f"{config.GCS_CONTENT_PREFIX}{sha256}"
+
+
+def alias_object_name(filename: str) -> str:
+    return f"{config.GCS_ALIAS_PREFIX}{filename}"
+
+
+def content_hash(name: str) -> Optional[str]:
+    """The SHA-256 a content object name (GCS_CONTENT_PREFIX + hash) stands for, or None for other names."""
+    if not name.startswith(config.GCS_CONTENT_PREFIX):
+        return None
+    sha256 = name[len(config.GCS_CONTENT_PREFIX) :].lower()
+    return sha256 if len(sha256) == 64 and all(char in "0123456789abcdef" for char in sha256) else None
+
+
+def content_exists(sha256: str) -> bool:
+    """Whether content with this hash is stored; one metadata request, none when it was seen within GCS_KNOWN_OBJECT_TTL_SECONDS."""
+    if _recall(_known_content, sha256):
+        return True
+    exists = get_bucket().blob(content_object_name(sha256)).exists()
+    if exists:
+        _remember(_known_content, sha256, True)
+    return exists
 
-    # Generate a signed URL that expires in 1 hour
-    url = blob.generate_signed_url(version="v4", expiration=3600, method="GET")  # 1 hour
-    return url
 
-def list_files():
+def store_upload(
+    file: BinaryIO,
+    sha256: str,
+    size: Optional[int] = None,
+    filename: Optional[str] = None,
+    content_type: Optional[str] = None,
+) -> dict:
     """
-    List all files in the Google Cloud Storage bucket
+    Store a file under its content hash, skipping the upload when that content is already stored.
+
+    The hash comes from the ingestion pass over the upload. When filename is given, an alias
+    object (GCS_ALIAS_PREFIX + filename) records which hash the name points to.
 
     Returns:
-        list: A list of dictionaries containing file information:
-            - name: The name of the file
-            - size: Size in bytes
-            - updated: Last modified timestamp
-            - url: Signed URL to access the file
-    """
-    bucket = get_bucket()
-    blobs = bucket.list_blobs()
-    
-    files = []
-    for blob in blobs:
-        url = blob.generate_signed_url(
-            version="v4",
-            expiration=3600,  # 1 hour
-            method="GET"
-        )
-        
-        files.append({
-            "name": blob.name,
-            "size": blob.size,
-            "updated": blob.updated.isoformat(),
-            "content_type": blob.content_type,
-            "url": url
-        })
-    
-    return files
+        dict: object_name, sha256, deduplicated (True when no bytes were uploaded) and a signed url
+    """
+    if not GCS_AVAILABLE:
+        raise ImportError("Google Cloud Storage is not available. Please install google-cloud-storage package.")
+
+    object_name = content_object_name(sha256)
+    deduplicated = content_exists(sha256)
+    if not deduplicated:
+        try:
+            upload_stream(file, object_name, size, content_type, if_generation_match=0)
+        except FileExistsError:
+            # The same content was stored by another request in the meantime
+            deduplicated = True
+        _remember(_known_content, sha256, True)
+        clear_listing_cache()
+
+    if filename and _recall(_known_aliases, filename) != sha256:
+        alias = {"sha256": sha256, "object_name": object_name, "size": size, "content_type": content_type}
+        get_bucket().blob(alias_object_name(filename)).upload_from_string(json.dumps(alias), content_type="application/json")
+        _remember(_known_aliases, filename, sha256)
+        clear_listing_cache()
+
+    return {"object_name": object_name, "sha256": sha256, "deduplicated": deduplicated, "url": signed_url(object_name)}
+
+
+def resolve_object(name: str) -> tuple:
+    """
+    The blob holding an object's bytes and its SHA-256, when that is known without downloading it.
+
+    Content objects carry the hash in their name (no request); a filename alias is read (one small
+    request) for the hash it points to; any other object needs a metadata request, and its hash is
+    known once it has been downloaded at that generation.
+
+    Raises:
+        FileNotFoundError: No object (or alias) with this name
+    """
+    sha256 = content_hash(name)
+    if sha256:
+        return get_bucket().blob(content_object_name(sha256)), sha256
+    if name.startswith(config.GCS_ALIAS_PREFIX):
+        try:
+            alias = json.loads(get_bucket().blob(name).download_as_bytes())
+        except NotFound:
+            _forget(name)
+            raise FileNotFoundError(name)
+        return get_bucket().blob(alias["object_name"]), alias["sha256"]
+    blob = get_bucket().get_blob(name)
+    if blob is None:
+        raise FileNotFoundError(name)
+    return blob, _recall(_object_hashes, (blob.name, blob.generation))
+
+
+def load_metadata(blob):
+    """
+    The blob with its metadata (size, generation) loaded; one request unless resolve_object already made it.
+
+    Raises:
+        FileNotFoundError: The object does not exist
+    """
+    if blob.size is not None:
+        return blob
+    loaded = get_bucket().get_blob(blob.name)
+    if loaded is None:
+        _forget(blob.name)
+        raise FileNotFoundError(blob.name)
+    return loaded
+
+
+class _HashingWriter:
+    """File wrapper hashing what is written through it."""
+
+    def __init__(self, file: BinaryIO):
+        self.file = file
+        self.digest = hashlib.sha256()
+
+    def write(self, data: bytes) -> int:
+        self.digest.update(data)
+        return self.file.write(data)
+
+
+def download_object(blob, file: BinaryIO) -> str:
+    """
+    Download an object (from resolve_object) into file and return the SHA-256 of its bytes.
+
+    Raises:
+        FileNotFoundError: The object no longer exists (or was replaced since it was resolved)
+    """
+    writer = _HashingWriter(file)
+    try:
+        blob.download_to_file(writer, if_generation_match=blob.generation)
+    except (NotFound, PreconditionFailed):
+        _forget(blob.name, blob.generation)
+        raise FileNotFoundError(blob.name)
+    sha256 = writer.digest.hexdigest()
+    if blob.generation is not None:
+        _remember(_object_hashes, (blob.name, blob.generation), sha256)
+    return sha256
+
+
+def _file_info(blob) -> dict:
+    return {
+        "name": blob.name,
+        "size": blob.size,
+        "updated": blob.updated.isoformat(),
+        "content_type": blob.content_type,
+        "generation": blob.generation,
+    }
+
+
+def _cached_page(key: tuple) -> Optional[dict]:
+    with _listing_lock:
+        cached = _listing_cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        _listing_cache.pop(key, None)
+    return None
+
+
+def _cache_page(key: tuple, page: dict) -> None:
+    with _listing_lock:
+        _listing_cache[key] = (time.monotonic() + config.FILE_LIST_CACHE_TTL_SECONDS, page)
+        while len(_listing_cache) > LISTING_CACHE_ITEMS:
+            _listing_cache.pop(next(iter(_listing_cache)))
+
+
+def clear_listing_cache() -> None:
+    with _listing_lock:
+        _listing_cache.clear()
+
+
+def list_files(prefix: str = "", page_size: int = 100, page_token: Optional[str] = None, sign: bool = False) -> dict:
+    """
+    List one page of files in the Google Cloud Storage bucket
+
+    Args:
+        prefix: Only list files whose names start with this
+        page_size: Files per page (GCS returns at most 1000)
+        page_token: next_page_token of the previous page, to continue the listing
+        sign: Add a signed URL to every file (otherwise get one per file with file_url)
+
+    Returns:
+        dict: files (name, size, updated, content_type and, when signed, url) and
+            next_page_token, which is None on the last page
+    """
+    key = (BUCKET_NAME, prefix, page_size, page_token)
+    page = _cached_page(key) if config.FILE_LIST_CACHE_TTL_SECONDS > 0 else None
+    if page is None:
+        blobs = get_client().list_blobs(BUCKET_NAME, prefix=prefix or None, page_size=page_size, page_token=page_token, fields=LISTING_FIELDS)
+        files = [_file_info(blob) for blob in next(blobs.pages, [])]
+        page = {"files": files, "next_page_token": blobs.next_page_token}
+        if config.FILE_LIST_CACHE_TTL_SECONDS > 0:
+            _cache_page(key, page)
+
+    if not sign:
+        return {"files": [dict(info) for info in page["files"]], "next_page_token": page["next_page_token"]}
+    files = [{**info, "url": signed_url(info["name"], info["generation"])} for info in page["files"]]
+    return {"files": files, "next_page_token": page["next_page_token"]}
+
+
+def file_url(name: str) -> str:
+    """Signed URL of one file; signing is local, so no request is made to GCS."""
+    return signed_url(name)
+
+
+async def upload_file_async(
+    file: BinaryIO,
+    destination_name: str,
+    size: Optional[int] = None,
+    content_type: Optional[str] = None,
+    progress: Optional[Callable[[int], None]] = None,
+) -> str:
+    """upload_file in the GCS worker pool, so the upload doesn't block the event loop."""
+    return await gcs_pool.run(upload_file, file, destination_name, size, content_type, progress)
+
+
+async def store_upload_async(
+    file: BinaryIO, sha256: str, size: Optional[int] = None, filename: Optional[str] = None, content_type: Optional[str] = None
+) -> dict:
+    """store_upload in the GCS worker pool."""
+    return await gcs_pool.run(store_upload, file, sha256, size, filename, content_type)
+
+
+async def list_files_async(prefix: str = "", page_size: int = 100, page_token: Optional[str] = None, sign: bool = False) -> dict:
+    """list_files in the GCS worker pool."""
+    return await gcs_pool.run(list_files, prefix, page_size, page_token, sign)
+
+
+async def file_url_async(name: str) -> str:
+    """file_url in the GCS worker pool, so signing on a cache miss doesn't block the event loop."""
+    return await gcs_pool.run(file_url, name)
@@ -0,0 +1,464 @@
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import time
+import weakref
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, AsyncIterator, Callable, Iterator, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from google.api_core import exceptions as api_exceptions
+
+from api.services.analysis import empty_demographics
+from api.services.chunked_analysis import CHARS_PER_TOKEN, summarize_findings
+
+MODEL_PATH = re.compile(r"^/v1beta/models/(?P<model>[^/:]+):(?P<method>generateContent|streamGenerateContent)$")
+# Error statuses the stand-in fails with, as the API names them
+STATUS_NAMES = {429: "RESOURCE_EXHAUSTED", 500: "INTERNAL", 503: "UNAVAILABLE"}
+
+
+class Latency:
+    """
+    Distribution of the seconds a stand-in response takes, written as "<kind>:<params>".
+
+    fixed:<seconds>, uniform:<low>,<high>, normal:<mean>,<stddev>, lognormal:<median>,<sigma>
+    and exponential:<mean>; samples are never negative.
+    """
+
+    KINDS = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2, "exponential": 1}
+
+    def __init__(self, kind: str, *params: float):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution {kind!r} (expected one of {', '.join(self.KINDS)})")
+        if len(params) != self.KINDS[kind]:
+            raise ValueError(f"{kind} latency takes {self.KINDS[kind]} parameter(s)")
+        self.kind = kind
+        self.params = tuple(float(p) for p in params)
+
+    @classmethod
+    def parse(cls, spec: str) -> "Latency":
+        kind, _, params = spec.partition(":")
+        return cls(kind, *(float(p) for p in params.split(",") if p))
+
+    def sample(self, rng: random.Random) -> float:
+        a, b = self.params[0], self.params[-1]
+        if self.kind == "uniform":
+            return rng.uniform(a, b)
+        if self.kind == "normal":
+            return max(rng.gauss(a, b), 0.0)
+        if self.kind == "lognormal":
+            return rng.lognormvariate(math.log(a), b) if a > 0 else 0.0
+        if self.kind == "exponential":
+            return rng.expovariate(1 / a) if a > 0 else 0.0
+        return a
+
+    def __repr__(self) -> str:
+        return f"{self.kind}:{','.join(f'{p:g}' for p in self.params)}"
+
+
+def standin_response(prompt: str) -> str:
+    """
+    Default answer of the stand-in: a well-formed reply of the kind the prompt asks for.
+
+    Innocence prompts get a fenced JSON analysis with no findings, demographics prompts the
+    empty demographics structure, anything else a short markdown summary.
+    """
+    if "maintaining actual innocence" in prompt:
+        return f"```json\n{json.dumps({'findings': [], 'summary': summarize_findings([])}, indent=2)}\n```"
+    if "extract structured information" in prompt:
+        return f"```json\n{json.dumps(empty_demographics(), indent=2)}\n```"
+    return (
+        "# Parole Hearing Summary\n\n"
+        "## Case Information\n"
+        f"- **Source**: Gemini stand-in, answering a {len(prompt) // CHARS_PER_TOKEN} token prompt\n\n"
+        "## Board Recommendations\n"
+        "- No recommendations (stand-in response)\n"
+    )
+
+
+def _payload(text: str, prompt_tokens: int, output_tokens: int, model: str, finished: bool) -> dict:
+    """A generateContent response (or streamed chunk) as the API sends it."""
+    candidate: dict[str, Any] = {"content": {"parts": [{"text": text}], "role": "model"}, "index": 0}
+    if finished:
+        candidate["finishReason"] = "STOP"
+    return {
+        "candidates": [candidate],
+        "usageMetadata": {"promptTokenCount": prompt_tokens, "candidatesTokenCount": output_tokens, "totalTokenCount": prompt_tokens + output_tokens},
+        "modelVersion": model,
+    }
+
+
+class GeminiStandInServer:
+    """
+    Local stand-in for the Gemini generateContent API, used by load and failure tests.
+
+    Serves POST /v1beta/models/<model>:generateContent and :streamGenerateContent?alt=sse on a
+    local port with the API's response shape (candidates, finishReason, usageMetadata, token
+    counts estimated at CHARS_PER_TOKEN characters per token) and answers with responder(prompt).
+    A request is refused at once with 429 when `requests_per_minute` requests were already
+    accepted in the last minute, or at random with probability `rate_limit_rate`. Otherwise it
+    waits a sample of `latency`, then fails with 500 or 503 with probability `error_rate`. Streams
+    send `stream_chunk_size` characters per chunk, `stream_chunk_delay` seconds apart, and with
+    probability `stream_break_rate` end with an error part-way. `seed` makes the draws repeatable.
+    """
+
+    def __init__(
+        self,
+        responder: Optional[Callable[[str], str]] = None,
+        latency: Optional[Latency] = None,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        requests_per_minute: int = 0,
+        stream_chunk_size: int = 64,
+        stream_chunk_delay: float = 0.0,
+        stream_break_rate: float = 0.0,
+        seed: Optional[int] = None,
+        port: int = 0,
+    ):
+        self.responder = responder or standin_response
+        self.latency = latency or Latency("fixed", 0)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.requests_per_minute = requests_per_minute
+        self.stream_chunk_size = max(stream_chunk_size, 1)
+        self.stream_chunk_delay = stream_chunk_delay
+        self.stream_break_rate = stream_break_rate
+        self.requests = 0
+        self.rate_limited = 0
+        self.errors = 0
+        self.broken_streams = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self._accepted: deque[float] = deque()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "GeminiStandInServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="gemini-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "GeminiStandInServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "rate_limited": self.rate_limited,
+                "errors": self.errors,
+                "broken_streams": self.broken_streams,
+                "peak_in_flight": self.peak_in_flight,
+                "prompt_tokens": self.prompt_tokens,
+                "output_tokens": self.output_tokens,
+            }
+
+    def _admit(self) -> tuple[Optional[int], float, bool]:
+        """Decide a request's fate: (error status or None, latency, whether a stream breaks)."""
+        with self._lock:
+            self.requests += 1
+            now = time.monotonic()
+            while self._accepted and now - self._accepted[0] >= 60:
+                self._accepted.popleft()
+            if (self.requests_per_minute and len(self._accepted) >= self.requests_per_minute) or self._rng.random() < self.rate_limit_rate:
+                self.rate_limited += 1
+                return 429, 0.0, False
+            self._accepted.append(now)
+            status = self._rng.choice((500, 503)) if self._rng.random() < self.error_rate else None
+            if status:
+                self.errors += 1
+            return status, self.latency.sample(self._rng), self._rng.random() < self.stream_break_rate
+
+    def _handler(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _json(self, payload: dict, status: int = 200):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _error(self, status: int, message: str):
+                self._json({"error": {"code": status, "message": message, "status": STATUS_NAMES.get(status, "UNKNOWN")}}, status)
+
+            def _chunk(self, data: bytes):
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def do_POST(self):
+                match = MODEL_PATH.match(urlsplit(self.path).path)
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if not match:
+                    return self._error(404, "Not Found")
+                try:
+                    contents = json.loads(body)["contents"]
+                    prompt = "".join(part.get("text", "") for content in contents for part in content.get("parts", []))
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    return self._error(400, "Invalid JSON payload")
+
+                status, latency, break_stream = server._admit()
+                if status == 429:
+                    return self._error(429, "Resource has been exhausted (e.g. check quota).")
+                with server._lock:
+                    server.in_flight += 1
+                    server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+                try:
+                    time.sleep(latency)
+                    if status:
+                        return self._error(status, "An internal error has occurred." if status == 500 else "The model is overloaded.")
+                    text = server.responder(prompt)
+                    prompt_tokens, output_tokens = len(prompt) // CHARS_PER_TOKEN, len(text) // CHARS_PER_TOKEN
+                    with server._lock:
+                        server.prompt_tokens += prompt_tokens
+                        server.output_tokens += output_tokens
+                    if match["method"] == "generateContent":
+                        return self._json(_payload(text, prompt_tokens, output_tokens, match["model"], finished=True))
+                    self._stream(text, prompt_tokens, match["model"], break_stream)
+                finally:
+                    with server._lock:
+                        server.in_flight -= 1
+
+            def _stream(self, text: str, prompt_tokens: int, model: str, break_stream: bool):
+                size = server.stream_chunk_size
+                pieces = [text[i : i + size] for i in range(0, len(text), size)] or [""]
+                # A broken stream sends at least one chunk before failing
+                break_at = None
+                if break_stream:
+                    with server._lock:
+                        break_at = server._rng.randint(1, max(len(pieces) - 1, 1))
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                sent = 0
+                for index, piece in enumerate(pieces):
+                    if index == break_at:
+                        with server._lock:
+                            server.broken_streams += 1
+                        error = {"error": {"code": 500, "message": "Stream interrupted.", "status": "INTERNAL"}}
+                        self._chunk(f"data: {json.dumps(error)}\r\n\r\n".encode())
+                        break
+                    if index:
+                        time.sleep(server.stream_chunk_delay)
+                    sent += len(piece)
+                    # Like the API, every chunk carries the usage so far
+                    payload = _payload(piece, prompt_tokens, sent // CHARS_PER_TOKEN, model, finished=index == len(pieces) - 1)
+                    self._chunk(f"data: {json.dumps(payload)}\r\n\r\n".encode())
+                self._chunk(b"")
+
+        return Handler
+
+
+class UsageMetadata(NamedTuple):
+    """Token counts of a response, with the attribute names of the SDK's usage_metadata."""
+
+    prompt_token_count: int
+    candidates_token_count: int
+    total_token_count: int
+
+
+class StandInResponse:
+    """A generateContent response (or one streamed chunk) from the stand-in, read like the SDK's."""
+
+    def __init__(self, payload: dict):
+        candidate = (payload.get("candidates") or [{}])[0]
+        self.text = "".join(part.get("text", "") for part in candidate.get("content", {}).get("parts", []))
+        self.finish_reason = candidate.get("finishReason")
+        usage = payload.get("usageMetadata", {})
+        self.usage_metadata = UsageMetadata(usage.get("promptTokenCount", 0), usage.get("candidatesTokenCount", 0), usage.get("totalTokenCount", 0))
+
+
+def _api_error(status: int, body: bytes) -> api_exceptions.GoogleAPICallError:
+    """The google.api_core exception the SDK raises for an HTTP error status."""
+    try:
+        message = json.loads(body)["error"]["message"]
+    except (ValueError, KeyError, TypeError):
+        message = body.decode("utf-8", errors="replace")
+    # The SDK's gRPC transport reports quota refusals as RESOURCE_EXHAUSTED rather than HTTP 429
+    if status == 429:
+        return api_exceptions.ResourceExhausted(message)
+    return api_exceptions.from_http_status(status, message)
+
+
+def _chunk_response(line: str) -> Optional[StandInResponse]:
+    """Parse one server-sent event line; None for lines that aren't data."""
+    if not line.startswith("data: "):
+        return None
+    payload = json.loads(line[len("data: ") :])
+    if "error" in payload:
+        raise _api_error(payload["error"].get("code", 500), json.dumps(payload).encode())
+    return StandInResponse(payload)
+
+
+class StandInStream:
+    """Streamed response: iterate it for StandInResponse chunks as they arrive."""
+
+    def __init__(self, response: httpx.Response, timeout: float):
+        self._response = response
+        self._timeout = timeout
+
+    def __iter__(self) -> Iterator[StandInResponse]:
+        try:
+            for line in self._response.iter_lines():
+                chunk = _chunk_response(line)
+                if chunk is not None:
+                    yield chunk
+        except httpx.TimeoutException as e:
+            raise api_exceptions.DeadlineExceeded(f"Stand-in stream stalled for {self._timeout}s") from e
+        finally:
+            self._response.close()
+
+
+class StandInAsyncStream:
+    """Async variant of StandInStream."""
+
+    def __init__(self, response: httpx.Response, timeout: float):
+        self._response = response
+        self._timeout = timeout
+
+    async def __aiter__(self) -> AsyncIterator[StandInResponse]:
+        try:
+            async for line in self._response.aiter_lines():
+                chunk = _chunk_response(line)
+                if chunk is not None:
+                    yield chunk
+        except httpx.TimeoutException as e:
+            raise api_exceptions.DeadlineExceeded(f"Stand-in stream stalled for {self._timeout}s") from e
+        finally:
+            await self._response.aclose()
+
+
+class StandInGenerativeModel:
+    """
+    genai.GenerativeModel-compatible client of a GeminiStandInServer (GEMINI_BACKEND=stand-in).
+
+    HTTP errors are raised as the google.api_core exceptions the SDK raises (ResourceExhausted for
+    429, InternalServerError, ServiceUnavailable), and a request that takes longer than `timeout`
+    seconds as DeadlineExceeded. Connections are pooled: one client for blocking calls and one
+    per event loop for async calls. model_name is prefixed with "stand-in/" so cached responses
+    never mix with the real model's.
+    """
+
+    def __init__(self, base_url: str, model: str = "gemini-2.5-flash", timeout: float = 120.0):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.model_name = f"stand-in/{model}"
+        self.timeout = timeout
+        self._client: Optional[httpx.Client] = None
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _sync_client(self) -> httpx.Client:
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(base_url=self.base_url, timeout=self.timeout)
+            return self._client
+
+    def _async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = self._async_clients[loop] = httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout)
+        return client
+
+    def close(self) -> None:
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+        self._async_clients.clear()
+
+    def _request(self, client: Any, contents: Any, stream: bool) -> httpx.Request:
+        method = "streamGenerateContent?alt=sse" if stream else "generateContent"
+        body = {"contents": [{"role": "user", "parts": [{"text": contents if isinstance(contents, str) else str(contents)}]}]}
+        return client.build_request("POST", f"/v1beta/models/{self.model}:{method}", json=body)
+
+    def generate_content(self, contents: Any, stream: bool = False, **kwargs: Any) -> Any:
+        client = self._sync_client()
+        try:
+            response = client.send(self._request(client, contents, stream), stream=stream)
+            if response.status_code >= 400:
+                body = response.read()
+                response.close()
+                raise _api_error(response.status_code, body)
+            return StandInStream(response, self.timeout) if stream else StandInResponse(response.json())
+        except httpx.TimeoutException as e:
+            raise api_exceptions.DeadlineExceeded(f"Stand-in did not answer within {self.timeout}s") from e
+        except httpx.TransportError as e:
+            raise api_exceptions.ServiceUnavailable(f"Stand-in unreachable: {e}") from e
+
+    async def generate_content_async(self, contents: Any, stream: bool = False, **kwargs: Any) -> Any:
+        client = self._async_client()
+        try:
+            response = await client.send(self._request(client, contents, stream), stream=stream)
+            if response.status_code >= 400:
+                body = await response.aread()
+                await response.aclose()
+                raise _api_error(response.status_code, body)
+            return StandInAsyncStream(response, self.timeout) if stream else StandInResponse(response.json())
+        except httpx.TimeoutException as e:
+            raise api_exceptions.DeadlineExceeded(f"Stand-in did not answer within {self.timeout}s") from e
+        except httpx.TransportError as e:
+            raise api_exceptions.ServiceUnavailable(f"Stand-in unreachable: {e}") from e
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the Gemini stand-in server (use with GEMINI_BACKEND=stand-in)")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on")
+    parser.add_argument("--latency", type=Latency.parse, default=Latency("fixed", 0), help="Latency distribution, e.g. lognormal:1.5,0.4")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests failing with 500/503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests refused with 429")
+    parser.add_argument("--rpm", type=int, default=0, help="Requests per minute accepted before 429s (0: no quota)")
+    parser.add_argument("--stream-chunk-delay", type=float, default=0.05, help="Seconds between streamed chunks")
+    parser.add_argument("--stream-break-rate", type=float, default=0.0, help="Share of streams ending with an error part-way")
+    parser.add_argument("--seed", type=int, help="Random seed for repeatable runs")
+    args = parser.parse_args()
+
+    standin = GeminiStandInServer(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        requests_per_minute=args.rpm,
+        stream_chunk_delay=args.stream_chunk_delay,
+        stream_break_rate=args.stream_break_rate,
+        seed=args.seed,
+        port=args.port,
+    )
+    print(f"Gemini stand-in listening on {standin.url} (latency {args.latency!r}); Ctrl+C to stop")
+    try:
+        standin._server.serve_forever()
+    except KeyboardInterrupt:
+        print(json.dumps(standin.stats()))
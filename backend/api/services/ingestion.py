@@ -0,0 +1,100 @@
+import hashlib
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, BinaryIO, Optional
+
+from fastapi import HTTPException, UploadFile
+
+from api.core.config import config
+from api.services.gcs_client import is_gcs_available
+from api.services.stored_pdfs import StoredPDFRejected, open_stored_pdf
+from api.services.worker_pools import gcs_pool
+
+PDF_MAGIC = b"%PDF-"
+# The PDF header may be preceded by junk bytes; readers accept it within the first 1024 bytes
+PDF_MAGIC_WINDOW = 1024
+
+
+def is_pdf(file: BinaryIO) -> bool:
+    """Whether a file read from its current position starts with the PDF header."""
+    return PDF_MAGIC in file.read(PDF_MAGIC_WINDOW)
+
+
+class IngestedPDF:
+    """A validated PDF upload, still backed by the spooled upload file rather than a bytes copy."""
+
+    __slots__ = ("file", "size", "sha256", "filename")
+
+    def __init__(self, file: BinaryIO, size: int, sha256: str, filename: Optional[str]):
+        self.file = file
+        self.size = size
+        self.sha256 = sha256
+        self.filename = filename
+
+
+async def ingest_pdf_upload(upload: UploadFile) -> IngestedPDF:
+    """
+    Stream an uploaded PDF in chunks, validating it without buffering the whole body.
+
+    The magic bytes are checked on the first chunk, the size limit is enforced as chunks
+    arrive, and the SHA-256 used by the extraction cache is computed on the same pass.
+    """
+    return await ingest_upload(upload, pdf_only=True, max_size=config.MAX_FILE_SIZE)
+
+
+@asynccontextmanager
+async def ingest_pdf(file: Optional[UploadFile], object_name: Optional[str] = None) -> AsyncIterator[IngestedPDF]:
+    """
+    The PDF to analyze: an upload, or a PDF already stored in GCS when object_name is given.
+
+    object_name is what /file/upload returned (a sha256/... content object), a filename alias
+    (aliases/...) or any other stored object. Stored files are closed when the block exits.
+    """
+    if (file is None) == (not object_name):
+        raise HTTPException(status_code=400, detail="Send either a PDF file or the object_name of a stored PDF")
+    if file is not None:
+        yield await ingest_pdf_upload(file)
+        return
+
+    upload = await ingest_stored_pdf(object_name)
+    try:
+        yield upload
+    finally:
+        upload.file.close()
+
+
+async def ingest_stored_pdf(object_name: str) -> IngestedPDF:
+    """Fetch a stored PDF through the local cache (in the GCS pool), validated like an upload before it is downloaded or cached."""
+    if not is_gcs_available():
+        raise HTTPException(status_code=503, detail="Stored PDFs are not available. Google Cloud Storage is not configured.")
+
+    try:
+        file, sha256, size = await gcs_pool.run(open_stored_pdf, object_name, config.MAX_FILE_SIZE, is_pdf)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Stored object not found: {object_name}")
+    except StoredPDFRejected as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Could not fetch stored object: {str(e)}")
+    return IngestedPDF(file, size, sha256, object_name)
+
+
+async def ingest_upload(upload: UploadFile, pdf_only: bool = False, max_size: Optional[int] = None) -> IngestedPDF:
+    """Stream an upload in chunks, hashing it (and checking its type and size when asked) in one pass."""
+    digest = hashlib.sha256()
+    size = 0
+
+    await upload.seek(0)
+    while chunk := await upload.read(config.UPLOAD_CHUNK_SIZE):
+        if pdf_only and size == 0 and PDF_MAGIC not in chunk[:PDF_MAGIC_WINDOW]:
+            raise HTTPException(status_code=400, detail="Only PDF files are supported")
+
+        size += len(chunk)
+        if max_size is not None and size > max_size:
+            raise HTTPException(status_code=400, detail=f"File size exceeds {max_size // (1024*1024)}MB limit")
+        digest.update(chunk)
+
+    if pdf_only and size == 0:
+        raise HTTPException(status_code=400, detail="Only PDF files are supported")
+
+    await upload.seek(0)
+    return IngestedPDF(upload.file, size, digest.hexdigest(), upload.filename)
@@ -0,0 +1,95 @@
+import re
+from itertools import islice
+from typing import Iterable, Iterator, Optional
+
+from api.services.document import DocumentLine
+from api.services.innocence_rules import DEFAULT_SPEAKER, INNOCENCE_RULES, QUOTE_MAX_CHARS, SPEAKER_RULES, CategoryRule
+
+# Lines normalized and scanned per regex pass
+SCAN_BLOCK_LINES = 1024
+
+
+class InnocenceClassifier:
+    """
+    Single-pass keyword classifier behind the offline innocence analyzer.
+
+    All rule keywords are compiled into one regex that runs once over the stripped, lowercased
+    lines joined with newlines. Every keyword maps to a bitmask of the rules it triggers, so a
+    line's hits reduce to one integer and its category is the lowest set bit.
+    """
+
+    def __init__(self, rules: Iterable[CategoryRule] = INNOCENCE_RULES, speakers: Iterable[tuple[tuple[str, ...], str]] = SPEAKER_RULES):
+        self.rules = tuple(rules)
+        self.speakers = tuple(speakers)
+
+        rule_masks: dict[str, int] = {}
+        for bit, rule in enumerate(self.rules):
+            for keyword in rule.keywords:
+                rule_masks[keyword] = rule_masks.get(keyword, 0) | (1 << bit)
+
+        # The lookahead reports a match at every offset, but only the longest keyword starting there;
+        # shorter keywords starting at the same offset are its prefixes, so fold their rules in
+        self._masks: dict[str, int] = {}
+        for keyword in rule_masks:
+            for other, mask in rule_masks.items():
+                if keyword.startswith(other):
+                    self._masks[keyword] = self._masks.get(keyword, 0) | mask
+
+        alternatives = "|".join(re.escape(keyword) for keyword in sorted(rule_masks, key=len, reverse=True))
+        self._pattern = re.compile(f"(?=({alternatives}))")
+
+    def speaker(self, text: str) -> str:
+        for markers, name in self.speakers:
+            if any(marker in text for marker in markers):
+                return name
+        return DEFAULT_SPEAKER
+
+    def _line_masks(self, normalized: list[str]) -> Iterator[tuple[int, int]]:
+        """(line index, rule mask) of every line with a keyword, in document order."""
+        index = -1
+        end = -1
+        mask = 0
+        for match in self._pattern.finditer("\n".join(normalized)):
+            start = match.start()
+            if start > end:
+                if mask:
+                    yield index, mask
+                    mask = 0
+                # Keywords never span the newline separators, so the running line end only moves forward
+                while start > end:
+                    index += 1
+                    end += len(normalized[index]) + 1
+            mask |= self._masks[match.group(1)]
+        if mask:
+            yield index, mask
+
+    def classify(self, lines: Iterable[DocumentLine], limit: Optional[int] = None) -> list[dict]:
+        """Findings for the given lines in document order, stopping after limit findings."""
+        findings: list[dict] = []
+        lines = iter(lines)
+        # Lines are normalized and scanned a block at a time so a limit stops the work early
+        while block := list(islice(lines, SCAN_BLOCK_LINES)):
+            stripped = [line.text.strip() for line in block]
+            # Lowercasing per line keeps offsets aligned even where lower() changes a line's length
+            normalized = [text.lower() for text in stripped]
+            for index, mask in self._line_masks(normalized):
+                rule = self.rules[(mask & -mask).bit_length() - 1]
+                text = stripped[index]
+                if not rule.accepts(len(text)):
+                    continue
+                findings.append(
+                    {
+                        "quote": text[:QUOTE_MAX_CHARS] + "..." if len(text) > QUOTE_MAX_CHARS else text,
+                        "speaker": self.speaker(text),
+                        "page": block[index].page,
+                        "line": block[index].line,
+                        "category": rule.category,
+                        "significance": rule.significance,
+                    }
+                )
+                if limit is not None and len(findings) >= limit:
+                    return findings
+        return findings
+
+
+innocence_classifier = InnocenceClassifier()
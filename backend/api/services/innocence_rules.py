@@ -0,0 +1,53 @@
+# Keyword sets and category rules used by the offline innocence analyzer and the relevance pre-filter.
+# Matching is by lowercase substring, as in the original analyzer.
+from typing import NamedTuple, Optional
+
+INNOCENCE_KEYWORDS = ["innocent", "didn't do", "not guilty", "wrongfully", "false", "framed"]
+PROCEDURAL_KEYWORDS = ["lawyer", "attorney", "counsel", "miranda", "rights", "coerced"]
+EVIDENCE_KEYWORDS = ["dna", "fingerprints", "alibi", "witness", "testimony"]
+RESPONSIBILITY_KEYWORDS = ["remorse", "responsibility", "accept", "admit", "sorry"]
+
+# Per-line rules of the offline analyzer
+RESPONSIBILITY_PRESSURE_WORDS = ["responsibility", "remorse", "accept", "admit"]
+CONSISTENCY_WORDS = ["version", "different", "contradict", "inconsistent"]
+CLARITY_WORDS = ["right", "yes", "no", "correct"]
+
+# Quotes longer than this are cut and end with "..."
+QUOTE_MAX_CHARS = 200
+
+
+class CategoryRule(NamedTuple):
+    """A finding category: the keywords that trigger it and the line lengths it accepts."""
+
+    category: str
+    keywords: tuple[str, ...]
+    significance: str
+    # Accepted stripped line lengths, both exclusive
+    min_length: int = 0
+    max_length: Optional[int] = None
+
+    def accepts(self, length: int) -> bool:
+        return length > self.min_length and (self.max_length is None or length < self.max_length)
+
+
+# In priority order: a line is judged only by the first rule with a keyword in it, even if that
+# rule then rejects the line's length
+INNOCENCE_RULES = (
+    CategoryRule(
+        "responsibility_pressure",
+        tuple(RESPONSIBILITY_PRESSURE_WORDS),
+        "Board member pressuring defendant to accept responsibility or show remorse",
+        min_length=20,
+    ),
+    CategoryRule("procedural_issue", tuple(PROCEDURAL_KEYWORDS), "Reference to legal representation or procedural matters", min_length=20),
+    CategoryRule("consistency_statement", tuple(CONSISTENCY_WORDS), "Statement addressing consistency or inconsistency of accounts", min_length=20),
+    CategoryRule("behavioral_clarity", tuple(CLARITY_WORDS), "Direct, clear response to questioning", max_length=50),
+)
+
+# Case-sensitive name markers, checked in order; lines matching none are attributed to DEFAULT_SPEAKER
+SPEAKER_RULES = (
+    (("Commissioner", "Presiding"), "Commissioner"),
+    (("Emmanuel", "Young"), "Emmanuel Young"),
+    (("Attorney", "Mbelu"), "Attorney"),
+)
+DEFAULT_SPEAKER = "Unknown"
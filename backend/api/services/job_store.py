@@ -0,0 +1,127 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed")
+
+
+def _timestamp(value: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(value, timezone.utc).isoformat() if value is not None else None
+
+
+class JobStore:
+    """SQLite-backed record of analysis jobs, so queued and finished jobs survive a restart."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                analysis_type TEXT NOT NULL,
+                analysis_mode TEXT NOT NULL,
+                prompt TEXT,
+                filename TEXT,
+                file_size INTEGER NOT NULL,
+                sha256 TEXT NOT NULL,
+                pdf_path TEXT NOT NULL,
+                status TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            )
+            """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_created_at ON jobs (status, created_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def new_id() -> str:
+        return uuid.uuid4().hex
+
+    def create(
+        self,
+        job_id: str,
+        analysis_type: str,
+        analysis_mode: str,
+        prompt: Optional[str],
+        filename: Optional[str],
+        file_size: int,
+        sha256: str,
+        pdf_path: str,
+    ) -> None:
+        """Record a new queued job."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, analysis_type, analysis_mode, prompt, filename, file_size, sha256, pdf_path, status, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'queued', ?)",
+                (job_id, analysis_type, analysis_mode, prompt, filename, file_size, sha256, pdf_path, time.time()),
+            )
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Full job record, or None if the id is unknown."""
+        with self._lock:
+            cursor = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            return dict(zip([column[0] for column in cursor.description], row))
+
+    def mark_running(self, job_id: str) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?", (time.time(), job_id))
+            self._conn.commit()
+
+    def mark_succeeded(self, job_id: str, result: dict) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'succeeded', result = ?, finished_at = ? WHERE id = ?", (json.dumps(result), time.time(), job_id)
+            )
+            self._conn.commit()
+
+    def mark_failed(self, job_id: str, error: str) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ?", (error, time.time(), job_id))
+            self._conn.commit()
+
+    def requeue_interrupted(self) -> list[str]:
+        """Put jobs left running by a previous process back in the queue; returns all queued ids, oldest first."""
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET status = 'queued', started_at = NULL WHERE status = 'running'")
+            self._conn.commit()
+            return [row[0] for row in self._conn.execute("SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at")]
+
+    def status_counts(self) -> dict:
+        """Number of jobs in each status."""
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {status: counts.get(status, 0) for status in JOB_STATUSES}
+
+    @staticmethod
+    def to_response(job: dict) -> dict:
+        """Public view of a job record: timestamps as ISO strings, result parsed, internal paths dropped."""
+        return {
+            "job_id": job["id"],
+            "status": job["status"],
+            "analysis_type": job["analysis_type"],
+            "analysis_mode": job["analysis_mode"],
+            "filename": job["filename"],
+            "file_size": job["file_size"],
+            "created_at": _timestamp(job["created_at"]),
+            "started_at": _timestamp(job["started_at"]),
+            "finished_at": _timestamp(job["finished_at"]),
+            "result": json.loads(job["result"]) if job["result"] else None,
+            "error": job["error"],
+        }
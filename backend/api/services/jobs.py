@@ -0,0 +1,123 @@
+import asyncio
+import os
+import shutil
+from typing import BinaryIO, Optional
+
+from fastapi import HTTPException
+
+from api.core.config import config
+from api.services.ingestion import IngestedPDF
+from api.services.job_store import JobStore
+from api.services.pipeline import analyze_document, extract_document, save_result
+from api.services.worker_pools import extraction_pool
+
+
+class JobQueue:
+    """
+    Background workers that run queued analysis jobs outside the request that submitted them.
+
+    Uploaded PDFs are saved to disk and jobs are recorded in a JobStore, so jobs queued or
+    interrupted when the server stops are picked up again on the next start.
+    """
+
+    def __init__(self, store: JobStore, pdf_dir: str, workers: int, max_queue_depth: int):
+        self.store = store
+        self.pdf_dir = pdf_dir
+        self.workers = workers
+        self.max_queue_depth = max_queue_depth
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list[asyncio.Task] = []
+        self.running = 0
+
+    async def start(self) -> None:
+        """Start the workers on the running event loop and requeue jobs left over from a previous run."""
+        if self._tasks:
+            return
+        os.makedirs(self.pdf_dir, exist_ok=True)
+        self._queue = asyncio.Queue()
+        for job_id in self.store.requeue_interrupted():
+            self._queue.put_nowait(job_id)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Cancel the workers; jobs they were running stay marked running and are requeued on the next start."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self.running = 0
+
+    async def submit(self, upload: IngestedPDF, analysis_type: str, analysis_mode: str, prompt: Optional[str]) -> str:
+        """Save the upload and queue a job for it; returns the job id."""
+        if self._queue is None or not self._tasks:
+            raise HTTPException(status_code=503, detail="Job workers are not running")
+        if self._queue.qsize() >= self.max_queue_depth:
+            raise HTTPException(status_code=503, detail="Job queue is full, try again later")
+
+        job_id = self.store.new_id()
+        pdf_path = os.path.join(self.pdf_dir, f"{job_id}.pdf")
+        await extraction_pool.run(self._save_pdf, upload.file, pdf_path)
+        self.store.create(job_id, analysis_type, analysis_mode, prompt, upload.filename, upload.size, upload.sha256, pdf_path)
+        self._queue.put_nowait(job_id)
+        return job_id
+
+    @staticmethod
+    def _save_pdf(pdf_file: BinaryIO, pdf_path: str) -> None:
+        pdf_file.seek(0)
+        with open(pdf_path, "wb") as f:
+            shutil.copyfileobj(pdf_file, f, config.UPLOAD_CHUNK_SIZE)
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        job = self.store.get(job_id)
+        if job is None or job["status"] != "queued":
+            return
+
+        self.store.mark_running(job_id)
+        self.running += 1
+        try:
+            with open(job["pdf_path"], "rb") as pdf_file:
+                document = await extract_document(pdf_file, job["sha256"])
+            analysis = await analyze_document(job["analysis_type"], document, job["analysis_mode"], job["prompt"])
+            response = {
+                "success": True,
+                "filename": job["filename"],
+                "file_size": job["file_size"],
+                "doc_hash": job["sha256"],
+                "extracted_text_length": len(document),
+                **analysis,
+            }
+            await save_result(job["analysis_type"], job["sha256"], document, response)
+            self.store.mark_succeeded(job_id, response)
+        except HTTPException as e:
+            self.store.mark_failed(job_id, str(e.detail))
+        except Exception as e:
+            self.store.mark_failed(job_id, f"Internal server error: {str(e)}")
+        finally:
+            self.running -= 1
+
+        # Only reached once the job has finished; cancelled jobs keep their PDF for the requeue
+        if os.path.exists(job["pdf_path"]):
+            os.remove(job["pdf_path"])
+
+    def stats(self) -> dict:
+        """Worker count, queue depth and number of jobs in each status."""
+        return {
+            "workers": len(self._tasks),
+            "configured_workers": self.workers,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_depth": self.max_queue_depth,
+            "running": self.running,
+            "jobs": self.store.status_counts(),
+        }
+
+
+job_queue = JobQueue(JobStore(config.JOBS_DB_PATH), config.JOBS_DIR, config.JOB_WORKERS, config.JOB_QUEUE_MAX)
@@ -0,0 +1,76 @@
+import io
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+import PyPDF2
+
+# This module is imported by pool workers, so it must stay free of app-level imports
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_size = 0
+_pool_lock = threading.Lock()
+
+
+def _extract_page_range(pdf_file: bytes, start: int, stop: int) -> list[str]:
+    """Worker entry point: open the PDF once and extract text for pages [start, stop)."""
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_file))
+    return [pdf_reader.pages[index].extract_text() for index in range(start, stop)]
+
+
+def get_pool(processes: int) -> ProcessPoolExecutor:
+    """Return the shared extraction process pool, creating it on first use."""
+    global _pool, _pool_size
+    with _pool_lock:
+        if _pool is None or _pool_size != processes:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # forkserver avoids forking a process that already runs server threads
+            _pool = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("forkserver"))
+            _pool_size = processes
+        return _pool
+
+
+def shutdown_pool() -> None:
+    """Stop the shared process pool if it was started."""
+    global _pool, _pool_size
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+        _pool = None
+        _pool_size = 0
+
+
+def split_page_ranges(page_count: int, parts: int) -> list[tuple[int, int]]:
+    """Split [0, page_count) into at most `parts` contiguous, near-equal ranges."""
+    parts = max(1, min(parts, page_count))
+    size, remainder = divmod(page_count, parts)
+    ranges = []
+    start = 0
+    for index in range(parts):
+        stop = start + size + (1 if index < remainder else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def extract_pages_parallel(pdf_file: bytes, page_count: int, processes: int) -> list[str]:
+    """Extract all page texts across a process pool, one contiguous page range per worker, in page order."""
+    global _pool, _pool_size
+    pool = get_pool(processes)
+    try:
+        futures = [pool.submit(_extract_page_range, pdf_file, start, stop) for start, stop in split_page_ranges(page_count, processes)]
+        page_texts: list[str] = []
+        for future in futures:
+            page_texts.extend(future.result())
+        return page_texts
+    except BrokenProcessPool as e:
+        # A worker died; drop the pool so the next call starts a fresh one, and finish in-process
+        print(f"Extraction process pool failed: {e}, extracting sequentially")
+        with _pool_lock:
+            if _pool is pool:
+                _pool = None
+                _pool_size = 0
+        return _extract_page_range(pdf_file, 0, page_count)
@@ -1,39 +1,101 @@
+import asyncio
+import functools
+import hashlib
 import io
-from typing import Optional
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, BinaryIO, Callable, Iterator, Optional, Union
 import PyPDF2
 from fastapi import HTTPException
 
 from api.core.config import config
+from api.services.chunked_analysis import summarize_findings
+from api.services.demographics_extractor import demographics_extractor
+from api.services.document import ExtractedDocument
+from api.services.extraction_cache import ExtractionCache
+from api.services.innocence_classifier import innocence_classifier
+from api.services.llm_cache import LLMResponseCache
+from api.services.parallel_extraction import extract_pages_parallel
+from api.services.worker_pools import gemini_pool
+
+# Bump whenever the extracted text format changes so stale cache entries are ignored
+EXTRACTOR_VERSION = "2"
+
+# Findings returned by the offline innocence analyzer
+MOCK_INNOCENCE_FINDINGS = 10
+
+# Prompts answered by the offline analyzers within GeminiService.track_offline_answers; tasks
+# started inside share the list, so fallbacks in concurrent calls are seen by the caller
+_offline_answers: ContextVar[Optional[list]] = ContextVar("offline_answers", default=None)
+
+extraction_cache = ExtractionCache(
+    memory_items=config.EXTRACTION_CACHE_MEMORY_ITEMS,
+    disk_dir=config.EXTRACTION_CACHE_DIR,
+    max_disk_bytes=config.EXTRACTION_CACHE_MAX_DISK_MB * 1024 * 1024,
+)
+
+llm_response_cache = (
+    LLMResponseCache(
+        path=config.LLM_CACHE_PATH,
+        ttl_seconds=config.LLM_CACHE_TTL_HOURS * 3600,
+        max_bytes=config.LLM_CACHE_MAX_MB * 1024 * 1024,
+    )
+    if config.LLM_CACHE_PATH
+    else None
+)
 
 
 class PDFService:
     """Service for handling PDF operations."""
 
     @staticmethod
-    def extract_text_from_pdf(pdf_file: bytes) -> str:
-        """Extract text from PDF file bytes with page numbers."""
+    def extract_text_from_pdf(pdf_file: Union[bytes, BinaryIO], sha256: Optional[str] = None) -> ExtractedDocument:
+        """
+        Extract a page/line document from a PDF, reusing cached results for identical files.
+
+        pdf_file may be bytes or a seekable file (e.g. a spooled upload). Pass sha256 when the
+        caller already hashed the content while streaming it in.
+        """
+        cache_key = ExtractionCache.make_key(sha256 or PDFService._sha256(pdf_file), EXTRACTOR_VERSION)
+        cached_document = extraction_cache.get(cache_key)
+        if cached_document is not None:
+            return cached_document
+
+        started = time.perf_counter()
+        document = PDFService._extract_document(pdf_file)
+        extraction_cache.put(cache_key, document, time.perf_counter() - started)
+        return document
+
+    @staticmethod
+    def _sha256(pdf_file: Union[bytes, BinaryIO]) -> str:
+        if isinstance(pdf_file, bytes):
+            return hashlib.sha256(pdf_file).hexdigest()
+        digest = hashlib.sha256()
+        pdf_file.seek(0)
+        while chunk := pdf_file.read(config.UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+        pdf_file.seek(0)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _extract_document(pdf_file: Union[bytes, BinaryIO]) -> ExtractedDocument:
+        """Run PyPDF2 over the PDF, keeping page and line structure."""
         try:
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_file))
-            text = ""
-
-            for page_num, page in enumerate(pdf_reader.pages, start=1):
-                page_text = page.extract_text()
-                # Add page marker at the beginning of each page
-                text += f"\n[PAGE {page_num}]\n"
-
-                # Add line numbers to each line within the page
-                lines = page_text.split("\n")
-                line_counter = 1
-                for line in lines:
-                    if line.strip():  # Only add line numbers to non-empty lines
-                        text += f"[Line {line_counter}] {line}\n"
-                        line_counter += 1
-                    else:
-                        text += "\n"
-
-                text += f"\n[END PAGE {page_num}]\n"
-
-            return text.strip()
+            # Files are read in place; only bytes need wrapping
+            pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_file) if isinstance(pdf_file, bytes) else pdf_file)
+            page_count = len(pdf_reader.pages)
+
+            # Large transcripts are split across worker processes; page order is preserved
+            if config.EXTRACTION_PROCESSES > 1 and page_count >= config.PARALLEL_EXTRACTION_MIN_PAGES:
+                if not isinstance(pdf_file, bytes):
+                    # Worker processes need their own copy of the content
+                    pdf_file.seek(0)
+                    pdf_file = pdf_file.read()
+                return ExtractedDocument(extract_pages_parallel(pdf_file, page_count, config.EXTRACTION_PROCESSES))
+
+            return ExtractedDocument([page.extract_text() for page in pdf_reader.pages])
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"Error reading PDF: {str(e)}")
 
@@ -50,39 +112,205 @@ class PDFService:
 class GeminiService:
     """Service for handling Gemini AI operations."""
 
-    def __init__(self):
-        self.model = config.get_gemini_model()
-
-    def process_text_with_ai(self, text: str, prompt: str = "Please summarize this document") -> str:
-        """Process text with Gemini AI."""
-        if not self.model or not config.is_gemini_configured():
-            # Determine which mock to use based on prompt content
-            if "innocence" in prompt.lower() or "wrongful conviction" in prompt.lower():
-                return self._generate_mock_innocence_analysis(text)
-            else:
-                return self._generate_mock_parole_summary(text)
+    def __init__(self, model: Any = None, response_cache: Optional[LLMResponseCache] = None):
+        # A model can be injected (e.g. FakeGenerativeModel in tests); otherwise use the configured Gemini model
+        self.model = model if model is not None else config.get_gemini_model()
+        self.response_cache = response_cache
+        # Model calls made, calls that failed (and fell back to the offline analyzers or raised
+        # mid-stream) and tokens reported by the model's usage metadata
+        self.usage = {"requests": 0, "failures": 0, "prompt_tokens": 0, "output_tokens": 0}
+        self._usage_lock = threading.Lock()
+
+    @property
+    def model_name(self) -> str:
+        """Name of the model in use, part of the response cache key."""
+        return getattr(self.model, "model_name", None) or config.GEMINI_MODEL
+
+    def _record_usage(self, response: Any = None, failed: bool = False) -> None:
+        metadata = getattr(response, "usage_metadata", None)
+        with self._usage_lock:
+            self.usage["requests"] += 1
+            self.usage["failures"] += failed
+            if metadata is not None:
+                self.usage["prompt_tokens"] += getattr(metadata, "prompt_token_count", 0) or 0
+                self.usage["output_tokens"] += getattr(metadata, "candidates_token_count", 0) or 0
+
+    def usage_stats(self) -> dict:
+        """Model in use (None when the offline analyzers answer) and call/token counters since startup."""
+        with self._usage_lock:
+            return {"model": self.model_name if self.model else None, **self.usage}
+
+    @contextmanager
+    def track_offline_answers(self) -> Iterator[list]:
+        """Collect the prompts the offline analyzers answer (no model, or the model failed) in the enclosed calls."""
+        token = _offline_answers.set([])
+        try:
+            yield _offline_answers.get()
+        finally:
+            _offline_answers.reset(token)
+
+    def _note_offline(self, prompt: str) -> None:
+        answers = _offline_answers.get()
+        if answers is not None:
+            answers.append(prompt)
+
+    def _cached_response(self, prompt: str, document: ExtractedDocument) -> tuple[Optional[str], Optional[str]]:
+        """Look up a cached model response; returns (cache key, response or None)."""
+        if not self.response_cache:
+            return None, None
+        key = LLMResponseCache.make_key(self.model_name, prompt, document.digest)
+        return key, self.response_cache.get(key)
+
+    def _store_response(self, key: Optional[str], response: str) -> None:
+        # Only real model output reaches this point; mock fallbacks are never cached
+        if self.response_cache and key:
+            self.response_cache.put(key, self.model_name, response)
+
+    def _generate(self, prompt: str, document: ExtractedDocument) -> str:
+        """Call the model with the prompt and document, going through the response cache."""
+        key, cached = self._cached_response(prompt, document)
+        if cached is not None:
+            return cached
+
+        # Combine prompt with extracted text and generate response from Gemini
+        try:
+            response = self.model.generate_content(f"{prompt}\n\nDocument content:\n{document.text}")
+            text = response.text
+        except Exception:
+            self._record_usage(failed=True)
+            raise
+        self._record_usage(response)
+        self._store_response(key, text)
+        return text
+
+    async def _generate_async(self, prompt: str, document: ExtractedDocument) -> str:
+        """Async variant of _generate."""
+        key, cached = self._cached_response(prompt, document)
+        if cached is not None:
+            return cached
 
         try:
-            # Combine prompt with extracted text
-            full_prompt = f"{prompt}\n\nDocument content:\n{text}"
+            response = await self.model.generate_content_async(f"{prompt}\n\nDocument content:\n{document.text}")
+            text = response.text
+        except Exception:
+            self._record_usage(failed=True)
+            raise
+        self._record_usage(response)
+        self._store_response(key, text)
+        return text
+
+    async def generate_async(self, document: ExtractedDocument, prompt: str) -> str:
+        """Call the model through the response cache, raising its errors instead of falling back to the offline analyzers."""
+        return await self._generate_async(prompt, document)
+
+    def process_text_with_ai(self, document: ExtractedDocument, prompt: str = "Please summarize this document") -> str:
+        """Process an extracted document with Gemini AI."""
+        if not self.model:
+            self._note_offline(prompt)
+            return self._generate_mock_response(document, prompt)
 
-            # Generate response from Gemini
-            response = self.model.generate_content(full_prompt)
-            return response.text
+        try:
+            return self._generate(prompt, document)
 
         except Exception as e:
             # Fallback to appropriate mock summary if Gemini fails
             print(f"Gemini error: {e}, using mock summary")
-            if "innocence" in prompt.lower() or "wrongful conviction" in prompt.lower():
-                return self._generate_mock_innocence_analysis(text)
-            else:
-                return self._generate_mock_parole_summary(text)
+            self._note_offline(prompt)
+            return self._generate_mock_response(document, prompt)
 
-    def _generate_mock_parole_summary(self, text: str) -> str:
-        """Generate a mock parole summary based on text analysis."""
-        # Extract key information from the text
-        lines = text.split("\n")
+    async def process_text_with_ai_async(self, document: ExtractedDocument, prompt: str = "Please summarize this document") -> str:
+        """Async variant of process_text_with_ai using the SDK's native async generation."""
+        if not self.model:
+            self._note_offline(prompt)
+            return await gemini_pool.run(self._generate_mock_response, document, prompt)
+
+        try:
+            return await self._generate_async(prompt, document)
+
+        except Exception as e:
+            print(f"Gemini error: {e}, using mock summary")
+            self._note_offline(prompt)
+            return await gemini_pool.run(self._generate_mock_response, document, prompt)
+
+    async def stream_text_with_ai(self, document: ExtractedDocument, prompt: str = "Please summarize this document") -> AsyncIterator[str]:
+        """
+        Stream the response to a prompt as text chunks, as the model produces them.
+
+        Cached responses are sent as a single chunk and the mock summary is sent line by line,
+        so callers see the same stream shape offline. If the model fails before sending anything
+        the mock summary is streamed instead; a failure mid-stream is raised to the caller.
+        """
+        async for piece in self._stream(document, prompt, functools.partial(self._generate_mock_response, document, prompt)):
+            yield piece
+
+    async def stream_parole_summary(self, document: ExtractedDocument, markdown_prompt: str) -> AsyncIterator[str]:
+        """Stream the markdown parole summary; see stream_text_with_ai."""
+        async for piece in self._stream(document, markdown_prompt, functools.partial(self._generate_mock_parole_summary, document)):
+            yield piece
+
+    async def _stream(self, document: ExtractedDocument, prompt: str, mock: Callable[[], str]) -> AsyncIterator[str]:
+        if not self.model:
+            self._note_offline(prompt)
+            async for piece in self._stream_mock(mock):
+                yield piece
+            return
+
+        key, cached = self._cached_response(prompt, document)
+        if cached is not None:
+            yield cached
+            return
+
+        received = []
+        chunk = None
+        try:
+            response = await self.model.generate_content_async(f"{prompt}\n\nDocument content:\n{document.text}", stream=True)
+            async for chunk in response:
+                received.append(chunk.text)
+                yield chunk.text
+        except Exception as e:
+            self._record_usage(failed=True)
+            if received:
+                raise
+            print(f"Gemini error: {e}, using mock summary")
+            self._note_offline(prompt)
+            async for piece in self._stream_mock(mock):
+                yield piece
+            return
+
+        # Every streamed chunk carries the usage so far
+        self._record_usage(chunk)
+        self._store_response(key, "".join(received))
+
+    async def _stream_mock(self, mock: Callable[[], str]) -> AsyncIterator[str]:
+        text = await gemini_pool.run(mock)
+        for line in text.splitlines(keepends=True):
+            yield line
+            # Let the event loop flush each line to the client
+            await asyncio.sleep(0)
+
+    async def extract_demographics_async(self, document: ExtractedDocument, demographics_prompt: str) -> str:
+        """Run only the demographics prompt (the streaming parole summary sends the markdown separately)."""
+        if not self.model:
+            self._note_offline(demographics_prompt)
+            return await gemini_pool.run(self._generate_mock_demographics, document)
+
+        try:
+            return await self._generate_async(demographics_prompt, document)
 
+        except Exception as e:
+            print(f"Gemini error: {e}, using mock data")
+            self._note_offline(demographics_prompt)
+            return await gemini_pool.run(self._generate_mock_demographics, document)
+
+    def _generate_mock_response(self, document: ExtractedDocument, prompt: str) -> str:
+        """Pick the mock analysis that matches the prompt."""
+        if "innocence" in prompt.lower() or "wrongful conviction" in prompt.lower():
+            return self._generate_mock_innocence_analysis(document)
+        else:
+            return self._generate_mock_parole_summary(document)
+
+    def _generate_mock_parole_summary(self, document: ExtractedDocument) -> str:
+        """Generate a mock parole summary based on text analysis."""
         # Find key details
         inmate_name = "Not specified"
         cdcr_number = "Not specified"
@@ -90,7 +318,7 @@ class GeminiService:
         sentence = "Not specified"
         hearing_date = "Not specified"
 
-        for line in lines:
+        for _, _, line in document.lines():
             if "EMMANUEL YOUNG" in line:
                 inmate_name = "Emmanuel Young"
             if "CDCR Number:" in line or "CDC Number" in line:
@@ -154,350 +382,67 @@ class GeminiService:
 
         return mock_summary
 
-    def _generate_mock_demographics(self, text: str) -> str:
+    def _generate_mock_demographics(self, document: ExtractedDocument) -> str:
         """Generate mock demographics data based on text analysis."""
         import json
 
-        # Extract key information from the text
-        lines = text.split("\n")
-
-        # Initialize demographics object
-        demographics = {
-            "clientInfo": {"name": "", "cdcrNumber": "", "dateOfBirth": "", "contactInfo": ""},
-            "introduction": {"shortSummary": ""},
-            "evidenceUsedToConvict": [],
-            "potentialTheory": "",
-            "convictionInfo": {
-                "dateOfCrime": "",
-                "locationOfCrime": "",
-                "dateOfArrest": "",
-                "charges": "",
-                "dateOfConviction": "",
-                "sentenceLength": "",
-                "county": "",
-                "trialOrPlea": "",
-            },
-            "appealInfo": {"directAppealFiled": "", "appellateCourtCaseNumber": "", "dateDecided": "", "result": "", "habenasFilings": []},
-            "attorneyInfo": {
-                "currentAttorneyForIncarceratedPerson": {
-                    "name": "",
-                    "title": "",
-                    "firm": "",
-                    "address": "",
-                    "phone": "",
-                    "email": "",
-                    "presentAtHearing": False,
-                    "representationContext": "",
-                },
-                "trialAttorney": {"name": "", "address": "", "phone": "", "caseNumber": "", "appointedOrRetained": ""},
-                "appellateAttorney": {"name": "", "address": "", "phone": "", "caseNumbers": "", "courtLevel": ""},
-                "otherLegalRepresentation": [],
-            },
-            "newEvidence": [],
-            "codefendants": "",
-            "physicalDescription": {"height": "", "weight": "", "race": "", "build": "", "distinguishingMarks": ""},
-            "victimInfo": {"name": "", "relationship": ""},
-            "prisonRecord": {"conduct": "", "programming": "", "support": ""},
-        }
-
-        # Extract information from text
-        for line in lines:
-            line_lower = line.lower()
-
-            # Client Info
-            if "emmanuel young" in line_lower:
-                demographics["clientInfo"]["name"] = "Emmanuel Young"
-            if "cdcr number:" in line_lower or "cdc number" in line_lower:
-                if "ak2960" in line_lower:
-                    demographics["clientInfo"]["cdcrNumber"] = "AK2960"
-
-            # Attorney Info - Look for common attorney patterns
-            attorney_patterns = [
-                "attorney for incarcerated person",
-                "counsel for",
-                "representing",
-                "attorney present",
-                "legal counsel",
-                "public defender",
-                "defense attorney",
-            ]
-
-            if any(phrase in line_lower for phrase in attorney_patterns):
-                # Extract attorney name and context
-                if "attorney for incarcerated person" in line_lower:
-                    demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["representationContext"] = "Attorney for Incarcerated Person"
-                    demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["presentAtHearing"] = True
-                    # Try to extract name from the line
-                    if ":" in line:
-                        parts = line.split(":")
-                        if len(parts) > 1:
-                            potential_name = parts[1].strip().rstrip(".")
-                            if len(potential_name) > 2 and len(potential_name) < 50:
-                                demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["name"] = potential_name
-
-                elif "counsel for" in line_lower:
-                    demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["representationContext"] = "Legal Counsel"
-                    demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["presentAtHearing"] = True
-                    # Try to extract name
-                    if ":" in line:
-                        parts = line.split(":")
-                        if len(parts) > 1:
-                            potential_name = parts[1].strip().rstrip(".")
-                            if len(potential_name) > 2 and len(potential_name) < 50:
-                                demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["name"] = potential_name
-
-                elif "representing" in line_lower and ("attorney" in line_lower or "counsel" in line_lower):
-                    demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["representationContext"] = "Legal Representation"
-                    demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["presentAtHearing"] = True
-                    # Try to extract attorney name after "attorney" or "counsel"
-                    if "attorney" in line_lower:
-                        attorney_index = line_lower.find("attorney")
-                        remaining = line[attorney_index + 8 :].strip()
-                        if remaining and len(remaining) < 50:
-                            demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["name"] = remaining
-                            demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["title"] = "Attorney"
-
-                elif "attorney present" in line_lower:
-                    demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["representationContext"] = "Attorney Present"
-                    demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["presentAtHearing"] = True
-                    # Try to extract name after ":"
-                    if ":" in line:
-                        parts = line.split(":")
-                        if len(parts) > 1:
-                            potential_name = parts[1].strip().rstrip(".")
-                            if len(potential_name) > 2 and len(potential_name) < 50:
-                                demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["name"] = potential_name
-
-                elif "legal counsel" in line_lower:
-                    demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["representationContext"] = "Legal Counsel"
-                    demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["presentAtHearing"] = True
-                    # Try to extract name after ":"
-                    if ":" in line:
-                        parts = line.split(":")
-                        if len(parts) > 1:
-                            potential_name = parts[1].strip().rstrip(".")
-                            if len(potential_name) > 2 and len(potential_name) < 50:
-                                demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["name"] = potential_name
-
-            # Look for attorney names that might appear in speaker identification
-            if (line_lower.startswith("attorney") or line_lower.startswith("counsel")) and ":" in line:
-                speaker_part = line.split(":")[0].strip()
-                if (
-                    len(speaker_part) > 5
-                    and len(speaker_part) < 50
-                    and not demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["name"]
-                ):
-                    demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["name"] = speaker_part
-                    demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["presentAtHearing"] = True
-                    demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["title"] = (
-                        "Attorney" if "attorney" in speaker_part.lower() else "Counsel"
-                    )
-                    demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"][
-                        "representationContext"
-                    ] = "Speaking at Hearing"  # Conviction Info
-            if "second-degree murder" in line_lower:
-                demographics["convictionInfo"]["charges"] = "Second-degree murder with enhancements"
-            if "15 years" in line_lower and "life" in line_lower:
-                demographics["convictionInfo"]["sentenceLength"] = "15 years to life with enhancements"
-
-            # Prison Record
-            if "programming" in line_lower and ("gogi" in line_lower or "avp" in line_lower):
-                demographics["prisonRecord"]["programming"] = "Limited programming completed; GOGI and AVP recommended"
-            if "115" in line_lower or "disciplinary" in line_lower:
-                demographics["prisonRecord"]["conduct"] = "Recent disciplinary issues noted by board"
-
-        # Add summary
-        demographics["introduction"][
-            "shortSummary"
-        ] = "Parole hearing for individual serving life sentence for second-degree murder. Board noted disciplinary concerns and recommended additional programming."
-
-        # Add evidence used to convict
-        demographics["evidenceUsedToConvict"] = ["Victim testimony", "Witness statements", "Physical evidence from crime scene"]
-
-        # Add potential theory
-        demographics["potentialTheory"] = "Domestic violence incident involving substance abuse and relationship conflict"
-
-        # Add victim info
-        demographics["victimInfo"]["relationship"] = "Acquaintance known for approximately 5 months"
-
-        return json.dumps(demographics, indent=2)
-
-    def generate_parole_summary_with_demographics(self, text: str, markdown_prompt: str, demographics_prompt: str) -> tuple[str, str]:
+        return json.dumps(demographics_extractor.mock_demographics(document.lines()), indent=2)
+
+    def generate_parole_summary_with_demographics(
+        self, document: ExtractedDocument, markdown_prompt: str, demographics_prompt: str
+    ) -> tuple[str, str]:
         """Generate both markdown summary and demographics data."""
-        if not self.model or not config.is_gemini_configured():
-            # Generate mock data
-            markdown_summary = self._generate_mock_parole_summary(text)
-            demographics_json = self._generate_mock_demographics(text)
-            return markdown_summary, demographics_json
+        if not self.model:
+            self._note_offline(markdown_prompt)
+            return self._generate_mock_parole_data(document)
 
         try:
             # Generate markdown summary
-            markdown_full_prompt = f"{markdown_prompt}\n\nDocument content:\n{text}"
-            markdown_response = self.model.generate_content(markdown_full_prompt)
-            markdown_summary = markdown_response.text
+            markdown_summary = self._generate(markdown_prompt, document)
 
             # Generate demographics data
-            demographics_full_prompt = f"{demographics_prompt}\n\nDocument content:\n{text}"
-            demographics_response = self.model.generate_content(demographics_full_prompt)
-            demographics_json = demographics_response.text
+            demographics_json = self._generate(demographics_prompt, document)
 
             return markdown_summary, demographics_json
 
         except Exception as e:
             print(f"Gemini error: {e}, using mock data")
-            markdown_summary = self._generate_mock_parole_summary(text)
-            demographics_json = self._generate_mock_demographics(text)
+            self._note_offline(markdown_prompt)
+            return self._generate_mock_parole_data(document)
+
+    async def generate_parole_summary_with_demographics_async(
+        self, document: ExtractedDocument, markdown_prompt: str, demographics_prompt: str
+    ) -> tuple[str, str]:
+        """Async variant of generate_parole_summary_with_demographics; both prompts run concurrently."""
+        if not self.model:
+            self._note_offline(markdown_prompt)
+            return await gemini_pool.run(self._generate_mock_parole_data, document)
+
+        try:
+            markdown_summary, demographics_json = await asyncio.gather(
+                self._generate_async(markdown_prompt, document),
+                self._generate_async(demographics_prompt, document),
+            )
             return markdown_summary, demographics_json
 
-    def _generate_mock_innocence_analysis(self, text: str) -> str:
-        """Generate a mock innocence analysis based on text analysis."""
-        import json
+        except Exception as e:
+            print(f"Gemini error: {e}, using mock data")
+            self._note_offline(markdown_prompt)
+            return await gemini_pool.run(self._generate_mock_parole_data, document)
 
-        # Extract key information from the text for innocence analysis
-        lines = text.split("\n")
-
-        # Look for innocence-related keywords and patterns
-        innocence_keywords = ["innocent", "didn't do", "not guilty", "wrongfully", "false", "framed"]
-        procedural_keywords = ["lawyer", "attorney", "counsel", "miranda", "rights", "coerced"]
-        evidence_keywords = ["dna", "fingerprints", "alibi", "witness", "testimony"]
-        responsibility_keywords = ["remorse", "responsibility", "accept", "admit", "sorry"]
-
-        has_innocence_claims = any(keyword in text.lower() for keyword in innocence_keywords)
-        has_procedural_issues = any(keyword in text.lower() for keyword in procedural_keywords)
-        has_evidence_issues = any(keyword in text.lower() for keyword in evidence_keywords)
-        has_responsibility_pressure = any(keyword in text.lower() for keyword in responsibility_keywords)
-
-        # Generate structured findings based on text analysis
-        findings = []
-
-        # Look for specific patterns and quotes in the text
-        for i, line in enumerate(lines):
-            line_text = line.strip()
-            if not line_text or line_text.startswith("[PAGE") or line_text.startswith("[END PAGE"):
-                continue
-
-            # Extract page and line numbers from markers
-            page_num = 1
-            line_num = 1
-
-            # Find page markers in recent lines
-            for j in range(max(0, i - 10), i):
-                if lines[j].startswith("[PAGE "):
-                    try:
-                        page_num = int(lines[j].split()[1].rstrip("]"))
-                    except:
-                        pass
-
-            # Extract line number from current line
-            if line_text.startswith("[Line "):
-                try:
-                    parts = line_text.split("]", 1)
-                    line_num = int(parts[0].split()[1])
-                    actual_text = parts[1].strip() if len(parts) > 1 else ""
-                except:
-                    actual_text = line_text
-            else:
-                actual_text = line_text
-
-            if not actual_text:
-                continue
-
-            # Detect different categories based on content
-            speaker = "Unknown"
-            if "Commissioner" in actual_text or "Presiding" in actual_text:
-                speaker = "Commissioner"
-            elif "Emmanuel" in actual_text or "Young" in actual_text:
-                speaker = "Emmanuel Young"
-            elif "Attorney" in actual_text or "Mbelu" in actual_text:
-                speaker = "Attorney"
-
-            # Check for responsibility pressure
-            if any(word in actual_text.lower() for word in ["responsibility", "remorse", "accept", "admit"]):
-                if len(actual_text) > 20:  # Only include substantial quotes
-                    findings.append(
-                        {
-                            "quote": actual_text[:200] + "..." if len(actual_text) > 200 else actual_text,
-                            "speaker": speaker,
-                            "page": page_num,
-                            "line": line_num,
-                            "category": "responsibility_pressure",
-                            "significance": "Board member pressuring defendant to accept responsibility or show remorse",
-                        }
-                    )
-
-            # Check for procedural issues
-            elif any(word in actual_text.lower() for word in procedural_keywords):
-                if len(actual_text) > 20:
-                    findings.append(
-                        {
-                            "quote": actual_text[:200] + "..." if len(actual_text) > 200 else actual_text,
-                            "speaker": speaker,
-                            "page": page_num,
-                            "line": line_num,
-                            "category": "procedural_issue",
-                            "significance": "Reference to legal representation or procedural matters",
-                        }
-                    )
-
-            # Check for consistency/inconsistency mentions
-            elif any(word in actual_text.lower() for word in ["version", "different", "contradict", "inconsistent"]):
-                if len(actual_text) > 20:
-                    findings.append(
-                        {
-                            "quote": actual_text[:200] + "..." if len(actual_text) > 200 else actual_text,
-                            "speaker": speaker,
-                            "page": page_num,
-                            "line": line_num,
-                            "category": "consistency_statement",
-                            "significance": "Statement addressing consistency or inconsistency of accounts",
-                        }
-                    )
-
-            # Look for behavioral clarity indicators
-            elif any(word in actual_text.lower() for word in ["right", "yes", "no", "correct"]) and len(actual_text) < 50:
-                findings.append(
-                    {
-                        "quote": actual_text,
-                        "speaker": speaker,
-                        "page": page_num,
-                        "line": line_num,
-                        "category": "behavioral_clarity",
-                        "significance": "Direct, clear response to questioning",
-                    }
-                )
-
-        # Limit findings to most relevant ones
-        findings = findings[:10]
-
-        # Calculate summary statistics
-        innocence_indicators = sum(1 for f in findings if f["category"] in ["direct_innocence_claim", "external_evidence"])
-        responsibility_pressure = sum(1 for f in findings if f["category"] == "responsibility_pressure")
-        consistency_issues = sum(1 for f in findings if f["category"] == "consistency_statement")
-        external_evidence = sum(1 for f in findings if f["category"] == "external_evidence")
-
-        # Determine overall assessment
-        if innocence_indicators > responsibility_pressure:
-            overall_assessment = "innocence_claim"
-        elif responsibility_pressure > innocence_indicators and consistency_issues > 0:
-            overall_assessment = "guilt_minimization"
-        else:
-            overall_assessment = "inconclusive"
+    def _generate_mock_parole_data(self, document: ExtractedDocument) -> tuple[str, str]:
+        """Generate mock markdown summary and demographics data."""
+        return self._generate_mock_parole_summary(document), self._generate_mock_demographics(document)
 
-        mock_analysis_json = {
-            "findings": findings,
-            "summary": {
-                "total_findings": len(findings),
-                "innocence_indicators": innocence_indicators,
-                "responsibility_pressure": responsibility_pressure,
-                "consistency_issues": consistency_issues,
-                "external_evidence": external_evidence,
-                "overall_assessment": overall_assessment,
-            },
-        }
+    def _generate_mock_innocence_analysis(self, document: ExtractedDocument) -> str:
+        """Generate a mock innocence analysis based on text analysis."""
+        import json
 
-        return json.dumps(mock_analysis_json, indent=2)
+        # Keep the first, most relevant findings
+        findings = innocence_classifier.classify(document.lines(), limit=MOCK_INNOCENCE_FINDINGS)
+        return json.dumps({"findings": findings, "summary": summarize_findings(findings)}, indent=2)
 
 
 # Service instances
 pdf_service = PDFService()
-gemini_service = GeminiService()
+gemini_service = GeminiService(response_cache=llm_response_cache)
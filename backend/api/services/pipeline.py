@@ -0,0 +1,245 @@
+import asyncio
+import time
+from typing import AsyncIterator, BinaryIO, Optional, Sequence, Union
+
+from fastapi import HTTPException, UploadFile
+
+from api.core.config import config
+from api.services.analysis import (
+    ANALYSIS_PROMPTS,
+    DEFAULT_SUMMARY_PROMPT,
+    DEMOGRAPHICS_EXTRACTION_PROMPT,
+    INNOCENCE_ANALYSIS_PROMPT,
+    INNOCENCE_CATEGORIES,
+    PAROLE_SUMMARY_PROMPT,
+    parse_demographics,
+    parse_innocence_analysis,
+    prompt_version,
+)
+from api.services.chunked_analysis import ChunkAnalysisError, innocence_analysis_chunked, parole_summary_chunked, plan_chunks, process_text_chunked
+from api.services.citations import verify_findings, verify_markdown
+from api.services.demographics_extractor import demographics_extractor
+from api.services.document import ExtractedDocument
+from api.services.ingestion import ingest_pdf
+from api.services.pdf_service import gemini_service, pdf_service
+from api.services.relevance import select_relevant_lines
+from api.services.results_store import results_store
+from api.services.worker_pools import extraction_pool, gemini_pool
+
+# Analyses that can be run on an extracted document, named after their /pdf endpoints
+ANALYSIS_TYPES = ("process", "parole-summary", "innocence-analysis")
+
+
+async def extract_document(pdf_file: Union[bytes, BinaryIO], sha256: Optional[str] = None) -> ExtractedDocument:
+    """Extract a PDF in the extraction pool, rejecting PDFs without any text."""
+    document = await extraction_pool.run(pdf_service.extract_text_from_pdf, pdf_file, sha256)
+    if not document:
+        raise HTTPException(status_code=400, detail="No text could be extracted from the PDF")
+    return document
+
+
+async def analyze_document(
+    analysis_type: str,
+    document: ExtractedDocument,
+    analysis_mode: str = "single",
+    prompt: Optional[str] = None,
+    context_filter: bool = False,
+    verify_citations: bool = False,
+) -> dict:
+    """
+    Run one of the /pdf analyses on an extracted document.
+
+    Returns the analysis fields of the endpoint's response; callers add the file details.
+    prompt only applies to the "process" analysis, context_filter only to a "single" "innocence-analysis"
+    (the excerpt is sent in one call; callers reject it with the other analysis modes).
+    verify_citations checks the quotes of the result against the document (see check_citations).
+    offline_analysis is true when any part of the result came from the offline analyzers.
+    """
+    with gemini_service.track_offline_answers() as offline_answers:
+        try:
+            result = await _run_analysis(analysis_type, document, analysis_mode, prompt, context_filter)
+        except ChunkAnalysisError as e:
+            raise HTTPException(status_code=502, detail=str(e))
+    result["offline_analysis"] = bool(offline_answers)
+    if verify_citations:
+        result["citation_verification"] = await gemini_pool.run(check_citations, document, result)
+    return result
+
+
+def check_citations(document: ExtractedDocument, result: dict) -> dict:
+    """
+    Verify the quoted page/line citations of an analysis result in place.
+
+    Innocence findings get a verification entry each; markdown summaries have wrong page/line
+    references rewritten. Returns the verification summary.
+    """
+    if "innocence_analysis" in result:
+        return verify_findings(document, result["innocence_analysis"].get("findings", []))
+    result["markdown_summary"], summary = verify_markdown(document, result["markdown_summary"])
+    return summary
+
+
+async def save_result(analysis_type: str, doc_hash: str, document: ExtractedDocument, response: dict) -> None:
+    """Keep a finished parole summary or innocence analysis for /pdf/results; a failed write is only logged."""
+    if analysis_type not in ANALYSIS_PROMPTS or not results_store.enabled:
+        return
+    try:
+        await gemini_pool.run(store_result, analysis_type, doc_hash, document, response)
+    except Exception as e:
+        print(f"Results store write failed: {e}")
+
+
+def store_result(analysis_type: str, doc_hash: str, document: ExtractedDocument, response: dict) -> str:
+    """Store an endpoint response under its document hash, analysis type and prompt version; returns the ETag."""
+    # Offline results, including analyses where the model failed and the offline analyzers answered, are kept apart from Gemini's
+    model_name = "offline" if response.get("offline_analysis") or not gemini_service.model else gemini_service.model_name
+    version = prompt_version(analysis_type, model_name)
+    return results_store.put(doc_hash, analysis_type, version, response, response.get("filename"), _cdcr_number(document, response))
+
+
+def _cdcr_number(document: ExtractedDocument, response: dict) -> str:
+    """CDCR number of a response's demographics, from the offline field rules when the model gave none."""
+    # Model demographics can have any shape, and innocence analyses have none at all
+    demographics = response.get("demographics")
+    client_info = demographics.get("clientInfo") if isinstance(demographics, dict) else None
+    cdcr_number = client_info.get("cdcrNumber") if isinstance(client_info, dict) else None
+    if not isinstance(cdcr_number, str) or not cdcr_number.strip():
+        cdcr_number = demographics_extractor.extract(document.lines())["clientInfo"]["cdcrNumber"]
+    return cdcr_number.strip().upper()
+
+
+async def _run_analysis(analysis_type: str, document: ExtractedDocument, analysis_mode: str, prompt: Optional[str], context_filter: bool) -> dict:
+    if analysis_type == "innocence-analysis" and context_filter:
+        return await innocence_analysis_with_context_filter(document)
+
+    # Analyze in one call or map-reduce over page-aligned chunks; the offline analyzers read the whole transcript
+    chunks = plan_chunks(document, analysis_mode) if gemini_service.model else None
+    mode = {"analysis_mode": "chunked" if chunks else "single", "chunk_count": len(chunks) if chunks else 1}
+
+    if analysis_type == "process":
+        # Use custom prompt if provided, otherwise use default parole summary prompt
+        analysis_prompt = prompt if prompt else DEFAULT_SUMMARY_PROMPT
+        if chunks:
+            gemini_response = await process_text_chunked(gemini_service, chunks, analysis_prompt)
+        else:
+            gemini_response = await gemini_service.process_text_with_ai_async(document, analysis_prompt)
+        return {"markdown_summary": gemini_response, "summary_type": "parole_hearing_analysis", **mode}
+
+    if analysis_type == "parole-summary":
+        # Generate both markdown summary and demographics data
+        if chunks:
+            markdown_summary, demographics_raw = await parole_summary_chunked(
+                gemini_service, chunks, PAROLE_SUMMARY_PROMPT, DEMOGRAPHICS_EXTRACTION_PROMPT
+            )
+        else:
+            markdown_summary, demographics_raw = await gemini_service.generate_parole_summary_with_demographics_async(
+                document, PAROLE_SUMMARY_PROMPT, DEMOGRAPHICS_EXTRACTION_PROMPT
+            )
+        return {
+            "markdown_summary": markdown_summary,
+            "demographics": parse_demographics(demographics_raw),
+            "summary_type": "parole_hearing_summary",
+            **mode,
+        }
+
+    if analysis_type == "innocence-analysis":
+        # Process with Gemini AI using innocence-focused prompt
+        if chunks:
+            innocence_analysis_raw = await innocence_analysis_chunked(gemini_service, chunks, INNOCENCE_ANALYSIS_PROMPT)
+        else:
+            innocence_analysis_raw = await gemini_service.process_text_with_ai_async(document, INNOCENCE_ANALYSIS_PROMPT)
+        return {
+            "innocence_analysis": parse_innocence_analysis(innocence_analysis_raw),
+            "analysis_type": "structured_innocence_detection",
+            **mode,
+            "categories": INNOCENCE_CATEGORIES,
+        }
+
+    raise ValueError(f"Unknown analysis type: {analysis_type}")
+
+
+async def innocence_analysis_with_context_filter(document: ExtractedDocument) -> dict:
+    """
+    Innocence analysis on only the lines most likely to matter.
+
+    Lines are scored with the innocence keyword sets and the top ones are sent with some
+    context and their original markers. The response reports the token reduction and timings,
+    and an estimate of the full prompt's latency: the measured analysis time per excerpt token
+    scaled to the full transcript's tokens. It is only an estimate, since the answer's length
+    and fixed per-call overhead do not grow with the prompt.
+    """
+    selection = await gemini_pool.run(select_relevant_lines, document)
+
+    started = time.perf_counter()
+    innocence_analysis_raw = await gemini_service.process_text_with_ai_async(selection.excerpt, INNOCENCE_ANALYSIS_PROMPT)
+    analysis_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    ms_per_token = analysis_ms / selection.selected_tokens if selection.selected_tokens else 0.0
+    estimated_full_prompt_ms = round(ms_per_token * selection.original_tokens, 2)
+
+    return {
+        "innocence_analysis": parse_innocence_analysis(innocence_analysis_raw),
+        "analysis_type": "structured_innocence_detection",
+        "analysis_mode": "single",
+        "chunk_count": 1,
+        "categories": INNOCENCE_CATEGORIES,
+        "context_selection": {
+            **selection.stats(),
+            "analysis_ms": analysis_ms,
+            "estimated_full_prompt_ms": estimated_full_prompt_ms,
+            "estimated_latency_saved_ms": round(estimated_full_prompt_ms - analysis_ms, 2),
+        },
+    }
+
+
+async def analyze_upload(
+    file: Optional[UploadFile], analysis_type: str, analysis_mode: str = "single", prompt: Optional[str] = None, object_name: Optional[str] = None
+) -> dict:
+    """Validate, extract and analyze one uploaded (or stored) PDF; failures become an error entry instead of an exception."""
+    filename = file.filename if file is not None else object_name
+    try:
+        async with ingest_pdf(file, object_name) as upload:
+            document = await extract_document(upload.file, upload.sha256)
+        analysis = await analyze_document(analysis_type, document, analysis_mode, prompt)
+        response = {
+            "success": True,
+            "filename": filename,
+            "file_size": upload.size,
+            "doc_hash": upload.sha256,
+            "extracted_text_length": len(document),
+            **analysis,
+        }
+        await save_result(analysis_type, upload.sha256, document, response)
+        return response
+    except HTTPException as e:
+        return {"success": False, "filename": filename, "status_code": e.status_code, "error": str(e.detail)}
+    except Exception as e:
+        return {"success": False, "filename": filename, "status_code": 500, "error": f"Internal server error: {str(e)}"}
+
+
+async def analyze_batch(
+    files: list[UploadFile],
+    analysis_type: str,
+    analysis_mode: str = "single",
+    prompt: Optional[str] = None,
+    object_names: Sequence[str] = (),
+) -> AsyncIterator[tuple[int, dict]]:
+    """
+    Analyze files, then stored objects, with at most BATCH_CONCURRENCY in flight, yielding
+    (index, result) as each one finishes; stored objects are indexed after the files.
+    """
+    semaphore = asyncio.Semaphore(max(config.BATCH_CONCURRENCY, 1))
+    sources = [(file, None) for file in files] + [(None, name) for name in object_names]
+
+    async def run(index: int, file: Optional[UploadFile], object_name: Optional[str]) -> tuple[int, dict]:
+        async with semaphore:
+            return index, await analyze_upload(file, analysis_type, analysis_mode, prompt, object_name)
+
+    tasks = [asyncio.create_task(run(index, *source)) for index, source in enumerate(sources)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Stop the remaining files if the client goes away mid-stream
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,170 @@
+import hashlib
+import math
+import re
+import time
+from array import array
+from bisect import bisect_right
+from typing import Iterator, NamedTuple, Optional
+
+from api.core.config import config
+from api.services.chunked_analysis import CHARS_PER_TOKEN
+from api.services.document import DocumentLine, ExtractedDocument
+from api.services.innocence_rules import (
+    CONSISTENCY_WORDS,
+    EVIDENCE_KEYWORDS,
+    INNOCENCE_KEYWORDS,
+    PROCEDURAL_KEYWORDS,
+    RESPONSIBILITY_KEYWORDS,
+)
+
+# Score added per keyword hit; direct innocence and evidence language matters most
+KEYWORD_WEIGHTS: dict[str, int] = {}
+for keywords, weight in (
+    (PROCEDURAL_KEYWORDS, 1),
+    (CONSISTENCY_WORDS, 2),
+    (RESPONSIBILITY_KEYWORDS, 2),
+    (EVIDENCE_KEYWORDS, 3),
+    (INNOCENCE_KEYWORDS, 3),
+):
+    for keyword in keywords:
+        KEYWORD_WEIGHTS[keyword] = max(weight, KEYWORD_WEIGHTS.get(keyword, 0))
+
+# Longest keywords first so overlapping alternatives prefer the more specific match
+KEYWORD_PATTERN = re.compile("|".join(re.escape(keyword) for keyword in sorted(KEYWORD_WEIGHTS, key=len, reverse=True)))
+
+
+class DocumentExcerpt:
+    """
+    Selected lines of an ExtractedDocument, rendered with their original [PAGE X] / [Line Y] markers.
+
+    Skipped runs of lines are shown as [...] and pages without selected lines are left out.
+    Offers the parts of the ExtractedDocument interface GeminiService uses (text, digest, lines(), len()).
+    """
+
+    __slots__ = ("_lines", "_text", "_digest")
+
+    def __init__(self, lines: list[DocumentLine]):
+        self._lines = lines
+        self._text: Optional[str] = None
+        self._digest: Optional[str] = None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self._render()
+        return self._text
+
+    @property
+    def digest(self) -> str:
+        if self._digest is None:
+            self._digest = hashlib.sha256(self.text.encode("utf-8")).hexdigest()
+        return self._digest
+
+    @property
+    def page_count(self) -> int:
+        return len({line.page for line in self._lines})
+
+    def lines(self) -> Iterator[DocumentLine]:
+        return iter(self._lines)
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def __bool__(self) -> bool:
+        return bool(self._lines)
+
+    def _render(self) -> str:
+        parts: list[str] = []
+        previous: Optional[DocumentLine] = None
+        for current in self._lines:
+            if previous is None or current.page != previous.page:
+                if previous is not None:
+                    parts.append(f"\n[END PAGE {previous.page}]\n")
+                parts.append(f"\n[PAGE {current.page}]\n")
+                if current.line != 1:
+                    parts.append("[...]\n")
+            elif current.line != previous.line + 1:
+                parts.append("[...]\n")
+            parts.append(f"[Line {current.line}] {current.text}\n")
+            previous = current
+        if previous is not None:
+            parts.append(f"\n[END PAGE {previous.page}]\n")
+        return "".join(parts).strip()
+
+
+class ContextSelection(NamedTuple):
+    """Result of relevance filtering: the excerpt to send and how much it saved."""
+
+    excerpt: DocumentExcerpt
+    lines_total: int
+    lines_kept: int
+    original_tokens: int
+    selected_tokens: int
+    selection_ms: float
+
+    def stats(self) -> dict:
+        return {
+            "lines_total": self.lines_total,
+            "lines_kept": self.lines_kept,
+            "original_tokens": self.original_tokens,
+            "selected_tokens": self.selected_tokens,
+            "token_reduction": round(1 - self.selected_tokens / self.original_tokens, 4) if self.original_tokens else 0.0,
+            "selection_ms": self.selection_ms,
+        }
+
+
+def score_lines(lines: list[DocumentLine]) -> array:
+    """
+    Keyword score of every line, from one regex pass over the whole lowercased document.
+
+    Match offsets are mapped back to lines by binary search over the line start offsets.
+    """
+    # Lowercasing per line keeps offsets aligned even where lower() changes a line's length
+    lowered_lines = [line.text.lower() for line in lines]
+    starts = array("L")
+    offset = 0
+    for text in lowered_lines:
+        starts.append(offset)
+        offset += len(text) + 1
+
+    scores = array("L", [0]) * len(lines)
+    lowered = "\n".join(lowered_lines)
+    for match in KEYWORD_PATTERN.finditer(lowered):
+        scores[bisect_right(starts, match.start()) - 1] += KEYWORD_WEIGHTS[match.group()]
+    return scores
+
+
+def select_relevant_lines(document: ExtractedDocument, keep_ratio: Optional[float] = None, context_lines: Optional[int] = None) -> ContextSelection:
+    """
+    Keep the highest-scoring lines plus context_lines of context on each side.
+
+    keep_ratio is the share of all lines picked as top-scoring seeds (lines without any keyword
+    are never seeds). If nothing scores, the whole document is kept.
+    """
+    keep_ratio = config.RELEVANCE_KEEP_RATIO if keep_ratio is None else keep_ratio
+    context_lines = config.RELEVANCE_CONTEXT_LINES if context_lines is None else context_lines
+
+    started = time.perf_counter()
+    lines = list(document.lines())
+    scores = score_lines(lines)
+
+    seed_count = max(1, math.ceil(len(lines) * keep_ratio))
+    seeds = sorted((index for index in range(len(lines)) if scores[index]), key=lambda index: (-scores[index], index))[:seed_count]
+
+    if seeds:
+        keep = set()
+        for index in seeds:
+            keep.update(range(max(0, index - context_lines), min(len(lines), index + context_lines + 1)))
+        selected = [lines[index] for index in sorted(keep)]
+    else:
+        selected = lines
+
+    excerpt = DocumentExcerpt(selected)
+    return ContextSelection(
+        excerpt=excerpt,
+        lines_total=len(lines),
+        lines_kept=len(selected),
+        original_tokens=len(document) // CHARS_PER_TOKEN,
+        selected_tokens=len(excerpt) // CHARS_PER_TOKEN,
+        selection_ms=round((time.perf_counter() - started) * 1000, 2),
+    )
@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Optional
+
+from api.core.config import config
+
+# zlib level for stored results; higher levels save little on analysis JSON of this size
+COMPRESSION_LEVEL = 6
+# Columns describing a stored result, without its body
+SUMMARY_COLUMNS = "doc_hash, analysis_type, prompt_version, filename, cdcr_number, size, stored_size, etag, created_at"
+
+
+def _timestamp(value: float) -> str:
+    return datetime.fromtimestamp(value, timezone.utc).isoformat()
+
+
+class StoredResult:
+    """One stored analysis result; the JSON body is decompressed only when asked for."""
+
+    __slots__ = ("doc_hash", "analysis_type", "prompt_version", "filename", "cdcr_number", "size", "stored_size", "etag", "created_at", "_body")
+
+    def __init__(self, row: tuple):
+        (
+            self.doc_hash,
+            self.analysis_type,
+            self.prompt_version,
+            self.filename,
+            self.cdcr_number,
+            self.size,
+            self.stored_size,
+            self.etag,
+            self.created_at,
+        ) = row[:9]
+        self._body: Optional[bytes] = row[9] if len(row) > 9 else None
+
+    def summary(self) -> dict:
+        return {
+            "doc_hash": self.doc_hash,
+            "analysis_type": self.analysis_type,
+            "prompt_version": self.prompt_version,
+            "filename": self.filename,
+            "cdcr_number": self.cdcr_number,
+            "size": self.size,
+            "stored_size": self.stored_size,
+            "created_at": _timestamp(self.created_at),
+        }
+
+    def result_json(self) -> str:
+        """The result exactly as stored, as JSON text (never re-serialized)."""
+        return zlib.decompress(self._body).decode("utf-8")
+
+
+class ResultsStore:
+    """
+    SQLite store of finished analyses, keyed by document hash, analysis type and prompt version.
+
+    Results are kept as zlib-compressed JSON with an ETag (hash of the JSON), and indexed by
+    CDCR number and filename. The connection is opened on first use; close() lets the next
+    use reopen it, at a new path if that was changed. An empty path disables the store.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                doc_hash TEXT NOT NULL,
+                analysis_type TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                filename TEXT,
+                cdcr_number TEXT,
+                size INTEGER NOT NULL,
+                stored_size INTEGER NOT NULL,
+                etag TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                result BLOB NOT NULL,
+                PRIMARY KEY (doc_hash, analysis_type, prompt_version)
+            )
+            """)
+        conn.execute("CREATE INDEX IF NOT EXISTS results_cdcr_number ON results (cdcr_number, created_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS results_filename ON results (filename, created_at)")
+        conn.commit()
+        self._conn = conn
+        return conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def put(
+        self,
+        doc_hash: str,
+        analysis_type: str,
+        prompt_version: str,
+        result: dict,
+        filename: Optional[str] = None,
+        cdcr_number: Optional[str] = None,
+    ) -> str:
+        """Store (or replace) a result and return its ETag."""
+        body = json.dumps(result, separators=(",", ":")).encode("utf-8")
+        etag = hashlib.sha256(body).hexdigest()[:32]
+        compressed = zlib.compress(body, COMPRESSION_LEVEL)
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                f"INSERT OR REPLACE INTO results ({SUMMARY_COLUMNS}, result) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (doc_hash, analysis_type, prompt_version, filename, cdcr_number or None, len(body), len(compressed), etag, time.time(), compressed),
+            )
+            conn.commit()
+        return etag
+
+    def get(self, doc_hash: str, analysis_type: Optional[str] = None, prompt_version: Optional[str] = None) -> list[StoredResult]:
+        """Results stored for a document (optionally of one analysis type and prompt version), newest first."""
+        query = f"SELECT {SUMMARY_COLUMNS}, result FROM results WHERE doc_hash = ?"
+        params: list = [doc_hash]
+        if analysis_type is not None:
+            query += " AND analysis_type = ?"
+            params.append(analysis_type)
+        if prompt_version is not None:
+            query += " AND prompt_version = ?"
+            params.append(prompt_version)
+        with self._lock:
+            rows = self._connection().execute(query + " ORDER BY created_at DESC", params).fetchall()
+        return [StoredResult(row) for row in rows]
+
+    def find(self, cdcr_number: Optional[str] = None, filename: Optional[str] = None, limit: int = 100) -> list[StoredResult]:
+        """Summaries (no bodies) of results for a CDCR number and/or filename, newest first."""
+        query = f"SELECT {SUMMARY_COLUMNS} FROM results"
+        conditions, params = [], []
+        if cdcr_number is not None:
+            conditions.append("cdcr_number = ?")
+            params.append(cdcr_number)
+        if filename is not None:
+            conditions.append("filename = ?")
+            params.append(filename)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        with self._lock:
+            rows = self._connection().execute(query + " ORDER BY created_at DESC LIMIT ?", params + [limit]).fetchall()
+        return [StoredResult(row) for row in rows]
+
+    def stats(self) -> dict:
+        """Number of results and their JSON and compressed sizes."""
+        with self._lock:
+            count, size, stored_size = (
+                self._connection().execute("SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored_size), 0) FROM results").fetchone()
+            )
+        return {
+            "results": count,
+            "bytes": size,
+            "stored_bytes": stored_size,
+            "compression_ratio": round(size / stored_size, 2) if stored_size else 0.0,
+        }
+
+
+def combined_etag(results: list[StoredResult]) -> str:
+    """Quoted ETag for a response made of these results; changes whenever any of them does."""
+    if len(results) == 1:
+        return f'"{results[0].etag}"'
+    digest = hashlib.sha256("\0".join(f"{r.analysis_type}:{r.prompt_version}:{r.etag}" for r in results).encode("utf-8"))
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+results_store = ResultsStore(config.RESULTS_DB_PATH)
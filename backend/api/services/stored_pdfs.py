@@ -0,0 +1,88 @@
+import os
+import tempfile
+from typing import BinaryIO, Callable
+
+from api.services.gcs_client import download_object, load_metadata, resolve_object
+from api.services.pdf_service import extraction_cache
+
+
+class StoredPDFRejected(ValueError):
+    """A stored object that is not analyzed: over the size limit, or not a PDF."""
+
+
+def _size_error(max_size: int) -> StoredPDFRejected:
+    return StoredPDFRejected(f"File size exceeds {max_size // (1024*1024)}MB limit")
+
+
+def _check_pdf(file: BinaryIO, max_size: int, is_pdf: Callable[[BinaryIO], bool]) -> int:
+    """Size of a stored file open for reading, left at offset 0; the file is closed if it is rejected."""
+    size = file.seek(0, os.SEEK_END)
+    file.seek(0)
+    if size > max_size or not is_pdf(file):
+        file.close()
+        raise _size_error(max_size) if size > max_size else StoredPDFRejected("Only PDF files are supported")
+    file.seek(0)
+    return size
+
+
+def open_stored_pdf(name: str, max_size: int, is_pdf: Callable[[BinaryIO], bool]) -> tuple[BinaryIO, str, int]:
+    """
+    Open a PDF stored in GCS through the local read-through cache.
+
+    The bytes are kept in the extraction cache's disk tier under their SHA-256, so a document
+    analyzed before is read from local disk (and its text from the extraction cache) without
+    downloading it again. With the disk tier disabled the object is downloaded to a temporary file.
+
+    An object over max_size is rejected from its metadata before anything is downloaded, and a
+    download must pass is_pdf (given the file at offset 0) before it is kept in the cache.
+
+    Returns:
+        (file, sha256, size), with file open for reading at offset 0; the caller closes it
+
+    Raises:
+        FileNotFoundError: No stored object with this name
+        StoredPDFRejected: The object is over max_size or not a PDF
+    """
+    blob, sha256 = resolve_object(name)
+    if sha256:
+        path = extraction_cache.pdf_path(sha256)
+        if path is not None:
+            try:
+                file = open(path, "rb")
+            except FileNotFoundError:
+                # Evicted since the lookup
+                pass
+            else:
+                return file, sha256, _check_pdf(file, max_size, is_pdf)
+
+    blob = load_metadata(blob)
+    if blob.size > max_size:
+        raise _size_error(max_size)
+
+    tmp_path = extraction_cache.pdf_temp_path()
+    if tmp_path is None:
+        file = tempfile.TemporaryFile()
+        try:
+            actual = download_object(blob, file)
+        except BaseException:
+            file.close()
+            raise
+        size = _check_pdf(file, max_size, is_pdf)
+    else:
+        try:
+            with open(tmp_path, "wb") as f:
+                actual = download_object(blob, f)
+            # Only PDFs that pass the checks are kept in the cache
+            with open(tmp_path, "rb") as f:
+                _check_pdf(f, max_size, is_pdf)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        file = open(extraction_cache.put_pdf(actual, tmp_path), "rb")
+        size = os.fstat(file.fileno()).st_size
+
+    if sha256 and actual != sha256:
+        file.close()
+        raise RuntimeError(f"Stored object {blob.name} does not match its SHA-256")
+    return file, actual, size
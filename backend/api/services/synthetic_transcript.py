@@ -0,0 +1,314 @@
+import io
+import os
+import random
+import textwrap
+
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+# Page layout of a hearing transcript: numbered lines in a fixed-pitch font
+LINES_PER_PAGE = 25
+CHARS_PER_LINE = 60
+FONT = "Courier"
+FONT_SIZE = 11
+LINE_SPACING = 26
+MARGIN = 72
+MAX_PAGES = 1000
+
+FIRST_NAMES = ["Marcus", "Daniel", "Luis", "Andre", "Kevin", "Jose", "Terrell", "Michael", "Ricardo", "Anthony", "Darnell", "Victor"]
+LAST_NAMES = ["Johnson", "Ramirez", "Washington", "Nguyen", "Harris", "Castillo", "Brooks", "Delgado", "Foster", "Alvarez", "Coleman", "Reyes"]
+PRISONS = [
+    ("SALINAS VALLEY STATE PRISON", "SOLEDAD"),
+    ("CALIFORNIA STATE PRISON, SOLANO", "VACAVILLE"),
+    ("SAN QUENTIN REHABILITATION CENTER", "SAN QUENTIN"),
+    ("MULE CREEK STATE PRISON", "IONE"),
+    ("RICHARD J. DONOVAN CORRECTIONAL FACILITY", "SAN DIEGO"),
+]
+MONTHS = ["JANUARY", "FEBRUARY", "MARCH", "APRIL", "MAY", "JUNE", "JULY", "AUGUST", "SEPTEMBER", "OCTOBER", "NOVEMBER", "DECEMBER"]
+CRIMES = ["second degree murder", "first degree murder", "attempted murder", "robbery", "kidnapping", "voluntary manslaughter"]
+PROGRAMS = ["GOGI", "AVP", "anger management", "Criminals and Gangmembers Anonymous", "Alcoholics Anonymous", "a vocational welding program"]
+
+# What each role says, by part of the hearing; {placeholders} are filled per transcript
+PHASES = [
+    (
+        "proceedings",
+        0.1,
+        {
+            "presiding": [
+                "We are on the record. Today's date is {date} and the time is {time}.",
+                "This is a subsequent parole consideration hearing for {name}, CDCR number {cdcr}.",
+                "For the record, would everyone in the room please state their name and spell their last name.",
+                "Have you had an opportunity to review your rights with your attorney before today's hearing?",
+                "Counsel, are there any objections or preliminary matters before we begin?",
+            ],
+            "deputy": [
+                "Deputy Commissioner {deputy_last}, {deputy_spelled}.",
+                "I have reviewed the comprehensive risk assessment and the central file.",
+            ],
+            "attorney": [
+                "{attorney}, attorney for {name}, and I have reviewed his rights with him.",
+                "No objections, Commissioner. We are ready to proceed.",
+                "My client understands the process and would like to speak with the Panel today.",
+            ],
+            "person": ["{name_title}, {last_spelled}.", "Yes, sir.", "Yes, I understand.", "Yes, I went over them with my lawyer."],
+        },
+    ),
+    (
+        "commitment offense",
+        0.3,
+        {
+            "presiding": [
+                "Let's talk about the commitment offense. You were convicted of {crime} in {year}.",
+                "Walk me through what happened on the night of the offense.",
+                "The record says the victim was found near the apartment. What was your role?",
+                "Your version today is different from the version in the probation report. Why is that?",
+                "Do you accept responsibility for the death of the victim?",
+                "The Panel has to consider whether you show remorse for what happened.",
+            ],
+            "deputy": [
+                "There was testimony from two witnesses who placed you at the scene.",
+                "Was there any DNA or fingerprint evidence introduced at trial?",
+                "Did you tell the detectives the same thing you are telling us today?",
+            ],
+            "attorney": [
+                "I would note for the record that my client has maintained the same account since his arrest.",
+                "The alibi witness was never called to testify at trial.",
+                "He was interviewed without counsel present, and we dispute that statement.",
+            ],
+            "person": [
+                "I wasn't there that night. I was at my sister's house the whole evening.",
+                "I didn't do it. I have said that from the beginning and I'm still saying it.",
+                "I am sorry for the family, I am, but I can't admit to something I didn't do.",
+                "The detective told me I could go home if I signed the statement, and I was nineteen.",
+                "I take responsibility for the life I was living back then, the people I ran with.",
+                "My lawyer at trial never talked to the witness who could say where I was.",
+                "No, sir, that's not correct. I never had a gun.",
+            ],
+        },
+    ),
+    (
+        "post-commitment factors",
+        0.3,
+        {
+            "presiding": [
+                "Let's move on to your programming since you've been incarcerated.",
+                "I see you completed {program} in {program_year}. What did you take from it?",
+                "You have had {rvrs} rules violation reports, the last one in {rvr_year}. Tell me about that 115.",
+                "What are you doing to address your character defects today?",
+            ],
+            "deputy": [
+                "The comprehensive risk assessment rates you as a {risk} risk for violence.",
+                "Your work reports from the kitchen are very positive.",
+                "Have you remained disciplinary free since your last hearing?",
+            ],
+            "attorney": [
+                "He has laudatory chronos from three different staff members.",
+                "I would direct the Panel to his certificates in the packet.",
+            ],
+            "person": [
+                "{program} taught me how to recognize when I'm getting angry and to stop and think first.",
+                "That RVR was for having a cell phone. I shouldn't have had it and I own that.",
+                "I've been a facilitator for {program} for two years now.",
+                "I got my GED in {program_year} and I'm taking college classes now.",
+                "Yes, sir, I've been disciplinary free since {rvr_year}.",
+            ],
+        },
+    ),
+    (
+        "parole plans",
+        0.15,
+        {
+            "presiding": [
+                "Tell us about your parole plans. Where would you live if released?",
+                "Do you have any offers of employment?",
+                "What is your relapse prevention plan?",
+            ],
+            "deputy": ["I see letters of support from your mother and your cousin.", "Have you been accepted to a transitional housing program?"],
+            "attorney": ["The packet includes an acceptance letter from a transitional housing program.", "His family has offered him housing."],
+            "person": [
+                "I've been accepted to a transitional housing program in Los Angeles.",
+                "My uncle has a construction company and he offered me a job.",
+                "I would go to meetings every week and keep my sponsor's number with me.",
+            ],
+        },
+    ),
+    (
+        "closing statements",
+        0.15,
+        {
+            "presiding": ["Counsel, your closing statement.", "{name_title}, is there anything you would like to say to the Panel?"],
+            "deputy": ["I have no further questions.", "Nothing further, Commissioner."],
+            "attorney": [
+                "My client has programmed consistently and has a strong support network.",
+                "The evidence against him was thin, and he has never wavered in his account.",
+                "We ask the Panel to find him suitable for parole.",
+            ],
+            "person": [
+                "I want to thank the Panel for hearing me today.",
+                "I have changed a lot in here and I just want the chance to show it.",
+                "I think about the victim's family every day.",
+            ],
+        },
+    ),
+]
+SPEAKER_ROLES = ["presiding", "person", "deputy", "person", "attorney", "person"]
+
+
+class SyntheticTranscript:
+    """
+    A generated parole hearing transcript: the text of every page and the facts it was built from.
+
+    pages[0] is the caption page; the other pages hold LINES_PER_PAGE numbered lines of speaker
+    turns wrapped at CHARS_PER_LINE characters. Render it with pdf().
+    """
+
+    def __init__(self, pages: list[list[str]], incarcerated_person: str, cdcr_number: str, attorney: str, seed: int):
+        self.pages = pages
+        self.incarcerated_person = incarcerated_person
+        self.cdcr_number = cdcr_number
+        self.attorney = attorney
+        self.seed = seed
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pages)
+
+    def pdf(self) -> bytes:
+        """Render the transcript: page number top right, numbered lines with the number at the right margin."""
+        buffer = io.BytesIO()
+        c = canvas.Canvas(buffer, pagesize=letter, invariant=1)
+        width, height = letter
+        for page_number, lines in enumerate(self.pages, start=1):
+            c.setFont(FONT, FONT_SIZE)
+            c.drawRightString(width - MARGIN, height - 40, str(page_number))
+            y = height - 80
+            for line_number, text in enumerate(lines, start=1):
+                # The caption page is not line numbered
+                c.drawString(MARGIN, y, text if page_number == 1 else f"{text} {line_number}")
+                y -= LINE_SPACING if page_number > 1 else 20
+            c.showPage()
+        c.save()
+        return buffer.getvalue()
+
+
+def _caption(facts: dict) -> list[str]:
+    return [
+        "PAROLE SUITABILITY HEARING",
+        "STATE OF CALIFORNIA",
+        "BOARD OF PAROLE HEARINGS",
+        "",
+        "In the matter of the Parole",
+        "Consideration Hearing of:",
+        facts["name"].upper(),
+        f"CDCR Number: {facts['cdcr']}",
+        "",
+        facts["prison"],
+        f"{facts['city']}, CALIFORNIA",
+        facts["date"].upper(),
+        facts["time"],
+        "",
+        "PANEL PRESENT:",
+        f"{facts['presiding'].upper()}, Presiding Commissioner",
+        f"{facts['deputy'].upper()}, Deputy Commissioner",
+        "",
+        "OTHERS PRESENT:",
+        f"{facts['name'].upper()}, Incarcerated Person",
+        f"{facts['attorney'].upper()}, Attorney for Incarcerated Person",
+    ]
+
+
+def _facts(rng: random.Random) -> dict:
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    presiding = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    deputy = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    attorney = f"{rng.choice(['Rosemary', 'Sandra', 'David', 'Helen'])} {rng.choice(['Mbelu', 'Okafor', 'Chen', 'Lindqvist'])}"
+    prison, city = rng.choice(PRISONS)
+    year = rng.randint(1995, 2010)
+    rvr_year = rng.randint(year + 2, 2022)
+    return {
+        "name": f"{first} {last}",
+        "name_title": f"Mr. {last}",
+        "last_spelled": "-".join(last.upper()),
+        "cdcr": f"{rng.choice('ABCDEFGHJKPTV')}{rng.choice('ABCDEFGHJKPTV')}{rng.randint(1000, 9999)}",
+        "presiding": presiding,
+        "deputy": deputy,
+        "deputy_last": deputy.split()[1],
+        "deputy_spelled": "-".join(deputy.split()[1].upper()),
+        "attorney": attorney,
+        "prison": prison,
+        "city": city,
+        "date": f"{rng.choice(MONTHS).title()} {rng.randint(1, 28)}, {rng.randint(2019, 2025)}",
+        "time": f"{rng.randint(8, 11)}:{rng.choice(['00', '15', '30', '40'])} AM",
+        "crime": rng.choice(CRIMES),
+        "year": year,
+        "program": rng.choice(PROGRAMS),
+        "program_year": rng.randint(year + 3, 2023),
+        "rvrs": rng.randint(1, 6),
+        "rvr_year": rvr_year,
+        "risk": rng.choice(["low", "moderate", "high"]),
+    }
+
+
+def _speaker(role: str, facts: dict) -> str:
+    if role == "presiding":
+        return f"PRESIDING COMMISSIONER {facts['presiding'].split()[1].upper()}"
+    if role == "deputy":
+        return f"DEPUTY COMMISSIONER {facts['deputy'].split()[1].upper()}"
+    if role == "attorney":
+        return f"ATTORNEY {facts['attorney'].split()[1].upper()}"
+    return facts["name"].upper()
+
+
+def generate_transcript(pages: int, seed: int = 0) -> SyntheticTranscript:
+    """
+    Generate a parole hearing transcript of 1 to MAX_PAGES pages; the same seed gives the same transcript.
+
+    Speaker turns follow the usual order of a hearing (proceedings, commitment offense,
+    post-commitment factors, parole plans, closing statements), each part taking its share of
+    the pages, with questions from the panel and answers of one to three sentences.
+    """
+    if not 1 <= pages <= MAX_PAGES:
+        raise ValueError(f"pages must be between 1 and {MAX_PAGES}")
+    rng = random.Random(seed)
+    facts = _facts(rng)
+
+    body_lines = (pages - 1) * LINES_PER_PAGE
+    lines: list[str] = []
+    for phase_index, (_, share, phrases) in enumerate(PHASES):
+        # The last part runs to the end of the transcript
+        phase_end = body_lines if phase_index == len(PHASES) - 1 else len(lines) + round(body_lines * share)
+        turn = 0
+        while len(lines) < phase_end:
+            role = SPEAKER_ROLES[turn % len(SPEAKER_ROLES)] if rng.random() < 0.8 else rng.choice(list(phrases))
+            turn += 1
+            choices = phrases[role]
+            sentences = " ".join(rng.sample(choices, min(rng.randint(1, 3), len(choices)))).format(**facts)
+            lines.extend(textwrap.wrap(f"{_speaker(role, facts)}:  {sentences}", CHARS_PER_LINE))
+    lines = lines[:body_lines]
+
+    body_pages = [lines[i : i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)]
+    return SyntheticTranscript([_caption(facts)] + body_pages, facts["name"], facts["cdcr"], facts["attorney"], seed)
+
+
+def write_corpus(directory: str, page_counts: list[int], seed: int = 0) -> list[str]:
+    """Write one transcript per page count to directory (synthetic-<pages>p-<seed>.pdf); returns the paths."""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for pages in page_counts:
+        path = os.path.join(directory, f"synthetic-{pages}p-{seed}.pdf")
+        with open(path, "wb") as f:
+            f.write(generate_transcript(pages, seed).pdf())
+        paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write synthetic parole hearing transcripts")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100, 1000], help=f"Page counts (1-{MAX_PAGES})")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed; the same seed gives the same transcripts")
+    parser.add_argument("--out", default=".cache/corpus", help="Output directory")
+    args = parser.parse_args()
+    for path in write_corpus(args.out, args.pages, args.seed):
+        print(path)
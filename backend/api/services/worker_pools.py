@@ -0,0 +1,95 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from api.core.config import config
+
+
+class WorkerPool:
+    """Bounded thread pool for running blocking work from async route handlers."""
+
+    def __init__(self, name: str, max_workers: int, max_concurrency: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_concurrency = max(max_concurrency, 1)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Semaphores are bound to the loop they are first used on, so make one per loop
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"{self.name}-pool")
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run func in the pool without blocking the event loop, waiting for a free slot first."""
+        semaphore = self._get_semaphore()
+        self.waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.running += 1
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._get_executor(), functools.partial(func, *args, **kwargs))
+            self.completed += 1
+            return result
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.running -= 1
+            semaphore.release()
+
+    def stats(self) -> dict:
+        """Pool size, limits and current load."""
+        return {
+            "max_workers": self.max_workers,
+            "max_concurrency": self.max_concurrency,
+            "waiting": self.waiting,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker threads; the pool starts new ones if it is used again."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# CPU-bound PDF extraction (large files are further split across processes)
+extraction_pool = WorkerPool("extraction", config.EXTRACTION_POOL_SIZE, config.EXTRACTION_POOL_CONCURRENCY)
+
+# Blocking Gemini calls and offline analysis
+gemini_pool = WorkerPool("gemini", config.GEMINI_POOL_SIZE, config.GEMINI_POOL_CONCURRENCY)
+
+# Blocking Google Cloud Storage calls
+gcs_pool = WorkerPool("gcs", config.GCS_POOL_SIZE, config.GCS_POOL_CONCURRENCY)
+
+
+def pool_stats() -> dict:
+    """Stats for every worker pool."""
+    return {pool.name: pool.stats() for pool in (extraction_pool, gemini_pool, gcs_pool)}
+
+
+def shutdown_pools() -> None:
+    """Stop all worker pools."""
+    for pool in (extraction_pool, gemini_pool, gcs_pool):
+        pool.shutdown()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark single-shot vs map-reduce (chunked) analysis of long transcripts.
+
+Builds a synthetic transcript in memory and runs it through GeminiService backed by
+FakeGenerativeModel, whose latency grows with prompt length the way real model
+prefill time does. Reports wall-clock time, model calls and speed-up for each
+transcript length.
+
+Usage:
+    python benchmark_chunked_analysis.py --pages 50 200 800 --chunk-tokens 20000 --concurrency 4
+"""
+
+import argparse
+import asyncio
+import time
+
+from api.core.config import config
+from api.services.chunked_analysis import CHARS_PER_TOKEN, estimate_tokens, process_text_chunked, split_document
+from api.services.document import ExtractedDocument
+from api.services.fake_gemini import FakeGenerativeModel
+from api.services.pdf_service import GeminiService
+
+SPEAKERS = ["PRESIDING COMMISSIONER RUFF", "DEPUTY COMMISSIONER WEILBACHER", "ATTORNEY MBELU", "INCARCERATED PERSON"]
+
+PROMPT = "Summarize this parole hearing transcript as markdown with page and line citations."
+
+
+def build_document(pages: int) -> ExtractedDocument:
+    """Create a transcript-like document with the given number of pages."""
+    page_texts = []
+    for page_num in range(1, pages + 1):
+        lines = [str(page_num)]
+        for line_num in range(1, 26):
+            speaker = SPEAKERS[(page_num + line_num) % len(SPEAKERS)]
+            lines.append(f"{speaker}:  Statement {line_num} on page {page_num} about the version of events. {line_num}")
+        page_texts.append("\n".join(lines))
+    return ExtractedDocument(page_texts)
+
+
+class PrefillLatencyModel(FakeGenerativeModel):
+    """Fake model whose latency is a fixed overhead plus a cost per thousand prompt tokens."""
+
+    def __init__(self, base_latency: float, seconds_per_1k_tokens: float):
+        super().__init__(responder=lambda prompt: "## Summary\n- Fake finding - (Page 1, Line 1)")
+        self.base_latency = base_latency
+        self.seconds_per_1k_tokens = seconds_per_1k_tokens
+
+    async def generate_content_async(self, contents, **kwargs):
+        self.latency = self.base_latency + len(str(contents)) / CHARS_PER_TOKEN / 1000 * self.seconds_per_1k_tokens
+        return await super().generate_content_async(contents, **kwargs)
+
+
+async def timed(coro) -> float:
+    start = time.perf_counter()
+    await coro
+    return time.perf_counter() - start
+
+
+async def run(pages_list: list[int], base_latency: float, seconds_per_1k_tokens: float) -> None:
+    print(f"chunk budget: {config.CHUNK_MAX_TOKENS} tokens, concurrency: {config.CHUNK_CONCURRENCY}\n")
+    print(f"{'pages':>6}{'tokens':>10}{'chunks':>8}{'single (s)':>12}{'chunked (s)':>13}{'speed-up':>10}")
+    for pages in pages_list:
+        document = build_document(pages)
+        chunks = split_document(document, config.CHUNK_MAX_TOKENS)
+
+        model = PrefillLatencyModel(base_latency, seconds_per_1k_tokens)
+        service = GeminiService(model=model)
+        single = await timed(service.process_text_with_ai_async(document, PROMPT))
+        chunked = await timed(process_text_chunked(service, chunks, PROMPT))
+
+        print(f"{pages:>6}{estimate_tokens(document):>10}{len(chunks):>8}{single:>12.2f}{chunked:>13.2f}{single / chunked:>9.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[50, 200, 800], help="Transcript lengths to test")
+    parser.add_argument("--chunk-tokens", type=int, default=config.CHUNK_MAX_TOKENS, help="Token budget per chunk")
+    parser.add_argument("--concurrency", type=int, default=config.CHUNK_CONCURRENCY, help="Chunks analyzed at once")
+    parser.add_argument("--base-latency", type=float, default=0.3, help="Fixed seconds per model call")
+    parser.add_argument("--seconds-per-1k-tokens", type=float, default=0.02, help="Extra seconds per 1000 prompt tokens")
+    args = parser.parse_args()
+
+    config.CHUNK_MAX_TOKENS = args.chunk_tokens
+    config.CHUNK_CONCURRENCY = args.concurrency
+    asyncio.run(run(args.pages, args.base_latency, args.seconds_per_1k_tokens))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark citation verification on long transcripts.
+
+Repeats the sample transcript to the requested lengths and checks a set of findings drawn
+from it: quotes at their citation, quotes cited at the wrong place, paraphrased quotes and
+invented ones. Reports index build time and the time per finding for each kind.
+
+Usage:
+    python benchmark_citations.py --copies 1 10 50 --findings 300
+"""
+
+import argparse
+import random
+import time
+
+from api.services.citations import CitationIndex
+from api.services.document import ExtractedDocument
+from api.services.pdf_service import pdf_service
+
+PDF_FILE_PATH = "pdf/Young-AK2960-2024-10-24.pdf"
+INVENTED = [
+    "I was never at the apartment that night",
+    "the detective told me what to say in the interview",
+    "my alibi witness was never called to testify",
+]
+
+
+def make_findings(lines: list, count: int, rng: random.Random) -> dict[str, list[tuple[str, int, int]]]:
+    """(quote, page, line) findings of each kind, from lines with at least five words."""
+    candidates = [index for index, line in enumerate(lines[:-1]) if len(line.text.split()) >= 6]
+    kinds: dict[str, list[tuple[str, int, int]]] = {"verified": [], "corrected": [], "paraphrased": [], "invented": []}
+    for _ in range(count // len(kinds)):
+        line = lines[rng.choice(candidates)]
+        words = line.text.split()[:-1]
+        wrong = lines[rng.randrange(len(lines))]
+        kinds["verified"].append((" ".join(words[1:]), line.page, line.line))
+        kinds["corrected"].append((" ".join(words), wrong.page, wrong.line))
+        # Two lines run together with one word dropped, as a model would misquote them
+        following = lines[lines.index(line) + 1].text.split()[:-1]
+        paraphrase = words + following
+        del paraphrase[len(paraphrase) // 2]
+        kinds["paraphrased"].append((" ".join(paraphrase), wrong.page, wrong.line))
+        kinds["invented"].append((rng.choice(INVENTED), line.page, line.line))
+    return kinds
+
+
+def run(copies_list: list[int], finding_count: int, seed: int) -> None:
+    with open(PDF_FILE_PATH, "rb") as f:
+        pages = pdf_service.extract_text_from_pdf(f.read()).page_texts()
+
+    print(
+        f"{'lines':>8}{'index (ms)':>12}{'fuzzy index (ms)':>18}"
+        + "".join(f"{kind + ' (ms)':>17}" for kind in ("verified", "corrected", "paraphrased", "invented"))
+    )
+    for copies in copies_list:
+        lines = list(ExtractedDocument(pages * copies).lines())
+        findings = make_findings(lines, finding_count, random.Random(seed))
+
+        started = time.perf_counter()
+        index = CitationIndex(lines)
+        build_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        index._build_fuzzy_index()
+        fuzzy_ms = (time.perf_counter() - started) * 1000
+
+        row = f"{len(lines):>8}{build_ms:>12.1f}{fuzzy_ms:>18.1f}"
+        for kind, kind_findings in findings.items():
+            started = time.perf_counter()
+            statuses = [index.locate(*finding).status for finding in kind_findings]
+            per_finding = (time.perf_counter() - started) * 1000 / len(kind_findings)
+            row += f"{per_finding:>8.3f} {sum(status != 'unverified' for status in statuses):>3}/{len(statuses):<4}"
+        print(row)
+    print("\nTimes are per finding; the fraction is how many were found.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--copies", type=int, nargs="+", default=[1, 10, 50], help="How many times to repeat the sample transcript")
+    parser.add_argument("--findings", type=int, default=300, help="Findings to check per document, split evenly over the kinds")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for picking quotes")
+    args = parser.parse_args()
+    run(args.copies, args.findings, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark the relevance pre-filter for innocence analysis.
+
+Repeats the sample transcript to the requested lengths and compares sending the whole
+document with sending only the selected lines. Gemini is replaced by a fake model whose
+latency is a fixed overhead plus a cost per thousand prompt tokens, as with real prefill.
+
+Usage:
+    python benchmark_context_filter.py --copies 1 10 40 --keep-ratio 0.1 --context-lines 2
+"""
+
+import argparse
+import asyncio
+import time
+
+from api.core.config import config
+from api.services.analysis import INNOCENCE_ANALYSIS_PROMPT
+from api.services.chunked_analysis import CHARS_PER_TOKEN
+from api.services.document import ExtractedDocument
+from api.services.fake_gemini import FakeGenerativeModel
+from api.services.pdf_service import GeminiService, pdf_service
+from api.services.relevance import select_relevant_lines
+
+PDF_FILE_PATH = "pdf/Young-AK2960-2024-10-24.pdf"
+
+
+class PrefillLatencyModel(FakeGenerativeModel):
+    """Fake model whose latency is a fixed overhead plus a cost per thousand prompt tokens."""
+
+    def __init__(self, base_latency: float, seconds_per_1k_tokens: float):
+        super().__init__(responder=lambda prompt: '{"findings": [], "summary": {}}')
+        self.base_latency = base_latency
+        self.seconds_per_1k_tokens = seconds_per_1k_tokens
+
+    async def generate_content_async(self, contents, **kwargs):
+        self.latency = self.base_latency + len(str(contents)) / CHARS_PER_TOKEN / 1000 * self.seconds_per_1k_tokens
+        return await super().generate_content_async(contents, **kwargs)
+
+
+async def timed_analysis(service: GeminiService, document) -> float:
+    started = time.perf_counter()
+    await service.process_text_with_ai_async(document, INNOCENCE_ANALYSIS_PROMPT)
+    return time.perf_counter() - started
+
+
+async def run(copies_list: list[int], base_latency: float, seconds_per_1k_tokens: float) -> None:
+    with open(PDF_FILE_PATH, "rb") as f:
+        pages = pdf_service.extract_text_from_pdf(f.read()).page_texts()
+
+    service = GeminiService(model=PrefillLatencyModel(base_latency, seconds_per_1k_tokens))
+    print(f"keep ratio: {config.RELEVANCE_KEEP_RATIO}, context lines: {config.RELEVANCE_CONTEXT_LINES}\n")
+    print(f"{'pages':>6}{'tokens':>9}{'kept':>8}{'reduction':>11}{'select (ms)':>13}{'full (s)':>10}{'filtered (s)':>14}")
+    for copies in copies_list:
+        document = ExtractedDocument(pages * copies)
+        selection = select_relevant_lines(document)
+        stats = selection.stats()
+        full = await timed_analysis(service, document)
+        filtered = await timed_analysis(service, selection.excerpt) + stats["selection_ms"] / 1000
+        print(
+            f"{document.page_count:>6}{stats['original_tokens']:>9}{stats['selected_tokens']:>8}{stats['token_reduction']:>10.1%}"
+            f"{stats['selection_ms']:>13.1f}{full:>10.2f}{filtered:>14.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--copies", type=int, nargs="+", default=[1, 10, 40], help="How many times to repeat the sample transcript")
+    parser.add_argument("--keep-ratio", type=float, default=config.RELEVANCE_KEEP_RATIO, help="Share of lines kept as seeds")
+    parser.add_argument("--context-lines", type=int, default=config.RELEVANCE_CONTEXT_LINES, help="Context lines around each seed")
+    parser.add_argument("--base-latency", type=float, default=0.3, help="Fixed seconds per model call")
+    parser.add_argument("--seconds-per-1k-tokens", type=float, default=0.02, help="Extra seconds per 1000 prompt tokens")
+    args = parser.parse_args()
+
+    config.RELEVANCE_KEEP_RATIO = args.keep_ratio
+    config.RELEVANCE_CONTEXT_LINES = args.context_lines
+    asyncio.run(run(args.copies, args.base_latency, args.seconds_per_1k_tokens))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Benchmark the table-driven demographics extractor against the previous per-line checks.
+
+Repeats the sample transcript's pages up to each requested page count and reports
+throughput in lines per second for both implementations (over already numbered lines),
+plus the fields each one found.
+
+Usage:
+    python benchmark_demographics_extractor.py --pages 10 100 1000 --repeat 3
+"""
+
+import argparse
+import time
+
+from api.services.demographics_extractor import demographics_extractor
+from api.services.document import DocumentLine, ExtractedDocument
+from api.services.pdf_service import pdf_service
+
+PDF_FILE_PATH = "pdf/Young-AK2960-2024-10-24.pdf"
+COMPARED_FIELDS = [
+    "clientInfo.name",
+    "clientInfo.cdcrNumber",
+    "attorneyInfo.currentAttorneyForIncarceratedPerson.name",
+    "convictionInfo.charges",
+    "convictionInfo.sentenceLength",
+    "prisonRecord.programming",
+    "prisonRecord.conduct",
+]
+
+
+def previous_demographics(lines: list[DocumentLine]) -> dict:
+    """The offline demographics extractor as it was before the rule table."""
+    # Initialize demographics object
+    demographics = {
+        "clientInfo": {"name": "", "cdcrNumber": "", "dateOfBirth": "", "contactInfo": ""},
+        "introduction": {"shortSummary": ""},
+        "evidenceUsedToConvict": [],
+        "potentialTheory": "",
+        "convictionInfo": {
+            "dateOfCrime": "",
+            "locationOfCrime": "",
+            "dateOfArrest": "",
+            "charges": "",
+            "dateOfConviction": "",
+            "sentenceLength": "",
+            "county": "",
+            "trialOrPlea": "",
+        },
+        "appealInfo": {"directAppealFiled": "", "appellateCourtCaseNumber": "", "dateDecided": "", "result": "", "habenasFilings": []},
+        "attorneyInfo": {
+            "currentAttorneyForIncarceratedPerson": {
+                "name": "",
+                "title": "",
+                "firm": "",
+                "address": "",
+                "phone": "",
+                "email": "",
+                "presentAtHearing": False,
+                "representationContext": "",
+            },
+            "trialAttorney": {"name": "", "address": "", "phone": "", "caseNumber": "", "appointedOrRetained": ""},
+            "appellateAttorney": {"name": "", "address": "", "phone": "", "caseNumbers": "", "courtLevel": ""},
+            "otherLegalRepresentation": [],
+        },
+        "newEvidence": [],
+        "codefendants": "",
+        "physicalDescription": {"height": "", "weight": "", "race": "", "build": "", "distinguishingMarks": ""},
+        "victimInfo": {"name": "", "relationship": ""},
+        "prisonRecord": {"conduct": "", "programming": "", "support": ""},
+    }
+
+    # Extract information from text
+    for _, _, line in lines:
+        line_lower = line.lower()
+
+        # Client Info
+        if "emmanuel young" in line_lower:
+            demographics["clientInfo"]["name"] = "Emmanuel Young"
+        if "cdcr number:" in line_lower or "cdc number" in line_lower:
+            if "ak2960" in line_lower:
+                demographics["clientInfo"]["cdcrNumber"] = "AK2960"
+
+        # Attorney Info - Look for common attorney patterns
+        attorney_patterns = [
+            "attorney for incarcerated person",
+            "counsel for",
+            "representing",
+            "attorney present",
+            "legal counsel",
+            "public defender",
+            "defense attorney",
+        ]
+
+        if any(phrase in line_lower for phrase in attorney_patterns):
+            # Extract attorney name and context
+            if "attorney for incarcerated person" in line_lower:
+                demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["representationContext"] = "Attorney for Incarcerated Person"
+                demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["presentAtHearing"] = True
+                # Try to extract name from the line
+                if ":" in line:
+                    parts = line.split(":")
+                    if len(parts) > 1:
+                        potential_name = parts[1].strip().rstrip(".")
+                        if len(potential_name) > 2 and len(potential_name) < 50:
+                            demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["name"] = potential_name
+
+            elif "counsel for" in line_lower:
+                demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["representationContext"] = "Legal Counsel"
+                demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["presentAtHearing"] = True
+                # Try to extract name
+                if ":" in line:
+                    parts = line.split(":")
+                    if len(parts) > 1:
+                        potential_name = parts[1].strip().rstrip(".")
+                        if len(potential_name) > 2 and len(potential_name) < 50:
+                            demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["name"] = potential_name
+
+            elif "representing" in line_lower and ("attorney" in line_lower or "counsel" in line_lower):
+                demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["representationContext"] = "Legal Representation"
+                demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["presentAtHearing"] = True
+                # Try to extract attorney name after "attorney" or "counsel"
+                if "attorney" in line_lower:
+                    attorney_index = line_lower.find("attorney")
+                    remaining = line[attorney_index + 8 :].strip()
+                    if remaining and len(remaining) < 50:
+                        demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["name"] = remaining
+                        demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["title"] = "Attorney"
+
+            elif "attorney present" in line_lower:
+                demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["representationContext"] = "Attorney Present"
+                demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["presentAtHearing"] = True
+                # Try to extract name after ":"
+                if ":" in line:
+                    parts = line.split(":")
+                    if len(parts) > 1:
+                        potential_name = parts[1].strip().rstrip(".")
+                        if len(potential_name) > 2 and len(potential_name) < 50:
+                            demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["name"] = potential_name
+
+            elif "legal counsel" in line_lower:
+                demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["representationContext"] = "Legal Counsel"
+                demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["presentAtHearing"] = True
+                # Try to extract name after ":"
+                if ":" in line:
+                    parts = line.split(":")
+                    if len(parts) > 1:
+                        potential_name = parts[1].strip().rstrip(".")
+                        if len(potential_name) > 2 and len(potential_name) < 50:
+                            demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["name"] = potential_name
+
+        # Look for attorney names that might appear in speaker identification
+        if (line_lower.startswith("attorney") or line_lower.startswith("counsel")) and ":" in line:
+            speaker_part = line.split(":")[0].strip()
+            if len(speaker_part) > 5 and len(speaker_part) < 50 and not demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["name"]:
+                demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["name"] = speaker_part
+                demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["presentAtHearing"] = True
+                demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]["title"] = (
+                    "Attorney" if "attorney" in speaker_part.lower() else "Counsel"
+                )
+                demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"][
+                    "representationContext"
+                ] = "Speaking at Hearing"  # Conviction Info
+        if "second-degree murder" in line_lower:
+            demographics["convictionInfo"]["charges"] = "Second-degree murder with enhancements"
+        if "15 years" in line_lower and "life" in line_lower:
+            demographics["convictionInfo"]["sentenceLength"] = "15 years to life with enhancements"
+
+        # Prison Record
+        if "programming" in line_lower and ("gogi" in line_lower or "avp" in line_lower):
+            demographics["prisonRecord"]["programming"] = "Limited programming completed; GOGI and AVP recommended"
+        if "115" in line_lower or "disciplinary" in line_lower:
+            demographics["prisonRecord"]["conduct"] = "Recent disciplinary issues noted by board"
+
+    # Add summary
+    demographics["introduction"][
+        "shortSummary"
+    ] = "Parole hearing for individual serving life sentence for second-degree murder. Board noted disciplinary concerns and recommended additional programming."
+
+    # Add evidence used to convict
+    demographics["evidenceUsedToConvict"] = ["Victim testimony", "Witness statements", "Physical evidence from crime scene"]
+
+    # Add potential theory
+    demographics["potentialTheory"] = "Domestic violence incident involving substance abuse and relationship conflict"
+
+    # Add victim info
+    demographics["victimInfo"]["relationship"] = "Acquaintance known for approximately 5 months"
+
+    return demographics
+
+
+def field(demographics: dict, path: str) -> str:
+    for key in path.split("."):
+        demographics = demographics[key]
+    return demographics
+
+
+def best_time(func, repeat: int) -> tuple[float, dict]:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def run(page_counts: list[int], repeat: int) -> None:
+    with open(PDF_FILE_PATH, "rb") as f:
+        sample_pages = pdf_service.extract_text_from_pdf(f.read()).page_texts()
+
+    print(f"{'pages':>6}{'lines':>8}{'previous (lines/s)':>20}{'rule table (lines/s)':>22}{'speed-up':>10}")
+    for pages in page_counts:
+        document = ExtractedDocument((sample_pages * (pages // len(sample_pages) + 1))[:pages])
+        lines = list(document.lines())
+        line_count = len(lines)
+        previous_s, previous = best_time(lambda: previous_demographics(lines), repeat)
+        table_s, extracted = best_time(lambda: demographics_extractor.mock_demographics(lines), repeat)
+        print(f"{pages:>6}{line_count:>8}{line_count / previous_s:>20,.0f}{line_count / table_s:>22,.0f}{previous_s / table_s:>9.1f}x")
+
+    print(f"\n{'field':<56}{'previous':<42}rule table")
+    for path in COMPARED_FIELDS:
+        print(f"{path:<56}{str(field(previous, path))[:40]:<42}{field(extracted, path)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 1000], help="Document sizes to test")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+    run(args.pages, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark /file/list listing against the fake GCS server.
+
+Fills a bucket with many objects and compares the previous listing (every object, each
+with a signed URL) with one page of the paginated listing, unsigned and signed, and with
+the same page served again from the listing cache.
+
+Usage:
+    python benchmark_file_list.py --objects 10000 --page-size 100 --latency 0.02
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from api.services import gcs_client
+from api.services.fake_gcs import FakeGCSServer, write_fake_service_account
+
+BUCKET = "benchmark"
+
+
+def list_everything_signed() -> int:
+    """The previous list_files: iterate the whole bucket and sign every object."""
+    blobs = gcs_client.get_client().list_blobs(BUCKET, page_size=1000)
+    sign = {"version": "v4", "expiration": 3600, "method": "GET", "credentials": gcs_client._signing_credentials}
+    files = [blob.generate_signed_url(**sign) for blob in blobs]
+    return len(files)
+
+
+def timed(label: str, func) -> None:
+    started = time.perf_counter()
+    count = func()
+    print(f"{label:<28}{count:>8}{(time.perf_counter() - started) * 1000:>12.1f}")
+
+
+def run(objects: int, page_size: int, latency: float) -> None:
+    with tempfile.TemporaryDirectory() as tmp, FakeGCSServer(latency=latency) as server:
+        os.environ["STORAGE_EMULATOR_HOST"] = server.url
+        gcs_client.SERVICE_ACCOUNT_JSON = write_fake_service_account(os.path.join(tmp, "service-account.json"))
+        gcs_client.BUCKET_NAME = BUCKET
+        for i in range(objects):
+            server.put(BUCKET, f"transcripts/{i:06d}.pdf", b"%PDF-1.4")
+
+        print(f"{objects} objects, page size {page_size}, {latency * 1000:.0f} ms per request\n")
+        print(f"{'listing':<28}{'files':>8}{'time (ms)':>12}")
+        timed("all objects, signed", list_everything_signed)
+        timed("one page", lambda: len(gcs_client.list_files(page_size=page_size)["files"]))
+        timed("one page, cached", lambda: len(gcs_client.list_files(page_size=page_size)["files"]))
+        timed("one page, cached, signed", lambda: len(gcs_client.list_files(page_size=page_size, sign=True)["files"]))
+        gcs_client.close_client()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--objects", type=int, default=10000, help="Objects in the bucket")
+    parser.add_argument("--page-size", type=int, default=100, help="Files per listing page")
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds the fake server waits per request")
+    args = parser.parse_args()
+    run(args.objects, args.page_size, args.latency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark the per-upload overhead of the shared GCS client.
+
+Uploads small files to the in-process fake GCS server, first building a client the way
+gcs_client used to on every call (read the credential file, new client, new connections),
+then through the shared pooled client, and finally the same file over and over through the
+content-hash deduplicated store used by /file/upload. The fake server can add a delay per request and per
+new connection to stand in for network round trips and TLS handshakes.
+
+Usage:
+    python benchmark_gcs_upload.py --uploads 50 --size-kb 64 --latency 0.005 --connect-latency 0.03
+"""
+
+import argparse
+import hashlib
+import io
+import os
+import tempfile
+import time
+
+from google.auth.credentials import AnonymousCredentials
+from google.cloud import storage
+from google.oauth2 import service_account
+
+from api.services import gcs_client
+from api.services.fake_gcs import FakeGCSServer, write_fake_service_account
+
+BUCKET = "benchmark"
+
+
+def upload_with_new_client(data: bytes, name: str) -> str:
+    """The previous per-call setup; the fake server takes anonymous requests, so the credentials only sign."""
+    credentials = service_account.Credentials.from_service_account_file(gcs_client.SERVICE_ACCOUNT_JSON)
+    client = storage.Client(project=credentials.project_id, credentials=AnonymousCredentials())
+    blob = client.bucket(BUCKET).blob(name)
+    blob.upload_from_file(io.BytesIO(data))
+    return blob.generate_signed_url(version="v4", expiration=3600, method="GET", credentials=credentials)
+
+
+def upload_with_shared_client(data: bytes, name: str) -> str:
+    return gcs_client.upload_file(io.BytesIO(data), name)
+
+
+def upload_deduplicated(data: bytes, name: str) -> str:
+    """/file/upload's path: hash, then store by content (only the first upload sends bytes)."""
+    return gcs_client.store_upload(io.BytesIO(data), hashlib.sha256(data).hexdigest(), len(data), name)["url"]
+
+
+def run(uploads: int, size_kb: int, latency: float, connect_latency: float) -> None:
+    data = b"%PDF-1.4\n" + os.urandom(size_kb * 1024)
+    with tempfile.TemporaryDirectory() as tmp, FakeGCSServer(latency=latency, connect_latency=connect_latency) as server:
+        os.environ["STORAGE_EMULATOR_HOST"] = server.url
+        gcs_client.SERVICE_ACCOUNT_JSON = write_fake_service_account(os.path.join(tmp, "service-account.json"))
+        gcs_client.BUCKET_NAME = BUCKET
+
+        print(f"{uploads} uploads of {size_kb} KB, {latency * 1000:.0f} ms per request, {connect_latency * 1000:.0f} ms per new connection\n")
+        print(f"{'client':>8}{'total (s)':>11}{'per upload (ms)':>17}{'connections':>13}")
+        for label, upload in (("new", upload_with_new_client), ("shared", upload_with_shared_client), ("dedup", upload_deduplicated)):
+            connections = server.connections
+            started = time.perf_counter()
+            for i in range(uploads):
+                upload(data, f"{label}-{i}.pdf")
+            elapsed = time.perf_counter() - started
+            print(f"{label:>8}{elapsed:>11.2f}{elapsed / uploads * 1000:>17.1f}{server.connections - connections:>13}")
+        gcs_client.close_client()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=50, help="Uploads per client setup")
+    parser.add_argument("--size-kb", type=int, default=64, help="Size of each uploaded file")
+    parser.add_argument("--latency", type=float, default=0.005, help="Seconds the fake server waits per request")
+    parser.add_argument("--connect-latency", type=float, default=0.03, help="Seconds the fake server waits per new connection")
+    args = parser.parse_args()
+    run(args.uploads, args.size_kb, args.latency, args.connect_latency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark the single-pass innocence classifier against the previous per-line analyzer.
+
+Repeats the sample transcript's pages up to each requested page count, checks that both
+produce the same findings and reports how long each takes. The offline analyzer keeps the
+first 10 findings, so the classifier is timed both with that limit and scanning everything.
+
+Usage:
+    python benchmark_innocence_classifier.py --pages 10 100 1000 --repeat 3
+"""
+
+import argparse
+import time
+
+from api.services.document import ExtractedDocument
+from api.services.innocence_classifier import innocence_classifier
+from api.services.innocence_rules import (
+    CONSISTENCY_WORDS,
+    EVIDENCE_KEYWORDS,
+    INNOCENCE_KEYWORDS,
+    PROCEDURAL_KEYWORDS,
+    RESPONSIBILITY_KEYWORDS,
+    RESPONSIBILITY_PRESSURE_WORDS,
+)
+from api.services.pdf_service import MOCK_INNOCENCE_FINDINGS, pdf_service
+
+PDF_FILE_PATH = "pdf/Young-AK2960-2024-10-24.pdf"
+
+
+def previous_findings(document: ExtractedDocument) -> list[dict]:
+    """The offline analyzer's findings loop as it was before the classifier, without the cut to 10."""
+    text = document.text
+    # Whole-document keyword checks the previous analyzer computed (and never used)
+    for keywords in (INNOCENCE_KEYWORDS, PROCEDURAL_KEYWORDS, EVIDENCE_KEYWORDS, RESPONSIBILITY_KEYWORDS):
+        any(keyword in text.lower() for keyword in keywords)
+
+    findings = []
+    for page_num, line_num, line in document.lines():
+        actual_text = line.strip()
+        speaker = "Unknown"
+        if "Commissioner" in actual_text or "Presiding" in actual_text:
+            speaker = "Commissioner"
+        elif "Emmanuel" in actual_text or "Young" in actual_text:
+            speaker = "Emmanuel Young"
+        elif "Attorney" in actual_text or "Mbelu" in actual_text:
+            speaker = "Attorney"
+
+        def finding(category: str, significance: str) -> dict:
+            quote = actual_text[:200] + "..." if len(actual_text) > 200 else actual_text
+            return {"quote": quote, "speaker": speaker, "page": page_num, "line": line_num, "category": category, "significance": significance}
+
+        if any(word in actual_text.lower() for word in RESPONSIBILITY_PRESSURE_WORDS):
+            if len(actual_text) > 20:
+                findings.append(finding("responsibility_pressure", "Board member pressuring defendant to accept responsibility or show remorse"))
+        elif any(word in actual_text.lower() for word in PROCEDURAL_KEYWORDS):
+            if len(actual_text) > 20:
+                findings.append(finding("procedural_issue", "Reference to legal representation or procedural matters"))
+        elif any(word in actual_text.lower() for word in CONSISTENCY_WORDS):
+            if len(actual_text) > 20:
+                findings.append(finding("consistency_statement", "Statement addressing consistency or inconsistency of accounts"))
+        elif any(word in actual_text.lower() for word in ["right", "yes", "no", "correct"]) and len(actual_text) < 50:
+            findings.append(finding("behavioral_clarity", "Direct, clear response to questioning"))
+    return findings
+
+
+def best_time(func, repeat: int) -> tuple[float, object]:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def run(page_counts: list[int], repeat: int) -> None:
+    with open(PDF_FILE_PATH, "rb") as f:
+        sample_pages = pdf_service.extract_text_from_pdf(f.read()).page_texts()
+
+    print(f"{'pages':>6}{'lines':>8}{'previous (ms)':>15}{'full scan (ms)':>16}{'speed-up':>10}{'first 10 (ms)':>15}{'findings':>10}")
+    for pages in page_counts:
+        document = ExtractedDocument((sample_pages * (pages // len(sample_pages) + 1))[:pages])
+        line_count = sum(1 for _ in document.lines())
+
+        previous_s, expected = best_time(lambda: previous_findings(document), repeat)
+        full_s, findings = best_time(lambda: innocence_classifier.classify(document.lines()), repeat)
+        limited_s, first = best_time(lambda: innocence_classifier.classify(document.lines(), limit=MOCK_INNOCENCE_FINDINGS), repeat)
+        assert findings == expected, f"findings differ at {pages} pages"
+        assert first == expected[:MOCK_INNOCENCE_FINDINGS], f"first findings differ at {pages} pages"
+
+        print(
+            f"{pages:>6}{line_count:>8}{previous_s * 1000:>15.1f}{full_s * 1000:>16.1f}{previous_s / full_s:>9.1f}x"
+            f"{limited_s * 1000:>15.2f}{len(findings):>10}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 1000], help="Document sizes to test")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+    run(args.pages, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark throughput and memory of large GCS uploads.
+
+Uploads a file of the requested size to the fake GCS server, which runs in its own process
+so that only the uploader's memory is measured. Compares the previous upload
+(blob.upload_from_file with the library's default 100 MB chunks) with upload_file at a few
+chunk sizes, reporting MB/s and the peak Python memory allocated while uploading.
+
+Usage:
+    python benchmark_large_upload.py --size-mb 100 --chunk-mb 1 8 32
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from api.core.config import config
+from api.services import gcs_client
+from api.services.fake_gcs import write_fake_service_account
+
+BUCKET = "benchmark"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure(label: str, upload, size_mb: int) -> None:
+    tracemalloc.start()
+    started = time.perf_counter()
+    upload()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:<22}{elapsed:>10.2f}{size_mb / elapsed:>10.1f}{peak / 1024 / 1024:>19.1f}")
+
+
+def run(size_mb: int, chunk_sizes: list[float]) -> None:
+    port = free_port()
+    server = subprocess.Popen([sys.executable, "-m", "api.services.fake_gcs", "--port", str(port)], stdout=subprocess.PIPE, text=True)
+    try:
+        server.stdout.readline()
+        with tempfile.TemporaryDirectory() as tmp:
+            os.environ["STORAGE_EMULATOR_HOST"] = f"http://127.0.0.1:{port}"
+            gcs_client.SERVICE_ACCOUNT_JSON = write_fake_service_account(os.path.join(tmp, "service-account.json"))
+            gcs_client.BUCKET_NAME = BUCKET
+            path = os.path.join(tmp, "upload.pdf")
+            with open(path, "wb") as f:
+                for _ in range(size_mb):
+                    f.write(os.urandom(1024 * 1024))
+
+            print(f"{size_mb} MB file\n")
+            print(f"{'upload':<22}{'time (s)':>10}{'MB/s':>10}{'peak memory (MB)':>19}")
+            with open(path, "rb") as f:
+                measure("upload_from_file", lambda: gcs_client.get_bucket().blob("previous.pdf").upload_from_file(f), size_mb)
+            for chunk_mb in chunk_sizes:
+                config.GCS_UPLOAD_CHUNK_MB = chunk_mb
+                with open(path, "rb") as f:
+                    measure(f"chunked, {chunk_mb:g} MB", lambda: gcs_client.upload_file(f, "chunked.pdf", size_mb * 1024 * 1024), size_mb)
+            gcs_client.close_client()
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=100, help="Size of the uploaded file")
+    parser.add_argument("--chunk-mb", type=float, nargs="+", default=[1, 8, 32], help="Chunk sizes to compare")
+    args = parser.parse_args()
+    run(args.size_mb, args.chunk_mb)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark sequential vs. process-pool PDF text extraction.
+
+Builds a synthetic multi-page transcript in memory and reports extraction time
+and speed-up for each process count.
+
+Usage:
+    python benchmark_parallel_extraction.py --pages 400 --processes 1 2 4 8
+"""
+
+import argparse
+import io
+import os
+import time
+
+import PyPDF2
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+from api.services.parallel_extraction import extract_pages_parallel, shutdown_pool
+
+SPEAKERS = ["PRESIDING COMMISSIONER RUFF", "DEPUTY COMMISSIONER WEILBACHER", "ATTORNEY MBELU", "INCARCERATED PERSON"]
+
+
+def build_pdf(pages: int) -> bytes:
+    """Create a transcript-like PDF with the given number of pages."""
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter)
+    width, height = letter
+    for page_num in range(1, pages + 1):
+        c.setFont("Helvetica", 11)
+        c.drawString(width - 60, height - 40, str(page_num))
+        y_position = height - 70
+        for line_num in range(1, 26):
+            speaker = SPEAKERS[(page_num + line_num) % len(SPEAKERS)]
+            c.drawString(50, y_position, f"{speaker}:  Statement {line_num} on page {page_num} about the version of events. {line_num}")
+            y_position -= 26
+        c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+
+def extract_sequential(pdf_file: bytes) -> list[str]:
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_file))
+    return [page.extract_text() for page in pdf_reader.pages]
+
+
+def time_call(func, repeat: int) -> tuple[float, list[str]]:
+    best = float("inf")
+    result: list[str] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=400, help="Number of pages in the synthetic PDF")
+    parser.add_argument("--processes", type=int, nargs="+", default=None, help="Process counts to benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per configuration (best time is reported)")
+    args = parser.parse_args()
+
+    cpu_count = os.cpu_count() or 1
+    process_counts = args.processes or sorted({1, 2, 4, 8, cpu_count} & set(range(1, cpu_count + 1))) or [1]
+
+    print(f"Building {args.pages}-page PDF...")
+    pdf_file = build_pdf(args.pages)
+    print(f"PDF size: {len(pdf_file) / 1024:.0f} KB, CPUs available: {cpu_count}\n")
+
+    baseline, expected = time_call(lambda: extract_sequential(pdf_file), args.repeat)
+    print(f"{'mode':<12}{'processes':>10}{'seconds':>10}{'speed-up':>10}")
+    print(f"{'sequential':<12}{1:>10}{baseline:>10.2f}{1.0:>10.2f}")
+
+    try:
+        for processes in process_counts:
+            # Warm up the pool so worker start-up is not counted
+            extract_pages_parallel(pdf_file, min(args.pages, processes), processes)
+            elapsed, pages = time_call(lambda: extract_pages_parallel(pdf_file, args.pages, processes), args.repeat)
+            if pages != expected:
+                raise SystemExit(f"Parallel extraction with {processes} processes returned different text")
+            print(f"{'parallel':<12}{processes:>10}{elapsed:>10.2f}{baseline / elapsed:>10.2f}")
+    finally:
+        shutdown_pool()
+
+
+if __name__ == "__main__":
+    main()
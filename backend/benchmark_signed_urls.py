@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark the signed URL cache.
+
+Signs URLs for a set of object names cold (every one an RSA signature) and warm (served from
+the cache), then times a signed /file/list page with the cache cold and warm. Signing is
+local, so the fake GCS server is only used for the listing.
+
+Usage:
+    python benchmark_signed_urls.py --objects 1000 --page-size 100
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from api.services import gcs_client
+from api.services.fake_gcs import FakeGCSServer, write_fake_service_account
+
+BUCKET = "benchmark"
+
+
+def timed(label: str, count: int, func) -> None:
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<30}{elapsed * 1000:>12.1f}{elapsed * 1e6 / count:>16.1f}")
+
+
+def run(objects: int, page_size: int) -> None:
+    names = [f"transcripts/{i:06d}.pdf" for i in range(objects)]
+    with tempfile.TemporaryDirectory() as tmp, FakeGCSServer() as server:
+        os.environ["STORAGE_EMULATOR_HOST"] = server.url
+        gcs_client.SERVICE_ACCOUNT_JSON = write_fake_service_account(os.path.join(tmp, "service-account.json"))
+        gcs_client.BUCKET_NAME = BUCKET
+        for name in names[:page_size]:
+            server.put(BUCKET, name, b"%PDF-1.4")
+
+        print(f"{'':<30}{'total (ms)':>12}{'per URL (us)':>16}")
+        timed(f"sign {objects} URLs, cold", objects, lambda: [gcs_client.signed_url(name, 1) for name in names])
+        timed(f"sign {objects} URLs, warm", objects, lambda: [gcs_client.signed_url(name, 1) for name in names])
+
+        gcs_client._signed_urls.clear()
+        gcs_client.list_files(page_size=page_size)
+        timed(f"list {page_size}, signed, cold", page_size, lambda: gcs_client.list_files(page_size=page_size, sign=True))
+        timed(f"list {page_size}, signed, warm", page_size, lambda: gcs_client.list_files(page_size=page_size, sign=True))
+        gcs_client.close_client()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--objects", type=int, default=1000, help="Object names to sign")
+    parser.add_argument("--page-size", type=int, default=100, help="Files in the listed page")
+    args = parser.parse_args()
+    run(args.objects, args.page_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite over synthetic parole hearing transcripts.
+
+For each transcript length it generates a PDF (api/services/synthetic_transcript.py) and times:
+PDF extraction with and without the extraction cache, the three offline analyzers (parole summary,
+demographics, innocence), the JSON cleanup of model output, and the /pdf routes end to end through
+a test client, with Gemini replaced by a fake model answering instantly with the offline analyzers'
+output. Caches that would turn repeats into hits (extraction, Gemini responses, results store) are
+off unless the benchmark is about them.
+
+Results are written as JSON (one entry per benchmark and length with min/median/mean/max in ms) so
+runs can be compared: --compare prints each median against an earlier run's.
+
+Usage:
+    python benchmark_suite.py --pages 1 10 100 1000 --repeat 5
+    python benchmark_suite.py --pages 100 --output after.json --compare before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable
+
+from fastapi.testclient import TestClient
+
+from api.core.config import config
+from api.services.analysis import DEMOGRAPHICS_EXTRACTION_PROMPT, INNOCENCE_ANALYSIS_PROMPT, parse_demographics, parse_innocence_analysis
+from api.services.document import ExtractedDocument
+from api.services.fake_gemini import FakeGenerativeModel
+from api.services.pdf_service import extraction_cache, gemini_service, pdf_service
+from api.services.results_store import results_store
+from api.services.synthetic_transcript import generate_transcript
+from main import app
+
+ROUTES = ["/pdf/extract-text", "/pdf/process", "/pdf/parole-summary", "/pdf/innocence-analysis"]
+
+
+def measure(name: str, pages: int, func: Callable[[], object], repeat: int, warmup: int) -> dict:
+    """Run func warmup + repeat times and summarize the timed runs in milliseconds."""
+    for _ in range(warmup):
+        func()
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - started) * 1000)
+    median = statistics.median(times)
+    return {
+        "name": name,
+        "pages": pages,
+        "repeat": repeat,
+        "min_ms": round(min(times), 3),
+        "median_ms": round(median, 3),
+        "mean_ms": round(statistics.fmean(times), 3),
+        "max_ms": round(max(times), 3),
+        "per_page_ms": round(median / pages, 4),
+    }
+
+
+def fenced(text: str) -> str:
+    """Model output as Gemini often sends it, wrapped in a markdown code block."""
+    return f"```json\n{text}\n```"
+
+
+def fake_model(document: ExtractedDocument) -> FakeGenerativeModel:
+    """A model answering each prompt with the offline analyzer's output for this document, instantly."""
+    summary = gemini_service._generate_mock_parole_summary(document)
+    demographics = fenced(gemini_service._generate_mock_demographics(document))
+    innocence = fenced(gemini_service._generate_mock_innocence_analysis(document))
+
+    def respond(prompt: str) -> str:
+        if INNOCENCE_ANALYSIS_PROMPT.strip()[:200] in prompt:
+            return innocence
+        if DEMOGRAPHICS_EXTRACTION_PROMPT.strip()[:200] in prompt:
+            return demographics
+        return summary
+
+    return FakeGenerativeModel(responder=respond)
+
+
+def run_pages(pages: int, repeat: int, warmup: int, seed: int) -> list[dict]:
+    results = []
+    started = time.perf_counter()
+    transcript = generate_transcript(pages, seed)
+    pdf = transcript.pdf()
+    results.append({**measure("generate_pdf", pages, lambda: generate_transcript(pages, seed).pdf(), 1, 0), "pdf_bytes": len(pdf)})
+
+    # Extraction, every call a miss, then every call a memory hit
+    memory_items, disk_dir, memory = extraction_cache.memory_items, extraction_cache.disk_dir, dict(extraction_cache._memory)
+    extraction_cache.memory_items, extraction_cache.disk_dir = 0, None
+    extraction_cache._memory.clear()
+    results.append(measure("extract_text_from_pdf", pages, lambda: pdf_service.extract_text_from_pdf(pdf), repeat, warmup))
+    extraction_cache.memory_items = max(memory_items, 1)
+    document = pdf_service.extract_text_from_pdf(pdf)
+    results.append(measure("extract_text_from_pdf_cached", pages, lambda: pdf_service.extract_text_from_pdf(pdf), repeat, warmup))
+
+    # Offline analyzers and the cleanup of their output as a model would send it
+    results.append(measure("mock_parole_summary", pages, lambda: gemini_service._generate_mock_parole_summary(document), repeat, warmup))
+    results.append(measure("mock_demographics", pages, lambda: gemini_service._generate_mock_demographics(document), repeat, warmup))
+    results.append(measure("mock_innocence_analysis", pages, lambda: gemini_service._generate_mock_innocence_analysis(document), repeat, warmup))
+    demographics_raw = fenced(gemini_service._generate_mock_demographics(document))
+    innocence_raw = fenced(gemini_service._generate_mock_innocence_analysis(document))
+    results.append(measure("parse_demographics", pages, lambda: parse_demographics(demographics_raw), repeat, warmup))
+    results.append(measure("parse_innocence_analysis", pages, lambda: parse_innocence_analysis(innocence_raw), repeat, warmup))
+
+    # Full routes with a stubbed model; the extraction cache is off again so every request extracts
+    extraction_cache.memory_items = 0
+    extraction_cache._memory.clear()
+    original_model, original_cache, original_results_path = gemini_service.model, gemini_service.response_cache, results_store.path
+    gemini_service.model, gemini_service.response_cache = fake_model(document), None
+    results_store.close()
+    results_store.path = ""
+    try:
+        with TestClient(app) as client:
+            for route in ROUTES:
+
+                def post(route: str = route) -> None:
+                    response = client.post(route, files={"file": ("synthetic.pdf", pdf, "application/pdf")})
+                    if response.status_code != 200:
+                        raise RuntimeError(f"{route} answered {response.status_code}: {response.text[:200]}")
+
+                results.append(measure(f"route {route}", pages, post, repeat, warmup))
+    finally:
+        gemini_service.model, gemini_service.response_cache, results_store.path = original_model, original_cache, original_results_path
+        extraction_cache.memory_items, extraction_cache.disk_dir = memory_items, disk_dir
+        extraction_cache._memory.clear()
+        extraction_cache._memory.update(memory)
+
+    print(f"  {pages} pages done in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return results
+
+
+def metadata(args: argparse.Namespace) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "extraction_processes": config.EXTRACTION_PROCESSES,
+        "args": {"pages": args.pages, "repeat": args.repeat, "warmup": args.warmup, "seed": args.seed},
+    }
+
+
+def print_table(results: list[dict], baseline: dict[tuple, dict]) -> None:
+    header = f"{'benchmark':<34}{'pages':>6}{'median ms':>12}{'min ms':>10}{'ms/page':>10}"
+    print(header + (f"{'baseline':>12}{'change':>9}" if baseline else ""))
+    for entry in results:
+        row = f"{entry['name']:<34}{entry['pages']:>6}{entry['median_ms']:>12.2f}{entry['min_ms']:>10.2f}{entry['per_page_ms']:>10.3f}"
+        before = baseline.get((entry["name"], entry["pages"]))
+        if before:
+            row += f"{before['median_ms']:>12.2f}{(entry['median_ms'] / before['median_ms'] - 1) * 100:>+8.1f}%"
+        print(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100], help="Transcript lengths to benchmark (1-1000 pages)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs before the timed ones")
+    parser.add_argument("--seed", type=int, default=0, help="Transcript generator seed")
+    parser.add_argument("--output", help="JSON file for the results (default: .cache/benchmarks/suite-<time>.json)")
+    parser.add_argument("--compare", help="Results JSON of an earlier run to compare medians against")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {(entry["name"], entry["pages"]): entry for entry in json.load(f)["results"]}
+
+    results = []
+    for pages in args.pages:
+        results.extend(run_pages(pages, args.repeat, args.warmup, args.seed))
+
+    output = args.output or os.path.join(".cache", "benchmarks", f"suite-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    if os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({"metadata": metadata(args), "results": results}, f, indent=2)
+
+    print_table(results, baseline)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
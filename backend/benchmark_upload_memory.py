@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Compare peak RSS of the old read-everything upload handling with streaming ingestion.
+
+Each mode runs in a fresh subprocess. The upload is first spooled to a
+SpooledTemporaryFile the way Starlette does it, then the mode under test validates
+it and opens it with PyPDF2. The reported number is the growth of peak RSS
+during that step.
+
+Usage:
+    python benchmark_upload_memory.py --size-mb 9
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+import PyPDF2
+from starlette.datastructures import UploadFile
+
+from api.services.ingestion import ingest_pdf_upload
+from api.services.pdf_service import pdf_service
+
+STARLETTE_SPOOL_MAX_SIZE = 1024 * 1024
+
+
+def build_pdf(path: str, size_mb: float) -> None:
+    """Write a valid one-page PDF padded to roughly size_mb with an incompressible attachment."""
+    writer = PyPDF2.PdfWriter()
+    writer.add_blank_page(width=612, height=792)
+    writer.add_attachment("padding.bin", os.urandom(int(size_mb * 1024 * 1024)))
+    with open(path, "wb") as f:
+        writer.write(f)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def spooled_upload(path: str) -> UploadFile:
+    spool = tempfile.SpooledTemporaryFile(max_size=STARLETTE_SPOOL_MAX_SIZE)
+    with open(path, "rb") as f:
+        while chunk := f.read(64 * 1024):
+            spool.write(chunk)
+    spool.seek(0)
+    return UploadFile(spool, size=os.path.getsize(path), filename="transcript.pdf")
+
+
+async def legacy(upload: UploadFile) -> int:
+    """Previous route behaviour: read the whole body, validate, copy into BytesIO."""
+    file_content = await upload.read()
+    pdf_service.validate_pdf_file("application/pdf", len(file_content))
+    return len(PyPDF2.PdfReader(io.BytesIO(file_content)).pages)
+
+
+async def streaming(upload: UploadFile) -> int:
+    """Chunked ingestion; PyPDF2 reads the spooled file directly."""
+    ingested = await ingest_pdf_upload(upload)
+    return len(PyPDF2.PdfReader(ingested.file).pages)
+
+
+def run_child(mode: str, path: str) -> None:
+    upload = spooled_upload(path)
+    before = peak_rss_mb()
+    asyncio.run({"legacy": legacy, "streaming": streaming}[mode](upload))
+    print(f"{peak_rss_mb() - before:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=9, help="Approximate upload size in MB (must be under MAX_FILE_SIZE)")
+    parser.add_argument("--child", choices=["legacy", "streaming"], help=argparse.SUPPRESS)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.path)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "upload.pdf")
+        build_pdf(path, args.size_mb)
+        print(f"Upload size: {os.path.getsize(path) / (1024 * 1024):.1f} MB\n")
+        print(f"{'mode':<12}{'peak RSS growth (MB)':>22}")
+        for mode in ("legacy", "streaming"):
+            output = subprocess.run(
+                [sys.executable, __file__, "--child", mode, "--path", path], capture_output=True, text=True, check=True
+            ).stdout.strip()
+            print(f"{mode:<12}{output.splitlines()[-1]:>22}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Concurrent load generator for the /pdf and /file endpoints.
+
+Sends a weighted mix of requests (--mix endpoint=weight,...) with PDFs drawn from --files and
+generated transcripts (--synthetic-pages), keeping at most --concurrency requests in flight.
+With --rate, requests arrive as a Poisson process at that many per second (open model);
+without it, --concurrency clients send back to back (closed model). Latency is measured from
+each request's scheduled arrival, so time spent waiting for a free slot counts against it.
+
+Reports per endpoint: requests, errors (transport errors, HTTP >= 400, "success": false
+bodies and error events in streams), throughput, p50/p95/p99 latency, a latency histogram and
+status codes; streams also report time to first byte. The report is written as JSON and
+summarized in the terminal.
+
+Run against a server (--url) or in-process against the app (--in-process); with
+GEMINI_BACKEND=stand-in the model calls go to the local Gemini stand-in, so a whole run can
+be offline:
+    python -m api.services.gemini_standin --latency lognormal:1.5,0.4 --error-rate 0.02 &
+    GEMINI_BACKEND=stand-in python load_test.py --in-process --requests 200 --concurrency 16 --rate 8
+
+Usage:
+    python load_test.py --url http://localhost:8000 --requests 500 --concurrency 32
+    python load_test.py --mix parole-summary=1,extract-text=3 --duration 60 --rate 5 --synthetic-pages 10 100
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from typing import NamedTuple, Optional
+
+import httpx
+
+# name: (method, path, what the request carries)
+ENDPOINTS = {
+    "extract-text": ("POST", "/pdf/extract-text", "file"),
+    "process": ("POST", "/pdf/process", "file"),
+    "parole-summary": ("POST", "/pdf/parole-summary", "file"),
+    "innocence-analysis": ("POST", "/pdf/innocence-analysis", "file"),
+    "process-stream": ("POST", "/pdf/process/stream", "stream"),
+    "parole-summary-stream": ("POST", "/pdf/parole-summary/stream", "stream"),
+    "batch": ("POST", "/pdf/batch", "batch"),
+    "file-upload": ("POST", "/file/upload", "file"),
+    "file-list": ("GET", "/file/list", None),
+    "file-url": ("GET", "/file/url/{name}", "name"),
+    "health": ("GET", "/health", None),
+}
+DEFAULT_MIX = "extract-text=4,parole-summary=2,innocence-analysis=2,process=1,file-list=1"
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is everything slower
+HISTOGRAM_BOUNDS_MS = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+BATCH_FILES = 3
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    """Parse "name=weight,..." into {name: weight}; a name without a weight weighs 1."""
+    mix = {}
+    for item in spec.split(","):
+        name, _, weight = item.strip().partition("=")
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"unknown endpoint {name!r} (expected one of {', '.join(ENDPOINTS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class Result(NamedTuple):
+    """Outcome of one request; latency and first_byte are seconds from its scheduled arrival."""
+
+    endpoint: str
+    status: str
+    ok: bool
+    latency: float
+    first_byte: Optional[float]
+    size: int
+
+
+class LoadGenerator:
+    """Sends the requests of one run with a shared client and collects a Result per request."""
+
+    def __init__(self, client: httpx.AsyncClient, files: list[tuple[str, bytes]], concurrency: int, seed: int = 0):
+        self.client = client
+        self.files = files
+        self.slots = asyncio.Semaphore(concurrency)
+        self.concurrency = concurrency
+        self.rng = random.Random(seed)
+        self.object_names: list[str] = []
+        self.results: list[Result] = []
+
+    def _pdf(self) -> tuple[str, bytes, str]:
+        name, data = self.rng.choice(self.files)
+        return name, data, "application/pdf"
+
+    async def seed_objects(self) -> None:
+        """Upload each file once (not measured) so file-url has stored objects to ask for."""
+        for name, data in self.files:
+            response = await self.client.post("/file/upload", files={"file": (name, data, "application/pdf")})
+            if response.status_code == 200:
+                self.object_names.append(response.json()["object_name"])
+
+    async def request(self, endpoint: str, arrival: float) -> None:
+        """Send one request once a slot is free; latency counts from its scheduled arrival."""
+        method, path, carries = ENDPOINTS[endpoint]
+        options: dict = {}
+        if carries in ("file", "stream"):
+            options["files"] = {"file": self._pdf()}
+        elif carries == "batch":
+            options["files"] = [("files", self._pdf()) for _ in range(BATCH_FILES)]
+        elif carries == "name":
+            path = path.format(name=self.rng.choice(self.object_names) if self.object_names else "missing.pdf")
+
+        async with self.slots:
+            first_byte = None
+            try:
+                if carries == "stream":
+                    status, ok, size, first_byte = await self._stream(method, path, options, arrival)
+                else:
+                    response = await self.client.request(method, path, **options)
+                    status, size = str(response.status_code), len(response.content)
+                    ok = response.status_code < 400 and self._succeeded(response)
+                    if endpoint == "file-upload" and ok:
+                        self.object_names.append(response.json()["object_name"])
+            except httpx.HTTPError as e:
+                status, ok, size = type(e).__name__, False, 0
+            self.results.append(Result(endpoint, status, ok, time.perf_counter() - arrival, first_byte, size))
+
+    async def _stream(self, method: str, path: str, options: dict, arrival: float) -> tuple[str, bool, int, Optional[float]]:
+        first_byte, size, ok = None, 0, True
+        async with self.client.stream(method, path, **options) as response:
+            async for line in response.aiter_lines():
+                if first_byte is None:
+                    first_byte = time.perf_counter() - arrival
+                size += len(line) + 1
+                ok = ok and line != "event: error"
+        return str(response.status_code), ok and response.status_code < 400, size, first_byte
+
+    @staticmethod
+    def _succeeded(response: httpx.Response) -> bool:
+        if not response.headers.get("content-type", "").startswith("application/json"):
+            return True
+        try:
+            return response.json().get("success", True) is not False
+        except (ValueError, AttributeError):
+            return True
+
+    async def run(self, mix: dict[str, float], requests: int, rate: float, duration: Optional[float]) -> float:
+        """Send `requests` requests (or as many as fit in `duration` seconds); returns the wall time."""
+        names, weights = list(mix), list(mix.values())
+        started = time.perf_counter()
+        deadline = started + duration if duration else None
+
+        def more(sent: int) -> bool:
+            return (deadline is None and sent < requests) or (deadline is not None and time.perf_counter() < deadline)
+
+        if rate > 0:
+            # Open model: arrivals on a Poisson schedule, whether or not earlier requests finished
+            tasks, arrival, sent = [], started, 0
+            while more(sent):
+                arrival += self.rng.expovariate(rate)
+                await asyncio.sleep(max(arrival - time.perf_counter(), 0))
+                tasks.append(asyncio.create_task(self.request(self.rng.choices(names, weights)[0], arrival)))
+                sent += 1
+            await asyncio.gather(*tasks)
+        else:
+            # Closed model: each client sends its next request as soon as the previous one is answered
+            sent = 0
+
+            async def client_loop() -> None:
+                nonlocal sent
+                while more(sent):
+                    sent += 1
+                    await self.request(self.rng.choices(names, weights)[0], time.perf_counter())
+
+            await asyncio.gather(*(client_loop() for _ in range(self.concurrency)))
+        return time.perf_counter() - started
+
+
+def percentile(sorted_values: list[float], share: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(max(math.ceil(len(sorted_values) * share) - 1, 0), len(sorted_values) - 1)]
+
+
+def latency_summary(seconds: list[float]) -> dict:
+    values = sorted(s * 1000 for s in seconds)
+    if not values:
+        return {}
+    return {
+        "mean": round(statistics.fmean(values), 2),
+        "p50": round(percentile(values, 0.5), 2),
+        "p95": round(percentile(values, 0.95), 2),
+        "p99": round(percentile(values, 0.99), 2),
+        "max": round(values[-1], 2),
+    }
+
+
+def histogram(seconds: list[float]) -> list[dict]:
+    counts = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+    for value in seconds:
+        counts[next((i for i, bound in enumerate(HISTOGRAM_BOUNDS_MS) if value * 1000 <= bound), len(HISTOGRAM_BOUNDS_MS))] += 1
+    return [{"le_ms": bound, "count": count} for bound, count in zip(HISTOGRAM_BOUNDS_MS + [None], counts)]
+
+
+def summarize(results: list[Result], wall_seconds: float) -> dict:
+    def stats(group: list[Result]) -> dict:
+        errors = sum(not r.ok for r in group)
+        summary = {
+            "requests": len(group),
+            "errors": errors,
+            "error_rate": round(errors / len(group), 4) if group else 0.0,
+            "throughput_rps": round(len(group) / wall_seconds, 2) if wall_seconds else 0.0,
+            "latency_ms": latency_summary([r.latency for r in group]),
+            "histogram": histogram([r.latency for r in group]),
+            "status_codes": {status: sum(r.status == status for r in group) for status in sorted({r.status for r in group})},
+            "bytes_received": sum(r.size for r in group),
+        }
+        first_bytes = [r.first_byte for r in group if r.first_byte is not None]
+        if first_bytes:
+            summary["first_byte_ms"] = latency_summary(first_bytes)
+        return summary
+
+    endpoints = sorted({r.endpoint for r in results})
+    return {
+        "wall_seconds": round(wall_seconds, 3),
+        "overall": stats(results),
+        "endpoints": {name: stats([r for r in results if r.endpoint == name]) for name in endpoints},
+    }
+
+
+def print_summary(report: dict) -> None:
+    print(f"{'endpoint':<24}{'requests':>9}{'errors':>8}{'err %':>7}{'req/s':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, stats in [*report["endpoints"].items(), ("all", report["overall"])]:
+        latency = stats["latency_ms"] or {"p50": 0, "p95": 0, "p99": 0}
+        print(
+            f"{name:<24}{stats['requests']:>9}{stats['errors']:>8}{stats['error_rate'] * 100:>6.1f}%{stats['throughput_rps']:>8.2f}"
+            f"{latency['p50']:>10.1f}{latency['p95']:>10.1f}{latency['p99']:>10.1f}"
+        )
+    for name, stats in report["endpoints"].items():
+        print(f"\n{name} latency histogram")
+        peak = max(bucket["count"] for bucket in stats["histogram"]) or 1
+        for bucket in stats["histogram"]:
+            if bucket["count"]:
+                label = f"<= {bucket['le_ms']} ms" if bucket["le_ms"] is not None else f"> {HISTOGRAM_BOUNDS_MS[-1]} ms"
+                print(f"  {label:>12} {'#' * max(round(40 * bucket['count'] / peak), 1)} {bucket['count']}")
+    print(f"\n{report['overall']['requests']} requests in {report['wall_seconds']:.1f}s")
+
+
+def load_files(paths: list[str], synthetic_pages: list[int], seed: int) -> list[tuple[str, bytes]]:
+    files = []
+    for path in paths:
+        with open(path, "rb") as f:
+            files.append((os.path.basename(path), f.read()))
+    if synthetic_pages:
+        from api.services.synthetic_transcript import generate_transcript
+
+        files += [(f"synthetic-{pages}p-{seed}.pdf", generate_transcript(pages, seed).pdf()) for pages in synthetic_pages]
+    return files
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main_async(args: argparse.Namespace) -> dict:
+    files = load_files(args.files, args.synthetic_pages, args.seed)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    if args.in_process:
+        from main import app
+
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://load-test", timeout=args.timeout)
+    else:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits)
+
+    async with client:
+        generator = LoadGenerator(client, files, args.concurrency, args.seed)
+        if "file-url" in args.mix:
+            await generator.seed_objects()
+        wall = await generator.run(args.mix, args.requests, args.rate, args.duration)
+
+    report = summarize(generator.results, wall)
+    report["metadata"] = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "target": "in-process" if args.in_process else args.url,
+        "files": [{"name": name, "bytes": len(data)} for name, data in files],
+        "args": {
+            "mix": args.mix,
+            "requests": args.requests,
+            "duration": args.duration,
+            "concurrency": args.concurrency,
+            "rate": args.rate,
+            "seed": args.seed,
+        },
+    }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000", help="Base URL of the API")
+    parser.add_argument("--in-process", action="store_true", help="Drive the app in this process instead of a server")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX), help=f"Endpoint weights (default {DEFAULT_MIX})")
+    parser.add_argument("--files", nargs="*", default=["pdf/Young-AK2960-2024-10-24.pdf"], help="PDFs to send")
+    parser.add_argument("--synthetic-pages", type=int, nargs="*", default=[], help="Also send generated transcripts of these lengths")
+    parser.add_argument("--requests", type=int, default=100, help="Requests to send")
+    parser.add_argument("--duration", type=float, help="Send for this many seconds instead of a fixed number of requests")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight at most")
+    parser.add_argument("--rate", type=float, default=0.0, help="Arrivals per second (Poisson); 0 sends back to back")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Seconds before a request counts as failed")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the endpoint/file choices and arrivals")
+    parser.add_argument("--output", help="JSON report path (default: .cache/load/load-<time>.json)")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    output = args.output or os.path.join(".cache", "load", f"load-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    if os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print_summary(report)
+    print(f"Report written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,34 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from api.core.config import config
+from api.core.upload_limits import UploadSizeLimitMiddleware
 from api.routes import health, pdf, file
+from api.services.gcs_client import close_client
+from api.services.jobs import job_queue
+from api.services.parallel_extraction import shutdown_pool
+from api.services.results_store import results_store
+from api.services.worker_pools import shutdown_pools
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background job workers; jobs left over from the last run are requeued
+    await job_queue.start()
+    yield
+    await job_queue.stop()
+    # Stop worker threads and extraction worker processes
+    shutdown_pools()
+    shutdown_pool()
+    # Close the shared GCS connections and the results database
+    close_client()
+    results_store.close()
+
 
 # Create FastAPI app
-app = FastAPI(title=config.API_TITLE, version=config.API_VERSION)
+app = FastAPI(title=config.API_TITLE, version=config.API_VERSION, lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -16,6 +39,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Reject oversized uploads before their body is parsed
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    max_body_size=config.MAX_REQUEST_SIZE,
+    path_limits={"/pdf/batch": config.BATCH_MAX_REQUEST_SIZE},
+)
+
 # Include routers
 app.include_router(health.router)
 app.include_router(pdf.router)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for /pdf/batch: per-file results, failure isolation, NDJSON streaming and the concurrency cap.
+
+Gemini is replaced by a fake model that records how many calls are in flight.
+Runs offline; works as a script or under pytest.
+"""
+
+import json
+
+from fastapi.testclient import TestClient
+
+from api.core.config import config
+from api.services.fake_gemini import FakeGenerativeModel
+from api.services.pdf_service import gemini_service
+from main import app
+
+PDF_FILE_PATH = "pdf/Young-AK2960-2024-10-24.pdf"
+MODEL_LATENCY = 0.1  # seconds per fake Gemini call
+BATCH_CONCURRENCY = 2
+
+
+class CountingModel(FakeGenerativeModel):
+    """Fake model that tracks the peak number of concurrent calls."""
+
+    def __init__(self):
+        super().__init__(latency=MODEL_LATENCY, responder=lambda prompt: '{"findings": [], "summary": {}}')
+        self.in_flight = 0
+        self.peak = 0
+
+    async def generate_content_async(self, contents, **kwargs):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            return await super().generate_content_async(contents, **kwargs)
+        finally:
+            self.in_flight -= 1
+
+
+def batch_files(pdf_bytes: bytes) -> list:
+    files = [("files", (f"transcript-{i}.pdf", pdf_bytes, "application/pdf")) for i in range(5)]
+    files.insert(2, ("files", ("notes.pdf", b"not a pdf", "application/pdf")))
+    return files
+
+
+def run_with_model(check) -> None:
+    original = gemini_service.model, gemini_service.response_cache, config.BATCH_CONCURRENCY
+    gemini_service.model = CountingModel()
+    # Identical files would otherwise be answered from the response cache
+    gemini_service.response_cache = None
+    config.BATCH_CONCURRENCY = BATCH_CONCURRENCY
+    try:
+        with open(PDF_FILE_PATH, "rb") as f:
+            check(TestClient(app), batch_files(f.read()))
+    finally:
+        gemini_service.model, gemini_service.response_cache, config.BATCH_CONCURRENCY = original
+
+
+def test_batch_isolates_failures_and_caps_concurrency():
+    def check(client, files):
+        body = client.post("/pdf/batch", files=files, data={"analysis_type": "innocence-analysis"}).json()
+
+        assert (body["total"], body["succeeded"], body["failed"]) == (6, 5, 1)
+        assert [result["filename"] for result in body["results"]][:3] == ["transcript-0.pdf", "transcript-1.pdf", "notes.pdf"]
+        assert body["results"][2] == {"success": False, "filename": "notes.pdf", "status_code": 400, "error": "Only PDF files are supported"}
+        assert body["results"][0]["innocence_analysis"]["findings"] == []
+        assert gemini_service.model.peak == BATCH_CONCURRENCY
+
+    run_with_model(check)
+
+
+def test_batch_streams_ndjson():
+    def check(client, files):
+        response = client.post("/pdf/batch", files=files, data={"analysis_type": "innocence-analysis", "stream": "true"})
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+
+        assert sorted(line["index"] for line in lines[:-1]) == list(range(6))
+        assert lines[-1] == {"done": True, "total": 6, "succeeded": 5, "failed": 1}
+
+    run_with_model(check)
+
+
+def test_batch_rejects_unknown_analysis_type():
+    with open(PDF_FILE_PATH, "rb") as f:
+        response = TestClient(app).post("/pdf/batch", files=batch_files(f.read()), data={"analysis_type": "summary"})
+    assert response.status_code == 400
+
+
+if __name__ == "__main__":
+    test_batch_isolates_failures_and_caps_concurrency()
+    test_batch_streams_ndjson()
+    test_batch_rejects_unknown_analysis_type()
+    print("OK")
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Tests for map-reduce analysis: page-aligned splitting, bounded concurrency and merging.
+
+Runs offline; works as a script or under pytest.
+"""
+
+import asyncio
+import json
+import re
+
+from api.core.config import config
+from api.services.chunked_analysis import (
+    ChunkAnalysisError,
+    innocence_analysis_chunked,
+    merge_findings,
+    merge_markdown,
+    parole_summary_chunked,
+    process_text_chunked,
+    split_document,
+)
+from api.services.document import ExtractedDocument
+from api.services.fake_gemini import FakeGenerativeModel
+from api.services.pdf_service import GeminiService
+
+PAGES = [f"{page}\nEMMANUEL YOUNG:   I did not do it, page {page}." for page in range(1, 9)]
+
+
+def test_split_document_keeps_page_numbers():
+    document = ExtractedDocument(PAGES)
+    page_size = document.page_sizes()[0]
+    chunks = split_document(document, max_tokens=-(-page_size * 3 // 4))
+
+    assert [chunk.page_count for chunk in chunks] == [3, 3, 2]
+    assert [chunk.first_page for chunk in chunks] == [1, 4, 7]
+    assert chunks[1].text.startswith("[PAGE 4]")
+    assert [line.page for chunk in chunks for line in chunk.lines()] == [line.page for line in document.lines()]
+
+
+class CountingModel(FakeGenerativeModel):
+    """Fake model recording the most calls it had in flight at once."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.in_flight = self.peak = 0
+
+    async def generate_content_async(self, contents, **kwargs):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            return await super().generate_content_async(contents, **kwargs)
+        finally:
+            self.in_flight -= 1
+
+
+def test_findings_are_merged_with_original_citations():
+    def responder(prompt):
+        page = int(re.search(r"\[PAGE (\d+)\]", prompt).group(1))
+        finding = {"quote": f"page {page}", "page": page, "line": 2, "category": "direct_innocence_claim"}
+        return "```json\n" + json.dumps({"findings": [finding], "summary": {}}) + "\n```"
+
+    document = ExtractedDocument(PAGES)
+    chunks = split_document(document, max_tokens=1)
+    model = CountingModel(latency=0.05, responder=responder)
+    original_concurrency = config.CHUNK_CONCURRENCY
+    config.CHUNK_CONCURRENCY = 3
+    try:
+        raw = asyncio.run(innocence_analysis_chunked(GeminiService(model=model), chunks, "Analyze"))
+    finally:
+        config.CHUNK_CONCURRENCY = original_concurrency
+
+    merged = json.loads(raw)
+    assert [finding["page"] for finding in merged["findings"]] == list(range(1, 9))
+    assert merged["summary"]["total_findings"] == 8
+    assert merged["summary"]["overall_assessment"] == "innocence_claim"
+    assert model.peak == 3
+
+
+def test_failed_chunks_are_retried_then_reported_without_offline_output():
+    attempts = {}
+
+    def responder(prompt):
+        page = int(re.search(r"\[PAGE (\d+)\]", prompt).group(1))
+        attempts[page] = attempts.get(page, 0) + 1
+        # Page 2 fails once and succeeds on the retry; page 4 always fails
+        if page == 4 or (page == 2 and attempts[page] == 1):
+            raise RuntimeError(f"model unavailable for page {page}")
+        finding = {"quote": f"page {page}", "page": page, "line": 2, "category": "direct_innocence_claim"}
+        return json.dumps({"findings": [finding]})
+
+    service = GeminiService(model=FakeGenerativeModel(responder=responder))
+    chunks = split_document(ExtractedDocument(PAGES), max_tokens=1)
+    merged = json.loads(asyncio.run(innocence_analysis_chunked(service, chunks, "Analyze")))
+
+    assert [finding["page"] for finding in merged["findings"]] == [1, 2, 3, 5, 6, 7, 8]
+    assert merged["failed_chunks"] == [{"part": 4, "pages": "4-4", "error": "model unavailable for page 4"}]
+    assert attempts[2] == attempts[4] == config.CHUNK_ATTEMPTS
+    assert service.usage["failures"] == 1 + config.CHUNK_ATTEMPTS
+
+    markdown = asyncio.run(process_text_chunked(GeminiService(model=FakeGenerativeModel(responder=responder)), chunks, "Summarize"))
+    assert markdown.endswith("## Pages Not Analyzed\n- Pages 4-4 (part 4 of 8): model unavailable for page 4")
+    assert "Parole Hearing Summary" not in markdown
+
+    def fail(prompt):
+        raise RuntimeError("quota exceeded")
+
+    try:
+        asyncio.run(innocence_analysis_chunked(GeminiService(model=FakeGenerativeModel(responder=fail)), chunks, "Analyze"))
+        raise AssertionError("a fully failed analysis was not reported")
+    except ChunkAnalysisError as e:
+        assert str(e) == "None of the 8 parts of the transcript could be analyzed: quota exceeded"
+
+
+def test_malformed_findings_do_not_fail_the_merge():
+    parts = [
+        json.dumps({"findings": ["stray text", {"quote": "a", "page": 3, "line": 2, "category": "direct_innocence_claim"}]}),
+        json.dumps({"findings": {"quote": "b", "page": 5, "line": 1}}),
+        json.dumps({"findings": [{"quote": "c", "page": "4", "line": "1", "category": "external_evidence"}, {"quote": ["d"], "page": None}]}),
+    ]
+    merged = json.loads(merge_findings(parts))
+
+    # Non-dict findings are dropped, a chunk whose findings are not a list is kept unparsed, and "4" sorts as 4
+    assert [finding["quote"] for finding in merged["findings"]] == [["d"], "a", "c"]
+    assert merged["unparsed_chunks"] == [parts[1]]
+    assert merged["summary"]["total_findings"] == 3
+
+
+def test_parallel_maps_share_the_concurrency_limit():
+    model = CountingModel(latency=0.05, responder=lambda prompt: "# Summary\n- part")
+    chunks = split_document(ExtractedDocument(PAGES), max_tokens=1)
+    original_concurrency = config.CHUNK_CONCURRENCY
+    config.CHUNK_CONCURRENCY = 3
+    try:
+        asyncio.run(parole_summary_chunked(GeminiService(model=model), chunks, "Summarize", "Demographics"))
+    finally:
+        config.CHUNK_CONCURRENCY = original_concurrency
+
+    # The summary and demographics prompts run together but stay within one request's limit
+    assert model.peak == 3
+
+
+def test_merge_markdown_combines_sections():
+    merged = merge_markdown(
+        [
+            "# Summary\n## Case\n- **Inmate**: Not specified\n## Programming\n- GOGI (Page 2, Line 17)",
+            "# Summary\n## Case\n- **Inmate**: Emmanuel Young (Page 1, Line 8)\n## Programming\n- GOGI (Page 2, Line 17)\n- AVP (Page 9, Line 3)",
+        ]
+    )
+    assert (
+        merged
+        == "# Summary\n\n## Case\n- **Inmate**: Emmanuel Young (Page 1, Line 8)\n\n## Programming\n- GOGI (Page 2, Line 17)\n- AVP (Page 9, Line 3)"
+    )
+
+
+if __name__ == "__main__":
+    test_split_document_keeps_page_numbers()
+    test_findings_are_merged_with_original_citations()
+    test_failed_chunks_are_retried_then_reported_without_offline_output()
+    test_malformed_findings_do_not_fail_the_merge()
+    test_parallel_maps_share_the_concurrency_limit()
+    test_merge_markdown_combines_sections()
+    print("OK")
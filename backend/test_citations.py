@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests for citation verification (verify_citations=true on the /pdf analyses).
+
+Runs offline; works as a script or under pytest.
+"""
+
+from fastapi.testclient import TestClient
+
+from api.services.citations import CitationIndex, verify_findings, verify_markdown
+from api.services.document import ExtractedDocument
+from api.services.pdf_service import gemini_service
+from main import app
+
+PDF_FILE_PATH = "pdf/Young-AK2960-2024-10-24.pdf"
+PAGES = [
+    "PRESIDING COMMISSIONER RUFF:  Good morning. 1\nWe are on the record. 2",
+    "INMATE YOUNG:  I was not there that night, I was at 1\nmy sister's house the whole evening. 2\nATTORNEY MBELU:  Objection. 3",
+]
+
+
+def index() -> CitationIndex:
+    return CitationIndex(list(ExtractedDocument(PAGES).lines()))
+
+
+def test_quote_at_its_citation_is_verified():
+    match = index().locate("I was not there that night", 2, 1)
+    assert (match.status, match.page, match.line, match.similarity) == ("verified", 2, 1, 1.0)
+    # Across a line break, with the printed line numbers and punctuation ignored
+    match = index().locate("I was at my sister’s house", 2, 1)
+    assert (match.status, match.line_count) == ("verified", 2)
+
+
+def test_wrong_location_is_corrected():
+    # A whole line, found through the hash index
+    match = index().locate("We are on the record.", 2, 3)
+    assert (match.status, match.page, match.line) == ("corrected", 1, 2)
+    # A paraphrased quote, found through the n-gram index
+    match = index().locate("I was at my sisters house the entire evening", 1, 1)
+    assert (match.status, match.page, match.line, match.line_count) == ("corrected", 2, 1, 2)
+    assert 0.8 <= match.similarity < 1
+
+
+def test_invented_quote_is_unverified():
+    match = index().locate("The victim attacked me first with a knife", 2, 1)
+    assert (match.status, match.page, match.line) == ("unverified", 2, 1)
+    assert match.similarity < 0.8
+
+
+def test_ellipsis_quotes_are_checked_part_by_part():
+    assert index().locate("I was not there that night ... the whole evening", 2, 1).status == "verified"
+    assert index().locate("I was not there that night [...] I stabbed him", 2, 1).status == "unverified"
+
+
+def test_findings_are_updated_in_place():
+    findings = [
+        {"quote": "Objection.", "page": 2, "line": 3},
+        {"quote": "Good morning.", "page": 2, "line": 1},
+        {"quote": "I did it.", "page": 1, "line": 1},
+    ]
+    summary = verify_findings(ExtractedDocument(PAGES), findings)
+
+    assert {key: summary[key] for key in ("checked", "verified", "corrected", "unverified")} == {
+        "checked": 3,
+        "verified": 1,
+        "corrected": 1,
+        "unverified": 1,
+    }
+    assert findings[1]["page"] == 1 and findings[1]["line"] == 1
+    assert findings[1]["verification"] == {"status": "corrected", "similarity": 1.0, "cited_page": 2, "cited_line": 1}
+    assert findings[2]["verification"]["status"] == "unverified"
+
+
+def test_markdown_citations_are_rewritten():
+    markdown = (
+        '- "We are on the record" - (Commissioner Ruff, Page 2, Line 9)\n'
+        '- "I was at my sister\'s house the whole evening" (Page 1, Lines 1-2)\n'
+        '- "Objection." - (Attorney Mbelu, Page 2, Line 3)'
+    )
+    corrected, summary = verify_markdown(ExtractedDocument(PAGES), markdown)
+
+    assert corrected.split("\n") == [
+        '- "We are on the record" - (Commissioner Ruff, Page 1, Line 2)',
+        '- "I was at my sister\'s house the whole evening" (Page 2, Lines 1-2)',
+        '- "Objection." - (Attorney Mbelu, Page 2, Line 3)',
+    ]
+    assert [citation["status"] for citation in summary["citations"]] == ["corrected", "corrected", "verified"]
+    assert summary["citations"][0]["cited"] == "Page 2, Line 9"
+
+
+def test_innocence_route_verifies_findings():
+    original_model = gemini_service.model
+    gemini_service.model = None
+    try:
+        with open(PDF_FILE_PATH, "rb") as f:
+            response = TestClient(app).post(
+                "/pdf/innocence-analysis", files={"file": ("transcript.pdf", f, "application/pdf")}, data={"verify_citations": "true"}
+            )
+    finally:
+        gemini_service.model = original_model
+
+    body = response.json()
+    findings = body["innocence_analysis"]["findings"]
+    assert body["citation_verification"]["checked"] == len(findings) > 0
+    assert all(finding["verification"]["status"] == "verified" for finding in findings)
+
+
+if __name__ == "__main__":
+    test_quote_at_its_citation_is_verified()
+    test_wrong_location_is_corrected()
+    test_invented_quote_is_unverified()
+    test_ellipsis_quotes_are_checked_part_by_part()
+    test_findings_are_updated_in_place()
+    test_markdown_citations_are_rewritten()
+    test_innocence_route_verifies_findings()
+    print("OK")
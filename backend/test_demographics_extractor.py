@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for the table-driven extractor behind the offline demographics.
+
+Runs offline; works as a script or under pytest.
+"""
+
+from api.services.demographics_extractor import DemographicsExtractor, demographics_extractor
+from api.services.demographics_rules import FieldRule
+from api.services.document import ExtractedDocument
+from api.services.pdf_service import pdf_service
+
+PDF_FILE_PATH = "pdf/Young-AK2960-2024-10-24.pdf"
+
+
+def extract(*pages: str) -> dict:
+    return demographics_extractor.extract(ExtractedDocument(list(pages)).lines())
+
+
+def test_sample_transcript():
+    with open(PDF_FILE_PATH, "rb") as f:
+        document = pdf_service.extract_text_from_pdf(f.read())
+    demographics = demographics_extractor.mock_demographics(document.lines())
+
+    assert demographics["clientInfo"]["name"] == "Emmanuel Young"
+    assert demographics["clientInfo"]["cdcrNumber"] == "AK2960"
+    attorney = demographics["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]
+    assert (attorney["name"], attorney["title"], attorney["presentAtHearing"]) == ("Rosemary Mbelu", "Attorney", True)
+    assert demographics["convictionInfo"]["charges"] == "Second-degree murder, Attempted murder"
+    assert demographics["prisonRecord"]["programming"] == "Anger management, GOGI, AVP, PREP"
+    assert demographics["prisonRecord"]["conduct"] == "Recent disciplinary issues noted by board"
+    assert demographics["victimInfo"]["relationship"] == "Acquaintance known for approximately 5 months"
+
+
+def test_values_are_captured_not_hardcoded():
+    demographics = extract(
+        "JANE Q. DOE, Incarcerated Person\nMy CDC Number is t12345.",
+        "She was convicted of ROBBERY and voluntary manslaughter, and got a 25-year to life term.",
+    )
+    assert demographics["clientInfo"] == {"name": "Jane Q. Doe", "cdcrNumber": "T12345", "dateOfBirth": "", "contactInfo": ""}
+    assert demographics["convictionInfo"]["charges"] == "Robbery, Voluntary manslaughter"
+    assert demographics["convictionInfo"]["sentenceLength"] == "25 years to life"
+
+
+def test_speaker_label_only_fills_a_missing_attorney_name():
+    speaking = extract("ATTORNEY SMITH :  Good morning.")
+    attorney = speaking["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]
+    assert (attorney["name"], attorney["representationContext"]) == ("Attorney Smith", "Speaking at Hearing")
+
+    named = extract("Legal counsel: John Smith.\nATTORNEY SMITH :  Good morning.")
+    attorney = named["attorneyInfo"]["currentAttorneyForIncarceratedPerson"]
+    assert (attorney["name"], attorney["representationContext"]) == ("John Smith", "Legal Counsel")
+
+
+def test_lines_without_triggers_are_skipped_and_offsets_survive_lowercasing():
+    # "İ".lower() is two characters long
+    demographics = extract("İİİİ nothing here\nCDCR Number: AB1234")
+    assert demographics["clientInfo"]["cdcrNumber"] == "AB1234"
+    assert extract("Good morning.\nThank you.") == extract()
+
+
+def test_rules_are_data():
+    extractor = DemographicsExtractor(rules=[FieldRule("county", ("county",), r"(?P<value>[A-Z][a-z]+) (?i:county)", field="convictionInfo.county")])
+    assert extractor.extract(ExtractedDocument(["Sentenced in Fresno County."]).lines())["convictionInfo"]["county"] == "Fresno"
+
+
+if __name__ == "__main__":
+    test_sample_transcript()
+    test_values_are_captured_not_hardcoded()
+    test_speaker_label_only_fills_a_missing_attorney_name()
+    test_lines_without_triggers_are_skipped_and_offsets_survive_lowercasing()
+    test_rules_are_data()
+    print("OK")
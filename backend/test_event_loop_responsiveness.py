@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Check that /health stays responsive while several PDF analyses are in flight.
+
+Gemini is replaced by a fake model with injected latency, so any handler that
+waited on it synchronously would stall every other request.
+Runs offline against the ASGI app; works as a script or under pytest.
+"""
+
+import asyncio
+import time
+
+import httpx
+
+from api.services.fake_gemini import FakeGenerativeModel
+from api.services.pdf_service import gemini_service
+from main import app
+
+PDF_FILE_PATH = "pdf/Young-AK2960-2024-10-24.pdf"
+MODEL_LATENCY = 1.0  # seconds each Gemini call takes
+CONCURRENT_ANALYSES = 4
+MAX_HEALTH_LATENCY = 0.25  # seconds
+
+
+async def run_check() -> float:
+    with open(PDF_FILE_PATH, "rb") as f:
+        pdf_bytes = f.read()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        analyses = [
+            asyncio.create_task(client.post("/pdf/innocence-analysis", files={"file": ("transcript.pdf", pdf_bytes, "application/pdf")}, timeout=60))
+            for _ in range(CONCURRENT_ANALYSES)
+        ]
+
+        # Give the analyses time to reach the model call
+        await asyncio.sleep(MODEL_LATENCY / 4)
+        assert not any(task.done() for task in analyses), "analyses finished before /health was checked"
+
+        started = time.perf_counter()
+        response = await client.get("/health")
+        health_latency = time.perf_counter() - started
+        assert response.status_code == 200
+
+        results = await asyncio.gather(*analyses)
+        assert all(result.status_code == 200 for result in results)
+
+    return health_latency
+
+
+def test_health_responsive_during_analyses():
+    original_model, original_cache = gemini_service.model, gemini_service.response_cache
+    gemini_service.model = FakeGenerativeModel(latency=MODEL_LATENCY, responder=lambda prompt: '{"findings": [], "summary": {}}')
+    # Cached responses would skip the model latency this check relies on
+    gemini_service.response_cache = None
+    try:
+        health_latency = asyncio.run(run_check())
+    finally:
+        gemini_service.model, gemini_service.response_cache = original_model, original_cache
+
+    print(f"/health answered in {health_latency * 1000:.1f} ms with {CONCURRENT_ANALYSES} analyses in flight")
+    assert health_latency < MAX_HEALTH_LATENCY
+
+
+if __name__ == "__main__":
+    test_health_responsive_during_analyses()
+    print("OK")
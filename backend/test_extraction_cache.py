@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for the two-tier extraction cache: memory LRU, disk tier budget, counters and versioned keys.
+
+Runs offline; works as a script or under pytest.
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+from api.services import pdf_service as pdf_service_module
+from api.services.document import ExtractedDocument
+from api.services.extraction_cache import ExtractionCache
+from api.services.pdf_service import pdf_service
+
+PDF_FILE_PATH = "pdf/Young-AK2960-2024-10-24.pdf"
+
+
+def document(name: str) -> ExtractedDocument:
+    return ExtractedDocument([f"{name}\nCOMMISSIONER RUFF:  Page one of {name}.", f"{name}\nYOUNG:  Page two of {name}."])
+
+
+@contextmanager
+def fresh_extraction_cache(extractor_version: str):
+    """Give PDFService an empty memory-only cache and the given extractor version."""
+    original = pdf_service_module.extraction_cache, pdf_service_module.EXTRACTOR_VERSION
+    pdf_service_module.extraction_cache = ExtractionCache(memory_items=4, disk_dir=None, max_disk_bytes=0)
+    pdf_service_module.EXTRACTOR_VERSION = extractor_version
+    try:
+        yield pdf_service_module.extraction_cache
+    finally:
+        pdf_service_module.extraction_cache, pdf_service_module.EXTRACTOR_VERSION = original
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = ExtractionCache(memory_items=2, disk_dir=None, max_disk_bytes=0)
+    cache.put("a", document("a"), 1.0)
+    cache.put("b", document("b"), 2.0)
+    assert cache.get("a").text == document("a").text
+    cache.put("c", document("c"), 3.0)
+
+    # "b" was used least recently, so it made room for "c"
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (3, 0, 1)
+    assert stats["hit_rate"] == 0.75 and stats["seconds_saved"] == 5.0
+    assert (stats["memory_items"], stats["disk_capacity_bytes"]) == (2, 0)
+
+
+def test_disk_tier_evicts_by_size_and_reloads_after_restart():
+    with tempfile.TemporaryDirectory() as tmp:
+        entry_size = len(f"{1.5}\n") + len(document("a").to_json())
+        cache = ExtractionCache(memory_items=1, disk_dir=tmp, max_disk_bytes=entry_size * 2)
+        for age, name in enumerate(("a", "b")):
+            cache.put(name, document(name), 1.5)
+            # Give each file a distinct, older mtime so eviction order does not depend on timer resolution
+            os.utime(os.path.join(tmp, f"{name}.json"), (1000 + age, 1000 + age))
+        cache.put("c", document("c"), 1.5)
+
+        assert sorted(os.listdir(tmp)) == ["b.json", "c.json"]
+        assert cache.stats()["disk_bytes"] == entry_size * 2
+
+        # A new cache over the same directory (as after a restart) counts the files and loads them from disk
+        restarted = ExtractionCache(memory_items=1, disk_dir=tmp, max_disk_bytes=entry_size * 2)
+        assert restarted.stats()["disk_bytes"] == entry_size * 2
+        reloaded = restarted.get("b")
+        assert reloaded.text == document("b").text and reloaded.page_count == 2
+        assert restarted.get("b") is not None and restarted.get("a") is None
+        stats = restarted.stats()
+        assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (1, 1, 1)
+        assert stats["seconds_saved"] == 3.0
+
+
+def test_extractor_version_bump_misses_old_entries():
+    with open(PDF_FILE_PATH, "rb") as f:
+        pdf_bytes = f.read()
+
+    with fresh_extraction_cache("old") as cache:
+        first = pdf_service.extract_text_from_pdf(pdf_bytes)
+        assert pdf_service.extract_text_from_pdf(pdf_bytes) is first
+        assert (cache.stats()["misses"], cache.stats()["memory_hits"]) == (1, 1)
+
+        pdf_service_module.EXTRACTOR_VERSION = "new"
+        second = pdf_service.extract_text_from_pdf(pdf_bytes)
+        assert second is not first and second.text == first.text
+        assert (cache.stats()["misses"], cache.stats()["memory_hits"]) == (2, 1)
+
+
+if __name__ == "__main__":
+    test_memory_tier_evicts_least_recently_used()
+    test_disk_tier_evicts_by_size_and_reloads_after_restart()
+    test_extractor_version_bump_misses_old_entries()
+    print("OK")
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared, pooled GCS client behind /file: chunked resumable uploads and the paginated listing.
+
+Runs against the in-process fake GCS server; works as a script or under pytest.
+"""
+
+import asyncio
+import hashlib
+import io
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+from fastapi.testclient import TestClient
+
+from api.core.config import config
+from api.services import gcs_client
+from api.services.fake_gcs import FakeGCSServer, write_fake_service_account
+from api.services.worker_pools import gcs_pool
+from main import app
+
+BUCKET = "transcripts"
+
+
+@contextmanager
+def fake_gcs():
+    """Point gcs_client at a fresh fake server, with a throwaway service account for signing."""
+    original = (gcs_client.SERVICE_ACCOUNT_JSON, gcs_client.BUCKET_NAME, os.environ.get("STORAGE_EMULATOR_HOST"))
+    with tempfile.TemporaryDirectory() as tmp, FakeGCSServer() as server:
+        gcs_client.close_client()
+        os.environ["STORAGE_EMULATOR_HOST"] = server.url
+        gcs_client.SERVICE_ACCOUNT_JSON = write_fake_service_account(os.path.join(tmp, "service-account.json"))
+        gcs_client.BUCKET_NAME = BUCKET
+        try:
+            yield server
+        finally:
+            gcs_client.close_client()
+            gcs_client.SERVICE_ACCOUNT_JSON, gcs_client.BUCKET_NAME, emulator = original
+            if emulator is None:
+                os.environ.pop("STORAGE_EMULATOR_HOST", None)
+            else:
+                os.environ["STORAGE_EMULATOR_HOST"] = emulator
+
+
+def test_client_and_connections_are_reused():
+    with fake_gcs() as server:
+        gcs_client.upload_file(io.BytesIO(b"%PDF-1.4 first"), "first.pdf")
+        client, bucket, connections = gcs_client.get_client(), gcs_client.get_bucket(), server.connections
+
+        for i in range(10):
+            gcs_client.upload_file(io.BytesIO(b"%PDF-1.4 more"), f"more-{i}.pdf")
+        gcs_client.list_files()
+
+        assert gcs_client.get_client() is client and gcs_client.get_bucket() is bucket
+        assert server.connections == connections
+        assert len(server.objects) == 11
+
+
+def test_upload_and_list_round_trip():
+    with fake_gcs() as server:
+        url = gcs_client.upload_file(io.BytesIO(b"%PDF-1.4 transcript"), "hearing.pdf")
+        assert "X-Goog-Signature=" in url and "/hearing.pdf?" in url
+        assert server.objects[(BUCKET, "hearing.pdf")].data == b"%PDF-1.4 transcript"
+
+        files = gcs_client.list_files(sign=True)["files"]
+        assert [(f["name"], f["size"]) for f in files] == [("hearing.pdf", 19)]
+        assert "X-Goog-Signature=" in files[0]["url"]
+
+
+def test_async_wrappers_run_in_the_gcs_pool():
+    async def upload_all() -> list:
+        return await asyncio.gather(*(gcs_client.upload_file_async(io.BytesIO(b"%PDF-1.4"), f"async-{i}.pdf") for i in range(8)))
+
+    with fake_gcs() as server:
+        completed = gcs_pool.completed
+        urls = asyncio.run(upload_all())
+        files = asyncio.run(gcs_client.list_files_async())["files"]
+        url = asyncio.run(gcs_client.file_url_async("async-0.pdf"))
+
+        assert len(urls) == 8 and len(files) == 8 and "X-Goog-Signature=" in url
+        assert gcs_pool.completed == completed + 10
+        assert len(server.objects) == 8
+
+
+@contextmanager
+def small_chunks(chunk_mb: float = 0.25, retry_seconds: float = 5.0):
+    original = (config.GCS_UPLOAD_CHUNK_MB, config.GCS_UPLOAD_RETRY_SECONDS, gcs_client.UPLOAD_RETRY_BACKOFF)
+    config.GCS_UPLOAD_CHUNK_MB, config.GCS_UPLOAD_RETRY_SECONDS, gcs_client.UPLOAD_RETRY_BACKOFF = chunk_mb, retry_seconds, 0.01
+    try:
+        yield
+    finally:
+        config.GCS_UPLOAD_CHUNK_MB, config.GCS_UPLOAD_RETRY_SECONDS, gcs_client.UPLOAD_RETRY_BACKOFF = original
+
+
+def test_uploads_stream_in_chunks():
+    data = os.urandom(1024 * 1024 + 1000)
+    with fake_gcs() as server, small_chunks():
+        reported = []
+        gcs_client.upload_file(io.BytesIO(data), "streamed.pdf", progress=reported.append)
+        assert server.objects[(BUCKET, "streamed.pdf")].data == data
+        # Four chunks of 256 KiB and the last 1000 bytes
+        assert reported == [262144, 524288, 786432, 1048576, len(data)]
+
+        # A small file of known size goes in one request
+        reported = []
+        gcs_client.upload_file(io.BytesIO(data), "sized.pdf", size=len(data), progress=reported.append)
+        assert server.objects[(BUCKET, "sized.pdf")].data == data
+        assert reported == [len(data)]
+
+        # Unknown size ending on a chunk boundary: the last request only closes the upload
+        gcs_client.upload_file(io.BytesIO(data[: 512 * 1024]), "boundary.pdf")
+        assert server.objects[(BUCKET, "boundary.pdf")].data == data[: 512 * 1024]
+
+
+def test_failed_chunks_are_resumed():
+    data = os.urandom(1024 * 1024)
+    with fake_gcs() as server, small_chunks(retry_seconds=0.5):
+        server.fail_chunks = 3
+        reported = []
+        gcs_client.upload_file(io.BytesIO(data), "flaky.pdf", progress=reported.append)
+        assert server.objects[(BUCKET, "flaky.pdf")].data == data
+        assert server.fail_chunks == 0 and reported == sorted(set(reported)) and reported[-1] == len(data)
+
+        # An upload whose requests keep failing gives up once the retry time runs out
+        server.fail_chunks = 10_000
+        try:
+            gcs_client.upload_file(io.BytesIO(data), "broken.pdf")
+        except RuntimeError as e:
+            assert "failed after retrying for 0.5s" in str(e)
+        else:
+            raise AssertionError("upload should fail once the retry time runs out")
+        assert (BUCKET, "broken.pdf") not in server.objects
+
+
+def test_listing_pages_through_10k_objects():
+    with fake_gcs() as server:
+        for i in range(10_000):
+            server.put(BUCKET, f"{'parole' if i % 2 else 'court'}/{i:05d}.pdf", b"%PDF")
+
+        names, page_token, pages = [], None, 0
+        while True:
+            page = gcs_client.list_files(prefix="parole/", page_size=1000, page_token=page_token)
+            names += [f["name"] for f in page["files"]]
+            pages += 1
+            page_token = page["next_page_token"]
+            if page_token is None:
+                break
+
+        assert pages == 5 and len(names) == 5000 and names == sorted(names)
+        assert all(name.startswith("parole/") for name in names)
+        assert "url" not in page["files"][0]
+
+
+def test_listing_pages_are_cached_until_an_upload():
+    with fake_gcs() as server:
+        for i in range(5):
+            server.put(BUCKET, f"{i}.pdf", b"%PDF")
+        first = gcs_client.list_files(page_size=2)
+        requests = server.requests
+
+        assert gcs_client.list_files(page_size=2) == first
+        assert server.requests == requests
+
+        gcs_client.upload_file(io.BytesIO(b"%PDF"), "00.pdf")
+        assert gcs_client.list_files(page_size=2)["files"][0]["name"] == "0.pdf"
+        assert gcs_client.list_files(page_size=2)["files"][1]["name"] == "00.pdf"
+
+
+def test_list_and_url_routes():
+    with fake_gcs() as server:
+        for i in range(3):
+            server.put(BUCKET, f"hearings/{i}.pdf", b"%PDF")
+        client = TestClient(app)
+
+        first = client.get("/file/list", params={"prefix": "hearings/", "page_size": 2}).json()
+        second = client.get("/file/list", params={"prefix": "hearings/", "page_size": 2, "page_token": first["next_page_token"], "sign": True}).json()
+        assert [f["name"] for f in first["files"] + second["files"]] == ["hearings/0.pdf", "hearings/1.pdf", "hearings/2.pdf"]
+        assert "url" not in first["files"][0] and "X-Goog-Signature=" in second["files"][0]["url"]
+        assert second["next_page_token"] is None
+
+        signed = client.get("/file/url/hearings/1.pdf").json()
+        assert "/hearings/1.pdf?" in signed["url"]
+        assert client.get("/file/list", params={"page_size": 5000}).status_code == 422
+
+
+def test_upload_route_stores_content_once():
+    data = b"%PDF-1.4 route"
+    sha256 = hashlib.sha256(data).hexdigest()
+    with fake_gcs() as server:
+        client = TestClient(app)
+        first = client.post("/file/upload", files={"file": ("hearing.pdf", data, "application/pdf")}).json()
+        requests = server.requests
+        second = client.post("/file/upload", files={"file": ("hearing (1).pdf", data, "application/pdf")}).json()
+        second_requests = server.requests - requests
+        requests = server.requests
+        third = client.post("/file/upload", files={"file": ("hearing (1).pdf", data, "application/pdf")}).json()
+
+        assert (first["deduplicated"], second["deduplicated"], third["deduplicated"]) == (False, True, True)
+        assert first["object_name"] == second["object_name"] == f"sha256/{sha256}"
+        assert sorted(name for _, name in server.objects) == ["aliases/hearing (1).pdf", "aliases/hearing.pdf", f"sha256/{sha256}"]
+        assert server.objects[(BUCKET, f"sha256/{sha256}")].data == data
+        assert json.loads(server.objects[(BUCKET, "aliases/hearing (1).pdf")].data)["sha256"] == sha256
+        # A known hash under a new name only writes the alias; a known name and hash touch nothing
+        assert second_requests == 1 and server.requests == requests
+
+
+def test_deleted_content_is_stored_again():
+    def store(data: bytes, filename: str = "hearing.pdf") -> dict:
+        return gcs_client.store_upload(io.BytesIO(data), hashlib.sha256(data).hexdigest(), len(data), filename)
+
+    original = (config.GCS_KNOWN_OBJECT_TTL_SECONDS, config.GCS_KNOWN_OBJECT_ITEMS)
+    with fake_gcs() as server:
+        try:
+            name = store(b"%PDF-1.4 kept")["object_name"]
+            alias = (BUCKET, "aliases/hearing.pdf")
+
+            # A read that finds the content and alias gone drops them, so the next upload writes both again
+            del server.objects[(BUCKET, name)], server.objects[alias]
+            for missing in (name, "aliases/hearing.pdf"):
+                try:
+                    blob, _ = gcs_client.resolve_object(missing)
+                    gcs_client.load_metadata(blob)
+                    raise AssertionError(f"{missing} was found")
+                except FileNotFoundError:
+                    pass
+            assert store(b"%PDF-1.4 kept")["deduplicated"] is False
+            assert (BUCKET, name) in server.objects and alias in server.objects
+
+            # Without a read, a deleted object is trusted only until its entry expires
+            config.GCS_KNOWN_OBJECT_TTL_SECONDS = 0.05
+            name = store(b"%PDF-1.4 expiring")["object_name"]
+            del server.objects[(BUCKET, name)]
+            assert store(b"%PDF-1.4 expiring")["deduplicated"] is True
+            time.sleep(0.1)
+            assert store(b"%PDF-1.4 expiring")["deduplicated"] is False
+
+            # At most GCS_KNOWN_OBJECT_ITEMS entries are kept
+            config.GCS_KNOWN_OBJECT_TTL_SECONDS, config.GCS_KNOWN_OBJECT_ITEMS = 60, 2
+            for i in range(5):
+                store(f"%PDF-1.4 {i}".encode(), f"{i}.pdf")
+            assert len(gcs_client._known_content) == len(gcs_client._known_aliases) == 2
+        finally:
+            config.GCS_KNOWN_OBJECT_TTL_SECONDS, config.GCS_KNOWN_OBJECT_ITEMS = original
+
+
+def test_content_created_meanwhile_is_not_overwritten():
+    with fake_gcs() as server:
+        server.put(BUCKET, "sha256/abc", b"first")
+        try:
+            gcs_client.upload_stream(io.BytesIO(b"second"), "sha256/abc", 6, if_generation_match=0)
+        except FileExistsError:
+            pass
+        else:
+            raise AssertionError("existing content should not be replaced")
+        assert server.objects[(BUCKET, "sha256/abc")].data == b"first"
+
+
+def test_signed_urls_are_cached_by_name_and_generation():
+    original = (config.SIGNED_URL_TTL_SECONDS, config.SIGNED_URL_MIN_REMAINING_SECONDS, config.SIGNED_URL_CACHE_ITEMS)
+    with fake_gcs():
+        try:
+            url = gcs_client.signed_url("a.pdf", 1)
+            assert gcs_client.signed_url("a.pdf", 1) is url
+            assert "X-Goog-Expires=3600" in url
+            # A new generation is signed separately
+            assert gcs_client.signed_url("a.pdf", 2) is not url
+
+            # URLs without enough lifetime left are signed again, and stale entries are dropped
+            config.SIGNED_URL_MIN_REMAINING_SECONDS = 3601
+            assert gcs_client.signed_url("a.pdf", 1) is not url
+            assert list(gcs_client._signed_urls) == []
+
+            config.SIGNED_URL_MIN_REMAINING_SECONDS, config.SIGNED_URL_CACHE_ITEMS = 0, 3
+            for name in "bcde":
+                gcs_client.signed_url(f"{name}.pdf")
+            assert list(gcs_client._signed_urls) == [("c.pdf", None), ("d.pdf", None), ("e.pdf", None)]
+        finally:
+            config.SIGNED_URL_TTL_SECONDS, config.SIGNED_URL_MIN_REMAINING_SECONDS, config.SIGNED_URL_CACHE_ITEMS = original
+
+
+def test_signed_listing_reuses_urls():
+    with fake_gcs() as server:
+        for i in range(20):
+            server.put(BUCKET, f"{i:02d}.pdf", b"%PDF")
+        first = gcs_client.list_files(sign=True)["files"]
+        gcs_client.clear_listing_cache()
+        second = gcs_client.list_files(sign=True)["files"]
+        assert all(a["url"] is b["url"] for a, b in zip(first, second))
+
+        # A replaced object has a new generation and gets a new URL
+        server.put(BUCKET, "00.pdf", b"%PDF-1.7")
+        gcs_client.clear_listing_cache()
+        third = gcs_client.list_files(sign=True)["files"]
+        assert third[0]["generation"] == first[0]["generation"] + 20
+        assert third[0]["url"] is not first[0]["url"] and third[1]["url"] is first[1]["url"]
+
+
+if __name__ == "__main__":
+    test_client_and_connections_are_reused()
+    test_upload_and_list_round_trip()
+    test_async_wrappers_run_in_the_gcs_pool()
+    test_uploads_stream_in_chunks()
+    test_failed_chunks_are_resumed()
+    test_listing_pages_through_10k_objects()
+    test_listing_pages_are_cached_until_an_upload()
+    test_list_and_url_routes()
+    test_upload_route_stores_content_once()
+    test_deleted_content_is_stored_again()
+    test_content_created_meanwhile_is_not_overwritten()
+    test_signed_urls_are_cached_by_name_and_generation()
+    test_signed_listing_reuses_urls()
+    print("OK")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Tests for the async GeminiService API against a local fake model with injected latency.
+
+Runs offline; works as a script or under pytest.
+"""
+
+import asyncio
+import time
+
+from api.services.document import ExtractedDocument
+from api.services.fake_gemini import FakeGenerativeModel
+from api.services.pdf_service import GeminiService
+
+MODEL_LATENCY = 0.3  # seconds per fake Gemini call
+DOCUMENT = ExtractedDocument(["PAROLE SUITABILITY HEARING\nEMMANUEL YOUNG\nCDCR Number: AK2960"])
+
+
+class FailingModel(FakeGenerativeModel):
+    """Fake model whose async calls always raise, to exercise the mock fallback."""
+
+    async def generate_content_async(self, contents, **kwargs):
+        raise RuntimeError("quota exceeded")
+
+
+def test_process_text_with_ai_async_returns_model_text():
+    service = GeminiService(model=FakeGenerativeModel(responder=lambda prompt: "summary from model"))
+    result = asyncio.run(service.process_text_with_ai_async(DOCUMENT, "Summarize"))
+    assert result == "summary from model"
+
+
+def test_parole_summary_prompts_run_concurrently():
+    model = FakeGenerativeModel(latency=MODEL_LATENCY, responder=lambda prompt: "markdown" if prompt.startswith("MD") else "{}")
+    service = GeminiService(model=model)
+
+    started = time.perf_counter()
+    markdown, demographics = asyncio.run(service.generate_parole_summary_with_demographics_async(DOCUMENT, "MD prompt", "JSON prompt"))
+    async_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    service.generate_parole_summary_with_demographics(DOCUMENT, "MD prompt", "JSON prompt")
+    sync_elapsed = time.perf_counter() - started
+
+    print(f"async: {async_elapsed:.2f}s, sync: {sync_elapsed:.2f}s")
+    assert (markdown, demographics) == ("markdown", "{}")
+    assert model.calls == 4
+    # Two concurrent calls take about one model latency; sequential calls take two
+    assert async_elapsed < MODEL_LATENCY * 1.5 <= sync_elapsed
+
+
+def test_async_falls_back_to_mock_on_model_error():
+    service = GeminiService(model=FailingModel())
+    markdown, demographics = asyncio.run(service.generate_parole_summary_with_demographics_async(DOCUMENT, "MD", "JSON"))
+    assert markdown.startswith("# Parole Hearing Summary")
+    assert '"cdcrNumber": "AK2960"' in demographics
+
+
+if __name__ == "__main__":
+    test_process_text_with_ai_async_returns_model_text()
+    test_parole_summary_prompts_run_concurrently()
+    test_async_falls_back_to_mock_on_model_error()
+    print("OK")
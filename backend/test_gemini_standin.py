@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Load and failure tests of the pipeline against the local Gemini stand-in server.
+
+The stand-in (api/services/gemini_standin.py) answers like the Gemini API, with injected
+latency, 5xx errors, 429 quota refusals and broken streams. Runs offline; works as a
+script or under pytest.
+"""
+
+import asyncio
+import time
+from contextlib import contextmanager
+
+import httpx
+from google.api_core import exceptions as api_exceptions
+
+from api.core.config import Config, config
+from api.services.gemini_standin import GeminiStandInServer, Latency, StandInGenerativeModel
+from api.services.pdf_service import gemini_service
+from main import app
+
+PDF_FILE_PATH = "pdf/Young-AK2960-2024-10-24.pdf"
+
+
+@contextmanager
+def gemini_standin(timeout: float = 10.0, **server_options):
+    """Run a stand-in server and point the shared GeminiService at it, with the response cache off."""
+    original = gemini_service.model, gemini_service.response_cache, dict(gemini_service.usage)
+    with GeminiStandInServer(**server_options) as server:
+        model = StandInGenerativeModel(server.url, timeout=timeout)
+        gemini_service.model, gemini_service.response_cache = model, None
+        gemini_service.usage.update(requests=0, failures=0, prompt_tokens=0, output_tokens=0)
+        try:
+            yield server
+        finally:
+            model.close()
+            gemini_service.model, gemini_service.response_cache, usage = original
+            gemini_service.usage.update(usage)
+
+
+def read_pdf() -> bytes:
+    with open(PDF_FILE_PATH, "rb") as f:
+        return f.read()
+
+
+async def post_concurrently(endpoint: str, count: int) -> list[httpx.Response]:
+    pdf_bytes = read_pdf()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test", timeout=60) as client:
+        return await asyncio.gather(*(client.post(endpoint, files={"file": ("transcript.pdf", pdf_bytes, "application/pdf")}) for _ in range(count)))
+
+
+def test_responses_carry_text_and_usage_metadata():
+    with GeminiStandInServer(responder=lambda prompt: "word " * 40, stream_chunk_size=16) as server:
+        model = StandInGenerativeModel(server.url)
+        response = model.generate_content("x" * 400)
+        assert response.text == "word " * 40 and response.finish_reason == "STOP"
+        assert response.usage_metadata == (100, 50, 150)
+
+        chunks = list(model.generate_content("x" * 400, stream=True))
+        assert len(chunks) == 13 and "".join(chunk.text for chunk in chunks) == "word " * 40
+        assert chunks[-1].usage_metadata.candidates_token_count == 50
+
+        async def stream() -> list[str]:
+            return [chunk.text async for chunk in await model.generate_content_async("x" * 400, stream=True)]
+
+        assert "".join(asyncio.run(stream())) == "word " * 40
+        model.close()
+
+
+def test_failures_are_raised_as_api_errors():
+    with GeminiStandInServer(requests_per_minute=2) as server:
+        model = StandInGenerativeModel(server.url)
+        model.generate_content("one")
+        model.generate_content("two")
+        try:
+            model.generate_content("three")
+            raise AssertionError("quota was not enforced")
+        except api_exceptions.ResourceExhausted:
+            pass
+        assert server.stats()["rate_limited"] == 1
+
+    with GeminiStandInServer(error_rate=1.0) as server:
+        try:
+            StandInGenerativeModel(server.url).generate_content("fails")
+            raise AssertionError("error was not raised")
+        except (api_exceptions.InternalServerError, api_exceptions.ServiceUnavailable):
+            pass
+
+    with GeminiStandInServer(latency=Latency("fixed", 1.0)) as server:
+        started = time.perf_counter()
+        try:
+            StandInGenerativeModel(server.url, timeout=0.2).generate_content("slow")
+            raise AssertionError("timeout was not raised")
+        except api_exceptions.DeadlineExceeded:
+            assert time.perf_counter() - started < 0.8
+
+
+def test_concurrent_analyses_overlap_model_latency():
+    before = gemini_service.usage_stats()
+    with gemini_standin(latency=Latency("uniform", 0.2, 0.3)) as server:
+        started = time.perf_counter()
+        responses = asyncio.run(post_concurrently("/pdf/parole-summary", 12))
+        elapsed = time.perf_counter() - started
+
+    assert all(response.status_code == 200 for response in responses)
+    assert responses[0].json()["markdown_summary"].startswith("# Parole Hearing Summary")
+    # 24 model calls of 0.2-0.3s each, made concurrently rather than one after another
+    stats = server.stats()
+    assert stats["requests"] == 24 and stats["peak_in_flight"] > 4
+    assert elapsed < 24 * 0.2 / 2
+    assert gemini_service.usage_stats() == before  # counters restored after the run
+
+
+def test_pipeline_survives_errors_and_rate_limits():
+    with gemini_standin(latency=Latency("exponential", 0.02), error_rate=0.3, rate_limit_rate=0.2, seed=7) as server:
+        responses = asyncio.run(post_concurrently("/pdf/innocence-analysis", 16))
+        usage = gemini_service.usage_stats()
+
+    # Every failed call falls back to the offline analyzer instead of failing the request
+    assert all(response.status_code == 200 and response.json()["success"] for response in responses)
+    stats = server.stats()
+    assert stats["errors"] and stats["rate_limited"]
+    assert (usage["model"], usage["requests"]) == ("stand-in/gemini-2.5-flash", stats["requests"])
+    assert usage["failures"] == stats["errors"] + stats["rate_limited"]
+    assert usage["prompt_tokens"] == stats["prompt_tokens"] > 0
+
+
+def test_broken_stream_reports_an_error_event():
+    with gemini_standin(stream_chunk_size=8, stream_break_rate=1.0) as server:
+        with open(PDF_FILE_PATH, "rb") as f:
+            body = asyncio.run(stream_events(f.read()))
+
+    events = [line for line in body.splitlines() if line.startswith("event: ")]
+    assert events[0] == "event: extraction" and "event: chunk" in events
+    assert events[-1] == "event: error" and server.stats()["broken_streams"] == 1
+
+
+async def stream_events(pdf_bytes: bytes) -> str:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test", timeout=60) as client:
+        response = await client.post("/pdf/process/stream", files={"file": ("transcript.pdf", pdf_bytes, "application/pdf")})
+        return response.text
+
+
+def test_backend_is_chosen_by_config():
+    # get_gemini_model is a classmethod, so the setting is changed on the class
+    original = Config.GEMINI_BACKEND
+    try:
+        Config.GEMINI_BACKEND = "stand-in"
+        model = config.get_gemini_model()
+        assert isinstance(model, StandInGenerativeModel) and model.base_url == config.GEMINI_STANDIN_URL
+        assert model.model_name == f"stand-in/{config.GEMINI_MODEL}"
+        Config.GEMINI_BACKEND = "offline"
+        assert config.get_gemini_model() is None
+    finally:
+        Config.GEMINI_BACKEND = original
+
+
+if __name__ == "__main__":
+    test_responses_carry_text_and_usage_metadata()
+    test_failures_are_raised_as_api_errors()
+    test_concurrent_analyses_overlap_model_latency()
+    test_pipeline_survives_errors_and_rate_limits()
+    test_broken_stream_reports_an_error_event()
+    test_backend_is_chosen_by_config()
+    print("OK")
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for the single-pass innocence classifier behind the offline innocence analyzer.
+
+Runs offline; works as a script or under pytest.
+"""
+
+from api.services.document import ExtractedDocument
+from api.services.innocence_classifier import InnocenceClassifier, innocence_classifier
+from api.services.innocence_rules import CategoryRule
+from api.services.pdf_service import MOCK_INNOCENCE_FINDINGS, pdf_service
+from benchmark_innocence_classifier import previous_findings
+
+PDF_FILE_PATH = "pdf/Young-AK2960-2024-10-24.pdf"
+
+
+def categories(text: str) -> list[tuple[int, int, str]]:
+    findings = innocence_classifier.classify(ExtractedDocument(text.split("\f")).lines())
+    return [(f["page"], f["line"], f["category"]) for f in findings]
+
+
+def test_matches_previous_analyzer_on_sample():
+    with open(PDF_FILE_PATH, "rb") as f:
+        document = pdf_service.extract_text_from_pdf(f.read())
+    expected = previous_findings(document)
+    assert innocence_classifier.classify(document.lines()) == expected
+    assert innocence_classifier.classify(document.lines(), limit=MOCK_INNOCENCE_FINDINGS) == expected[:MOCK_INNOCENCE_FINDINGS]
+
+
+def test_first_rule_hit_decides_even_when_length_rejects():
+    # "rights" hides the clarity word "right" at the same offset; the short line is then rejected as procedural
+    assert categories("My rights, yes.") == []
+    # "no" inside "know" still counts, and the page number follows the pages
+    assert categories("Good morning.\fI know.") == [(2, 1, "behavioral_clarity")]
+    assert categories("PRESIDING COMMISSIONER:  Do you accept responsibility?") == [(1, 1, "responsibility_pressure")]
+
+
+def test_offsets_survive_lowercasing_that_changes_length():
+    # "İ".lower() is two characters long
+    assert categories("İİİİ\nThat is a different version of events.") == [(1, 2, "consistency_statement")]
+
+
+def test_rules_are_data():
+    classifier = InnocenceClassifier(rules=[CategoryRule("alibi", ("alibi",), "Alibi mentioned")], speakers=[(("Smith",), "Smith")])
+    findings = classifier.classify(ExtractedDocument(["Smith: I had an alibi that night."]).lines())
+    assert findings == [
+        {
+            "quote": "Smith: I had an alibi that night.",
+            "speaker": "Smith",
+            "page": 1,
+            "line": 1,
+            "category": "alibi",
+            "significance": "Alibi mentioned",
+        }
+    ]
+
+
+if __name__ == "__main__":
+    test_matches_previous_analyzer_on_sample()
+    test_first_rule_hit_decides_even_when_length_rejects()
+    test_offsets_survive_lowercasing_that_changes_length()
+    test_rules_are_data()
+    print("OK")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests for the background job API: submit, poll, restart recovery and queue limits.
+
+Jobs are stored in a temporary SQLite file; analysis uses the offline mock.
+Runs offline; works as a script or under pytest.
+"""
+
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from api.services.ingestion import IngestedPDF
+from api.services.job_store import JobStore
+from api.services.jobs import JobQueue, job_queue
+from api.services.pdf_service import gemini_service
+from main import app
+
+PDF_FILE_PATH = "pdf/Young-AK2960-2024-10-24.pdf"
+POLL_TIMEOUT = 30  # seconds
+
+
+def wait_for_job(store: JobStore, job_id: str) -> dict:
+    deadline = time.monotonic() + POLL_TIMEOUT
+    while time.monotonic() < deadline:
+        job = store.get(job_id)
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_submit_and_poll_job():
+    original_store, original_dir, original_model = job_queue.store, job_queue.pdf_dir, gemini_service.model
+    with tempfile.TemporaryDirectory() as tmp:
+        job_queue.store, job_queue.pdf_dir = JobStore(os.path.join(tmp, "jobs.sqlite3")), tmp
+        gemini_service.model = None
+        try:
+            with TestClient(app) as client, open(PDF_FILE_PATH, "rb") as f:
+                response = client.post(
+                    "/pdf/jobs", files={"file": ("transcript.pdf", f, "application/pdf")}, data={"analysis_type": "parole-summary"}
+                )
+                assert response.status_code == 202
+                job_id = response.json()["job_id"]
+
+                wait_for_job(job_queue.store, job_id)
+                job = client.get(f"/pdf/jobs/{job_id}").json()["job"]
+                assert job["status"] == "succeeded"
+                assert job["result"]["demographics"]["clientInfo"]["cdcrNumber"] == "AK2960"
+                assert job["result"]["markdown_summary"].startswith("# Parole Hearing Summary")
+                assert not os.path.exists(os.path.join(tmp, f"{job_id}.pdf"))
+
+                assert client.get("/health/jobs").json()["jobs"]["jobs"]["succeeded"] == 1
+                assert client.get("/pdf/jobs/unknown").status_code == 404
+                assert (
+                    client.post("/pdf/jobs", files={"file": ("a.pdf", b"%PDF-1.4", "application/pdf")}, data={"analysis_type": "x"}).status_code
+                    == 400
+                )
+        finally:
+            job_queue.store, job_queue.pdf_dir, gemini_service.model = original_store, original_dir, original_model
+
+
+def test_interrupted_jobs_resume_after_restart():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "jobs.sqlite3")
+        pdf_path = os.path.join(tmp, "interrupted.pdf")
+        shutil.copy(PDF_FILE_PATH, pdf_path)
+
+        # A previous process had started this job when it stopped
+        store = JobStore(db_path)
+        store.create("interrupted", "innocence-analysis", "single", None, "transcript.pdf", os.path.getsize(pdf_path), "0" * 64, pdf_path)
+        store.mark_running("interrupted")
+
+        async def restart() -> None:
+            queue = JobQueue(JobStore(db_path), tmp, workers=1, max_queue_depth=10)
+            await queue.start()
+            await queue._queue.join()
+            await queue.stop()
+
+        asyncio.run(restart())
+        job = JobStore(db_path).get("interrupted")
+        assert job["status"] == "succeeded", job["error"]
+        assert "findings" in JobStore.to_response(job)["result"]["innocence_analysis"]
+
+
+def test_full_queue_rejects_submissions():
+    async def submit() -> int:
+        with tempfile.TemporaryDirectory() as tmp:
+            queue = JobQueue(JobStore(os.path.join(tmp, "jobs.sqlite3")), tmp, workers=1, max_queue_depth=0)
+            await queue.start()
+            try:
+                with open(PDF_FILE_PATH, "rb") as f:
+                    await queue.submit(IngestedPDF(f, 1, "0" * 64, "transcript.pdf"), "innocence-analysis", "single", None)
+            except HTTPException as e:
+                return e.status_code
+            finally:
+                await queue.stop()
+        return 200
+
+    assert asyncio.run(submit()) == 503
+
+
+if __name__ == "__main__":
+    test_submit_and_poll_job()
+    test_interrupted_jobs_resume_after_restart()
+    test_full_queue_rejects_submissions()
+    print("OK")
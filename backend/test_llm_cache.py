@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for the Gemini response cache: hits skip the model, and mock fallbacks are never cached.
+
+Runs offline with a fake model and a temporary SQLite file; works as a script or under pytest.
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+
+from api.services.document import ExtractedDocument
+from api.services.fake_gemini import FakeGenerativeModel
+from api.services.llm_cache import LLMResponseCache
+from api.services.pdf_service import GeminiService
+
+DOCUMENT = ExtractedDocument(["PAROLE SUITABILITY HEARING\nEMMANUEL YOUNG"])
+
+
+class FlakyModel(FakeGenerativeModel):
+    """Fake model that fails until `failures` calls have been made."""
+
+    def __init__(self, failures: int):
+        super().__init__(responder=lambda prompt: "real summary")
+        self.failures = failures
+
+    async def generate_content_async(self, contents, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            self.calls += 1
+            raise RuntimeError("429 quota exceeded")
+        return await super().generate_content_async(contents, **kwargs)
+
+
+def make_cache(directory: str, ttl_seconds: float = 3600, max_bytes: int = 1024 * 1024) -> LLMResponseCache:
+    return LLMResponseCache(os.path.join(directory, "llm.sqlite3"), ttl_seconds=ttl_seconds, max_bytes=max_bytes)
+
+
+def test_repeat_request_is_served_from_cache():
+    with tempfile.TemporaryDirectory() as tmp:
+        model = FakeGenerativeModel(responder=lambda prompt: "real summary")
+        service = GeminiService(model=model, response_cache=make_cache(tmp))
+        first = service.process_text_with_ai(DOCUMENT, "Summarize")
+        second = asyncio.run(service.process_text_with_ai_async(DOCUMENT, "Summarize"))
+        assert first == second == "real summary"
+        assert model.calls == 1
+        # A different prompt is a different cache entry
+        service.process_text_with_ai(DOCUMENT, "Summarize differently")
+        assert model.calls == 2
+
+
+def test_mock_fallback_is_not_cached():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = make_cache(tmp)
+        service = GeminiService(model=FlakyModel(failures=1), response_cache=cache)
+        fallback = asyncio.run(service.process_text_with_ai_async(DOCUMENT, "Summarize"))
+        assert fallback.startswith("# Parole Hearing Summary")
+        assert cache.stats()["entries"] == 0
+
+        # The next request reaches the model and its real answer is cached
+        assert asyncio.run(service.process_text_with_ai_async(DOCUMENT, "Summarize")) == "real summary"
+        assert cache.stats()["entries"] == 1
+
+
+def test_ttl_and_size_eviction():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = make_cache(tmp, ttl_seconds=0.05, max_bytes=100)
+        cache.put("a", "m", "x" * 60)
+        cache.put("b", "m", "y" * 60)
+        # Size budget only fits one entry; the least recently used one goes
+        assert cache.get("a") is None and cache.get("b") == "y" * 60
+        time.sleep(0.1)
+        assert cache.get("b") is None
+
+
+if __name__ == "__main__":
+    test_repeat_request_is_served_from_cache()
+    test_mock_fallback_is_not_cached()
+    test_ttl_and_size_eviction()
+    print("OK")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for the load generator (load_test.py), run in-process against the app.
+
+Model calls go to the Gemini stand-in; runs offline; works as a script or under pytest.
+"""
+
+import asyncio
+
+import httpx
+
+from api.services.gemini_standin import Latency
+from load_test import LoadGenerator, histogram, load_files, parse_mix, percentile, summarize
+from main import app
+from test_gemini_standin import gemini_standin
+
+PDF_FILE_PATH = "pdf/Young-AK2960-2024-10-24.pdf"
+
+
+async def run(mix: str, requests: int, concurrency: int, rate: float = 0.0) -> tuple[LoadGenerator, float]:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test", timeout=60) as client:
+        generator = LoadGenerator(client, load_files([PDF_FILE_PATH], [3], seed=0), concurrency)
+        wall = await generator.run(parse_mix(mix), requests, rate, duration=None)
+    return generator, wall
+
+
+def test_percentiles_and_histogram():
+    values = [float(v) for v in range(1, 101)]
+    assert (percentile(values, 0.5), percentile(values, 0.95), percentile(values, 0.99)) == (50.0, 95.0, 99.0)
+    assert percentile([], 0.5) == 0.0
+    buckets = histogram([0.005, 0.02, 0.02, 45.0])
+    assert [b["count"] for b in buckets if b["count"]] == [1, 2, 1] and buckets[-1] == {"le_ms": None, "count": 1}
+
+
+def test_closed_loop_respects_concurrency_and_counts_errors():
+    with gemini_standin(latency=Latency("fixed", 0.1)) as server:
+        generator, wall = asyncio.run(run("innocence-analysis=2,extract-text=1,file-url=1", 24, concurrency=4))
+
+    report = summarize(generator.results, wall)
+    assert report["overall"]["requests"] == 24
+    assert server.stats()["peak_in_flight"] <= 4
+    endpoints = report["endpoints"]
+    assert endpoints["innocence-analysis"]["errors"] == 0 and endpoints["extract-text"]["error_rate"] == 0.0
+    # No object was uploaded, so every signed URL request fails
+    assert endpoints["file-url"]["error_rate"] == 1.0
+    latency = endpoints["innocence-analysis"]["latency_ms"]
+    assert 100 <= latency["p50"] <= latency["p95"] <= latency["p99"] <= latency["max"]
+    assert sum(b["count"] for b in endpoints["innocence-analysis"]["histogram"]) == endpoints["innocence-analysis"]["requests"]
+
+
+def test_open_loop_follows_the_arrival_rate_and_times_streams():
+    with gemini_standin(stream_chunk_delay=0.01):
+        generator, wall = asyncio.run(run("process-stream", 20, concurrency=20, rate=40))
+
+    report = summarize(generator.results, wall)
+    stream = report["endpoints"]["process-stream"]
+    assert stream["requests"] == 20 and stream["errors"] == 0
+    # 20 arrivals at 40/s take about half a second, however fast each request is answered
+    assert 0.2 < wall < 2.0
+    assert stream["first_byte_ms"]["p50"] <= stream["latency_ms"]["p50"]
+
+
+if __name__ == "__main__":
+    test_percentiles_and_histogram()
+    test_closed_loop_respects_concurrency_and_counts_errors()
+    test_open_loop_follows_the_arrival_rate_and_times_streams()
+    print("OK")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for multi-process text extraction: same text as sequential extraction, and the
+in-process fallback when the process pool breaks.
+
+Runs offline; works as a script or under pytest.
+"""
+
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+from api.core.config import config
+from api.services import parallel_extraction
+from api.services.document import ExtractedDocument
+from api.services.pdf_service import PDFService
+
+PDF_FILE_PATH = "pdf/Young-AK2960-2024-10-24.pdf"
+PAGE_COUNT = 20
+
+
+def read_pdf() -> bytes:
+    with open(PDF_FILE_PATH, "rb") as f:
+        return f.read()
+
+
+def extract(pdf_bytes: bytes, processes: int, min_pages: int) -> ExtractedDocument:
+    """Extract without the cache, with the given process count and parallel threshold."""
+    original = config.EXTRACTION_PROCESSES, config.PARALLEL_EXTRACTION_MIN_PAGES
+    config.EXTRACTION_PROCESSES, config.PARALLEL_EXTRACTION_MIN_PAGES = processes, min_pages
+    try:
+        return PDFService._extract_document(pdf_bytes)
+    finally:
+        config.EXTRACTION_PROCESSES, config.PARALLEL_EXTRACTION_MIN_PAGES = original
+
+
+def test_parallel_extraction_matches_sequential():
+    pdf_bytes = read_pdf()
+    parallel_extraction.shutdown_pool()
+    try:
+        sequential = extract(pdf_bytes, processes=1, min_pages=1)
+        assert parallel_extraction._pool is None
+        parallel = extract(pdf_bytes, processes=3, min_pages=2)
+        assert parallel_extraction._pool is not None and parallel_extraction._pool_size == 3
+    finally:
+        parallel_extraction.shutdown_pool()
+
+    assert parallel.page_count == sequential.page_count == PAGE_COUNT
+    assert parallel.text == sequential.text
+    assert parallel_extraction.split_page_ranges(PAGE_COUNT, 3) == [(0, 7), (7, 14), (14, 20)]
+
+
+def test_broken_pool_falls_back_to_sequential_extraction():
+    pdf_bytes = read_pdf()
+    expected = parallel_extraction._extract_page_range(pdf_bytes, 0, PAGE_COUNT)
+    try:
+        # Kill a worker so the shared pool is broken when extraction uses it
+        pool = parallel_extraction.get_pool(2)
+        try:
+            pool.submit(os._exit, 1).result()
+            raise AssertionError("the worker did not exit")
+        except BrokenProcessPool:
+            pass
+
+        assert parallel_extraction.extract_pages_parallel(pdf_bytes, PAGE_COUNT, 2) == expected
+        assert parallel_extraction._pool is None
+
+        # The next call starts a fresh pool
+        assert parallel_extraction.extract_pages_parallel(pdf_bytes, PAGE_COUNT, 2) == expected
+        assert parallel_extraction._pool is not None and parallel_extraction._pool is not pool
+    finally:
+        parallel_extraction.shutdown_pool()
+
+
+if __name__ == "__main__":
+    test_parallel_extraction_matches_sequential()
+    test_broken_pool_falls_back_to_sequential_extraction()
+    print("OK")
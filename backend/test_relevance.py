@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for the relevance pre-filter used by /pdf/innocence-analysis?context_filter=true.
+
+Runs offline; works as a script or under pytest.
+"""
+
+from fastapi.testclient import TestClient
+
+from api.services.document import ExtractedDocument
+from api.services.pdf_service import gemini_service
+from api.services.relevance import score_lines, select_relevant_lines
+from main import app
+
+PDF_FILE_PATH = "pdf/Young-AK2960-2024-10-24.pdf"
+FILLER = "COMMISSIONER RUFF:  Let's move on to the next topic."
+
+
+def test_scores_come_from_keyword_sets():
+    document = ExtractedDocument(["I am innocent, I was framed.\nGood morning.\nMy attorney has the DNA report."])
+    assert list(score_lines(list(document.lines()))) == [6, 0, 4]
+
+    # "İ".lower() is two characters long, which must not shift the matches onto later lines
+    document = ExtractedDocument(["İ" * 40 + "\nnothing\nI am innocent\nok"])
+    scores = list(score_lines(list(document.lines())))
+    assert scores[2] and not scores[3]
+
+
+def test_excerpt_keeps_original_markers_and_context():
+    page_one = "\n".join([FILLER] * 10 + ["YOUNG:  I didn't do it, I was not there."] + [FILLER] * 10)
+    page_two = "\n".join([FILLER] * 5)
+    selection = select_relevant_lines(ExtractedDocument([page_one, page_two]), keep_ratio=0.01, context_lines=1)
+
+    expected = [
+        "[PAGE 1]",
+        "[...]",
+        f"[Line 10] {FILLER}",
+        "[Line 11] YOUNG:  I didn't do it, I was not there.",
+        f"[Line 12] {FILLER}",
+        "",
+        "[END PAGE 1]",
+    ]
+    assert selection.excerpt.text.split("\n") == expected
+    assert [(line.page, line.line) for line in selection.excerpt.lines()] == [(1, 10), (1, 11), (1, 12)]
+    assert (selection.lines_total, selection.lines_kept) == (26, 3)
+    assert selection.stats()["token_reduction"] > 0.8
+
+
+def test_document_without_keywords_is_kept_whole():
+    document = ExtractedDocument([FILLER, FILLER])
+    selection = select_relevant_lines(document)
+    assert selection.lines_kept == selection.lines_total == 2
+
+
+def test_innocence_route_reports_context_selection():
+    original_model = gemini_service.model
+    gemini_service.model = None
+    try:
+        with open(PDF_FILE_PATH, "rb") as f:
+            response = TestClient(app).post(
+                "/pdf/innocence-analysis", files={"file": ("transcript.pdf", f, "application/pdf")}, data={"context_filter": "true"}
+            )
+    finally:
+        gemini_service.model = original_model
+
+    body = response.json()
+    selection = body["context_selection"]
+    assert selection["selected_tokens"] < selection["original_tokens"]
+    assert 0 < selection["token_reduction"] < 1
+    # The latency change is estimated from the measured time per excerpt token
+    assert selection["estimated_full_prompt_ms"] >= selection["analysis_ms"]
+    assert selection["estimated_latency_saved_ms"] == round(selection["estimated_full_prompt_ms"] - selection["analysis_ms"], 2)
+    # Findings cite the original page and line numbers
+    assert body["innocence_analysis"]["findings"][0]["page"] == 1
+
+
+def test_context_filter_is_rejected_with_chunked_modes():
+    with TestClient(app) as client:
+        for mode in ("chunked", "auto"):
+            response = client.post(
+                "/pdf/innocence-analysis",
+                files={"file": ("transcript.pdf", b"%PDF-1.4", "application/pdf")},
+                data={"context_filter": "true", "analysis_mode": mode},
+            )
+            assert response.status_code == 400
+            assert response.json()["detail"] == 'context_filter only supports analysis_mode "single"'
+
+
+if __name__ == "__main__":
+    test_scores_come_from_keyword_sets()
+    test_excerpt_keeps_original_markers_and_context()
+    test_document_without_keywords_is_kept_whole()
+    test_innocence_route_reports_context_selection()
+    test_context_filter_is_rejected_with_chunked_modes()
+    print("OK")
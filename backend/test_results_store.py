@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Tests for the analysis results store and the /pdf/results endpoints.
+
+Results go to a temporary SQLite file; analysis uses the offline mock.
+Runs offline; works as a script or under pytest.
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+from fastapi.testclient import TestClient
+
+from api.services.analysis import INNOCENCE_ANALYSIS_PROMPT, prompt_version
+from api.services.fake_gemini import FakeGenerativeModel
+from api.services.pdf_service import gemini_service, pdf_service
+from api.services.pipeline import store_result
+from api.services.results_store import ResultsStore, results_store
+from main import app
+
+PDF_FILE_PATH = "pdf/Young-AK2960-2024-10-24.pdf"
+
+
+@contextmanager
+def temporary_results_store(path: str = "results.sqlite3"):
+    """Point the shared results store at a fresh file (or disable it with path="") and use the offline analyzer."""
+    original_path, original_model = results_store.path, gemini_service.model
+    with tempfile.TemporaryDirectory() as tmp:
+        results_store.close()
+        results_store.path = os.path.join(tmp, path) if path else ""
+        gemini_service.model = None
+        try:
+            yield results_store
+        finally:
+            results_store.close()
+            results_store.path, gemini_service.model = original_path, original_model
+
+
+def analyze(client: TestClient, endpoint: str) -> dict:
+    with open(PDF_FILE_PATH, "rb") as f:
+        response = client.post(endpoint, files={"file": ("young.pdf", f, "application/pdf")})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_results_are_compressed_and_keyed_by_prompt_version():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ResultsStore(os.path.join(tmp, "results.sqlite3"))
+        result = {"markdown_summary": "# Parole Hearing Summary\n" + "The panel reviewed the record. " * 200}
+
+        etag = store.put("abc", "parole-summary", "v1", result, "young.pdf", "AK2960")
+        assert store.put("abc", "parole-summary", "v1", result, "young.pdf", "AK2960") == etag
+        store.put("abc", "parole-summary", "v2", {**result, "markdown_summary": "newer"}, "young.pdf", "AK2960")
+
+        stored = store.get("abc", "parole-summary")
+        assert [entry.prompt_version for entry in stored] == ["v2", "v1"]
+        assert stored[1].etag == etag and stored[1].stored_size * 10 < stored[1].size
+        assert stored[1].result_json() == '{"markdown_summary":"' + result["markdown_summary"].replace("\n", "\\n") + '"}'
+        assert store.stats()["results"] == 2
+        store.close()
+
+
+def test_lookups_by_cdcr_number_and_filename_use_the_indexes():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ResultsStore(os.path.join(tmp, "results.sqlite3"))
+        for i in range(50):
+            store.put(f"doc-{i}", "innocence-analysis", "v1", {"i": i}, f"hearing-{i % 5}.pdf", f"AK{2900 + i % 10}")
+
+        assert {entry.doc_hash for entry in store.find(cdcr_number="AK2903")} == {f"doc-{i}" for i in (3, 13, 23, 33, 43)}
+        assert len(store.find(filename="hearing-1.pdf", limit=3)) == 3
+        assert [entry.doc_hash for entry in store.find(cdcr_number="AK2903", filename="hearing-3.pdf")][-1] == "doc-3"
+
+        conn = store._connection()
+        for column, index in (("cdcr_number", "results_cdcr_number"), ("filename", "results_filename")):
+            plan = " ".join(row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN SELECT * FROM results WHERE {column} = ?", ("x",)))
+            assert index in plan
+        store.close()
+
+
+def test_analyses_are_stored_and_served_with_etags():
+    with temporary_results_store(), TestClient(app) as client:
+        summary = analyze(client, "/pdf/parole-summary")
+        doc_hash = summary["doc_hash"]
+
+        response = client.get(f"/pdf/results/{doc_hash}/parole-summary")
+        assert response.status_code == 200
+        body = response.json()
+        assert body["result"] == summary
+        assert (body["cdcr_number"], body["filename"]) == ("AK2960", "young.pdf")
+
+        etag = response.headers["etag"]
+        assert client.get(f"/pdf/results/{doc_hash}/parole-summary", headers={"If-None-Match": etag}).status_code == 304
+        assert client.get(f"/pdf/results/{doc_hash}/parole-summary", headers={"If-None-Match": '"stale"'}).status_code == 200
+
+        # A new analysis of the document changes the ETag of the document's result list
+        all_etag = client.get(f"/pdf/results/{doc_hash}").headers["etag"]
+        innocence = analyze(client, "/pdf/innocence-analysis")
+        response = client.get(f"/pdf/results/{doc_hash}", headers={"If-None-Match": all_etag})
+        assert response.status_code == 200 and response.headers["etag"] != all_etag
+        results = response.json()["results"]
+        assert [entry["analysis_type"] for entry in results] == ["innocence-analysis", "parole-summary"]
+        assert results[0]["result"] == innocence
+
+        found = client.get("/pdf/results", params={"cdcr_number": "ak2960"}).json()["results"]
+        assert {entry["analysis_type"] for entry in found} == {"parole-summary", "innocence-analysis"}
+        assert "result" not in found[0]
+        assert client.get("/pdf/results/unknown").status_code == 404
+        assert client.get(f"/pdf/results/{doc_hash}/process").status_code == 404
+
+
+def test_model_failures_are_stored_as_offline_results():
+    def respond(prompt: str) -> str:
+        if prompt.startswith(INNOCENCE_ANALYSIS_PROMPT):
+            raise RuntimeError("model unavailable")
+        return "{}"
+
+    original_cache = gemini_service.response_cache
+    with temporary_results_store(), TestClient(app) as client:
+        gemini_service.model, gemini_service.response_cache = FakeGenerativeModel(responder=respond), None
+        try:
+            summary = analyze(client, "/pdf/parole-summary")
+            innocence = analyze(client, "/pdf/innocence-analysis")
+        finally:
+            gemini_service.response_cache = original_cache
+
+        assert summary["offline_analysis"] is False and innocence["offline_analysis"] is True
+        stored = {entry["analysis_type"]: entry["prompt_version"] for entry in client.get(f"/pdf/results/{summary['doc_hash']}").json()["results"]}
+        assert stored == {
+            "parole-summary": prompt_version("parole-summary", "models/fake-gemini"),
+            "innocence-analysis": prompt_version("innocence-analysis", "offline"),
+        }
+
+
+def test_malformed_demographics_fall_back_to_the_offline_cdcr_number():
+    with open(PDF_FILE_PATH, "rb") as f:
+        document = pdf_service.extract_text_from_pdf(f.read())
+    with temporary_results_store() as store:
+        for demographics in (None, "AK2960", {"clientInfo": "AK2960"}, {"clientInfo": {"cdcrNumber": 2960}}, {"clientInfo": {"cdcrNumber": " "}}):
+            store_result("parole-summary", "abc", document, {"filename": "young.pdf", "demographics": demographics})
+            assert [entry.doc_hash for entry in store.find(cdcr_number="AK2960")] == ["abc"]
+        store_result("parole-summary", "def", document, {"filename": "young.pdf", "demographics": {"clientInfo": {"cdcrNumber": "bk1234 "}}})
+        assert [entry.doc_hash for entry in store.find(cdcr_number="BK1234")] == ["def"]
+
+
+def test_disabled_store_still_analyzes():
+    with temporary_results_store(path=""), TestClient(app) as client:
+        assert analyze(client, "/pdf/innocence-analysis")["success"]
+        assert client.get("/pdf/results", params={"cdcr_number": "AK2960"}).status_code == 503
+
+
+if __name__ == "__main__":
+    test_results_are_compressed_and_keyed_by_prompt_version()
+    test_lookups_by_cdcr_number_and_filename_use_the_indexes()
+    test_analyses_are_stored_and_served_with_etags()
+    test_model_failures_are_stored_as_offline_results()
+    test_malformed_demographics_fall_back_to_the_offline_cdcr_number()
+    test_disabled_store_still_analyzes()
+    print("OK")
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Tests for analyzing PDFs already stored in GCS (object_name on the /pdf endpoints).
+
+Runs end to end against the in-process fake GCS server; works as a script or under pytest.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+
+from fastapi.testclient import TestClient
+
+from api.core.config import config
+from api.services.pdf_service import extraction_cache, gemini_service
+from main import app
+from test_gcs_client import BUCKET, fake_gcs
+
+PDF_FILE_PATH = "pdf/Young-AK2960-2024-10-24.pdf"
+
+
+@contextmanager
+def stored_pdfs():
+    """A fake GCS server, an empty extraction cache on a throwaway disk dir and the offline analyzer."""
+    original = (extraction_cache.disk_dir, extraction_cache._disk_bytes, dict(extraction_cache._memory), gemini_service.model)
+    with tempfile.TemporaryDirectory() as cache_dir, fake_gcs() as server:
+        extraction_cache.disk_dir, extraction_cache._disk_bytes = cache_dir, 0
+        extraction_cache._memory.clear()
+        gemini_service.model = None
+        try:
+            yield server, TestClient(app)
+        finally:
+            extraction_cache.disk_dir, extraction_cache._disk_bytes, memory, gemini_service.model = original
+            extraction_cache._memory.clear()
+            extraction_cache._memory.update(memory)
+
+
+def read_pdf() -> bytes:
+    with open(PDF_FILE_PATH, "rb") as f:
+        return f.read()
+
+
+def test_uploaded_pdf_is_analyzed_by_reference():
+    with stored_pdfs() as (server, client):
+        stored = client.post("/file/upload", files={"file": ("young.pdf", read_pdf(), "application/pdf")}).json()
+        by_upload = client.post("/pdf/innocence-analysis", files={"file": ("young.pdf", read_pdf(), "application/pdf")}).json()
+
+        response = client.post("/pdf/innocence-analysis", data={"object_name": stored["object_name"]})
+        body = response.json()
+        assert response.status_code == 200 and body["success"]
+        assert (body["filename"], body["file_size"]) == (stored["object_name"], len(read_pdf()))
+        assert body["innocence_analysis"] == by_upload["innocence_analysis"]
+        assert extraction_cache.pdf_path(stored["sha256"]) is not None
+
+
+def test_cached_content_is_not_downloaded_again():
+    with stored_pdfs() as (server, client):
+        stored = client.post("/file/upload", files={"file": ("young.pdf", read_pdf(), "application/pdf")}).json()
+        client.post("/pdf/extract-text", data={"object_name": stored["object_name"]})
+        requests = server.requests
+
+        # Content objects name their hash, so a cached one is read from local disk with no request at all
+        for _ in range(3):
+            response = client.post("/pdf/extract-text", data={"object_name": stored["object_name"]})
+            assert response.status_code == 200 and response.json()["extracted_text"]
+        assert server.requests == requests
+        assert extraction_cache.stats()["pdf_hits"] >= 3
+
+
+def test_aliases_and_other_objects_are_resolved():
+    with stored_pdfs() as (server, client):
+        client.post("/file/upload", files={"file": ("young.pdf", read_pdf(), "application/pdf")})
+        server.put(BUCKET, "hearings/2024/young.pdf", read_pdf(), "application/pdf")
+
+        by_alias = client.post("/pdf/extract-text", data={"object_name": "aliases/young.pdf"})
+        assert by_alias.status_code == 200
+
+        by_name = client.post("/pdf/extract-text", data={"object_name": "hearings/2024/young.pdf"})
+        assert by_name.json()["extracted_text"] == by_alias.json()["extracted_text"]
+        # Same bytes as the content object, so the cached copy is reused once the hash is known
+        requests = server.requests
+        client.post("/pdf/extract-text", data={"object_name": "hearings/2024/young.pdf"})
+        assert server.requests == requests + 1
+
+
+def test_bad_references_are_rejected():
+    with stored_pdfs() as (server, client):
+        server.put(BUCKET, "notes.txt", b"not a pdf", "text/plain")
+
+        assert client.post("/pdf/parole-summary", data={"object_name": "missing.pdf"}).status_code == 404
+        assert client.post("/pdf/parole-summary", data={"object_name": "notes.txt"}).status_code == 400
+        assert client.post("/pdf/parole-summary", data={}).status_code == 400
+        both = client.post("/pdf/parole-summary", files={"file": ("a.pdf", read_pdf(), "application/pdf")}, data={"object_name": "notes.txt"})
+        assert both.status_code == 400
+
+
+def test_large_and_non_pdf_objects_are_rejected_before_caching():
+    with stored_pdfs() as (server, client):
+        large = b"%PDF-1.4\n" + b"0" * config.MAX_FILE_SIZE
+        large_name = config.GCS_CONTENT_PREFIX + hashlib.sha256(large).hexdigest()
+        server.put(BUCKET, large_name, large, "application/pdf")
+        server.put(BUCKET, "hearings/large.pdf", large, "application/pdf")
+        server.put(BUCKET, "notes.txt", b"not a pdf", "text/plain")
+
+        # Over the limit: rejected from the object's metadata, without downloading it
+        for name in (large_name, "hearings/large.pdf"):
+            response = client.post("/pdf/extract-text", data={"object_name": name})
+            assert response.status_code == 400
+            assert response.json()["detail"] == f"File size exceeds {config.MAX_FILE_SIZE // (1024 * 1024)}MB limit"
+        assert server.downloads == 0
+
+        # Not a PDF: downloaded to check its header, but not kept in the cache
+        response = client.post("/pdf/extract-text", data={"object_name": "notes.txt"})
+        assert response.status_code == 400 and response.json()["detail"] == "Only PDF files are supported"
+        assert server.downloads == 1
+        assert os.listdir(extraction_cache.disk_dir) == []
+        assert extraction_cache.pdf_path(hashlib.sha256(b"not a pdf").hexdigest()) is None
+
+
+def test_batch_and_stream_accept_references():
+    with stored_pdfs() as (server, client):
+        stored = client.post("/file/upload", files={"file": ("young.pdf", read_pdf(), "application/pdf")}).json()
+
+        response = client.post(
+            "/pdf/batch",
+            files=[("files", ("young.pdf", read_pdf(), "application/pdf"))],
+            data={"object_names": [stored["object_name"], "missing.pdf"], "analysis_type": "innocence-analysis"},
+        )
+        body = response.json()
+        assert (body["total"], body["succeeded"]) == (3, 2)
+        assert [result["filename"] for result in body["results"]] == ["young.pdf", stored["object_name"], "missing.pdf"]
+        assert body["results"][2]["status_code"] == 404
+
+        with client.stream("POST", "/pdf/parole-summary/stream", data={"object_name": stored["object_name"]}) as stream:
+            lines = stream.iter_lines()
+            first, data = next(lines), next(lines)
+        assert first == "event: extraction"
+        assert json.loads(data.removeprefix("data: "))["filename"] == stored["object_name"]
+
+
+if __name__ == "__main__":
+    test_uploaded_pdf_is_analyzed_by_reference()
+    test_cached_content_is_not_downloaded_again()
+    test_aliases_and_other_objects_are_resolved()
+    test_bad_references_are_rejected()
+    test_large_and_non_pdf_objects_are_rejected_before_caching()
+    test_batch_and_stream_accept_references()
+    print("OK")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming summary API and the /pdf/*/stream Server-Sent Events endpoints.
+
+Runs offline against a fake model and the mock analyzer; works as a script or under pytest.
+"""
+
+import asyncio
+import json
+import time
+
+from fastapi.testclient import TestClient
+
+from api.services.document import ExtractedDocument
+from api.services.fake_gemini import FakeGenerativeModel
+from api.services.pdf_service import GeminiService, gemini_service
+from main import app
+
+PDF_FILE_PATH = "pdf/Young-AK2960-2024-10-24.pdf"
+DOCUMENT = ExtractedDocument(["PAROLE SUITABILITY HEARING\nEMMANUEL YOUNG\nCDCR Number: AK2960"])
+STREAM_TEXT = "# Summary\n" + "- finding\n" * 20
+CHUNK_DELAY = 0.05  # seconds between streamed chunks
+
+
+async def collect(stream) -> tuple[float, list[str]]:
+    """Return the time to the first piece and all pieces."""
+    started = time.perf_counter()
+    first_piece_at = None
+    pieces = []
+    async for piece in stream:
+        if first_piece_at is None:
+            first_piece_at = time.perf_counter() - started
+        pieces.append(piece)
+    return first_piece_at, pieces
+
+
+def parse_events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        name, data = block.split("\n", 1)
+        events.append((name.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+def test_stream_yields_before_generation_finishes():
+    model = FakeGenerativeModel(responder=lambda prompt: STREAM_TEXT, stream_chunk_size=20, stream_chunk_delay=CHUNK_DELAY)
+    service = GeminiService(model=model)
+
+    first_piece_at, pieces = asyncio.run(collect(service.stream_text_with_ai(DOCUMENT, "Summarize")))
+
+    assert "".join(pieces) == STREAM_TEXT
+    assert len(pieces) == -(-len(STREAM_TEXT) // 20)
+    # The first chunk arrives after one chunk delay, not after the whole response
+    assert first_piece_at < CHUNK_DELAY * 3 < CHUNK_DELAY * len(pieces)
+
+
+def test_mock_stream_matches_mock_summary():
+    service = GeminiService(model=FakeGenerativeModel())
+    service.model = None
+
+    _, pieces = asyncio.run(collect(service.stream_parole_summary(DOCUMENT, "MD prompt")))
+
+    assert len(pieces) > 1
+    assert "".join(pieces) == service._generate_mock_parole_summary(DOCUMENT)
+
+
+def test_stream_endpoints_send_events():
+    original_model = gemini_service.model
+    gemini_service.model = None
+    try:
+        client = TestClient(app)
+        with open(PDF_FILE_PATH, "rb") as f:
+            pdf_bytes = f.read()
+        files = {"file": ("transcript.pdf", pdf_bytes, "application/pdf")}
+
+        response = client.post("/pdf/parole-summary/stream", files=files)
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = parse_events(response.text)
+        names = [name for name, _ in events]
+        assert names[0] == "extraction" and names[-2:] == ["demographics", "done"]
+        assert set(names[1:-2]) == {"chunk"}
+        assert events[0][1]["extracted_text_length"] > 0
+        assert events[-2][1]["clientInfo"]["cdcrNumber"] == "AK2960"
+
+        markdown = "".join(data["text"] for name, data in events if name == "chunk")
+        assert markdown.startswith("# Parole Hearing Summary")
+        assert events[-1][1]["markdown_length"] == len(markdown)
+
+        names = [name for name, _ in parse_events(client.post("/pdf/process/stream", files=files).text)]
+        assert names[0] == "extraction" and names[-1] == "done"
+
+        # Invalid uploads are rejected before the stream starts
+        assert client.post("/pdf/process/stream", files={"file": ("a.pdf", b"not a pdf", "application/pdf")}).status_code == 400
+    finally:
+        gemini_service.model = original_model
+
+
+if __name__ == "__main__":
+    test_stream_yields_before_generation_finishes()
+    test_mock_stream_matches_mock_summary()
+    test_stream_endpoints_send_events()
+    print("OK")
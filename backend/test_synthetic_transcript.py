@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for the synthetic transcript generator used by benchmark_suite.py.
+
+Runs offline; works as a script or under pytest.
+"""
+
+from api.services.demographics_extractor import demographics_extractor
+from api.services.innocence_classifier import innocence_classifier
+from api.services.pdf_service import PDFService
+from api.services.synthetic_transcript import LINES_PER_PAGE, MAX_PAGES, generate_transcript
+
+
+def test_transcripts_extract_to_numbered_pages():
+    transcript = generate_transcript(12, seed=3)
+    document = PDFService._extract_document(transcript.pdf())
+
+    assert transcript.page_count == document.page_count == 12
+    body = [line for line in document.lines() if line.page == 5]
+    # The page number heads the page, then every transcript line ends with its own number
+    assert len(body) == LINES_PER_PAGE + 1 and body[0].text == "5"
+    assert body[1].text == f"{transcript.pages[4][0]} 1" and body[-1].text.endswith(f" {LINES_PER_PAGE}")
+
+
+def test_same_seed_gives_same_pdf():
+    assert generate_transcript(5, seed=7).pdf() == generate_transcript(5, seed=7).pdf()
+    assert generate_transcript(5, seed=7).pages != generate_transcript(5, seed=8).pages
+
+
+def test_offline_analyzers_find_the_hearing_facts():
+    transcript = generate_transcript(40, seed=1)
+    document = PDFService._extract_document(transcript.pdf())
+
+    client = demographics_extractor.extract(document.lines())["clientInfo"]
+    assert client["cdcrNumber"] == transcript.cdcr_number
+    assert innocence_classifier.classify(document.lines())
+
+
+def test_page_count_is_bounded():
+    for pages in (0, MAX_PAGES + 1):
+        try:
+            generate_transcript(pages)
+        except ValueError:
+            continue
+        raise AssertionError(f"{pages} pages were accepted")
+
+
+if __name__ == "__main__":
+    test_transcripts_extract_to_numbered_pages()
+    test_same_seed_gives_same_pdf()
+    test_offline_analyzers_find_the_hearing_facts()
+    test_page_count_is_bounded()
+    print("OK")
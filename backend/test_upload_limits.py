@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests for upload rejections: the request size middleware (413) and the checks made while
+an upload streams in (size limit and PDF magic bytes, 400).
+
+Runs offline; works as a script or under pytest.
+"""
+
+import asyncio
+
+import httpx
+from fastapi.testclient import TestClient
+
+from api.core.config import config
+from api.core.upload_limits import UploadSizeLimitMiddleware
+from main import app
+
+PDF_FILE_PATH = "pdf/Young-AK2960-2024-10-24.pdf"
+LIMIT = 64 * 1024
+
+
+class BodyCountingApp:
+    """ASGI app that reads the whole request body and answers with its size (400 if the client went away)."""
+
+    def __init__(self):
+        self.calls = 0
+        self.received = 0
+
+    async def __call__(self, scope, receive, send):
+        self.calls += 1
+        status = 200
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                status = 400
+                break
+            self.received += len(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        await send({"type": "http.response.start", "status": status, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.body", "body": str(self.received).encode()})
+
+
+async def post(limited_app, path: str, content) -> httpx.Response:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=limited_app), base_url="http://test") as client:
+        return await client.post(path, content=content)
+
+
+async def chunked_body(chunks: int, chunk_size: int = 16 * 1024):
+    for _ in range(chunks):
+        yield b"x" * chunk_size
+
+
+def test_content_length_over_the_limit_is_rejected_unread():
+    inner = BodyCountingApp()
+    limited = UploadSizeLimitMiddleware(inner, max_body_size=LIMIT, path_limits={"/pdf/batch": LIMIT * 4})
+
+    response = asyncio.run(post(limited, "/pdf/process", b"x" * (LIMIT + 1)))
+    assert response.status_code == 413 and response.json() == {"detail": "Request body exceeds 0MB limit"}
+    assert inner.calls == 0
+
+    # Larger budget for batches, and no limit outside /pdf
+    assert asyncio.run(post(limited, "/pdf/batch", b"x" * (LIMIT * 2))).status_code == 200
+    assert asyncio.run(post(limited, "/file/upload", b"x" * (LIMIT * 8))).status_code == 200
+
+    with TestClient(app) as client:
+        response = client.post("/pdf/extract-text", content=b"x" * (config.MAX_REQUEST_SIZE + 1), headers={"content-type": "application/pdf"})
+    assert response.status_code == 413
+    assert response.json()["detail"] == f"Request body exceeds {config.MAX_REQUEST_SIZE // (1024 * 1024)}MB limit"
+
+
+def test_chunked_body_over_the_limit_is_cut_off():
+    inner = BodyCountingApp()
+    limited = UploadSizeLimitMiddleware(inner, max_body_size=LIMIT)
+
+    # No Content-Length: the body is counted as it streams in and reading stops past the limit
+    response = asyncio.run(post(limited, "/pdf/process", chunked_body(chunks=64)))
+    assert response.status_code == 413 and response.json() == {"detail": "Request body exceeds 0MB limit"}
+    assert inner.calls == 1 and inner.received <= LIMIT
+
+    inner.received = 0
+    response = asyncio.run(post(limited, "/pdf/process", chunked_body(chunks=4)))
+    assert response.status_code == 200 and response.text == str(LIMIT)
+
+
+def test_upload_over_max_file_size_is_rejected():
+    # Fits in the request budget, so it is the streaming size check that rejects it
+    content = b"%PDF-1.4\n" + b"0" * config.MAX_FILE_SIZE
+    with TestClient(app) as client:
+        response = client.post("/pdf/extract-text", files={"file": ("large.pdf", content, "application/pdf")})
+    assert response.status_code == 400
+    assert response.json()["detail"] == f"File size exceeds {config.MAX_FILE_SIZE // (1024 * 1024)}MB limit"
+
+
+def test_pdf_type_is_checked_by_magic_bytes():
+    with open(PDF_FILE_PATH, "rb") as f:
+        pdf_bytes = f.read()
+
+    with TestClient(app) as client:
+        for content in (b"<html>not a pdf</html>", b"", b"x" * 2048 + pdf_bytes):
+            response = client.post("/pdf/extract-text", files={"file": ("transcript.pdf", content, "application/pdf")})
+            assert response.status_code == 400 and response.json()["detail"] == "Only PDF files are supported"
+
+        # Junk ahead of the header is accepted within the first 1024 bytes, as PDF readers do
+        response = client.post("/pdf/extract-text", files={"file": ("transcript.pdf", b"\r\n" + pdf_bytes, "application/pdf")})
+        assert response.status_code == 200 and response.json()["file_size"] == len(pdf_bytes) + 2
+
+
+if __name__ == "__main__":
+    test_content_length_over_the_limit_is_rejected_unread()
+    test_chunked_body_over_the_limit_is_cut_off()
+    test_upload_over_max_file_size_is_rejected()
+    test_pdf_type_is_checked_by_magic_bytes()
+    print("OK")